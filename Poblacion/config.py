@@ -1,10 +1,39 @@
+import os
+import sys
 from rdflib import Graph, Namespace, Literal, URIRef
 from rdflib.namespace import RDF, XSD
 
+# Los índices compartidos con la aplicación viven en la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from verification_index import VerificationIndex
+from near_duplicates import NearDuplicateIndex
+from sqlite_store import open_ontology
+from ingestion import TripleJournal
+
 # Configuración de namespaces
 ONTOLOGY_NS = Namespace("http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#")
 BASE_URI = "http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3"
 
-# Inicializar grafo RDF
-g = Graph()
-g.parse("noticias_ontologia.rdf", format="xml")
\ No newline at end of file
+# Almacén de tripletas: "memory" (RDF/XML) o "sqlite" (el mismo fichero que abre la aplicación)
+TRIPLE_STORE = os.environ.get("TRIPLE_STORE", "memory")
+TRIPLE_STORE_FILE = os.environ.get("TRIPLE_STORE_FILE", "data/ontologia.sqlite")
+
+# Registro de ingesta de la aplicación: con el almacén en memoria las inserciones se
+# añaden aquí y la aplicación las compacta en el RDF/XML (nunca se reescribe desde aquí)
+INGEST_JOURNAL = os.environ.get("INGEST_JOURNAL", "data/ingesta.nt")
+registro = TripleJournal(INGEST_JOURNAL)
+
+# Inicializar grafo RDF con lo ingerido que aún no se ha compactado
+with registro.lock():
+    g = open_ontology(TRIPLE_STORE, TRIPLE_STORE_FILE, ["noticias_ontologia.rdf"])
+# Tripletas insertadas desde el último guardado (sólo con el almacén en memoria)
+pendientes = []
+if not g.store.transaction_aware:
+    registro.replay(g)
+    pendientes = registro.track(g)
+
+# Índice inverso noticia -> verificaciones, actualizado en cada inserción
+verificaciones = VerificationIndex.from_graph(g, ONTOLOGY_NS)
+
+# Índice LSH de casi duplicados, compartido con la aplicación
+duplicados = NearDuplicateIndex("data/near_duplicates.sqlite")
@@ -1,6 +1,6 @@
 from rdflib import Literal
 from rdflib.namespace import RDF, XSD
-from utils import generar_uri
+from utils import generar_uri, guardar_ontologia
 from config import g, ONTOLOGY_NS, BASE_URI
 
 def insertar_herramienta():
@@ -57,7 +57,7 @@ def insertar_herramienta():
         g.add((herramienta_uri, ONTOLOGY_NS.FormatosSoportados, Literal(formatos)))
         g.add((herramienta_uri, ONTOLOGY_NS.DetecciónManipulación, Literal(deteccion, datatype=XSD.boolean)))
     
-    g.serialize(destination="noticias_ontologia.rdf", format="xml")
+    guardar_ontologia(g)
     print("\n¡Herramienta agregada exitosamente!")
 
 def insertar_modelo_ia():
@@ -79,5 +79,5 @@ def insertar_modelo_ia():
     for idioma in idiomas.split(','):
         g.add((modelo_uri, ONTOLOGY_NS.IdiomaSoportaModelo_IA, Literal(idioma.strip())))
     
-    g.serialize(destination="noticias_ontologia.rdf", format="xml")
+    guardar_ontologia(g)
     print("\n¡Modelo de IA agregado exitosamente!")
\ No newline at end of file
@@ -1,106 +1,84 @@
-import os
-import datetime
-from rdflib import Graph, Namespace, Literal, URIRef, RDF, XSD
-from config import g, ONTOLOGY_NS, BASE_URI
-from utils import generar_uri
+from config import g, ONTOLOGY_NS, BASE_URI, verificaciones, duplicados
+from utils import guardar_ontologia
+from ingestion import FORMATS, RESPONSIBLE_TYPES, IngestionError, UriGenerator, news_triples, verification_triples
+from verification_index import normalize_state
+
+# Mismo formato que generar_uri, sin repetir URIs dentro del mismo microsegundo
+nueva_uri = UriGenerator(BASE_URI)
 
 def insertar_noticia():
     """Interfaz para insertar una nueva noticia"""
     print("\n--- Insertar Nueva Noticia ---")
     
-    noticia_uri = generar_uri(BASE_URI, "Noticia")
-    titulo = input("Título de la noticia: ")
-    autor = input("Autor: ")
-    tematica = input("Temática (separar con comas si son varias): ")
-    ubicacion = input("Ubicación: ")
-    idioma = input("Idioma: ")
-    fecha_pub = input("Fecha de publicación (YYYY-MM-DD o dejar vacío para hoy): ")
-    fecha_pub = fecha_pub if fecha_pub else datetime.date.today().strftime("%Y-%m-%d")
+    datos = {
+        "titulo": input("Título de la noticia: "),
+        "autor": input("Autor: "),
+        "tematica": input("Temática (separar con comas si son varias): "),
+        "ubicacion": input("Ubicación: "),
+        "idioma": input("Idioma: "),
+        "fecha": input("Fecha de publicación (YYYY-MM-DD o dejar vacío para hoy): "),
+    }
     multimedia = input("¿Tiene contenido multimedia? (s/n): ").lower() == 's'
 
     print("\nSeleccione el formato de la noticia:")
-    print("1. Artículo")
-    print("2. Reportaje")
-    print("3. Entrevista")
-    print("4. Crónica")
-    print("5. Columna")
+    for i, formato in enumerate(FORMATS, 1):
+        print(f"{i}. {formato}")
     opcion_formato = input("Opción (1-5): ")
-    
-    formatos = {
-        "1": "Artículo",
-        "2": "Reportaje",
-        "3": "Entrevista",
-        "4": "Crónica",
-        "5": "Columna"
-    }
-    tipo_formato = formatos.get(opcion_formato, "Artículo")
-
-    g.add((noticia_uri, RDF.type, ONTOLOGY_NS.Noticia))
-    g.add((noticia_uri, ONTOLOGY_NS.Título, Literal(titulo)))
-    g.add((noticia_uri, ONTOLOGY_NS.Autor, Literal(autor)))
-    
-    for tema in tematica.split(','):
-        g.add((noticia_uri, ONTOLOGY_NS.Temática, Literal(tema.strip())))
-    
-    g.add((noticia_uri, ONTOLOGY_NS.Ubicación, Literal(ubicacion)))
-    g.add((noticia_uri, ONTOLOGY_NS.Idioma, Literal(idioma)))
-    g.add((noticia_uri, ONTOLOGY_NS.Fecha_publicación, Literal(fecha_pub, datatype=XSD.date)))
-    g.add((noticia_uri, ONTOLOGY_NS.Multimedia_asociado, Literal(multimedia, datatype=XSD.boolean)))
-    
-    formato_uri = generar_uri(BASE_URI, tipo_formato)
-    g.add((formato_uri, RDF.type, ONTOLOGY_NS[tipo_formato]))
-    g.add((noticia_uri, ONTOLOGY_NS.tiene, formato_uri))
+    datos["formato"] = FORMATS[int(opcion_formato) - 1] if opcion_formato in ["1", "2", "3", "4", "5"] else None
     
     print("\n--- Contenido de la Noticia ---")
-    contenido_texto = input("Texto principal de la noticia: ")
-    if contenido_texto:
-        texto_uri = generar_uri(BASE_URI, "Texto")
-        g.add((texto_uri, RDF.type, ONTOLOGY_NS.Texto))
-        g.add((texto_uri, ONTOLOGY_NS.ContenidoTexto, Literal(contenido_texto)))
-        g.add((texto_uri, ONTOLOGY_NS.pertenece_a, noticia_uri))
-        g.add((noticia_uri, ONTOLOGY_NS.tiene, texto_uri))
-    
+    datos["texto"] = input("Texto principal de la noticia: ")
+    
+    similares = duplicados.find(datos["titulo"], datos["texto"])
+    if similares:
+        print("\nAviso: la noticia es casi idéntica a otras ya registradas:")
+        for uri, similitud in similares[:5]:
+            print(f"  {uri} (similitud {similitud:.0%})")
+        if input("¿Desea insertarla de todos modos? (s/n): ").lower() != 's':
+            print("Noticia descartada.")
+            return
+
+    datos["multimedia"] = multimedia
     if multimedia:
         print("\n--- Detalles Multimedia ---")
         tipo_multimedia = input("Tipo de multimedia (Imagen/Video/Audio): ").capitalize()
-        if tipo_multimedia in ["Imagen", "Video", "Audio"]:
-            multimedia_uri = generar_uri(BASE_URI, tipo_multimedia)
-            g.add((multimedia_uri, RDF.type, ONTOLOGY_NS[tipo_multimedia]))
-            g.add((noticia_uri, ONTOLOGY_NS.tiene, multimedia_uri))
-            
-            if tipo_multimedia == "Imagen":
-                resolucion = input("Resolución de la imagen: ")
-                modo_color = input("Modo de color: ")
-                g.add((multimedia_uri, ONTOLOGY_NS.ResoluciónImágen, Literal(resolucion)))
-                g.add((multimedia_uri, ONTOLOGY_NS.ModoColor, Literal(modo_color)))
-            
-            elif tipo_multimedia == "Video":
-                duracion = input("Duración en segundos: ")
-                tasa_fotogramas = input("Tasa de fotogramas: ")
-                resolucion = input("Resolución: ")
-                g.add((multimedia_uri, ONTOLOGY_NS.Duración, Literal(int(duracion), datatype=XSD.integer)))
-                g.add((multimedia_uri, ONTOLOGY_NS.TasaFotogramas, Literal(float(tasa_fotogramas), datatype=XSD.float)))
-                g.add((multimedia_uri, ONTOLOGY_NS.ResoluciónVideo, Literal(resolucion)))
-            
-            elif tipo_multimedia == "Audio":
-                duracion = input("Duración en segundos: ")
-                canales = input("Número de canales: ")
-                g.add((multimedia_uri, ONTOLOGY_NS.DuraciónAudio, Literal(int(duracion), datatype=XSD.integer)))
-                g.add((multimedia_uri, ONTOLOGY_NS.Canales, Literal(float(canales), datatype=XSD.float)))
+        if tipo_multimedia == "Imagen":
+            datos["multimedia"] = {"tipo": tipo_multimedia,
+                                   "resolucion": input("Resolución de la imagen: "),
+                                   "modo_color": input("Modo de color: ")}
+        elif tipo_multimedia == "Video":
+            datos["multimedia"] = {"tipo": tipo_multimedia,
+                                   "duracion": input("Duración en segundos: "),
+                                   "tasa_fotogramas": input("Tasa de fotogramas: "),
+                                   "resolucion": input("Resolución: ")}
+        elif tipo_multimedia == "Audio":
+            datos["multimedia"] = {"tipo": tipo_multimedia,
+                                   "duracion": input("Duración en segundos: "),
+                                   "canales": input("Número de canales: ")}
+    
+    # Las mismas tripletas que inserta la API de ingesta de la aplicación
+    try:
+        noticia_uri, tripletas = news_triples(datos, ONTOLOGY_NS, nueva_uri)
+    except IngestionError as e:
+        print(f"Noticia descartada: {e}")
+        return
+    for tripleta in tripletas:
+        g.add(tripleta)
     
     if input("\n¿Desea agregar información de verificación? (s/n): ").lower() == 's':
         insertar_verificacion(noticia_uri)
     
-    g.serialize(destination="noticias_ontologia.rdf", format="xml")
+    guardar_ontologia(g)
+    grupo = duplicados.add(str(noticia_uri), datos["titulo"], datos["texto"])
+    if grupo != str(noticia_uri):
+        print(f"Registrada como casi duplicada de {grupo}")
     print("\n¡Noticia agregada exitosamente!")
 
 def insertar_verificacion(noticia_uri):
     """Interfaz para insertar una verificación de noticia"""
     print("\n--- Información de Verificación ---")
     
-    verificacion_uri = generar_uri(BASE_URI, "Verificacion")
-    fecha_verificacion = input("Fecha de verificación (YYYY-MM-DD o dejar vacío para hoy): ")
-    fecha_verificacion = fecha_verificacion if fecha_verificacion else datetime.date.today().strftime("%Y-%m-%d")
+    datos = {"fecha": input("Fecha de verificación (YYYY-MM-DD o dejar vacío para hoy): ")}
     
     print("\nSeleccione el método de verificación:")
     print("1. Fact-checking")
@@ -111,58 +89,39 @@ def insertar_verificacion(noticia_uri):
     opcion_metodo = input("Opción (1-5): ")
     
     metodos = {
-        "1": ("Fact-checking", "Fact-checking"),
-        "2": ("Verificación_de_Fuente", "Verificación de Fuente"),
-        "3": ("Verificación_de_Imágen", "Verificación de Imagen"),
-        "4": ("Verificación_de_Video", "Verificación de Video"),
-        "5": ("Patrones_lingüísticos", "Patrones Lingüísticos")
+        "1": "Fact-checking",
+        "2": "Verificación_de_Fuente",
+        "3": "Verificación_de_Imágen",
+        "4": "Verificación_de_Video",
+        "5": "Patrones_lingüísticos"
     }
     
-    metodo_uri, metodo_nombre = metodos.get(opcion_metodo, ("Fact-checking", "Fact-checking"))
-    
-    g.add((verificacion_uri, RDF.type, ONTOLOGY_NS.Verificación))
-    g.add((verificacion_uri, ONTOLOGY_NS.evalua, noticia_uri))
-    g.add((verificacion_uri, ONTOLOGY_NS.FechaVerificación, Literal(fecha_verificacion, datatype=XSD.date)))
-    
-    metodo_inst_uri = generar_uri(BASE_URI, metodo_uri)
-    g.add((metodo_inst_uri, RDF.type, ONTOLOGY_NS[metodo_uri]))
-    g.add((verificacion_uri, ONTOLOGY_NS.se_apoya_en, metodo_inst_uri))
-    
-    if metodo_uri == "Fact-checking":
-        fuentes = input("Fuentes consultadas (separar con comas): ")
-        cantidad_fuentes = input("Cantidad de fuentes: ")
-        for fuente in fuentes.split(','):
-            g.add((metodo_inst_uri, ONTOLOGY_NS.FuentesUtilizadasFC, Literal(fuente.strip())))
-        g.add((metodo_inst_uri, ONTOLOGY_NS.CantidadFuentes, Literal(int(cantidad_fuentes), datatype=XSD.integer)))
-    
-    elif metodo_uri == "Verificación_de_Fuente":
-        autoridad = input("Autoridad de la fuente: ")
-        registro = input("¿Tiene registro oficial? (s/n): ").lower() == 's'
-        g.add((metodo_inst_uri, ONTOLOGY_NS.AutoridadFuente, Literal(autoridad)))
-        g.add((metodo_inst_uri, ONTOLOGY_NS.RegistroOficial, Literal(registro, datatype=XSD.boolean)))
-    
-    elif metodo_uri == "Verificación_de_Imágen":
-        coincidencia = input("Coincidencia visual: ")
-        deteccion = input("¿Se detectaron ediciones? (s/n): ").lower() == 's'
-        g.add((metodo_inst_uri, ONTOLOGY_NS.CoincidenciaVisual, Literal(coincidencia)))
-        g.add((metodo_inst_uri, ONTOLOGY_NS.DetecciónEdiciones, Literal(deteccion, datatype=XSD.boolean)))
-    
-    elif metodo_uri == "Verificación_de_Video":
-        coherencia = input("¿Hay coherencia audiovisual? (s/n): ").lower() == 's'
-        contexto = input("Coincidencia contextual: ")
-        g.add((metodo_inst_uri, ONTOLOGY_NS.CoherenciaAudiovisual, Literal(coherencia, datatype=XSD.boolean)))
-        g.add((metodo_inst_uri, ONTOLOGY_NS.CoincidenciaContextual, Literal(contexto)))
-    
-    elif metodo_uri == "Patrones_lingüísticos":
-        complejidad = input("Complejidad del texto: ")
-        deteccion_sesgo = input("¿Se detectó sesgo? (s/n): ").lower() == 's'
-        g.add((metodo_inst_uri, ONTOLOGY_NS.Complejidad, Literal(complejidad)))
-        g.add((metodo_inst_uri, ONTOLOGY_NS.DetecciónSesgo, Literal(deteccion_sesgo, datatype=XSD.boolean)))
-    
-    resultado = input("Resultado de la verificación: ")
-    estado = input("Estado (Finalizada/En proceso/Rechazada): ")
-    g.add((verificacion_uri, ONTOLOGY_NS.Resultado, Literal(resultado)))
-    g.add((verificacion_uri, ONTOLOGY_NS.Estado, Literal(estado)))
+    metodo = datos["metodo"] = metodos.get(opcion_metodo, "Fact-checking")
+    
+    if metodo == "Fact-checking":
+        datos["fuentes"] = input("Fuentes consultadas (separar con comas): ")
+        datos["cantidad_fuentes"] = input("Cantidad de fuentes: ")
+    
+    elif metodo == "Verificación_de_Fuente":
+        datos["autoridad"] = input("Autoridad de la fuente: ")
+        datos["registro_oficial"] = input("¿Tiene registro oficial? (s/n): ").lower() == 's'
+    
+    elif metodo == "Verificación_de_Imágen":
+        datos["coincidencia_visual"] = input("Coincidencia visual: ")
+        datos["ediciones"] = input("¿Se detectaron ediciones? (s/n): ").lower() == 's'
+    
+    elif metodo == "Verificación_de_Video":
+        datos["coherencia_audiovisual"] = input("¿Hay coherencia audiovisual? (s/n): ").lower() == 's'
+        datos["coincidencia_contextual"] = input("Coincidencia contextual: ")
+    
+    elif metodo == "Patrones_lingüísticos":
+        datos["complejidad"] = input("Complejidad del texto: ")
+        datos["sesgo"] = input("¿Se detectó sesgo? (s/n): ").lower() == 's'
+    
+    datos["resultado"] = input("Resultado de la verificación: ")
+    datos["estado"] = input("Estado (Finalizada/En proceso/Rechazada): ")
+    if normalize_state(datos["estado"]) is None:
+        print(f"Aviso: '{datos['estado']}' no es un estado conocido; la noticia figurará como no verificada")
     
     print("\n--- Entidad Responsable ---")
     print("1. Organización")
@@ -172,28 +131,24 @@ def insertar_verificacion(noticia_uri):
     opcion_responsable = input("Opción (1-4): ")
     
     if opcion_responsable in ["1", "2", "3", "4"]:
-        responsable_uri = generar_uri(BASE_URI, "EntidadResponsable")
-        tipos = {
-            "1": ("Organización", "TipoOrganización"),
-            "2": ("Medio_de_comunicación", "AlineaciónEditorial"),
-            "3": ("Usuarios", "Rol"),
-            "4": ("Algoritmo_de_IA", "TipoAprendizaje")
+        tipo_entidad = list(RESPONSIBLE_TYPES)[int(opcion_responsable) - 1]
+        propiedad_especifica, clave = RESPONSIBLE_TYPES[tipo_entidad]
+        datos["responsable"] = {
+            "tipo": tipo_entidad,
+            "nombre": input(f"Nombre de la {tipo_entidad.replace('_', ' ')}: "),
+            clave: input(f"{propiedad_especifica.replace('_', ' ')}: "),
+            "experiencia": input("Años de experiencia (opcional): ")
         }
-        tipo_entidad, propiedad_especifica = tipos[opcion_responsable]
-        
-        nombre = input(f"Nombre de la {tipo_entidad.replace('_', ' ')}: ")
-        especifico = input(f"{propiedad_especifica.replace('_', ' ')}: ")
-        experiencia = input("Años de experiencia (opcional): ")
-        
-        g.add((responsable_uri, RDF.type, ONTOLOGY_NS[tipo_entidad]))
-        g.add((responsable_uri, ONTOLOGY_NS[propiedad_especifica], Literal(especifico)))
-        g.add((responsable_uri, ONTOLOGY_NS.Especialización, Literal(nombre)))
-        
-        if experiencia:
-            g.add((responsable_uri, ONTOLOGY_NS.Experiencia, Literal(int(experiencia), datatype=XSD.integer)))
-        
-        g.add((verificacion_uri, ONTOLOGY_NS.se_realiza_por, responsable_uri))
     
+    try:
+        verificacion_uri, tripletas = verification_triples(noticia_uri, datos, ONTOLOGY_NS, nueva_uri)
+    except IngestionError as e:
+        print(f"Verificación descartada: {e}")
+        return
+    for tripleta in tripletas:
+        g.add(tripleta)
+    
+    verificaciones.add(g, verificacion_uri)
     print("\n¡Verificación agregada exitosamente!")
 
 def menu_principal():
@@ -218,10 +173,12 @@ def menu_principal():
             WHERE {
                 ?noticia a untitled-ontology-3:Noticia ;
                          untitled-ontology-3:Título ?titulo .
-                FILTER NOT EXISTS { ?verificacion untitled-ontology-3:evalua ?noticia }
             }
             """
-            resultados = g.query(query)
+            # Las noticias ya verificadas se descartan con el índice, sin FILTER NOT EXISTS
+            filas = list(g.query(query))
+            pendientes = set(verificaciones.unverified(row.noticia for row in filas))
+            resultados = [row for row in filas if row.noticia in pendientes]
             for i, row in enumerate(resultados, 1):
                 print(f"{i}. {row.titulo} ({row.noticia})")
             
@@ -236,7 +193,7 @@ def menu_principal():
             from herramientas import insertar_modelo_ia
             insertar_modelo_ia()
         elif opcion == "5":
-            g.serialize(destination="noticias_ontologia.rdf", format="xml")
+            guardar_ontologia(g)
             print("Cambios guardados. Saliendo...")
             break
         else:
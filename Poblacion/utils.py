@@ -1,5 +1,6 @@
 from rdflib import URIRef
 import datetime
+from config import registro, pendientes
 
 def generar_uri(base_uri, tipo_entidad):
     """Genera un URI único para una nueva entidad"""
@@ -22,7 +23,14 @@ def mostrar_noticias_disponibles(g):
         print(f"{i}. {row.titulo}")
     return resultados
 
-def guardar_ontologia(g, archivo="noticias_ontologia.rdf"):
-    """Guarda la ontología en un archivo"""
-    g.serialize(destination=archivo, format="xml")
-    print(f"Ontología guardada en {archivo}")
\ No newline at end of file
+def guardar_ontologia(g):
+    """Confirma la transacción si el grafo vive en un almacén en disco; si no, añade lo insertado al registro de ingesta"""
+    if g.store.transaction_aware:
+        g.commit()
+        print(f"Cambios confirmados en {g.store.path}")
+        return
+    if not pendientes:
+        return
+    registro.append(list(pendientes))
+    print(f"{len(pendientes)} tripletas añadidas a {registro.path}")
+    pendientes.clear()
@@ -0,0 +1,272 @@
+"""
+Control de admisión y descarte de carga.
+Las etapas caras (búsqueda sin caché, traducción, consulta online a DBpedia)
+tienen un límite de concurrencia y una cola de espera acotada. Una petición
+que no cabe en la cola, o que no llegaría a ejecutarse antes de su plazo, se
+rechaza en el acto en lugar de esperar para nada. Las etapas opcionales no
+rechazan la petición: se omiten (modo degradado) y se sirven sólo resultados
+locales o sin traducir. Además, cada cliente tiene un cubo de fichas que
+limita su ritmo de peticiones.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+# Plazo absoluto (time.monotonic) de la petición en curso; None fuera de una petición.
+_deadline: contextvars.ContextVar = contextvars.ContextVar("admission_deadline", default=None)
+
+
+def client_address(remote_addr: str, forwarded_for: str = "", trusted_proxies: int = 0) -> str:
+    """
+    Dirección del cliente para el límite de ritmo. Detrás de ``trusted_proxies``
+    proxies de confianza es la que añadió a X-Forwarded-For el más externo de
+    ellos; lo que haya a su izquierda lo escribe el cliente y no se usa. Sin
+    proxies configurados, o con menos saltos de los esperados, la del socket.
+    """
+    if trusted_proxies <= 0 or not forwarded_for:
+        return remote_addr
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    if len(hops) < trusted_proxies:
+        return remote_addr
+    return hops[-trusted_proxies]
+
+
+class Overloaded(Exception):
+    """Una etapa obligatoria rechazó la petición."""
+
+    def __init__(self, stage: str, reason: str, retry_after: float):
+        super().__init__(f"etapa '{stage}' saturada ({reason})")
+        self.stage = stage
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Cubo de fichas: ``rate`` fichas por segundo con ráfagas de hasta ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Consume una ficha; devuelve 0 si había o los segundos hasta la siguiente."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Stage:
+    """Semáforo con cola de espera acotada y rechazo según el plazo de la petición."""
+
+    # Peso de la última muestra en la media móvil del tiempo de servicio.
+    EWMA_WEIGHT = 0.2
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            name: Nombre de la etapa en las métricas
+            limit: Ejecuciones simultáneas permitidas
+            max_queue: Peticiones que pueden esperar turno a la vez
+            max_wait: Espera máxima aunque el plazo de la petición sea mayor
+        """
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.queued = 0
+        self.peak_queue = 0
+        self.admitted = 0
+        self.shed: Counter = Counter()
+        self.service_time = 0.0
+        self._cond = threading.Condition()
+
+    def expected_wait(self) -> float:
+        """Espera estimada de quien se pone ahora a la cola."""
+        return (self.queued + 1) * self.service_time / self.limit
+
+    def acquire(self, deadline: Optional[float]) -> Optional[str]:
+        """Espera turno; devuelve None si entra o el motivo del rechazo."""
+        now = time.monotonic()
+        limit_at = now + self.max_wait if deadline is None else min(deadline, now + self.max_wait)
+        with self._cond:
+            if self.in_flight < self.limit and not self.queued:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+            if self.queued >= self.max_queue:
+                return self._reject("queue_full")
+            if self.expected_wait() > limit_at - now:
+                return self._reject("deadline")
+
+            self.queued += 1
+            self.peak_queue = max(self.peak_queue, self.queued)
+            try:
+                while self.in_flight >= self.limit:
+                    remaining = limit_at - time.monotonic()
+                    if remaining <= 0:
+                        return self._reject("timeout")
+                    self._cond.wait(remaining)
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+    def release(self, elapsed: float) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self.service_time += self.EWMA_WEIGHT * (elapsed - self.service_time)
+            self._cond.notify()
+
+    def _reject(self, reason: str) -> str:
+        self.shed[reason] += 1
+        return reason
+
+    @property
+    def saturation(self) -> float:
+        """Fracción ocupada de la cola de espera."""
+        return self.queued / self.max_queue if self.max_queue else float(self.in_flight >= self.limit)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "peak_queue_depth": self.peak_queue,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "service_ms": round(self.service_time * 1000, 2)
+        }
+
+
+class AdmissionController:
+    """Etapas con límite de concurrencia, modos degradados y límite de ritmo por cliente."""
+
+    def __init__(self, stages: Dict[str, Tuple[int, int]], request_deadline: float = 2.0,
+                 max_wait: float = 1.0, rate: float = 20.0, burst: float = 40.0,
+                 max_clients: int = 10000, degrade_at: float = 0.5, enabled: bool = True):
+        """
+        Args:
+            stages: {nombre: (concurrencia, tamaño de la cola)}
+            request_deadline: Segundos que tiene cada petición desde que llega
+            max_wait: Espera máxima en la cola de una etapa
+            rate: Peticiones por segundo por cliente (0 desactiva el límite)
+            burst: Ráfaga máxima por cliente
+            max_clients: Cubos de fichas que se conservan (se olvidan los más antiguos)
+            degrade_at: Ocupación de cola a partir de la cual se omiten las etapas opcionales
+            enabled: Si es False todas las etapas admiten sin límite
+        """
+        self.stages = {name: Stage(name, limit, queue, max_wait) for name, (limit, queue) in stages.items()}
+        self.request_deadline = request_deadline
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.degrade_at = degrade_at
+        self.enabled = enabled
+        self.rate_limited = 0
+        self.degraded: Counter = Counter()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._buckets_lock = threading.Lock()
+
+    def begin_request(self) -> contextvars.Token:
+        """Fija el plazo de la petición en curso; se deshace con ``end_request``."""
+        return _deadline.set(time.monotonic() + self.request_deadline)
+
+    @staticmethod
+    def end_request(token: contextvars.Token) -> None:
+        _deadline.reset(token)
+
+    def allow(self, client: str) -> float:
+        """Consume una ficha del cliente; 0 si puede pasar o los segundos que debe esperar."""
+        if not self.enabled or self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._buckets_lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            wait = bucket.take(now)
+        if wait:
+            self.rate_limited += 1
+        return wait
+
+    def overloaded(self) -> bool:
+        """True si alguna etapa tiene la cola por encima del umbral de degradación."""
+        return self.enabled and any(stage.saturation >= self.degrade_at for stage in self.stages.values())
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Etapa obligatoria: si no hay turno a tiempo lanza ``Overloaded``."""
+        if not self.enabled:
+            yield
+            return
+        stage = self.stages[name]
+        reason = stage.acquire(_deadline.get())
+        if reason is not None:
+            raise Overloaded(name, reason, max(stage.expected_wait(), 1.0))
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            stage.release(time.monotonic() - start)
+
+    @contextmanager
+    def optional_stage(self, name: str, mode: str) -> Iterator[bool]:
+        """
+        Etapa prescindible: produce False (y cuenta una activación del modo
+        degradado ``mode``) si el sistema está sobrecargado o no hay turno.
+        """
+        if not self.enabled:
+            yield True
+            return
+        stage = self.stages[name]
+        if self.overloaded() or stage.acquire(_deadline.get()) is not None:
+            self.degraded[mode] += 1
+            yield False
+            return
+        start = time.monotonic()
+        try:
+            yield True
+        finally:
+            stage.release(time.monotonic() - start)
+
+    def skip_optional(self, mode: str) -> bool:
+        """
+        Variante sin espera de ``optional_stage`` para el código asíncrono, que
+        no puede bloquear el bucle: True (y cuenta una activación del modo
+        degradado ``mode``) si el sistema está sobrecargado.
+        """
+        if not self.overloaded():
+            return False
+        self.degraded[mode] += 1
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del control de admisión."""
+        return {
+            "enabled": self.enabled,
+            "overloaded": self.overloaded(),
+            "stages": {name: stage.get_statistics() for name, stage in self.stages.items()},
+            "shed_total": sum(sum(stage.shed.values()) for stage in self.stages.values()),
+            "degraded": dict(self.degraded),
+            "rate_limited": self.rate_limited,
+            "tracked_clients": len(self._buckets)
+        }
@@ -3,15 +3,50 @@ Sistema de Búsqueda de Noticias con Ontología Semántica.
 Integra búsqueda local (RDF) y online (DBpedia) con soporte multilingüe.
 """
 
+import hmac
+import http.client
+import json
 import os
-from flask import Flask, request, render_template, jsonify
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Optional
+from flask import (Flask, Response, abort, current_app, g, get_template_attribute, has_request_context, request,
+                   render_template, jsonify, make_response, stream_with_context)
+from markupsafe import Markup, escape
 from rdflib import Graph, Namespace, Literal, URIRef
-from rdflib.namespace import RDF, RDFS, OWL, XSD
-from SPARQLWrapper import SPARQLWrapper, JSON
-from googletrans import Translator
+from rdflib.namespace import RDF, RDFS
 import urllib.parse
 
+from admission import AdmissionController, Overloaded, client_address
 from dbpedia_manager import initialize_dbpedia, HybridSearchEngine
+from news_index import NewsIndex, extract_records, infer_properties, news_details, news_record, parse_date_query
+from fuzzy_index import FuzzyIndex, build_fuzzy_index
+from entity_linker import EntityLinker, build_entity_linker
+from lexicon import Lexicon, load_or_build_lexicon
+from location_index import LocationHierarchy, build_location_hierarchy
+from suggest_index import SuggestService, dbpedia_entries, news_entries
+from http_cache import HTTPCache, precompress_static
+from fragment_cache import FragmentCache, fill, slot
+from export import (FILTER_FACETS, FORMATS as EXPORT_FORMATS, ExportError, chunks, grouped_triples, news_subjects,
+                    resolve_format, select_news, serialize, subject_triples)
+from hot_reload import HotReloader, SnapshotHolder, WarmUp
+from ingestion import (IngestionError, IngestionWriter, LayeredStore, TripleJournal, UriGenerator, add_to_graph,
+                       persist_graph, prepare_news, prepare_verification)
+from sharding import ShardedNewsSearch
+from query_parser import QueryPlanner, parse_query
+from resilience import CircuitOpen, ClientError, HedgedClient
+from verification_index import VerificationIndex
+from memory_report import MemoryAccountant
+from sqlite_store import SQLiteStore, open_ontology
+from sparql_endpoint import FORMAT_ALIASES, GRAPH_FORMAT, RESULT_FORMATS, QueryError, SparqlEndpoint, to_csv
+
+if TYPE_CHECKING:
+    # Dependen de numpy: se importan al construir los extras, no al arrancar.
+    from semantic_index import SemanticIndex
+    from near_duplicates import NearDuplicateIndex
 
 
 class NewsSearchConfig:
@@ -24,7 +59,110 @@ class NewsSearchConfig:
     }
     
     ONTOLOGY_NS = Namespace("http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#")
-    DBPEDIA_ENDPOINT = "http://dbpedia.org/sparql"
+    # Puede apuntar al /sparql local de otra instancia para trabajar sin conexión.
+    DBPEDIA_ENDPOINT = os.environ.get("DBPEDIA_ENDPOINT", "http://dbpedia.org/sparql")
+    # Réplica a la que se repiten las consultas lentas (vacío = sin peticiones cubiertas)
+    DBPEDIA_MIRROR = os.environ.get("DBPEDIA_MIRROR", "")
+    # DBpedia online: plazos, cortocircuito tras fallos seguidos y percentil para cubrir peticiones
+    ONLINE_CONNECT_TIMEOUT = float(os.environ.get("ONLINE_CONNECT_TIMEOUT", "1.0"))
+    ONLINE_READ_TIMEOUT = float(os.environ.get("ONLINE_READ_TIMEOUT", "3.0"))
+    # Hilos para las consultas online: cada búsqueda puede ocupar dos (principal y réplica)
+    ONLINE_WORKERS = 16
+    BREAKER_FAILURES = 5
+    BREAKER_RESET = 10.0
+    HEDGE_PERCENTILE = 0.95
+    HEDGE_MIN_DELAY = 0.05
+    
+    # Corrección de consultas sin resultados: "off", "suggest" o "rewrite"
+    FUZZY_MODE = os.environ.get("FUZZY_MODE", "suggest")
+    FUZZY_MAX_DISTANCE = 2
+    
+    SEARCH_MODES = ('lexical', 'semantic', 'hybrid')
+    SEMANTIC_INDEX_DIR = "data/semantic"
+    SEMANTIC_DIMENSIONS = 100
+    # Peso del resultado léxico frente al coseno en el modo híbrido
+    HYBRID_ALPHA = 0.5
+    # Máximo de sugerencias precalculadas por prefijo en el autocompletado
+    SUGGEST_MAX_RESULTS = 10
+    # Búsqueda por lotes (/api/search/batch): consultas por petición y resultados por consulta
+    BATCH_MAX_QUERIES = 1000
+    BATCH_MAX_RESULTS = 100
+    # Léxico es/en/pt para ampliar las consultas a los otros idiomas sin traducirlas en línea
+    LEXICON_FILE = "data/lexicon.json"
+    CROSS_LINGUAL = os.environ.get("CROSS_LINGUAL", "1") == "1"
+    
+    # Modo ASGI (async_app.py): cliente HTTP compartido y ejecutor para los índices
+    TRANSLATE_HOST = "translate.google.com"
+    HTTP_CONNECT_TIMEOUT = 2.0
+    HTTP_READ_TIMEOUT = 5.0
+    HTTP_MAX_CONNECTIONS = 100
+    INDEX_WORKERS = 4
+    
+    # Caché HTTP: segundos de validez para proxies/CDN y tamaño mínimo a comprimir
+    CACHE_MAX_AGE = 60
+    COMPRESS_MIN_SIZE = 1024
+    # Tarjetas de resultado y cuerpos de detalle renderizados que se conservan (0 = sin caché)
+    FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "20000"))
+    
+    # Recarga en caliente al cambiar la ontología o la caché de DBpedia
+    ONTOLOGY_FILES = ("noticias_ontologia.rdf", "noticias_ontologia.owl")
+    DBPEDIA_CACHE_FILE = "data/dbpedia_local.json"
+    HOT_RELOAD = os.environ.get("HOT_RELOAD", "1") == "1"
+    HOT_RELOAD_INTERVAL = 2.0
+    
+    # Almacén de tripletas: "memory" (RDF/XML en memoria) o "sqlite" (en disco, compartido con Poblacion)
+    TRIPLE_STORE = os.environ.get("TRIPLE_STORE", "memory")
+    TRIPLE_STORE_FILE = os.environ.get("TRIPLE_STORE_FILE", "data/ontologia.sqlite")
+    
+    # Modo particionado: número de procesos (0 = desactivado), "hash" o "date"
+    NEWS_SHARDS = int(os.environ.get("NEWS_SHARDS", "0"))
+    SHARD_PARTITION = os.environ.get("SHARD_PARTITION", "hash")
+    SHARD_TIMEOUT = 2.0
+    
+    # Casi duplicados (MinHash/LSH): índice en disco, umbral de Jaccard y agrupación en resultados
+    NEAR_DUPLICATES_FILE = "data/near_duplicates.sqlite"
+    NEAR_DUPLICATE_THRESHOLD = 0.7
+    COLLAPSE_DUPLICATES = os.environ.get("COLLAPSE_DUPLICATES", "1") == "1"
+    
+    # Rutas de administración (desactivadas si no hay token) e informe de memoria
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+    MEMORY_TRACING = os.environ.get("MEMORY_TRACING", "0") == "1"
+    MEMORY_REPORT_INTERVAL = float(os.environ.get("MEMORY_REPORT_INTERVAL", "0"))
+    MEMORY_REPORT_TOP = 10
+    
+    # Arranque: los índices opcionales se construyen en un hilo tras publicar lo imprescindible
+    BACKGROUND_WARM_UP = os.environ.get("BACKGROUND_WARM_UP", "1") == "1"
+    
+    # Control de admisión: {etapa: (concurrencia, cola)}, plazo por petición y ritmo por cliente
+    ADMISSION_CONTROL = os.environ.get("ADMISSION_CONTROL", "1") == "1"
+    ADMISSION_STAGES = {"search": (8, 32), "translation": (4, 8), "online": (2, 4)}
+    REQUEST_DEADLINE = 2.0
+    STAGE_MAX_WAIT = 1.0
+    # Ocupación de cola a partir de la cual se omiten traducción y DBpedia online
+    DEGRADE_AT = 0.5
+    RATE_LIMIT = float(os.environ.get("RATE_LIMIT", "20"))
+    RATE_BURST = 40
+    RATE_LIMIT_CLIENTS = 10000
+    # Proxies de confianza delante de la aplicación: el límite de ritmo usa la
+    # dirección de X-Forwarded-For que añadió el más externo (0 = la del socket)
+    TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", "0"))
+    
+    # Endpoint /sparql de sólo lectura: procesos, plazo y CPU por consulta, filas y caché
+    SPARQL_WORKERS = int(os.environ.get("SPARQL_WORKERS", "2"))
+    SPARQL_TIMEOUT = 10.0
+    SPARQL_CPU_SECONDS = 10.0
+    SPARQL_MAX_ROWS = 10000
+    SPARQL_CACHE_SIZE = 256
+    
+    # Ingesta en línea (/api/noticias): documentos por petición, lote y cola del escritor,
+    # espera de la petición a que se publique su lote y pausa antes de reconstruir los extras
+    INGEST_MAX_DOCUMENTS = 100
+    INGEST_MAX_BATCH = 200
+    INGEST_MAX_QUEUE = 2000
+    INGEST_TIMEOUT = 10.0
+    INGEST_REFRESH_DELAY = float(os.environ.get("INGEST_REFRESH_DELAY", "5"))
+    # Con el almacén en memoria, registro N-Triples de lo ingerido desde la última compactación
+    INGEST_JOURNAL = os.environ.get("INGEST_JOURNAL", "data/ingesta.nt")
     
     TRANSLATIONS = {
         'search_placeholder': {
@@ -131,27 +269,120 @@ class NewsSearchConfig:
             'es': 'No se encontraron resultados en DBpedia',
             'en': 'No results found in DBpedia',
             'pt': 'Nenhum resultado encontrado no DBpedia'
+        },
+        'filters': {
+            'es': 'Filtros',
+            'en': 'Filters',
+            'pt': 'Filtros'
+        },
+        'month': {
+            'es': 'Mes',
+            'en': 'Month',
+            'pt': 'Mês'
+        },
+        'location': {
+            'es': 'Ubicación',
+            'en': 'Location',
+            'pt': 'Localização'
+        },
+        'clear_filters': {
+            'es': 'Quitar filtros',
+            'en': 'Clear filters',
+            'pt': 'Limpar filtros'
+        },
+        'did_you_mean': {
+            'es': '¿Quisiste decir',
+            'en': 'Did you mean',
+            'pt': 'Você quis dizer'
+        },
+        'showing_results_for': {
+            'es': 'Mostrando resultados para',
+            'en': 'Showing results for',
+            'pt': 'Mostrando resultados para'
+        },
+        'partial_results': {
+            'es': 'Resultados incompletos: parte del índice no respondió a tiempo.',
+            'en': 'Incomplete results: part of the index did not respond in time.',
+            'pt': 'Resultados incompletos: parte do índice não respondeu a tempo.'
+        },
+        'mode_lexical': {
+            'es': 'Léxica',
+            'en': 'Lexical',
+            'pt': 'Léxica'
+        },
+        'mode_semantic': {
+            'es': 'Semántica',
+            'en': 'Semantic',
+            'pt': 'Semântica'
+        },
+        'mode_hybrid': {
+            'es': 'Híbrida',
+            'en': 'Hybrid',
+            'pt': 'Híbrida'
+        },
+        'related_entities': {
+            'es': 'Entidades relacionadas',
+            'en': 'Related entities',
+            'pt': 'Entidades relacionadas'
+        },
+        'near_duplicates': {
+            'es': 'versiones casi idénticas',
+            'en': 'near-identical versions',
+            'pt': 'versões quase idênticas'
+        },
+        'verifications': {
+            'es': 'Verificaciones',
+            'en': 'Verifications',
+            'pt': 'Verificações'
+        },
+        'verification_method': {
+            'es': 'Método',
+            'en': 'Method',
+            'pt': 'Método'
+        },
+        'verification_responsible': {
+            'es': 'Responsable',
+            'en': 'Responsible',
+            'pt': 'Responsável'
+        },
+        'linked_news': {
+            'es': 'Noticias relacionadas',
+            'en': 'Related news',
+            'pt': 'Notícias relacionadas'
         }
     }
+    
+    FACET_LABELS = {
+        'tematica': 'topic',
+        'autor': 'author',
+        'estado': 'verification',
+        'mes': 'month',
+        'ubicacion': 'location'
+    }
 
 
 class RDFSearchEngine:
     """Motor de búsqueda para la ontología RDF local."""
     
-    def __init__(self, graph: Graph, ontology_ns: Namespace):
+    # rdflib deja pasar FILTER (false): hace falta una comparación que nunca se cumpla.
+    NO_MATCH = "1 = 0"
+    
+    def __init__(self, graph: Graph, ontology_ns: Namespace, verifications: VerificationIndex):
         self.graph = graph
         self.ontology_ns = ontology_ns
+        self.verifications = verifications
     
-    def build_query(self, keyword: str, search_type: str = "general") -> str:
+    def build_query(self, keyword: str, search_type: str = "general", ordered: bool = True) -> str:
         filters = self._build_filters(keyword, search_type)
         filter_clause = f"FILTER ({' || '.join(filters)})" if filters else ""
+        order_clause = "ORDER BY DESC(?fecha)" if ordered else ""
         
         return f"""
             PREFIX untitled-ontology-3: <http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#>
             PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
             PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
             
-            SELECT DISTINCT ?noticia ?titulo ?fecha ?tematica ?autor ?estadoVerificacion
+            SELECT DISTINCT ?noticia ?titulo ?fecha ?tematica ?autor
             WHERE {{
                 ?noticia rdf:type ?tipoNoticia .
                 ?tipoNoticia rdfs:subClassOf* untitled-ontology-3:Noticia .
@@ -162,13 +393,8 @@ class RDFSearchEngine:
                 OPTIONAL {{ ?noticia untitled-ontology-3:Autor ?autor . }}
                 
                 {filter_clause}
-                
-                OPTIONAL {{
-                    ?verificacion untitled-ontology-3:evalua ?noticia ;
-                                  untitled-ontology-3:Estado ?estadoVerificacion .
-                }}
             }}
-            ORDER BY DESC(?fecha)
+            {order_clause}
         """
     
     def _build_filters(self, keyword: str, search_type: str) -> list:
@@ -182,27 +408,51 @@ class RDFSearchEngine:
             ],
             "autor": [f'CONTAINS(LCASE(STR(?autor)), LCASE("{keyword_escaped}"))'],
             "tema": [f'CONTAINS(LCASE(STR(?tematica)), LCASE("{keyword_escaped}"))'],
-            "fecha": [f'STR(?fecha) = "{keyword_escaped}"'],
-            "verificadas": ['?estadoVerificacion = untitled-ontology-3:Verificada']
+            "fecha": [self._date_filter(keyword)],
+            "verificadas": [self._verified_filter()]
         }
         
         return filter_map.get(search_type, filter_map["general"])
     
+    def _date_filter(self, expression: str) -> str:
+        # Mismas expresiones que el índice de fechas (2024, 2024-03, rangos, last30d...).
+        interval = parse_date_query(expression)
+        if interval is None:
+            return self.NO_MATCH
+        start, end = interval
+        return f'(STR(?fecha) >= "{start}" && STR(?fecha) <= "{end}")'
+    
+    def _verified_filter(self) -> str:
+        # Estado es un literal con variantes de escritura: se resuelve con el índice inverso.
+        verified = [uri for uri in self.verifications.by_news if self.verifications.is_verified(uri)]
+        if not verified:
+            return self.NO_MATCH
+        return f"?noticia IN ({', '.join(f'<{uri}>' for uri in verified)})"
+    
     def execute_search(self, query: str) -> list:
         try:
-            results = list(self.graph.query(query))
-            return [
-                {
-                    "uri": str(row.noticia),
-                    "titulo": str(row.titulo) if row.titulo else "Sin título",
-                    "fecha": self._format_date(row.fecha) if row.fecha else "?",
-                    "tematica": str(row.tematica) if row.tematica else "?",
-                    "autor": str(row.autor) if row.autor else "?",
-                    "verificacion": str(row.estadoVerificacion) if row.estadoVerificacion else "No verificada",
-                    "original_lang": "es"
-                }
-                for row in results
-            ]
+            # Una fila por noticia aunque tenga varias temáticas o autores.
+            merged = {}
+            for row in self.graph.query(query):
+                uri = str(row.noticia)
+                result = merged.get(uri)
+                if result is None:
+                    result = merged[uri] = {
+                        "uri": uri,
+                        "titulo": str(row.titulo) if row.titulo else "Sin título",
+                        "fecha": self._format_date(row.fecha) if row.fecha else "?",
+                        "tematica": [],
+                        "autor": [],
+                        "verificacion": self.verifications.state(uri),
+                        "original_lang": "es"
+                    }
+                for key, value in (("tematica", row.tematica), ("autor", row.autor)):
+                    if value and str(value) not in result[key]:
+                        result[key].append(str(value))
+            for result in merged.values():
+                result["tematica"] = ", ".join(result["tematica"]) or "?"
+                result["autor"] = ", ".join(result["autor"]) or "?"
+            return list(merged.values())
         except Exception as e:
             print(f"Error en consulta SPARQL: {e}")
             return []
@@ -216,15 +466,72 @@ class RDFSearchEngine:
 
 
 class OnlineSearchEngine:
-    """Motor de búsqueda online para DBpedia."""
+    """
+    Motor de búsqueda online para DBpedia.
+    Las consultas tienen plazos explícitos de conexión y de lectura, pasan por
+    un cortocircuito por endpoint y, con réplica, se cubren las más lentas.
+    """
     
-    def __init__(self, endpoint: str = "http://dbpedia.org/sparql"):
+    def __init__(self, endpoint: str = "http://dbpedia.org/sparql", mirror: Optional[str] = None,
+                 connect_timeout: float = NewsSearchConfig.ONLINE_CONNECT_TIMEOUT,
+                 read_timeout: float = NewsSearchConfig.ONLINE_READ_TIMEOUT,
+                 failure_threshold: int = NewsSearchConfig.BREAKER_FAILURES,
+                 reset_timeout: float = NewsSearchConfig.BREAKER_RESET):
         self.endpoint = endpoint
-        self.sparql = SPARQLWrapper(endpoint)
-        self.sparql.setReturnFormat(JSON)
+        self.mirror = mirror or None
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.client = HedgedClient(
+            [endpoint] + ([mirror] if mirror else []), self.fetch,
+            deadline=connect_timeout + read_timeout,
+            failure_threshold=failure_threshold, reset_timeout=reset_timeout,
+            hedge_percentile=NewsSearchConfig.HEDGE_PERCENTILE,
+            hedge_min_delay=NewsSearchConfig.HEDGE_MIN_DELAY,
+            max_workers=NewsSearchConfig.ONLINE_WORKERS
+        )
     
     def query_dbpedia(self, search_term: str, lang: str = 'en') -> list:
-        query = f"""
+        try:
+            return self.parse_results(self.client.request(self.build_query(search_term, lang)))
+        except CircuitOpen:
+            # DBpedia ya se dio por caída: se sirven sólo resultados locales sin esperar.
+            return []
+        except Exception as e:
+            print(f"⚠️  Búsqueda online no disponible: {e}")
+            return []
+    
+    def fetch(self, endpoint: str, query: str) -> dict:
+        """GET del protocolo SPARQL con un plazo para conectar y otro para cada lectura."""
+        url = urllib.parse.urlsplit(endpoint)
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(url.netloc, timeout=self.connect_timeout)
+        try:
+            connection.connect()
+            connection.sock.settimeout(self.read_timeout)
+            params = urllib.parse.urlencode({"query": query, "format": "application/sparql-results+json"})
+            connection.request("GET", f"{url.path or '/'}?{params}",
+                               headers={"Accept": "application/sparql-results+json"})
+            response = connection.getresponse()
+            body = response.read()
+        finally:
+            connection.close()
+        if 400 <= response.status < 500:
+            raise ClientError(f"HTTP {response.status} de {endpoint}")
+        if response.status != 200:
+            raise ConnectionError(f"HTTP {response.status} de {endpoint}")
+        return json.loads(body)
+    
+    def get_statistics(self) -> dict:
+        """Retorna estadísticas de las consultas online."""
+        return {
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            **self.client.get_statistics()
+        }
+    
+    @staticmethod
+    def build_query(search_term: str, lang: str = 'en') -> str:
+        return f"""
             PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
             PREFIX dbo: <http://dbpedia.org/ontology/>
             
@@ -242,73 +549,280 @@ class OnlineSearchEngine:
             }}
             LIMIT 5
         """
-        
-        try:
-            self.sparql.setQuery(query)
-            results = self.sparql.query().convert()
-            
-            return [
-                {
-                    "resource": {"value": binding["resource"]["value"]},
-                    "label": {"value": binding["label"]["value"]},
-                    "abstract": {"value": binding.get("abstract", {}).get("value", "")}
-                }
-                for binding in results["results"]["bindings"]
-            ]
-        except Exception as e:
-            print(f"⚠️  Búsqueda online no disponible: {e}")
-            return []
+    
+    @staticmethod
+    def parse_results(results: dict) -> list:
+        return [
+            {
+                "resource": {"value": binding["resource"]["value"]},
+                "label": {"value": binding["label"]["value"]},
+                "abstract": {"value": binding.get("abstract", {}).get("value", "")}
+            }
+            for binding in results["results"]["bindings"]
+        ]
 
 
 class SearchManager:
     """Gestor centralizado de búsquedas offline y online."""
     
     def __init__(self, rdf_engine: RDFSearchEngine, online_engine: OnlineSearchEngine, 
-                 dbpedia_index):
+                 dbpedia_index, news_index: NewsIndex, fuzzy_index: FuzzyIndex = None,
+                 fuzzy_mode: str = "suggest", semantic_index: "SemanticIndex" = None,
+                 entity_linker: EntityLinker = None, shards: ShardedNewsSearch = None,
+                 clusters: dict = None, lexicon: Lexicon = None,
+                 admission: AdmissionController = None):
         self.rdf_engine = rdf_engine
         self.online_engine = online_engine
         self.dbpedia_index = dbpedia_index
+        self.news_index = news_index
+        self.planner = QueryPlanner(news_index)
+        self.fuzzy_index = fuzzy_index
+        self.fuzzy_mode = fuzzy_mode if fuzzy_index is not None else "off"
+        self.semantic_index = semantic_index
+        self.entity_linker = entity_linker
+        self.shards = shards
+        self.clusters = clusters or {}
+        self.lexicon = lexicon if NewsSearchConfig.CROSS_LINGUAL else None
+        self.admission = admission
+    
+    def search_news(self, keyword: str, lang: str = 'es', filters: dict = None) -> tuple:
+        """
+        Busca noticias con el lenguaje de consulta compuesto (ver ``query_parser``).
+        
+        Returns:
+            Tupla (resultados de la más reciente a la más antigua, tipo de consulta,
+            particiones que no respondieron: si hay alguna, los resultados son parciales)
+        """
+        query = parse_query(keyword)
+        if self.lexicon is not None:
+            query = self.lexicon.expand_query(query)
+        
+        missing = []
+        if self.shards is not None:
+            local_results, missing = self.shards.search(query.clauses, filters)
+        else:
+            bits = self.planner.execute(query, self.news_index.filter_bits(filters))
+            local_results = self.news_index.results(bits)
+        
+        if NewsSearchConfig.COLLAPSE_DUPLICATES and self.clusters:
+            from near_duplicates import collapse_duplicates
+            local_results = collapse_duplicates(local_results, self.clusters)
+        
+        return self._translate_results(local_results, lang), query.kind, missing
+    
+    def search_many(self, keywords: list, lang: str = 'es', filters: dict = None,
+                    limit: Optional[int] = None) -> list:
+        """
+        Evalúa un lote de consultas a la vez: el texto libre de todas se busca en
+        una sola pasada sobre el índice y cada texto distinto se traduce una vez
+        para todo el lote.
+        
+        Returns:
+            Lista de tuplas (resultados, tipo de consulta, particiones que no
+            respondieron) en el orden de ``keywords``
+        """
+        unique = list(dict.fromkeys(keywords))
+        queries = [parse_query(keyword) for keyword in unique]
+        if self.lexicon is not None:
+            queries = [self.lexicon.expand_query(query) for query in queries]
+        
+        missing = []
+        if self.shards is not None:
+            batches, missing = self.shards.search_many([query.clauses for query in queries], filters, limit)
+        else:
+            allowed = self.news_index.filter_bits(filters)
+            batches = [self.news_index.results(bits, limit)
+                       for bits in self.planner.execute_many(queries, allowed)]
+        
+        if NewsSearchConfig.COLLAPSE_DUPLICATES and self.clusters:
+            from near_duplicates import collapse_duplicates
+            batches = [collapse_duplicates(results, self.clusters) for results in batches]
+        
+        self._translate_batch(batches, lang)
+        by_keyword = {keyword: (results, query.kind, missing)
+                      for keyword, query, results in zip(unique, queries, batches)}
+        return [by_keyword[keyword] for keyword in keywords]
+    
+    def search_semantic(self, keyword: str, lang: str = 'es', filters: dict = None,
+                        k: int = 20) -> tuple:
+        """
+        Búsqueda por similitud de embeddings sobre noticias y resúmenes de DBpedia.
+        
+        Returns:
+            Tupla (noticias, recursos DBpedia), cada una con su puntaje de coseno.
+            Mientras el índice semántico no está listo, la búsqueda léxica.
+        """
+        if self.semantic_index is None:
+            return self.search_news(keyword, lang, filters)[0], []
+        
+        allowed = self.news_index.filter_bits(filters)
+        doc_ids = self.news_index.doc_ids
+        
+        news_results = []
+        for uri, score in self.semantic_index.search(keyword, k, kind="noticia"):
+            if allowed >> doc_ids[uri] & 1:
+                result = self.news_index.to_result(doc_ids[uri])
+                result["score"] = round(score, 4)
+                news_results.append(result)
+        
+        dbpedia_results = []
+        for uri, score in self.semantic_index.search(keyword, 5, kind="dbpedia"):
+            resource = self.dbpedia_index.resources[uri]
+            dbpedia_results.append({
+                "resource": {"value": resource.uri},
+                "label": {"value": resource.label},
+                "abstract": {"value": resource.abstract},
+                "score": round(score, 4)
+            })
+        
+        return self._translate_results(news_results, lang), self._attach_linked_news(dbpedia_results)
+    
+    def search_hybrid(self, keyword: str, lang: str = 'es', filters: dict = None,
+                      k: int = 20, alpha: float = 0.5) -> list:
+        """
+        Combina coincidencia léxica y similitud semántica en un solo ranking.
+        
+        Cada noticia puntúa ``alpha * léxico + (1 - alpha) * coseno``, donde
+        léxico vale 1 si la búsqueda por palabras clave la encontró.
+        """
+        if self.semantic_index is None:
+            return self.search_news(keyword, lang, filters)[0]
+        
+        lexical = self.search_news(keyword, 'es', filters)[0]
+        lexical_uris = {r["uri"] for r in lexical}
+        allowed = self.news_index.filter_bits(filters)
+        doc_ids = self.news_index.doc_ids
+        
+        semantic = dict(self.semantic_index.search(keyword, k, kind="noticia"))
+        semantic.update(self.semantic_index.similarity(keyword, lexical_uris - semantic.keys()))
+        
+        scored = []
+        for uri in lexical_uris | semantic.keys():
+            if not allowed >> doc_ids[uri] & 1:
+                continue
+            score = alpha * (uri in lexical_uris) + (1 - alpha) * max(semantic.get(uri, 0.0), 0.0)
+            scored.append((score, uri))
+        scored.sort(reverse=True)
+        
+        results = []
+        for score, uri in scored[:k]:
+            result = self.news_index.to_result(doc_ids[uri])
+            result["score"] = round(score, 4)
+            results.append(result)
+        return self._translate_results(results, lang)
+    
+    def _translate_results(self, results: list, lang: str) -> list:
+        self._translate_batch([results], lang)
+        return results
+    
+    def _translate_batch(self, batches: list, lang: str) -> None:
+        """
+        Traduce los resultados de varias consultas pidiendo cada texto distinto
+        una sola vez. Con el sistema saturado se dejan sin traducir.
+        """
+        if lang == 'es':
+            return
+        if self.admission is None:
+            self._translate_texts(batches, lang)
+            return
+        with self.admission.optional_stage("translation", "skip_translation") as admitted:
+            if admitted:
+                self._translate_texts(batches, lang)
+            else:
+                note_degraded("skip_translation")
+    
+    def _translate_texts(self, batches: list, lang: str) -> None:
+        translated = {}
+        for results in batches:
+            for result in results:
+                for field in ("titulo", "tematica", "autor"):
+                    text = result[field]
+                    if text not in translated:
+                        translated[text] = self._translate_if_needed(text, lang)
+                    result[field] = translated[text]
     
-    def search_news(self, keyword: str, lang: str = 'es') -> tuple:
-        query_type = self._detect_search_type(keyword)
-        query = self.rdf_engine.build_query(keyword, query_type)
-        local_results = self.rdf_engine.execute_search(query)
+    def search_with_correction(self, keyword: str, lang: str = 'es', filters: dict = None) -> tuple:
+        """
+        Busca noticias y, si no hay resultados, propone o aplica una corrección.
+        
+        Returns:
+            Tupla (resultados, tipo de consulta, corrección o None, particiones
+            que no respondieron). En modo "rewrite" los resultados ya
+            corresponden a la consulta corregida.
+        """
+        local_results, query_type, missing = self.search_news(keyword, lang, filters)
+        correction = None
         
-        for result in local_results:
-            result["titulo"] = self._translate_if_needed(result["titulo"], lang)
-            result["tematica"] = self._translate_if_needed(result["tematica"], lang)
-            result["autor"] = self._translate_if_needed(result["autor"], lang)
+        if not local_results and keyword and self.fuzzy_mode != "off":
+            correction = self.fuzzy_index.correct(keyword)
+            if correction and self.fuzzy_mode == "rewrite":
+                local_results, query_type, missing = self.search_news(correction, lang, filters)
         
-        return local_results, query_type
+        return local_results, query_type, correction, missing
+    
+    def get_facets(self, results: list, top_k: int = 10) -> dict:
+        """Conteos por faceta de un conjunto de resultados, servidos desde el índice."""
+        bits = self.news_index.bits_for_uris(r["uri"] for r in results)
+        return self.news_index.facet_counts(bits, top_k)
     
     def search_dbpedia(self, keyword: str, lang: str = 'es', use_online: bool = True) -> list:
         local_results = self.dbpedia_index.search(keyword)
         
-        if use_online and len(local_results) == 0:
-            try:
-                lang_code = 'en' if lang == 'en' else 'es' if lang == 'es' else 'pt'
-                online_results = self.online_engine.query_dbpedia(keyword, lang_code)
-                if online_results:
-                    local_results.extend(online_results)
-            except Exception as e:
-                print(f"⚠️  No se pudo buscar en DBpedia online: {e}")
+        if not local_results and self.lexicon is not None:
+            for term in self.lexicon.lookup(keyword):
+                local_results = self.dbpedia_index.search(term)
+                if local_results:
+                    break
         
-        return local_results
-    
-    @staticmethod
-    def _detect_search_type(keyword: str) -> str:
-        keyword_lower = keyword.lower()
+        if not local_results and self.fuzzy_mode == "rewrite":
+            correction = self.fuzzy_index.correct(keyword)
+            if correction:
+                local_results = self.dbpedia_index.search(correction)
         
-        if "autor:" in keyword_lower or "author:" in keyword_lower:
-            return "autor"
-        elif "tema:" in keyword_lower or "topic:" in keyword_lower:
-            return "tema"
-        elif "fecha:" in keyword_lower or "date:" in keyword_lower:
-            return "fecha"
-        elif "verificadas" in keyword_lower or "verified" in keyword_lower:
-            return "verificadas"
+        if use_online and len(local_results) == 0:
+            if self.admission is None:
+                local_results.extend(self._search_online(keyword, lang))
+            else:
+                with self.admission.optional_stage("online", "skip_online") as admitted:
+                    if admitted:
+                        local_results.extend(self._search_online(keyword, lang))
+                    else:
+                        note_degraded("skip_online")
         
-        return "general"
+        return self._attach_linked_news(local_results)
+    
+    def _search_online(self, keyword: str, lang: str) -> list:
+        try:
+            lang_code = 'en' if lang == 'en' else 'es' if lang == 'es' else 'pt'
+            return self.online_engine.query_dbpedia(keyword, lang_code) or []
+        except Exception as e:
+            print(f"⚠️  No se pudo buscar en DBpedia online: {e}")
+            return []
+    
+    def related_resources(self, news_uri: str) -> list:
+        """Recursos DBpedia enlazados a una noticia, sin consultar el grafo."""
+        if self.entity_linker is None:
+            return []
+        related = {}
+        for uri in self.entity_linker.resources_for(news_uri):
+            resource = self.dbpedia_index.resources.get(uri)
+            if resource is not None and resource.label not in related:
+                related[resource.label] = {"uri": resource.uri, "label": resource.label}
+        return list(related.values())
+    
+    def _attach_linked_news(self, dbpedia_results: list) -> list:
+        """Añade a cada recurso DBpedia las noticias locales enlazadas con él."""
+        doc_ids = self.news_index.doc_ids
+        for result in dbpedia_results:
+            if self.entity_linker is None:
+                result["linked_news"] = []
+                continue
+            result["linked_news"] = [
+                {"uri": uri, "titulo": self.news_index.records[doc_ids[uri]].titulo}
+                for uri in self.entity_linker.news_for(result["resource"]["value"])
+                if uri in doc_ids
+            ]
+        return dbpedia_results
     
     @staticmethod
     def _translate_if_needed(text: str, target_lang: str) -> str:
@@ -316,6 +830,7 @@ class SearchManager:
             return text
         
         try:
+            from googletrans import Translator
             translator = Translator()
             translation = translator.translate(text, src='es', dest=target_lang)
             return translation.text
@@ -326,10 +841,13 @@ class SearchManager:
 def load_ontology() -> Graph:
     graph = Graph()
     try:
-        if os.path.exists("noticias_ontologia.rdf"):
-            graph.parse("noticias_ontologia.rdf", format="xml")
-        elif os.path.exists("noticias_ontologia.owl"):
-            graph.parse("noticias_ontologia.owl", format="xml")
+        graph = open_ontology(NewsSearchConfig.TRIPLE_STORE, NewsSearchConfig.TRIPLE_STORE_FILE,
+                              NewsSearchConfig.ONTOLOGY_FILES)
+        if not isinstance(graph.store, SQLiteStore):
+            # Lo ingerido que aún no se ha compactado en el RDF/XML.
+            replayed = ingest_journal.replay(graph)
+            if replayed:
+                print(f"✓ Registro de ingesta aplicado: {replayed} tripletas")
         print(f"✓ Ontología cargada: {len(graph)} tripletas")
     except Exception as e:
         print(f"✗ Error cargando ontología: {e}")
@@ -337,104 +855,530 @@ def load_ontology() -> Graph:
     return graph
 
 
-def infer_properties(graph: Graph, subject: URIRef) -> dict:
-    classes = set()
+def ontology_version(graph: Graph) -> str:
+    """Versión del grafo cargado: fecha del fichero de ontología (o versión del almacén) y número de tripletas."""
+    if isinstance(graph.store, SQLiteStore):
+        return f"sqlite{graph.store.version()}-{len(graph)}"
+    for path in NewsSearchConfig.ONTOLOGY_FILES:
+        if os.path.exists(path):
+            return f"{os.stat(path).st_mtime_ns}-{len(graph)}"
+    return f"0-{len(graph)}"
+
+
+def load_near_duplicates(news_index: NewsIndex) -> Optional["NearDuplicateIndex"]:
+    """Abre el índice de casi duplicados e incorpora las noticias que aún no tiene."""
+    from near_duplicates import NearDuplicateIndex
+    try:
+        index = NearDuplicateIndex(NewsSearchConfig.NEAR_DUPLICATES_FILE,
+                                   NewsSearchConfig.NEAR_DUPLICATE_THRESHOLD)
+        index.add_many((r.uri, r.titulo, r.texto) for r in news_index.records)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"⚠️  Índice de casi duplicados no disponible: {e}")
+        return None
+    stats = index.get_statistics()
+    print(f"✓ Casi duplicados: {stats['grouped']} noticias en {stats['clusters']} grupos"
+          + (f" ({stats['checked']} noticias nuevas revisadas)" if stats['checked'] else ""))
+    return index
+
+
+@dataclass
+class RuntimeSnapshot:
+    """
+    Una generación de datos: grafo, índices derivados y gestores. La primera
+    se publica sólo con lo imprescindible (``extras_ready`` falso) y los
+    índices opcionales se añaden al terminar el calentamiento.
+    """
+    generation: int
+    graph: Graph
+    graph_version: str
+    rdf_engine: RDFSearchEngine
+    dbpedia_index: Any
+    verification_index: VerificationIndex
+    news_index: NewsIndex
+    search_manager: "SearchManager"
+    fuzzy_index: Optional[FuzzyIndex] = None
+    semantic_index: Optional["SemanticIndex"] = None
+    entity_linker: Optional[EntityLinker] = None
+    suggest_service: Optional[SuggestService] = None
+    shards: Optional[ShardedNewsSearch] = None
+    near_duplicates: Optional["NearDuplicateIndex"] = None
+    lexicon: Optional[Lexicon] = None
+    extras_ready: bool = False
+    locations: Optional[LocationHierarchy] = None
+    
+    def versions(self) -> tuple:
+        return (self.generation, self.graph_version, self.dbpedia_index.version, self.extras_ready)
+
+
+online_engine = OnlineSearchEngine(NewsSearchConfig.DBPEDIA_ENDPOINT, NewsSearchConfig.DBPEDIA_MIRROR)
+# URIs nuevas con el formato de generar_uri de Poblacion.
+new_uri = UriGenerator(str(NewsSearchConfig.ONTOLOGY_NS).rstrip("#"))
+ingest_journal = TripleJournal(NewsSearchConfig.INGEST_JOURNAL)
+# Compartido por todas las generaciones: las colas y métricas sobreviven a las recargas.
+admission = AdmissionController(NewsSearchConfig.ADMISSION_STAGES,
+                                request_deadline=NewsSearchConfig.REQUEST_DEADLINE,
+                                max_wait=NewsSearchConfig.STAGE_MAX_WAIT,
+                                rate=NewsSearchConfig.RATE_LIMIT, burst=NewsSearchConfig.RATE_BURST,
+                                max_clients=NewsSearchConfig.RATE_LIMIT_CLIENTS,
+                                degrade_at=NewsSearchConfig.DEGRADE_AT,
+                                enabled=NewsSearchConfig.ADMISSION_CONTROL)
+
+
+def build_essentials(generation: int = 1) -> RuntimeSnapshot:
+    """Carga la ontología y DBpedia local y construye lo necesario para buscar noticias."""
+    graph = load_ontology()
+    if generation > 1 and not len(graph):
+        raise ValueError("la ontología está vacía o no se pudo leer")
+    verification_index = VerificationIndex.from_graph(graph, NewsSearchConfig.ONTOLOGY_NS)
+    rdf_engine = RDFSearchEngine(graph, NewsSearchConfig.ONTOLOGY_NS, verification_index)
+    dbpedia_index = initialize_dbpedia()
+    records = extract_records(graph, NewsSearchConfig.ONTOLOGY_NS, verification_index)
+    # Antes del índice: la faceta "ubicacion" guarda cada lugar con sus antecesores.
+    locations = build_location_hierarchy(dbpedia_index, records)
+    news_index = NewsIndex(records)
+    search_manager = SearchManager(rdf_engine, online_engine, dbpedia_index, news_index,
+                                   admission=admission)
+    return RuntimeSnapshot(generation, graph, ontology_version(graph), rdf_engine, dbpedia_index,
+                           verification_index, news_index, search_manager, locations=locations)
+
+
+def news_suggest_source(news_index: NewsIndex) -> dict:
+    """Fuente de autocompletado con los títulos, autores y temáticas de ``news_index``."""
+    return {"news": (lambda: len(news_index.records), lambda: news_entries(news_index))}
+
+
+def build_extras(essentials: RuntimeSnapshot) -> RuntimeSnapshot:
+    """
+    Completa una generación esencial con los índices opcionales (corrección,
+    semántico, enlaces, casi duplicados, léxico, particiones y autocompletado).
+    """
+    from semantic_index import load_or_build_semantic_index
+    
+    graph = essentials.graph
+    news_index = essentials.news_index
+    dbpedia_index = essentials.dbpedia_index
+    shards = None
+    if NewsSearchConfig.NEWS_SHARDS > 0:
+        # Cada partición copia sólo las tripletas de sus noticias y calcula el detalle al pedirlo.
+        shards = ShardedNewsSearch(news_index.records, graph, NewsSearchConfig.NEWS_SHARDS,
+                                   NewsSearchConfig.SHARD_PARTITION, NewsSearchConfig.SHARD_TIMEOUT)
+    fuzzy_index = build_fuzzy_index(news_index, dbpedia_index, NewsSearchConfig.FUZZY_MAX_DISTANCE)
+    semantic_index = load_or_build_semantic_index(news_index, dbpedia_index,
+                                                  NewsSearchConfig.SEMANTIC_INDEX_DIR,
+                                                  NewsSearchConfig.SEMANTIC_DIMENSIONS)
+    entity_linker = build_entity_linker(news_index, dbpedia_index)
+    near_duplicates = load_near_duplicates(news_index)
+    lexicon = load_or_build_lexicon(graph, NewsSearchConfig.ONTOLOGY_NS, dbpedia_index,
+                                    NewsSearchConfig.LEXICON_FILE)
+    search_manager = SearchManager(essentials.rdf_engine, online_engine, dbpedia_index, news_index,
+                                   fuzzy_index, NewsSearchConfig.FUZZY_MODE, semantic_index,
+                                   entity_linker, shards,
+                                   near_duplicates.clusters() if near_duplicates else None, lexicon,
+                                   admission)
+    suggest_service = SuggestService({
+        **news_suggest_source(news_index),
+        "dbpedia": (lambda: dbpedia_index.version,
+                    lambda: dbpedia_entries(dbpedia_index, entity_linker)),
+    }, top_k=NewsSearchConfig.SUGGEST_MAX_RESULTS)
+    snapshot = RuntimeSnapshot(essentials.generation, graph, essentials.graph_version,
+                               essentials.rdf_engine, dbpedia_index, essentials.verification_index,
+                               news_index, search_manager, fuzzy_index, semantic_index, entity_linker,
+                               suggest_service, shards, near_duplicates, lexicon, extras_ready=True,
+                               locations=essentials.locations)
+    if shards is not None:
+        # Los procesos de la generación retirada se detienen cuando deja de usarse.
+        weakref.finalize(snapshot, shards.close)
+    if near_duplicates is not None:
+        weakref.finalize(snapshot, near_duplicates.close)
+    return snapshot
+
+
+def build_snapshot(generation: int = 1) -> RuntimeSnapshot:
+    """Generación completa de una vez, como la construye la recarga en caliente."""
+    return build_extras(build_essentials(generation))
+
+
+def ontology_file() -> str:
+    """Fichero RDF/XML que se cargó (y al que escribe la ingesta con el almacén en memoria)."""
+    return next((path for path in NewsSearchConfig.ONTOLOGY_FILES if os.path.exists(path)),
+                NewsSearchConfig.ONTOLOGY_FILES[0])
+
+
+def store_triples(graph: Graph, triples: list) -> Graph:
+    """
+    Persiste un lote de tripletas y devuelve el grafo que las contiene. Con
+    SQLite se confirman en una sola transacción sobre el mismo almacén (las
+    lecturas sólo ven lo confirmado); en memoria se añaden al registro de
+    ingesta y la generación nueva es el grafo vigente con una capa más, sin
+    copiarlo: las búsquedas en curso siguen leyendo el anterior. El RDF/XML
+    se reescribe al compactar (``compact_graph``), fuera de los lotes.
+    """
+    if isinstance(graph.store, SQLiteStore):
+        try:
+            graph.addN((s, p, o, graph) for s, p, o in triples)
+            graph.commit()
+        except Exception:
+            graph.rollback()
+            raise
+        return graph
+    ingest_journal.append(triples)
+    return add_to_graph(graph, triples)
+
+
+def compact_graph(snapshot: RuntimeSnapshot) -> RuntimeSnapshot:
+    """
+    Funde las capas de lo ingerido en un grafo en memoria, reescribe el
+    RDF/XML de forma atómica y vacía el registro. Si se interrumpe antes de
+    vaciarlo, al cargar se vuelven a aplicar tripletas que ya están (sin efecto).
+    """
+    if not isinstance(snapshot.graph.store, LayeredStore):
+        return snapshot
+    graph = snapshot.graph.store.compact()
+    with ingest_journal.lock():
+        if ingest_journal.foreign_writes():
+            # Poblacion añadió tripletas que este grafo no tiene: vaciar el
+            # registro las perdería. Se compacta tras la recarga que las aplica.
+            return snapshot
+        persist_graph(graph, ontology_file())
+        ingest_journal.truncate()
+    rdf_engine = RDFSearchEngine(graph, NewsSearchConfig.ONTOLOGY_NS, snapshot.verification_index)
+    return replace(snapshot, graph=graph, graph_version=ontology_version(graph), rdf_engine=rdf_engine)
+
+
+def apply_ingestion(current: RuntimeSnapshot, generation: int, writes: list,
+                    duplicates: Optional["NearDuplicateIndex"]) -> tuple:
+    """
+    Aplica un lote de escrituras sobre la generación vigente y construye la
+    siguiente sin recorrer el grafo: sólo se releen las noticias afectadas y
+    los índices se copian antes de modificarlos. Los extras (corrección,
+    semántico, enlaces...) se conservan hasta que se reconstruyen en segundo
+    plano; las particiones se descartan y la búsqueda vuelve al índice local.
+    
+    Returns:
+        Tupla (generación nueva o la vigente si no se aplicó nada, resultado o excepción por escritura)
+    """
+    ns = NewsSearchConfig.ONTOLOGY_NS
+    known = current.news_index.doc_ids
+    outcomes, accepted, batch_news = [], [], set()
+    for write in writes:
+        try:
+            if write.existing and str(write.noticia) not in known and str(write.noticia) not in batch_news:
+                raise IngestionError(404, f"noticia desconocida: {write.noticia}")
+            if not write.existing and not write.force and duplicates is not None:
+                similares = duplicates.find(write.titulo, write.texto)
+                if similares:
+                    raise IngestionError(409, "casi idéntica a " + ", ".join(uri for uri, _ in similares[:5])
+                                         + " (\"force\": true para insertarla de todos modos)")
+        except IngestionError as e:
+            outcomes.append(e)
+            continue
+        if not write.existing:
+            batch_news.add(str(write.noticia))
+        accepted.append(write)
+        outcomes.append(write.to_dict())
+    if not accepted:
+        return current, outcomes
+    
+    graph = store_triples(current.graph, [triple for write in accepted for triple in write.triples])
+    verification_index = current.verification_index.copy()
+    for write in accepted:
+        for verificacion in write.verifications:
+            verification_index.add(graph, verificacion)
+    
+    affected = dict.fromkeys(str(write.noticia) for write in accepted)
+    changed = [news_record(graph, ns, URIRef(uri), verification_index) for uri in affected]
+    locations = current.locations.copy() if current.locations is not None else LocationHierarchy()
+    relocated = locations.refresh(current.news_index.records, changed)
+    news_index = current.news_index.with_records(relocated + changed)
+    
+    rdf_engine = RDFSearchEngine(graph, ns, verification_index)
+    search_manager = SearchManager(rdf_engine, online_engine, current.dbpedia_index, news_index,
+                                   current.fuzzy_index, NewsSearchConfig.FUZZY_MODE,
+                                   current.semantic_index, current.entity_linker, None,
+                                   dict(current.search_manager.clusters), current.lexicon, admission)
+    # El autocompletado de la generación nueva lee su índice de noticias; DBpedia se reutiliza.
+    suggest_service = (current.suggest_service.with_sources(news_suggest_source(news_index))
+                       if current.suggest_service is not None else None)
+    snapshot = RuntimeSnapshot(generation, graph, ontology_version(graph), rdf_engine,
+                               current.dbpedia_index, verification_index, news_index, search_manager,
+                               current.fuzzy_index, current.semantic_index, current.entity_linker,
+                               suggest_service, lexicon=current.lexicon,
+                               extras_ready=current.extras_ready, locations=locations)
+    
+    # Los casi duplicados se confirman sólo con la generación ya construida: un
+    # fallo anterior no deja en el índice URIs que no están en el grafo.
+    if duplicates is not None:
+        try:
+            duplicates.add_many((write.noticia, write.titulo, write.texto)
+                                for write in accepted if not write.existing)
+            for uri in batch_news:
+                group = duplicates.cluster_of(uri)
+                if group is not None and group != uri:
+                    search_manager.clusters[uri] = search_manager.clusters[group] = group
+        except sqlite3.Error as e:
+            print(f"⚠️  No se pudieron indexar los casi duplicados del lote: {e}")
+    return snapshot, outcomes
+
+
+def ingestion_writer(reloader: HotReloader) -> IngestionWriter:
+    """
+    Escritor único de la aplicación: aplica cada lote sobre la generación
+    vigente con ``publish`` (serializado con la recarga en caliente) y, tras
+    un rato sin escrituras, reconstruye los extras con todo lo ingerido.
+    """
+    duplicates = []
+    
+    def setup():
+        graph = reloader.holder.current.graph
+        if isinstance(graph.store, SQLiteStore):
+            graph.store.set_durable()
+        try:
+            from near_duplicates import NearDuplicateIndex
+            # Conexión propia del hilo escritor, como la de Poblacion.
+            duplicates.append(NearDuplicateIndex(NewsSearchConfig.NEAR_DUPLICATES_FILE,
+                                                 NewsSearchConfig.NEAR_DUPLICATE_THRESHOLD))
+        except (ImportError, sqlite3.Error, ValueError) as e:
+            print(f"⚠️  La ingesta no comprobará casi duplicados: {e}")
     
-    for s, p, o in graph.triples((subject, RDF.type, None)):
-        classes.add(o)
-        for s2, p2, o2 in graph.triples((o, RDFS.subClassOf, None)):
-            classes.add(o2)
+    def apply(writes: list) -> list:
+        outcomes = []
+        
+        def update(current: RuntimeSnapshot, generation: int) -> RuntimeSnapshot:
+            snapshot, results = apply_ingestion(current, generation, writes,
+                                                duplicates[0] if duplicates else None)
+            outcomes.extend(results)
+            return snapshot
+        
+        reloader.publish(update)
+        return outcomes
     
-    properties = set()
-    for class_uri in classes:
-        for s, p, o in graph.triples((class_uri, RDFS.domain, None)):
-            properties.add(p)
+    def refresh_extras():
+        if not ingest_journal.foreign_writes():
+            reloader.publish(lambda current, generation:
+                             build_extras(compact_graph(replace(current, generation=generation))))
+        if ingest_journal.foreign_writes():
+            # ``publish`` da por vistos los ficheros: lo que Poblacion añadió al
+            # registro sólo se aplica con una recarga completa.
+            reloader.reload()
     
-    return {
-        'classes': [str(c) for c in classes],
-        'possible_properties': [str(p) for p in properties]
+    return IngestionWriter(apply, NewsSearchConfig.INGEST_MAX_BATCH, NewsSearchConfig.INGEST_MAX_QUEUE,
+                           idle_fn=refresh_extras, idle_delay=NewsSearchConfig.INGEST_REFRESH_DELAY,
+                           setup_fn=setup)
+
+
+def memory_subsystems(snapshot: RuntimeSnapshot, app: Flask) -> dict:
+    """Raíces de memoria de la generación vigente, en orden de atribución."""
+    roots = {
+        "graph": snapshot.graph,
+        "dbpedia_resources": snapshot.dbpedia_index.resources,
+        "dbpedia_label_index": snapshot.dbpedia_index.label_index,
+        "dbpedia_category_index": snapshot.dbpedia_index.category_index,
+        "verification_index": snapshot.verification_index,
+        "news_index": snapshot.news_index,
+        "fuzzy_index": snapshot.fuzzy_index,
+        "semantic_index": snapshot.semantic_index,
+        "entity_linker": snapshot.entity_linker,
+        "suggest_index": snapshot.suggest_service,
+        "lexicon": snapshot.lexicon,
+        "locations": snapshot.locations,
+        "jinja_cache": app.jinja_env.cache,
+        "fragment_cache": app.extensions["news_search"].fragments.entries if "news_search" in app.extensions else None,
     }
+    return {name: root for name, root in roots.items() if root is not None}
+
+
+@dataclass
+class AppState:
+    """Estado de una instancia de la aplicación; las vistas lo obtienen con ``app_state()``."""
+    runtime: SnapshotHolder
+    reloader: HotReloader
+    warm_up: WarmUp
+    memory: MemoryAccountant
+    http_cache: HTTPCache
+    sparql: SparqlEndpoint
+    ingestion: IngestionWriter
+    fragments: FragmentCache
+
+
+def app_state() -> AppState:
+    return current_app.extensions["news_search"]
+
+
+def bind_snapshot():
+    # Cada petición trabaja de principio a fin con la generación vigente al llegar.
+    g.snapshot = app_state().runtime.current
+
+
+# Sondas y estáticos no consumen fichas ni tienen plazo.
+UNMETERED_ENDPOINTS = {"healthz", "readyz", "static"}
+
 
+def admit_request():
+    if request.endpoint in UNMETERED_ENDPOINTS:
+        return None
+    client = client_address(request.remote_addr or "", ",".join(request.headers.getlist("X-Forwarded-For")),
+                            NewsSearchConfig.TRUSTED_PROXIES)
+    retry_after = admission.allow(client)
+    if retry_after:
+        return overload_response(429, retry_after)
+    g.admission_token = admission.begin_request()
+    return None
 
-app = Flask(__name__)
 
-graph = load_ontology()
-rdf_engine = RDFSearchEngine(graph, NewsSearchConfig.ONTOLOGY_NS)
-online_engine = OnlineSearchEngine(NewsSearchConfig.DBPEDIA_ENDPOINT)
-dbpedia_index = initialize_dbpedia()
-search_manager = SearchManager(rdf_engine, online_engine, dbpedia_index)
+def finish_request(_exc=None):
+    token = g.pop("admission_token", None)
+    if token is not None:
+        admission.end_request(token)
+
+
+def note_degraded(mode: str) -> None:
+    """Anota en la petición en curso que se omitió un paso prescindible (``mode``)."""
+    if has_request_context():
+        g.degraded = g.get("degraded", ()) + (mode,)
+
+
+def overload_response(status: int, retry_after: float):
+    response = make_response(jsonify({"error": "servicio saturado, reintente más tarde"}), status)
+    response.headers["Retry-After"] = str(max(1, round(retry_after)))
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def handle_overloaded(error: Overloaded):
+    return overload_response(503, error.retry_after)
+
+
+def require_admin() -> None:
+    """Las rutas de administración no existen sin ADMIN_TOKEN y exigen el token en cabecera."""
+    if not NewsSearchConfig.ADMIN_TOKEN:
+        abort(404)
+    supplied = request.headers.get("X-Admin-Token", "")
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        supplied = authorization[len("Bearer "):]
+    if not hmac.compare_digest(supplied.encode(), NewsSearchConfig.ADMIN_TOKEN.encode()):
+        abort(403)
+
+
+def supported_language(lang: Any) -> str:
+    """Idioma pedido si la interfaz lo ofrece; si no, español. Va antes de cualquier caché."""
+    return lang if isinstance(lang, str) and lang in NewsSearchConfig.LANGUAGES else 'es'
+
+
+# Campos de un resultado que se pintan en su tarjeta.
+CARD_FIELDS = ("titulo", "fecha", "tematica", "autor", "verificacion", "original_lang", "enlaceDBpedia")
+
+
+def news_cards(fragments: FragmentCache, snapshot: RuntimeSnapshot, results: list, lang: str,
+               keyword: str) -> list:
+    """Tarjetas de los resultados locales ensambladas desde la caché de fragmentos."""
+    chrome = fragments.chrome(lang)
+    card = get_template_attribute("fragments.html", "news_card")
+    badge = get_template_attribute("fragments.html", "duplicates_badge")
+    version = snapshot.versions()
+    keyword_param = str(escape("&" + urllib.parse.urlencode({"keyword": keyword})))
+    cards = []
+    for item in results:
+        fragment = fragments.get(
+            version, ("card", item["uri"], lang), tuple(item.get(name) for name in CARD_FIELDS),
+            lambda item=item: card(item, snapshot.search_manager.related_resources(item["uri"]), lang, chrome,
+                                   slot("keyword"), slot("duplicados"))
+        )
+        duplicates = str(badge(item["duplicados"], chrome)) if item.get("duplicados") else ""
+        cards.append(fill(fragment, {"keyword": keyword_param, "duplicados": duplicates}))
+    return cards
+
+
+def detail_body(fragments: FragmentCache, snapshot: RuntimeSnapshot, uri: str, lang: str) -> Markup:
+    """Cuerpo de la página de detalle; las consultas al grafo sólo se hacen al renderizarlo."""
+    def render() -> str:
+        detail = snapshot.shards.detail(uri) if snapshot.shards is not None else None
+        if detail is not None:
+            detalles, inferred = detail
+        else:
+            detalles = news_details(snapshot.graph, uri)
+            inferred = infer_properties(snapshot.graph, URIRef(uri))
+        return get_template_attribute("fragments.html", "detail_body")(
+            detalles, inferred, snapshot.verification_index.verifications(uri),
+            snapshot.search_manager.related_resources(uri), fragments.chrome(lang)
+        )
+    
+    return Markup(fragments.get(snapshot.versions(), ("detail", uri, lang), None, render))
 
 
-@app.route("/", methods=["GET", "POST"])
 def search():
-    lang = request.args.get('lang', 'es')
+    lang = supported_language(request.args.get('lang'))
     dark_mode = request.cookies.get('dark_mode', 'true') == 'true'
     keyword = request.args.get('keyword', '') or request.form.get("keyword", "")
+    mode = request.args.get('mode', '') or request.form.get("mode", "lexical")
+    if mode not in NewsSearchConfig.SEARCH_MODES:
+        mode = 'lexical'
+    filters = {
+        facet: request.args.getlist(facet)
+        for facet in NewsIndex.FACETS
+        if request.args.getlist(facet)
+    }
+    search_manager = g.snapshot.search_manager
     
     local_results = []
     dbpedia_results = []
+    facets = {}
+    correction = None
+    missing = []
     
-    if keyword:
-        local_results, _ = search_manager.search_news(keyword, lang)
+    with admission.stage("search"):
+        if keyword and mode == 'semantic':
+            local_results, dbpedia_results = search_manager.search_semantic(keyword, lang, filters)
+            facets = search_manager.get_facets(local_results)
+        elif keyword and mode == 'hybrid':
+            local_results = search_manager.search_hybrid(keyword, lang, filters,
+                                                         alpha=NewsSearchConfig.HYBRID_ALPHA)
+            facets = search_manager.get_facets(local_results)
+        
+            if len(local_results) < 5:
+                dbpedia_results = search_manager.search_dbpedia(keyword, lang, use_online=False)
+        elif keyword or filters:
+            local_results, _, correction, missing = search_manager.search_with_correction(keyword, lang, filters)
+            facets = search_manager.get_facets(local_results)
         
-        if len(local_results) < 5:
-            dbpedia_results = search_manager.search_dbpedia(keyword, lang, use_online=False)
+            if keyword and len(local_results) < 5:
+                dbpedia_results = search_manager.search_dbpedia(keyword, lang, use_online=False)
     
-    return render_template(
+    response = make_response(render_template(
         "search.html",
-        local_results=local_results,
+        local_cards=news_cards(app_state().fragments, g.snapshot, local_results, lang, keyword),
         dbpedia_results=dbpedia_results,
         keyword=keyword,
+        mode=mode,
+        search_modes=NewsSearchConfig.SEARCH_MODES,
+        correction=correction,
+        partial=bool(missing),
+        fuzzy_mode=search_manager.fuzzy_mode,
+        facets=facets,
+        active_filters=filters,
+        facet_labels=NewsSearchConfig.FACET_LABELS,
         languages=NewsSearchConfig.LANGUAGES,
         current_lang=lang,
         translations=NewsSearchConfig.TRANSLATIONS,
         dark_mode=dark_mode
-    )
+    ))
+    if missing or g.get("degraded"):
+        # Una página parcial o servida en modo degradado no lleva ETag ni se
+        # guarda en cachés intermedias.
+        response.headers["Cache-Control"] = "no-store"
+    return response
 
 
-@app.route("/noticia/<path:uri>")
 def detalle_noticia(uri):
-    lang = request.args.get('lang', 'es')
+    lang = supported_language(request.args.get('lang'))
     dark_mode = request.cookies.get('dark_mode', 'true') == 'true'
     keyword = request.args.get('keyword', '')
     
     uri_decoded = urllib.parse.unquote(uri)
-    detalles = {}
-    
-    try:
-        query = f"""
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            
-            SELECT ?propiedad ?valor
-            WHERE {{
-                <{uri_decoded}> ?propiedad ?valor .
-                FILTER (
-                    STRSTARTS(STR(?propiedad), 
-                        "http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#") ||
-                    ?propiedad IN (rdf:type, rdfs:label, rdfs:comment)
-                )
-            }}
-        """
-        
-        for row in graph.query(query):
-            prop_name = str(row.propiedad).split("#")[-1]
-            valor = str(row.valor)
-            
-            if hasattr(row.valor, 'toPython'):
-                valor = str(row.valor.toPython())
-            
-            detalles[prop_name] = valor
-    
-    except Exception as e:
-        print(f"Error obteniendo detalles: {e}")
-    
-    inferred = infer_properties(graph, URIRef(uri_decoded))
     
     return render_template(
         "detalle.html",
-        noticia=detalles,
-        inferred=inferred,
+        body=detail_body(app_state().fragments, g.snapshot, uri_decoded, lang),
         translations=NewsSearchConfig.TRANSLATIONS,
         languages=NewsSearchConfig.LANGUAGES,
         current_lang=lang,
@@ -443,7 +1387,172 @@ def detalle_noticia(uri):
     )
 
 
-@app.route("/toggle_dark_mode", methods=["POST"])
+def suggest():
+    prefix = request.args.get('q', '')
+    try:
+        limit = max(1, min(int(request.args.get('k', 8)), NewsSearchConfig.SUGGEST_MAX_RESULTS))
+    except ValueError:
+        limit = 8
+    suggest_service = g.snapshot.suggest_service
+    return jsonify({
+        "query": prefix,
+        "suggestions": suggest_service.suggest(prefix, limit) if suggest_service is not None else []
+    })
+
+
+def search_batch():
+    payload = request.get_json(silent=True) or {}
+    keywords = payload.get('queries')
+    if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+        return jsonify({"error": "queries debe ser una lista de textos"}), 400
+    if len(keywords) > NewsSearchConfig.BATCH_MAX_QUERIES:
+        return jsonify({"error": f"máximo {NewsSearchConfig.BATCH_MAX_QUERIES} consultas por lote"}), 400
+    try:
+        limit = min(int(payload.get('limit', 20)), NewsSearchConfig.BATCH_MAX_RESULTS)
+    except (TypeError, ValueError):
+        limit = 20
+    filters = payload.get('filters')
+    filters = {
+        facet: values if isinstance(values, list) else [values]
+        for facet, values in filters.items()
+        if facet in NewsIndex.FACETS and values
+    } if isinstance(filters, dict) else {}
+    
+    with admission.stage("search"):
+        batch = g.snapshot.search_manager.search_many(keywords, supported_language(payload.get('lang')),
+                                                      filters, limit)
+    return jsonify({"results": [
+        {"query": keyword, "kind": kind, "results": results, "partial": bool(missing)}
+        for keyword, (results, kind, missing) in zip(keywords, batch)
+    ]})
+
+
+def sparql_query():
+    """Protocolo SPARQL (sólo consultas): ``query`` por GET, formulario POST o cuerpo application/sparql-query."""
+    if "update" in request.values:
+        return Response("endpoint de sólo lectura", 403, mimetype="text/plain")
+    text = request.values.get("query", "")
+    if not text and request.mimetype == "application/sparql-query":
+        text = request.get_data(as_text=True)
+    
+    requested = request.values.get("format") or request.values.get("output")
+    result_format = FORMAT_ALIASES.get(requested) if requested else None
+    if result_format is None:
+        best = request.accept_mimetypes.best_match(list(RESULT_FORMATS.values()), RESULT_FORMATS["json"])
+        result_format = FORMAT_ALIASES[best]
+    
+    snapshot = g.snapshot
+    try:
+        document = app_state().sparql.query(snapshot.graph, snapshot.graph_version, text)
+    except QueryError as e:
+        return Response(str(e), e.status, mimetype="text/plain")
+    
+    if "graph" in document:
+        response = Response(document["graph"], mimetype=GRAPH_FORMAT)
+    elif result_format == "csv":
+        response = Response(to_csv(document), mimetype=RESULT_FORMATS["csv"])
+    else:
+        response = jsonify({key: value for key, value in document.items() if key != "truncated"})
+        response.mimetype = RESULT_FORMATS["json"]
+    if document.get("truncated"):
+        response.headers["X-SPARQL-Truncated"] = str(NewsSearchConfig.SPARQL_MAX_ROWS)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
+
+
+def ingest(prepare, key: str):
+    """
+    Encola los documentos de la petición (un objeto o una lista) y espera a
+    que su lote esté publicado. Cada documento se acepta o rechaza por
+    separado; el código de la respuesta es el del primer rechazo si no se
+    aceptó ninguno.
+    """
+    require_admin()
+    payload = request.get_json(silent=True)
+    documents = payload if isinstance(payload, list) else [payload]
+    if payload is None or not documents:
+        return jsonify({"error": "se esperaba un objeto JSON o una lista de objetos"}), 400
+    if len(documents) > NewsSearchConfig.INGEST_MAX_DOCUMENTS:
+        return jsonify({"error": f"máximo {NewsSearchConfig.INGEST_MAX_DOCUMENTS} documentos por petición"}), 400
+    
+    state = app_state()
+    ns = NewsSearchConfig.ONTOLOGY_NS
+    # La petición no lee datos: si retuviera su generación, el escritor esperaría
+    # a que se retirase antes de publicar el lote que ella misma espera.
+    g.pop("snapshot", None)
+    # Las tripletas se construyen en el hilo de la petición; el escritor sólo las aplica.
+    futures = []
+    for document in documents:
+        try:
+            futures.append(state.ingestion.submit(prepare(document, ns, new_uri)))
+        except IngestionError as e:
+            futures.append(e)
+    
+    results, statuses = [], []
+    for future in futures:
+        try:
+            if isinstance(future, IngestionError):
+                raise future
+            results.append(future.result(timeout=NewsSearchConfig.INGEST_TIMEOUT))
+            statuses.append(201)
+        except IngestionError as e:
+            results.append({"error": str(e), "status": e.status})
+            statuses.append(e.status)
+        except FutureTimeoutError:
+            # Sigue en la cola: se aplicará aunque la petición ya haya respondido.
+            results.append({"error": "pendiente de publicar", "status": 202})
+            statuses.append(202)
+    
+    status = 201 if 201 in statuses else 202 if 202 in statuses else statuses[0]
+    body = {key: results if isinstance(payload, list) else results[0],
+            "generation": state.reloader.generation}
+    response = make_response(jsonify(body), status)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def export_data():
+    """
+    Exportación en streaming (transferencia por trozos) en N-Triples, N-Quads o
+    JSON-LD. Sin filtros sale la ontología completa; con ``q``, facetas
+    (``tematica``, ``estado``...) o ``desde``/``hasta``, sólo esas noticias y
+    sus verificaciones.
+    """
+    requested = request.args.get("format")
+    if not requested:
+        best = request.accept_mimetypes.best_match(list(EXPORT_FORMATS.values()), EXPORT_FORMATS["nt"])
+        requested = next(key for key, mimetype in EXPORT_FORMATS.items() if mimetype == best)
+    snapshot = g.snapshot
+    query = request.args.get("q", "")
+    filters = {facet: request.args.getlist(facet) for facet in FILTER_FACETS if request.args.getlist(facet)}
+    since, until = request.args.get("desde", ""), request.args.get("hasta", "")
+    try:
+        export_format = resolve_format(requested)
+        if query or filters or since or until:
+            bits = select_news(snapshot.news_index, query, filters, since, until)
+            triples = subject_triples(snapshot.graph,
+                                      news_subjects(snapshot.news_index, snapshot.verification_index, bits))
+        else:
+            triples = grouped_triples(snapshot.graph)
+    except ExportError as e:
+        return Response(str(e), e.status, mimetype="text/plain")
+    
+    graph_name = str(NewsSearchConfig.ONTOLOGY_NS).rstrip("#")
+    body = chunks(serialize(triples, export_format, graph_name, {"onto": str(NewsSearchConfig.ONTOLOGY_NS)}))
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format])
+    response.headers["Content-Disposition"] = f'attachment; filename="noticias.{export_format}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def ingest_news():
+    return ingest(prepare_news, "noticias")
+
+
+def ingest_verifications():
+    return ingest(prepare_verification, "verificaciones")
+
+
 def toggle_dark_mode():
     dark_mode = request.json.get('dark_mode', True)
     response = jsonify({"success": True})
@@ -451,17 +1560,167 @@ def toggle_dark_mode():
     return response
 
 
-@app.route("/stats", methods=["GET"])
+def memory_report():
+    require_admin()
+    response = jsonify(app_state().memory.report(reset_baseline=request.args.get('baseline') == '1'))
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
 def get_stats():
-    return jsonify({
+    snapshot = g.snapshot
+    state = app_state()
+    
+    def stats(component) -> Optional[dict]:
+        return component.get_statistics() if component is not None else None
+    
+    response = jsonify({
         "ontology": {
-            "triples": len(graph),
-            "resources": len(list(graph.subjects()))
+            "version": snapshot.graph_version,
+            "generation": snapshot.generation,
+            "triples": len(snapshot.graph),
+            "resources": len(list(snapshot.graph.subjects())),
+            "store": stats(snapshot.graph.store) if isinstance(snapshot.graph.store, SQLiteStore) else "memory"
         },
-        "dbpedia_local": dbpedia_index.get_statistics(),
+        "dbpedia_local": snapshot.dbpedia_index.get_statistics(),
+        "news_index": snapshot.news_index.get_statistics(),
+        "verifications": snapshot.verification_index.get_statistics(),
+        "fuzzy_index": stats(snapshot.fuzzy_index),
+        "semantic_index": stats(snapshot.semantic_index),
+        "entity_links": stats(snapshot.entity_linker),
+        "suggest_index": stats(snapshot.suggest_service),
+        "lexicon": stats(snapshot.lexicon),
+        "locations": stats(snapshot.locations),
+        "http_cache": state.http_cache.get_statistics(),
+        "hot_reload": state.reloader.get_statistics(),
+        "warm_up": state.warm_up.get_statistics(),
+        "memory": state.memory.get_statistics(),
+        "sparql": state.sparql.get_statistics(),
+        "ingestion": {**state.ingestion.get_statistics(), "journal": ingest_journal.get_statistics()},
+        "fragments": state.fragments.get_statistics(),
+        "admission": admission.get_statistics(),
+        "online": online_engine.get_statistics(),
+        "shards": stats(snapshot.shards),
+        "near_duplicates": stats(snapshot.near_duplicates),
         "supported_languages": NewsSearchConfig.LANGUAGES
     })
+    # Contadores en vivo: no dependen sólo de la versión de los datos.
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def healthz():
+    """Sonda de vida: responde en cuanto la aplicación existe."""
+    return jsonify({"status": "ok"})
+
+
+def readyz():
+    """Sonda de disponibilidad: 503 hasta que termina el calentamiento."""
+    snapshot = g.snapshot
+    response = jsonify({
+        "ready": snapshot.extras_ready,
+        "generation": snapshot.generation,
+        "warm_up": app_state().warm_up.get_statistics()
+    })
+    response.status_code = 200 if snapshot.extras_ready else 503
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+ROUTES = (
+    ("/", search, ["GET", "POST"]),
+    ("/noticia/<path:uri>", detalle_noticia, ["GET"]),
+    ("/api/suggest", suggest, ["GET"]),
+    ("/api/search/batch", search_batch, ["POST"]),
+    ("/sparql", sparql_query, ["GET", "POST"]),
+    ("/api/export", export_data, ["GET"]),
+    ("/api/noticias", ingest_news, ["POST"]),
+    ("/api/verificaciones", ingest_verifications, ["POST"]),
+    ("/toggle_dark_mode", toggle_dark_mode, ["POST"]),
+    ("/admin/memory", memory_report, ["GET"]),
+    ("/stats", get_stats, ["GET"]),
+    ("/healthz", healthz, ["GET"]),
+    ("/readyz", readyz, ["GET"]),
+)
+
+
+def create_app(background_warm_up: bool = NewsSearchConfig.BACKGROUND_WARM_UP) -> Flask:
+    """
+    Crea la aplicación. Publica una generación con lo imprescindible para
+    buscar noticias y construye el resto de índices en segundo plano; hasta
+    entonces /readyz responde 503 y las búsquedas semánticas caen en la léxica.
+    
+    Args:
+        background_warm_up: Si es falso, espera a tener la generación completa
+    """
+    app = Flask(__name__)
+    runtime: Optional[SnapshotHolder] = None
+    
+    # Antes de construir la primera generación para que tracemalloc vea sus reservas.
+    memory = MemoryAccountant(lambda: memory_subsystems(runtime.current, app),
+                              top=NewsSearchConfig.MEMORY_REPORT_TOP,
+                              trace=NewsSearchConfig.MEMORY_TRACING)
+    memory.start_schedule(NewsSearchConfig.MEMORY_REPORT_INTERVAL)
+    
+    runtime = SnapshotHolder(build_essentials())
+    warm_up = WarmUp(runtime, build_extras, on_ready=memory.reset_baseline)
+    watched = NewsSearchConfig.ONTOLOGY_FILES + (NewsSearchConfig.DBPEDIA_CACHE_FILE,)
+    if NewsSearchConfig.TRIPLE_STORE == "sqlite":
+        # Las escrituras confirmadas de Poblacion llegan primero al fichero WAL.
+        watched += (NewsSearchConfig.TRIPLE_STORE_FILE, NewsSearchConfig.TRIPLE_STORE_FILE + "-wal")
+    else:
+        # Poblacion añade sus inserciones al registro de ingesta.
+        watched += (NewsSearchConfig.INGEST_JOURNAL,)
+    reloader = HotReloader(runtime, build_snapshot, watched,
+                           interval=NewsSearchConfig.HOT_RELOAD_INTERVAL)
+    # Antes de los ganchos de HTTPCache, que calculan el ETag con g.snapshot.
+    app.before_request(admit_request)
+    app.before_request(bind_snapshot)
+    app.teardown_request(finish_request)
+    app.register_error_handler(Overloaded, handle_overloaded)
+    http_cache = HTTPCache(app, lambda: g.snapshot.versions(),
+                           endpoints=("search", "detalle_noticia", "suggest"),
+                           max_age=NewsSearchConfig.CACHE_MAX_AGE,
+                           min_size=NewsSearchConfig.COMPRESS_MIN_SIZE)
+    precompress_static(app.static_folder, NewsSearchConfig.COMPRESS_MIN_SIZE)
+    
+    # Los procesos de consulta arrancan con la primera consulta, no con la aplicación.
+    sparql = SparqlEndpoint(NewsSearchConfig.SPARQL_WORKERS, NewsSearchConfig.SPARQL_TIMEOUT,
+                            NewsSearchConfig.SPARQL_CPU_SECONDS, NewsSearchConfig.SPARQL_MAX_ROWS,
+                            cache_size=NewsSearchConfig.SPARQL_CACHE_SIZE)
+    # El hilo escritor arranca con la primera escritura.
+    ingestion = ingestion_writer(reloader)
+    fragments = FragmentCache(NewsSearchConfig.TRANSLATIONS, NewsSearchConfig.FRAGMENT_CACHE_SIZE)
+    app.extensions["news_search"] = AppState(runtime, reloader, warm_up, memory, http_cache, sparql,
+                                             ingestion, fragments)
+    for rule, view, methods in ROUTES:
+        app.add_url_rule(rule, view_func=view, methods=methods)
+    
+    warm_up.start(background=background_warm_up)
+    if NewsSearchConfig.HOT_RELOAD:
+        reloader.start()
+    return app
+
+
+_default_app: Optional[Flask] = None
+_default_app_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """
+    ``from app import app, runtime`` sigue funcionando: la aplicación por
+    defecto se crea la primera vez que se pide y no al importar el módulo.
+    """
+    global _default_app
+    if name not in ("app", "runtime", "reloader", "warm_up", "memory", "http_cache"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _default_app_lock:
+        if _default_app is None:
+            _default_app = create_app()
+    if name == "app":
+        return _default_app
+    return getattr(_default_app.extensions["news_search"], name)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,485 @@
+"""
+async_app.py
+Modo de servicio ASGI del buscador.
+
+Las rutas ``/api/*`` se atienden de forma nativa en el bucle de eventos: las
+consultas a DBpedia y las traducciones usan un cliente HTTP asíncrono con
+pool de conexiones y tiempos límite, y el trabajo sobre los índices locales
+(CPU) corre en un ejecutor acotado. Así el número de peticiones simultáneas
+por proceso depende de la espera de red y no del número de hilos. El resto
+de rutas (páginas HTML) se delegan a la aplicación Flask en ese ejecutor.
+
+Uso:
+    uvicorn async_app:create_app --factory --host 0.0.0.0 --port 5000
+
+``async_app:app`` también sirve: la aplicación por defecto se crea la primera
+vez que se pide, no al importar el módulo.
+"""
+
+import asyncio
+import contextvars
+import io
+import json
+import sys
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import httpcore
+import httpx
+from flask import Flask
+
+import app as flask_module
+import translate_rpc
+from admission import AdmissionController, Overloaded, client_address
+from app import NewsSearchConfig, OnlineSearchEngine, SearchManager, supported_language
+from news_index import NewsIndex
+from hot_reload import SnapshotHolder
+from memory_report import MemoryAccountant
+from resilience import AsyncHedgedClient, CircuitOpen, ClientError
+
+
+# httpx 0.13 no envuelve todos los errores de transporte de httpcore.
+NETWORK_ERRORS = (httpx.HTTPError, httpcore.TimeoutException, httpcore.NetworkError,
+                  httpcore.ProtocolError)
+
+
+def http_client(connect_timeout: float, read_timeout: float, max_connections: int) -> httpx.AsyncClient:
+    """
+    Cliente asíncrono con plazos y pool acotado. ``PoolLimits`` y
+    ``connect_timeout`` sólo existen en httpx 0.13 (la versión que exige
+    googletrans 4.0.0rc1). requirements.txt fija httpx y httpcore; si se
+    actualizan, éste es el único sitio que cambia.
+    """
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read_timeout, connect_timeout=connect_timeout),
+        pool_limits=httpx.PoolLimits(max_keepalive=max_connections, max_connections=max_connections)
+    )
+
+
+class AsyncOnlineClient:
+    """Cliente HTTP compartido para DBpedia y el servicio de traducción."""
+
+    TRANSLATION_CACHE_SIZE = 10000
+
+    def __init__(self, endpoint: str = NewsSearchConfig.DBPEDIA_ENDPOINT,
+                 translate_url: str = translate_rpc.translate_url(NewsSearchConfig.TRANSLATE_HOST),
+                 translation_cache_size: int = TRANSLATION_CACHE_SIZE,
+                 mirror: Optional[str] = NewsSearchConfig.DBPEDIA_MIRROR):
+        self.endpoint = endpoint
+        self.mirror = mirror or None
+        self.translate_url = translate_url
+        self.client = http_client(NewsSearchConfig.HTTP_CONNECT_TIMEOUT, NewsSearchConfig.HTTP_READ_TIMEOUT,
+                                  NewsSearchConfig.HTTP_MAX_CONNECTIONS)
+        # El pool de httpcore 0.9 despierta tarde a quien espera conexión libre;
+        # el semáforo mantiene las peticiones en vuelo por debajo del límite.
+        self.slots = asyncio.Semaphore(NewsSearchConfig.HTTP_MAX_CONNECTIONS)
+        # LRU: las traducciones más pedidas sobreviven aunque entren textos nuevos.
+        self.translation_cache_size = translation_cache_size
+        self.translations: "OrderedDict[tuple, str]" = OrderedDict()
+        # La misma política que ``OnlineSearchEngine``: cortocircuito por endpoint,
+        # réplica con cobertura y un plazo que no espera al de lectura.
+        self.dbpedia = AsyncHedgedClient(
+            [endpoint] + ([mirror] if mirror else []), self.fetch,
+            deadline=NewsSearchConfig.ONLINE_CONNECT_TIMEOUT + NewsSearchConfig.ONLINE_READ_TIMEOUT,
+            failure_threshold=NewsSearchConfig.BREAKER_FAILURES,
+            reset_timeout=NewsSearchConfig.BREAKER_RESET,
+            hedge_percentile=NewsSearchConfig.HEDGE_PERCENTILE,
+            hedge_min_delay=NewsSearchConfig.HEDGE_MIN_DELAY
+        )
+
+    async def close(self) -> None:
+        self.dbpedia.close()
+        await self.client.aclose()
+
+    async def query_dbpedia(self, search_term: str, lang: str = 'en') -> list:
+        """Mismo SPARQL que ``OnlineSearchEngine.query_dbpedia`` sin bloquear el bucle."""
+        try:
+            return OnlineSearchEngine.parse_results(
+                await self.dbpedia.request(OnlineSearchEngine.build_query(search_term, lang)))
+        except CircuitOpen:
+            # DBpedia ya se dio por caída: se sirven sólo resultados locales sin esperar.
+            return []
+        except Exception as e:
+            print(f"⚠️  Búsqueda online no disponible: {e}")
+            return []
+
+    async def fetch(self, endpoint: str, query: str) -> dict:
+        """GET del protocolo SPARQL contra un endpoint (un intento de ``AsyncHedgedClient``)."""
+        async with self.slots:
+            response = await self.client.get(endpoint, params={
+                "query": query,
+                "format": "application/sparql-results+json"
+            })
+        if 400 <= response.status_code < 500:
+            raise ClientError(f"HTTP {response.status_code} de {endpoint}")
+        if response.status_code != 200:
+            raise ConnectionError(f"HTTP {response.status_code} de {endpoint}")
+        return response.json()
+
+    async def translate(self, text: str, target_lang: str) -> str:
+        """Traduce desde el español; devuelve el texto original si el servicio falla."""
+        if target_lang == 'es' or not text or text == '?':
+            return text
+        key = (text, target_lang)
+        cached = self.translations.get(key)
+        if cached is not None:
+            self.translations.move_to_end(key)
+            return cached
+        params, data = translate_rpc.build_request(text, 'es', target_lang)
+        try:
+            async with self.slots:
+                response = await self.client.post(self.translate_url, params=params, data=data)
+            response.raise_for_status()
+            translated = translate_rpc.parse_response(response.text)
+        except (*NETWORK_ERRORS, ValueError):
+            return text
+        if self.translation_cache_size > 0:
+            self.translations[key] = translated
+            self.translations.move_to_end(key)
+            while len(self.translations) > self.translation_cache_size:
+                self.translations.popitem(last=False)
+        return translated
+
+    async def translate_results(self, results: list, lang: str) -> list:
+        """Traduce los campos visibles, pidiendo cada texto distinto una sola vez."""
+        if lang == 'es' or not results:
+            return results
+        fields = ("titulo", "tematica", "autor")
+        texts = list({result[field] for result in results for field in fields})
+        translated = dict(zip(texts, await asyncio.gather(
+            *(self.translate(text, lang) for text in texts)
+        )))
+        for result in results:
+            for field in fields:
+                result[field] = translated[result[field]]
+        return results
+
+
+class AsyncSearchService:
+    """Versión asíncrona de las búsquedas de ``SearchManager``."""
+
+    def __init__(self, runtime: SnapshotHolder, online: AsyncOnlineClient,
+                 executor: ThreadPoolExecutor, admission: Optional[AdmissionController] = None):
+        self.runtime = runtime
+        self.online = online
+        self.executor = executor
+        self.admission = admission
+
+    async def run(self, fn, *args, **kwargs):
+        """Ejecuta trabajo de CPU sobre los índices en el ejecutor acotado."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def run_stage(self, stage: str, fn, *args, **kwargs):
+        """
+        Como ``run``, dentro de una etapa obligatoria del control de admisión.
+        El turno se espera en el hilo del ejecutor, con el plazo de la petición
+        (una variable de contexto que ``run_in_executor`` no copia por sí solo).
+        """
+        if self.admission is None:
+            return await self.run(fn, *args, **kwargs)
+
+        def staged():
+            with self.admission.stage(stage):
+                return fn(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, contextvars.copy_context().run, staged)
+
+    def _skip(self, mode: str) -> bool:
+        return self.admission is not None and self.admission.skip_optional(mode)
+
+    async def search(self, keyword: str, lang: str, mode: str, filters: dict,
+                     use_online: bool = False) -> dict:
+        # La generación se fija al empezar, igual que en las vistas de Flask.
+        manager = self.runtime.current.search_manager
+        correction = None
+        dbpedia_results = []
+        missing = []
+
+        # Las búsquedas se hacen en español y se traducen después sin bloquear.
+        if keyword and mode == 'semantic':
+            local_results, dbpedia_results = await self.run_stage("search", manager.search_semantic,
+                                                                  keyword, 'es', filters)
+        elif keyword and mode == 'hybrid':
+            local_results = await self.run_stage("search", manager.search_hybrid, keyword, 'es', filters,
+                                                 alpha=NewsSearchConfig.HYBRID_ALPHA)
+        elif keyword or filters:
+            local_results, _, correction, missing = await self.run_stage(
+                "search", manager.search_with_correction, keyword, 'es', filters)
+        else:
+            local_results = []
+
+        facets = await self.run(manager.get_facets, local_results) if local_results else {}
+        if keyword and mode != 'semantic' and len(local_results) < 5:
+            dbpedia_results = await self.search_dbpedia(keyword, lang, use_online, manager)
+
+        if not self._skip("skip_translation"):
+            local_results = await self.online.translate_results(local_results, lang)
+
+        return {
+            "keyword": keyword,
+            "mode": mode,
+            "correction": correction,
+            "partial": bool(missing),
+            "local_results": local_results,
+            "dbpedia_results": dbpedia_results,
+            "facets": facets
+        }
+
+    async def search_dbpedia(self, keyword: str, lang: str, use_online: bool = True,
+                             manager: Optional[SearchManager] = None) -> list:
+        manager = manager or self.runtime.current.search_manager
+        results = await self.run_stage("search", manager.search_dbpedia, keyword, lang, use_online=False)
+        if use_online and not results and not self._skip("skip_online"):
+            lang_code = lang if lang in ('en', 'pt') else 'es'
+            results = await self.run(manager._attach_linked_news,
+                                     await self.online.query_dbpedia(keyword, lang_code))
+        return results
+
+
+class AsyncNewsApp:
+    """Aplicación ASGI: API asíncrona y puente WSGI para las páginas de Flask."""
+
+    def __init__(self, runtime: SnapshotHolder, wsgi_app,
+                 endpoint: str = NewsSearchConfig.DBPEDIA_ENDPOINT,
+                 translate_url: str = translate_rpc.translate_url(NewsSearchConfig.TRANSLATE_HOST),
+                 workers: int = NewsSearchConfig.INDEX_WORKERS,
+                 memory: Optional[MemoryAccountant] = None,
+                 admission: Optional[AdmissionController] = None):
+        self.runtime = runtime
+        self.memory = memory
+        self.admission = admission
+        self.wsgi_app = wsgi_app
+        self.endpoint = endpoint
+        self.translate_url = translate_url
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="index")
+        self.service: Optional[AsyncSearchService] = None
+        self.routes = {
+            "/api/search": self.api_search,
+            "/api/dbpedia": self.api_dbpedia,
+            "/api/suggest": self.api_suggest,
+        }
+
+    async def startup(self) -> None:
+        online = AsyncOnlineClient(self.endpoint, self.translate_url)
+        self.service = AsyncSearchService(self.runtime, online, self.executor, self.admission)
+        if self.memory is not None:
+            self.memory.register("translations", lambda: online.translations)
+
+    async def shutdown(self) -> None:
+        if self.service is not None:
+            await self.service.online.close()
+            self.service = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self.service is None:
+            # Servidores sin soporte de lifespan.
+            await self.startup()
+
+        handler = self.routes.get(scope["path"])
+        if handler is None or scope["method"] != "GET":
+            await self._wsgi(scope, receive, send)
+            return
+        args = urllib.parse.parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        status, payload, headers = await self._admitted(scope, handler, args)
+        await self._send_json(send, status, payload, headers)
+
+    async def _admitted(self, scope, handler, args: Dict[str, List[str]]) -> tuple:
+        """Límite de ritmo y plazo de la petición, como ``admit_request`` en Flask."""
+        if self.admission is None:
+            return (*await handler(args), ())
+        retry_after = self.admission.allow(self._client(scope))
+        if retry_after:
+            return self._overloaded(429, retry_after)
+        token = self.admission.begin_request()
+        try:
+            return (*await handler(args), ())
+        except Overloaded as e:
+            return self._overloaded(503, e.retry_after)
+        finally:
+            self.admission.end_request(token)
+
+    @staticmethod
+    def _client(scope) -> str:
+        remote_addr = scope["client"][0] if scope.get("client") else ""
+        forwarded_for = ",".join(value.decode("latin-1") for name, value in scope.get("headers", [])
+                                 if name.lower() == b"x-forwarded-for")
+        return client_address(remote_addr, forwarded_for, NewsSearchConfig.TRUSTED_PROXIES)
+
+    @staticmethod
+    def _overloaded(status: int, retry_after: float) -> tuple:
+        return status, {"error": "servicio saturado, reintente más tarde"}, (
+            (b"retry-after", str(max(1, round(retry_after))).encode()),
+            (b"cache-control", b"no-store"),
+        )
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    def _arg(args: Dict[str, List[str]], name: str, default: str = "") -> str:
+        return args.get(name, [default])[0]
+
+    async def api_search(self, args: Dict[str, List[str]]) -> tuple:
+        mode = self._arg(args, "mode", "lexical")
+        if mode not in NewsSearchConfig.SEARCH_MODES:
+            mode = "lexical"
+        filters = {facet: args[facet] for facet in NewsIndex.FACETS if args.get(facet)}
+        return 200, await self.service.search(
+            self._arg(args, "keyword"), supported_language(self._arg(args, "lang")), mode, filters,
+            use_online=self._arg(args, "online") == "1"
+        )
+
+    async def api_dbpedia(self, args: Dict[str, List[str]]) -> tuple:
+        keyword = self._arg(args, "q")
+        if not keyword:
+            return 400, {"error": "q es obligatorio"}
+        results = await self.service.search_dbpedia(keyword, supported_language(self._arg(args, "lang")),
+                                                    use_online=self._arg(args, "online", "1") == "1")
+        return 200, {"query": keyword, "results": results}
+
+    async def api_suggest(self, args: Dict[str, List[str]]) -> tuple:
+        prefix = self._arg(args, "q")
+        try:
+            limit = min(int(self._arg(args, "k", "8")), NewsSearchConfig.SUGGEST_MAX_RESULTS)
+        except ValueError:
+            limit = 8
+        # Consulta de microsegundos: no compensa pasar por el ejecutor.
+        suggest_service = self.runtime.current.suggest_service
+        suggestions = suggest_service.suggest(prefix, limit) if suggest_service is not None else []
+        return 200, {"query": prefix, "suggestions": suggestions}
+
+    @staticmethod
+    async def _send_json(send, status: int, payload, headers: tuple = ()) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode()), *headers]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _wsgi(self, scope, receive, send) -> None:
+        """
+        Ejecuta la aplicación Flask en el ejecutor y reenvía su respuesta trozo
+        a trozo (``more_body``), sin juntarla en memoria: las exportaciones en
+        streaming llegan al cliente según se generan y ningún hilo del
+        ejecutor queda ocupado entre un trozo y el siguiente.
+        """
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        environ = self._build_environ(scope, body)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+        # Cada trozo puede generarse en un hilo distinto: todos corren en el mismo
+        # contexto para que ``stream_with_context`` deshaga lo que hizo al empezar.
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+
+        def in_context(fn, *args):
+            return loop.run_in_executor(self.executor, partial(context.run, fn, *args))
+
+        iterable = await in_context(self.wsgi_app, environ, start_response)
+        try:
+            chunks = iter(iterable)
+            # start_response puede llamarse justo antes del primer trozo no vacío.
+            chunk = await in_context(next, chunks, None)
+            while chunk is not None and not chunk:
+                chunk = await in_context(next, chunks, None)
+            await send({"type": "http.response.start", "status": response["status"],
+                        "headers": response["headers"]})
+            while chunk is not None:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await in_context(next, chunks, None)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(iterable, "close"):
+                await in_context(iterable.close)
+
+    @staticmethod
+    def _build_environ(scope, body: bytes) -> dict:
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", ""),
+            "PATH_INFO": scope["path"],
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        if scope.get("client"):
+            environ["REMOTE_ADDR"] = scope["client"][0]
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                environ[name] = value
+            else:
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+
+def create_app(wsgi_app: Optional[Flask] = None, **kwargs) -> AsyncNewsApp:
+    """
+    Crea la aplicación ASGI sobre una aplicación Flask (por defecto, una nueva
+    de ``app.create_app``), con su generación vigente, su contabilidad de
+    memoria y el control de admisión compartido.
+    """
+    wsgi_app = wsgi_app if wsgi_app is not None else flask_module.create_app()
+    state = wsgi_app.extensions["news_search"]
+    return AsyncNewsApp(state.runtime, wsgi_app, memory=state.memory, admission=flask_module.admission,
+                        **kwargs)
+
+
+_default_app: Optional[AsyncNewsApp] = None
+_default_app_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """``uvicorn async_app:app``: la aplicación por defecto se crea al pedirla, no al importar."""
+    global _default_app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _default_app_lock:
+        if _default_app is None:
+            _default_app = create_app(flask_module.app)
+    return _default_app
@@ -0,0 +1,1127 @@
+"""
+benchmark.py
+Mediciones de rendimiento de los índices y rutas del buscador.
+
+Uso:
+    python benchmark.py facets --size 100000
+    python benchmark.py dates --size 100000
+    python benchmark.py fuzzy --size 100000
+    python benchmark.py semantic --size 50000
+    python benchmark.py linking --size 100000 --labels 1000000
+    python benchmark.py suggest --size 1000000
+    python benchmark.py async --size 400 --delay 0.2
+    python benchmark.py http
+    python benchmark.py admission --size 64
+    python benchmark.py shards --size 200000
+    python benchmark.py query --size 100000
+    python benchmark.py batch --size 20000
+    python benchmark.py locations --size 100000
+    python benchmark.py dedupe --size 1000000
+    python benchmark.py startup --size 5
+    python benchmark.py store --size 200000
+    python benchmark.py sparql --size 20000
+    python benchmark.py ingest --size 20000
+    python benchmark.py online --size 8 --delay 0.05
+    python benchmark.py render --size 1000
+    python benchmark.py export --size 100000
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+from entity_linker import EntityLinker
+from fuzzy_index import FuzzyIndex, edit_distance
+from memory_report import current_rss
+from near_duplicates import NearDuplicateIndex
+from news_index import NewsIndex, NewsRecord, fold_text, parse_date_query
+from semantic_index import SemanticIndex, top_k
+from query_parser import QueryPlanner, parse_query
+from sharding import ShardedNewsSearch
+from suggest_index import SuggestIndex
+
+
+TOPICS = ["Salud pública", "Política", "Economía", "Educación", "Cambio climático",
+          "Deportes", "Tecnología", "Cultura", "Seguridad", "Medio ambiente"]
+STATES = ["Finalizada", "En proceso", "Rechazada"]
+
+
+def topic_vocabulary(seed: int = 3, words_per_topic: int = 200) -> dict:
+    """Palabras inventadas propias de cada temática, para textos con estructura temática."""
+    rng = random.Random(seed)
+    return {
+        topic: ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 9)))
+                for _ in range(words_per_topic)]
+        for topic in TOPICS
+    }
+
+
+def synthetic_records(size: int, seed: int = 42) -> List[NewsRecord]:
+    """Genera un corpus sintético de noticias con distribución sesgada de valores."""
+    rng = random.Random(seed)
+    authors = [f"Autor {i}" for i in range(max(size // 20, 1))]
+    vocabulary = topic_vocabulary()
+    records = []
+    for i in range(size):
+        tematicas = sorted(set(rng.choices(TOPICS, weights=range(len(TOPICS), 0, -1), k=2)))
+        words = [w for t in tematicas for w in rng.choices(vocabulary[t], k=30 // len(tematicas))]
+        year = rng.randint(2018, 2025)
+        month = rng.randint(1, 12)
+        day = rng.randint(1, 28)
+        records.append(NewsRecord(
+            uri=f"http://example.org/noticia/{i}",
+            titulo=f"Noticia sintética {i} sobre {rng.choice(TOPICS).lower()}",
+            fecha=f"{year:04d}-{month:02d}-{day:02d}",
+            tematicas=tematicas,
+            autores=[authors[int(rng.paretovariate(1.2)) % len(authors)]],
+            estados=[rng.choice(STATES)] if rng.random() < 0.4 else [],
+            texto=" ".join(words)
+        ))
+    return records
+
+
+def timed(fn: Callable, repeat: int = 50) -> float:
+    """Devuelve la mediana en milisegundos de ``repeat`` ejecuciones."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def bench_facets(size: int) -> None:
+    """Conteo de facetas sobre resultados de distintos tamaños."""
+    start = time.perf_counter()
+    index = NewsIndex(synthetic_records(size))
+    print(f"Índice de {size} noticias construido en {time.perf_counter() - start:.2f}s")
+
+    result_sets = {
+        "todo el corpus": index.all_bits,
+        "una temática": index.value_bits("tematica", TOPICS[0]),
+        "temática + estado": index.filter_bits({"tematica": [TOPICS[0]], "estado": ["Finalizada"]}),
+        "un autor": index.value_bits("autor", "Autor 3"),
+    }
+    for name, bits in result_sets.items():
+        elapsed = timed(lambda: index.facet_counts(bits))
+        print(f"  {name:<20} {bits.bit_count():>8} resultados  {elapsed:.3f} ms")
+
+
+def bench_dates(size: int) -> None:
+    """Consultas por rango de fecha: índice ordenado frente a recorrido lineal."""
+    index = NewsIndex(synthetic_records(size))
+    print(f"Índice de {size} noticias")
+
+    for expression in ["2024-03", "2024-01-01..2024-06-30", "2019", "last30d"]:
+        interval = parse_date_query(expression)
+        indexed = timed(lambda: index.results(index.date_bits(expression), limit=20))
+        scanned = timed(lambda: sorted(
+            (r for r in index.records if interval[0] <= r.fecha <= interval[1]),
+            key=lambda r: r.fecha, reverse=True
+        )[:20], repeat=5)
+        print(f"  {expression:<24} índice {indexed:.3f} ms   recorrido {scanned:.3f} ms")
+
+
+def bench_fuzzy(size: int) -> None:
+    """Corrección aproximada sobre un vocabulario sintético de ``size`` términos."""
+    rng = random.Random(7)
+    alphabet = "abcdefghijklmnopqrstuvwxyzáéíóúñ"
+    vocabulary = {"".join(rng.choices(alphabet, k=rng.randint(4, 12))) for _ in range(size)}
+
+    start = time.perf_counter()
+    index = FuzzyIndex()
+    for term in vocabulary:
+        index.add_term(term, rng.randint(1, 100))
+    print(f"Vocabulario de {len(index)} términos construido en {time.perf_counter() - start:.2f}s")
+
+    def typo(word: str) -> str:
+        i = rng.randrange(len(word))
+        return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + rng.choice(alphabet) + word[i:]
+
+    queries = [typo(word) for word in rng.sample(sorted(vocabulary), 1000)]
+    start = time.perf_counter()
+    for query in queries:
+        index.lookup(query, limit=1)
+    elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"  Búsqueda a distancia <= 2: {elapsed:.3f} ms por consulta")
+
+    start = time.perf_counter()
+    for query in queries[:20]:
+        sorted(vocabulary, key=lambda term: edit_distance(query, term, 2))[:1]
+    elapsed = (time.perf_counter() - start) * 1000 / 20
+    print(f"  Recorrido lineal del vocabulario: {elapsed:.3f} ms por consulta")
+
+
+def bench_semantic(size: int, k: int = 10, queries: int = 200) -> None:
+    """Recall@k y latencia del IVF frente a la búsqueda exacta por fuerza bruta."""
+    records = synthetic_records(size)
+    items = [(r.uri, "noticia", f"{r.titulo} {' '.join(r.tematicas)} {r.texto}") for r in records]
+
+    start = time.perf_counter()
+    index = SemanticIndex.build(items)
+    print(f"Índice LSA de {size} documentos construido en {time.perf_counter() - start:.2f}s "
+          f"({index.get_statistics()['ivf_lists']} listas IVF)")
+
+    rng = random.Random(11)
+    vectors = [index.embed_query(rng.choice(records).texto) for _ in range(queries)]
+    vectors = [v for v in vectors if v is not None]
+    exact = [top_k(index.embeddings @ v, k)[0] for v in vectors]
+    brute = timed(lambda: [top_k(index.embeddings @ v, k) for v in vectors], repeat=3) / len(vectors)
+    print(f"  Fuerza bruta        {brute:.3f} ms/consulta")
+
+    if index.ivf is None:
+        return
+    for n_probe in (1, 4, 8, 16, 32):
+        approximate = [index.ivf.search(index.embeddings, v, k, n_probe)[0] for v in vectors]
+        recall = sum(len(set(a) & set(e)) for a, e in zip(approximate, exact)) / (k * len(vectors))
+        latency = timed(lambda: [index.ivf.search(index.embeddings, v, k, n_probe) for v in vectors],
+                        repeat=3) / len(vectors)
+        print(f"  IVF n_probe={n_probe:<3}    {latency:.3f} ms/consulta   recall@{k} {recall:.3f}")
+
+
+def bench_linking(size: int, labels: int) -> None:
+    """Construcción del autómata y enlace del corpus completo."""
+    records = synthetic_records(size)
+    rng = random.Random(5)
+    words = [w for topic_words in topic_vocabulary().values() for w in topic_words]
+    filler = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 9))) for _ in range(50000)]
+    label_pairs = []
+    for i in range(labels):
+        pool = words if rng.random() < 0.01 else filler
+        label = " ".join(rng.choices(pool, k=rng.choice((1, 1, 2, 3))))
+        label_pairs.append((label, f"http://dbpedia.org/resource/R{i}"))
+
+    start = time.perf_counter()
+    linker = EntityLinker.from_labels(label_pairs)
+    print(f"Autómata de {len(linker.automaton)} etiquetas ({len(linker.automaton.fail)} estados) "
+          f"construido en {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    linker.link_corpus(records)
+    elapsed = time.perf_counter() - start
+    stats = linker.get_statistics()
+    print(f"  {size} noticias enlazadas en {elapsed:.2f}s ({size / elapsed:.0f} noticias/s), "
+          f"{stats['links']} enlaces")
+
+    uris = [r.uri for r in records[:1000]]
+    lookup = timed(lambda: [linker.resources_for(uri) for uri in uris]) / len(uris) * 1000
+    print(f"  Consulta noticia→recursos: {lookup:.3f} µs")
+
+
+def bench_suggest(size: int, queries: int = 2000) -> None:
+    """Autocompletado sobre ``size`` entradas con pesos de popularidad sesgados."""
+    rng = random.Random(13)
+    syllables = ["ma", "ri", "co", "la", "ta", "pe", "sa", "lu", "bo", "ca", "de", "en", "ro", "mi"]
+    entries = []
+    for i in range(size):
+        text = " ".join("".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(rng.randint(1, 3)))
+        entries.append((text, text.capitalize(), rng.choice(("titulo", "autor", "tematica", "dbpedia")),
+                        float(int(rng.paretovariate(1.1)))))
+
+    start = time.perf_counter()
+    index = SuggestIndex(entries)
+    stats = index.get_statistics()
+    print(f"Índice de {stats['entries']} sugerencias construido en {time.perf_counter() - start:.2f}s "
+          f"({stats['precomputed_prefixes']} prefijos precalculados)")
+
+    for length in (1, 2, 3, 5, 8):
+        prefixes = [entry[0][:length] for entry in rng.sample(entries, queries)]
+        elapsed = timed(lambda: [index.suggest(p) for p in prefixes], repeat=5) / len(prefixes)
+        print(f"  Prefijos de {length} caracteres: {elapsed * 1000:.1f} µs por consulta")
+
+    prefix = entries[0][0][:2]
+    scanned = timed(lambda: sorted((e for e in entries if e[0].startswith(prefix)),
+                                   key=lambda e: -e[3])[:10], repeat=3)
+    print(f"  Recorrido lineal: {scanned:.3f} ms por consulta")
+
+
+class FakeEndpoint:
+    """
+    Endpoint SPARQL local que responde sin resultados tras ``delay`` segundos.
+    Inyecta fallos para probar la resiliencia: una fracción ``slow_rate`` de
+    las respuestas tarda además ``slow_delay`` segundos y una fracción
+    ``error_rate`` es un HTTP 503. Los atributos pueden cambiarse en marcha
+    para simular una caída (p. ej. ``delay`` mayor que el plazo de lectura).
+    """
+
+    def __init__(self, delay: float, slow_rate: float = 0.0, slow_delay: float = 0.0,
+                 error_rate: float = 0.0):
+        self.delay = delay
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+        self.error_rate = error_rate
+        self.requests = 0
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                endpoint.requests += 1
+                slow = random.random() < endpoint.slow_rate
+                time.sleep(endpoint.delay + (endpoint.slow_delay if slow else 0))
+                if random.random() < endpoint.error_rate:
+                    status, body = 503, b"Service Unavailable"
+                else:
+                    status = 200
+                    body = json.dumps({"head": {"vars": []}, "results": {"bindings": []}}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/sparql-results+json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 1024
+
+            def handle_error(self, request, client_address):
+                # Los clientes con plazo cortan las respuestas lentas: no es un error del endpoint.
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/sparql"
+
+    def __enter__(self) -> "FakeEndpoint":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def bench_async(requests: int, delay: float, threads: int = 8) -> None:
+    """Peticiones con búsqueda online contra un endpoint lento: hilos frente a ASGI."""
+    from app import OnlineSearchEngine, create_app
+    from async_app import AsyncNewsApp
+
+    wsgi_app = create_app(background_warm_up=False)
+    runtime = wsgi_app.extensions["news_search"].runtime
+
+    terms = [f"termino inexistente {i}" for i in range(requests)]
+    with FakeEndpoint(delay) as endpoint:
+        engine = OnlineSearchEngine(endpoint.url)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(lambda term: runtime.current.search_manager.search_dbpedia(term, 'es', use_online=False)
+                          or engine.query_dbpedia(term, 'es'), terms))
+        elapsed = time.perf_counter() - start
+        print(f"  Síncrono, {threads} hilos:   {requests / elapsed:8.1f} peticiones/s ({elapsed:.2f}s)")
+
+        asgi = AsyncNewsApp(runtime, wsgi_app, endpoint=endpoint.url)
+
+        async def call(term: str) -> int:
+            scope = {"type": "http", "method": "GET", "path": "/api/dbpedia", "headers": [],
+                     "query_string": f"q={term}&online=1".encode()}
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b""}
+
+            async def send(message):
+                messages.append(message)
+
+            await asgi(scope, receive, send)
+            return messages[0]["status"]
+
+        async def run() -> List[int]:
+            await asgi.startup()
+            try:
+                return await asyncio.gather(*(call(term) for term in terms))
+            finally:
+                await asgi.shutdown()
+
+        start = time.perf_counter()
+        statuses = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        print(f"  ASGI, {asgi.executor._max_workers} hilos de índice: {requests / elapsed:8.1f} peticiones/s "
+              f"({elapsed:.2f}s, {statuses.count(200)} respuestas 200)")
+
+
+def bench_admission(clients: int, seconds: float = 3.0, service: float = 0.02,
+                    capacity: int = 4, deadline: float = 0.2) -> None:
+    """
+    Pico de carga contra un recurso de capacidad fija: sin control de admisión
+    todas las peticiones esperan y casi ninguna cumple su plazo; con él, las
+    que sobran se rechazan al instante y las admitidas terminan a tiempo.
+    """
+    from admission import AdmissionController, Overloaded
+
+    backend = threading.Semaphore(capacity)
+
+    def work() -> None:
+        with backend:
+            time.sleep(service)
+
+    def run(controller: Optional[AdmissionController]) -> None:
+        latencies: List[float] = []
+        shed = [0]
+        lock = threading.Lock()
+        stop_at = time.perf_counter() + seconds
+
+        def client() -> None:
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                try:
+                    if controller is None:
+                        work()
+                    else:
+                        token = controller.begin_request()
+                        try:
+                            with controller.stage("search"):
+                                work()
+                        finally:
+                            controller.end_request(token)
+                except Overloaded:
+                    with lock:
+                        shed[0] += 1
+                    time.sleep(service)
+                    continue
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latencies.sort()
+        on_time = sum(latency <= deadline for latency in latencies)
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+        label = "con control de admisión" if controller is not None else "sin control"
+        print(f"  {label:<24} completadas {len(latencies):5d}  a tiempo {on_time / seconds:7.1f}/s  "
+              f"p99 {p99:7.1f} ms  rechazadas {shed[0]}")
+
+    print(f"{clients} clientes contra un recurso de {capacity} x {service * 1000:.0f} ms, "
+          f"plazo {deadline * 1000:.0f} ms")
+    run(None)
+    run(AdmissionController({"search": (capacity, capacity)}, request_deadline=deadline,
+                            max_wait=deadline, rate=0))
+
+
+def bench_http(repeat: int = 30) -> None:
+    """Bytes transferidos y CPU por petición: completa, comprimida y revalidada con 304."""
+    import urllib.parse
+    from app import create_app
+    from http_cache import brotli
+
+    wsgi_app = create_app(background_warm_up=False)
+    runtime = wsgi_app.extensions["news_search"].runtime
+
+    client = wsgi_app.test_client()
+    uri = runtime.current.news_index.records[-1].uri
+    pages = {
+        "búsqueda": "/?keyword=salud&lang=es",
+        "detalle": f"/noticia/{urllib.parse.quote(uri, safe='')}?lang=es",
+        "estadísticas": "/stats",
+    }
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    def measure(path: str, headers: dict) -> tuple:
+        start = time.process_time()
+        for _ in range(repeat):
+            response = client.get(path, headers=headers)
+        return (time.process_time() - start) * 1000 / repeat, len(response.data), response.status_code
+
+    for name, path in pages.items():
+        etag = client.get(path).headers["ETag"]
+        print(f"  {name}")
+        for encoding in encodings:
+            cpu, size, _ = measure(path, {"Accept-Encoding": encoding})
+            print(f"    {encoding:<9} {size:>8} bytes  {cpu:7.3f} ms CPU")
+        cpu, size, status = measure(path, {"If-None-Match": etag})
+        print(f"    {status} ETag   {size:>8} bytes  {cpu:7.3f} ms CPU")
+
+
+def bench_shards(size: int, queries: int = 200, clients: int = 16) -> None:
+    """Consultas por segundo del modo particionado con 1, 2, 4 y 8 procesos."""
+    import os
+
+    records = synthetic_records(size)
+    rng = random.Random(17)
+    mix = ["sintética 1", "tema:salud", "autor:\"autor 3\"", "fecha:2024-03",
+           "verificadas tema:política -deportes"]
+    workload = [parse_query(rng.choice(mix)).clauses for _ in range(queries)]
+    print(f"{size} noticias, {queries} consultas desde {clients} clientes, {os.cpu_count()} CPU")
+
+    for n_shards in (1, 2, 4, 8):
+        for partition in ("hash", "date"):
+            shards = ShardedNewsSearch(records, None, n_shards, partition, timeout=60)
+            try:
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=clients) as pool:
+                    list(pool.map(lambda clauses: shards.search(clauses, limit=20), workload))
+                elapsed = time.perf_counter() - start
+            finally:
+                shards.close()
+            print(f"  {n_shards} particiones ({partition:<4}): {queries / elapsed:8.1f} consultas/s")
+
+
+def bench_query(size: int) -> None:
+    """Consultas compuestas: plan por selectividad frente a su cláusula más selectiva."""
+    index = NewsIndex(synthetic_records(size))
+    planner = QueryPlanner(index)
+    print(f"Índice de {size} noticias")
+
+    def naive(query):
+        # Evaluación en el orden escrito, con el texto libre recorriendo todo el corpus.
+        bits = index.all_bits
+        for clause in query.clauses:
+            if planner.estimate(clause) is None:
+                needle = fold_text(clause.value)
+                clause_bits = index._ids_to_bits(
+                    i for i in range(len(index)) if needle in index.search_text(i)
+                )
+            else:
+                clause_bits = planner.clause_bits(clause)
+            bits = bits & ~clause_bits if clause.negated else bits & clause_bits
+        return bits
+
+    for text in ['sintética 12 autor:"autor 3"',
+                 'sintética tema:salud fecha:2024-03 verificadas -deportes',
+                 'autor:"autor 1" tema:política fecha:2019..2020']:
+        query = parse_query(text)
+        assert planner.execute(query) == naive(query)
+        planned = timed(lambda: planner.execute(query), repeat=20)
+        ordered = timed(lambda: naive(query), repeat=3)
+        selective, estimate = planner.plan(query)[0]
+        single = timed(lambda: planner.execute(parse_query(f"{selective.field}:\"{selective.value}\""
+                                                           if selective.field != "text" else selective.value)),
+                       repeat=20)
+        print(f"  {text}")
+        print(f"    planificada {planned:.3f} ms   orden escrito {ordered:.3f} ms   "
+              f"sólo '{selective.field}' ({estimate}) {single:.3f} ms")
+
+
+def bench_batch(size: int, queries: int = 1000) -> None:
+    """Lote de consultas con una pasada de texto compartida frente a consultas sueltas."""
+    records = synthetic_records(size)
+    index = NewsIndex(records)
+    planner = QueryPlanner(index)
+    rng = random.Random(23)
+    authors = sorted({author for record in records for author in record.autores})
+    workload = [parse_query(rng.choice([
+        f"sintética {rng.randrange(size)}",
+        rng.choice(TOPICS).lower(),
+        f"autor:\"{rng.choice(authors)}\" {rng.choice(TOPICS).lower()}",
+        f"tema:{rng.choice(TOPICS).lower()} fecha:{rng.randint(2018, 2025)} -{rng.choice(TOPICS).lower()}",
+        f"noticia {rng.randrange(100)}",
+    ])) for _ in range(queries)]
+    index.search_text(0)
+    print(f"Índice de {size} noticias, {queries} consultas")
+
+    start = time.perf_counter()
+    single = [planner.execute(query) for query in workload]
+    single_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = planner.execute_many(workload)
+    batch_elapsed = time.perf_counter() - start
+    assert batched == single
+
+    print(f"  Consultas sueltas: {single_elapsed:8.2f} s  ({queries / single_elapsed:10.1f} consultas/s)")
+    print(f"  Lote compartido:   {batch_elapsed:8.2f} s  ({queries / batch_elapsed:10.1f} consultas/s)")
+    print(f"  Aceleración: x{single_elapsed / batch_elapsed:.1f}")
+
+
+def bench_locations(size: int, countries: int = 20, regions: int = 10, cities: int = 20) -> None:
+    """Consulta por región: postings con antecesores precalculados frente a subir la jerarquía."""
+    from location_index import LocationHierarchy, place_key
+
+    rng = random.Random(5)
+    records = synthetic_records(size)
+    for record in records:
+        country, region, city = rng.randrange(countries), rng.randrange(regions), rng.randrange(cities)
+        record.ubicaciones = [f"Ciudad {country}-{region}-{city}, Región {country}-{region}, País {country}"]
+    start = time.perf_counter()
+    hierarchy = LocationHierarchy()
+    hierarchy.annotate(records)
+    index = NewsIndex(records)
+    print(f"{size} noticias, {len(hierarchy.parents)} lugares: jerarquía e índice en "
+          f"{time.perf_counter() - start:.2f}s")
+
+    def walk_up(region: str) -> int:
+        # Sin antecesores precalculados: cada noticia sube por la jerarquía en cada consulta.
+        target = place_key(region)
+        return index._ids_to_bits(
+            doc_id for doc_id, record in enumerate(index.records)
+            if any(key == target or target in hierarchy._walk(key)
+                   for key in (place_key(u.split(",")[0]) for u in record.ubicaciones))
+        )
+
+    for region in ("País 3", "Región 3-4"):
+        assert index.value_bits("ubicacion", region) == walk_up(region)
+        posting = timed(lambda: index.value_bits("ubicacion", region), repeat=20)
+        walked = timed(lambda: walk_up(region), repeat=3)
+        print(f"  {region:<12} postings {posting:8.3f} ms   recorrido {walked:9.1f} ms   "
+              f"({index.value_bits('ubicacion', region).bit_count()} noticias)")
+    counted = timed(lambda: index.facet_counts(index.all_bits >> 1), repeat=5)
+    print(f"  Facetas (incluida ubicación) sobre casi todo el corpus: {counted:.1f} ms")
+
+
+def synthetic_items(size: int, duplicate_rate: float = 0.1, seed: int = 7):
+    """
+    Flujo de (uri, título, texto, uri original) donde una fracción son copias
+    de noticias recientes con un par de palabras cambiadas (original None si no lo es).
+    """
+    rng = random.Random(seed)
+    vocabulary = topic_vocabulary()
+    recent = []
+    for i in range(size):
+        uri = f"http://example.org/noticia/{i}"
+        if recent and rng.random() < duplicate_rate:
+            original, title, words = rng.choice(recent)
+            words = list(words)
+            for _ in range(2):
+                words[rng.randrange(len(words))] = rng.choice(vocabulary[rng.choice(TOPICS)])
+            yield uri, title, " ".join(words), original
+            continue
+        topic = rng.choice(TOPICS)
+        title = f"Noticia sintética {i} sobre {topic.lower()}"
+        words = rng.choices(vocabulary[topic], k=60)
+        recent.append((uri, title, words))
+        if len(recent) > 10000:
+            recent.pop(rng.randrange(len(recent)))
+        yield uri, title, " ".join(words), None
+
+
+def bench_dedupe(size: int) -> None:
+    """Ingesta por lotes en el índice LSH y comprobación de una noticia suelta."""
+    directory = tempfile.TemporaryDirectory(prefix="near-duplicates-")
+    path = os.path.join(directory.name, "index.sqlite")
+    index = NearDuplicateIndex(path)
+    truth = {}
+
+    def stream():
+        for uri, title, text, original in synthetic_items(size):
+            if original is not None and len(truth) < 5000:
+                truth[uri] = original
+            yield uri, title, text
+
+    start = time.perf_counter()
+    found = index.add_many(stream(), chunk_size=2000)
+    elapsed = time.perf_counter() - start
+    print(f"{size} noticias indexadas en {elapsed:.1f}s ({size / elapsed:,.0f}/s), "
+          f"{found} casi duplicadas detectadas")
+
+    recalled = sum(index.cluster_of(uri) == index.cluster_of(original) for uri, original in truth.items())
+    print(f"  Exhaustividad sobre {len(truth)} copias conocidas: {recalled / max(len(truth), 1):.1%}")
+
+    samples = list(itertools.islice(synthetic_items(2000, seed=99), 200))
+    latency = timed(lambda: [index.find(title, text) for _, title, text, _ in samples], repeat=3) / len(samples)
+    print(f"  Comprobación de una noticia nueva (find): {latency:.3f} ms")
+    stats = index.get_statistics()
+    index.close()
+    print(f"  {stats['clusters']} grupos; índice en disco de {os.path.getsize(path) / 1e6:.0f} MB")
+    directory.cleanup()
+
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Se ejecuta en un proceso nuevo para medir un arranque en frío.
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+client = flask_app.test_client()
+live = client.get("/healthz").status_code
+while client.get("/readyz").status_code != 200:
+    time.sleep(0.005)
+ready = time.perf_counter()
+print(json.dumps({"import": imported - start, "create": created - imported, "ready": ready - created,
+                  "live": live, "lazy": [m for m in ("googletrans", "SPARQLWrapper") if m not in sys.modules]}))
+"""
+
+
+def bench_startup(runs: int, top: int = 10) -> None:
+    """Arranque en frío: ``-X importtime`` de ``import app`` y tiempo hasta /readyz."""
+    env = dict(os.environ, HOT_RELOAD="0", MEMORY_REPORT_INTERVAL="0", BACKGROUND_WARM_UP="1")
+    modules = {}
+    totals = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                                   env=env, capture_output=True, text=True, check=True)
+        # -X importtime escribe cada módulo después de los que importa.
+        children = []
+        for match in IMPORTTIME_LINE.finditer(completed.stderr):
+            own, cumulative, indent, name = match.groups()
+            if len(indent) == 3:
+                children.append((name, int(cumulative)))
+            elif len(indent) == 1:
+                if name == "app":
+                    totals.append(int(cumulative))
+                    for child, value in children:
+                        modules.setdefault(child, []).append(value)
+                children = []
+    print(f"import app (-X importtime, mediana de {runs}): {sorted(totals)[len(totals) // 2] / 1000:.1f} ms; "
+          f"módulos que más tardan:")
+    ranked = sorted(((sorted(v)[len(v) // 2], name) for name, v in modules.items()), reverse=True)
+    for cumulative, name in ranked[:top]:
+        print(f"  {name:30} {cumulative / 1000:8.1f} ms")
+
+    phases = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], env=env,
+                                   capture_output=True, text=True, check=True)
+        phases.append(next(json.loads(line) for line in completed.stdout.splitlines()
+                           if line.startswith("{")))
+    for phase, label in (("import", "Importación"), ("create", "create_app (hasta /healthz)"),
+                         ("ready", "Calentamiento (hasta /readyz)")):
+        values = sorted(p[phase] for p in phases)
+        print(f"  {label:32} {values[len(values) // 2] * 1000:8.1f} ms")
+    lazy = set.intersection(*(set(p["lazy"]) for p in phases))
+    print(f"  Sin importar tras el arranque: {', '.join(sorted(lazy)) or 'ninguno'}")
+
+
+ONTOLOGY = "http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#"
+
+
+def write_ntriples(path: str, size: int) -> int:
+    """Vuelca el corpus sintético como N-Triples con la forma de las noticias de Poblacion."""
+    from rdflib import Literal
+
+    def lit(value: str, datatype: str = "") -> str:
+        return Literal(value).n3() if not datatype else f'"{value}"^^<http://www.w3.org/2001/XMLSchema#{datatype}>'
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in synthetic_records(size):
+            s = f"<{record.uri}>"
+            lines = [f"{s} <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{ONTOLOGY}Noticia> .",
+                     f"{s} <{ONTOLOGY}Título> {lit(record.titulo)} .",
+                     f"{s} <{ONTOLOGY}Fecha_publicación> {lit(record.fecha, 'date')} .",
+                     f"{s} <{ONTOLOGY}ContenidoTexto> {lit(record.texto)} ."]
+            lines += [f"{s} <{ONTOLOGY}Temática> {lit(t)} ." for t in record.tematicas]
+            lines += [f"{s} <{ONTOLOGY}Autor> {lit(a)} ." for a in record.autores]
+            f.write("\n".join(lines) + "\n")
+            count += len(lines)
+    return count
+
+
+def available_memory() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def bench_store(size: int) -> None:
+    """Latencia de patrones de tripletas y SPARQL: grafo en memoria frente a almacén SQLite."""
+    from rdflib import Graph, Literal, Namespace, URIRef
+    from sqlite_store import import_rdf, open_graph
+
+    ns = Namespace(ONTOLOGY)
+    directory = tempfile.TemporaryDirectory(prefix="triple-store-")
+    source = os.path.join(directory.name, "corpus.nt")
+    store_path = os.path.join(directory.name, "store.sqlite")
+    triples = write_ntriples(source, size)
+    print(f"{size} noticias, {triples} tripletas ({os.path.getsize(source) / 1e6:.0f} MB en N-Triples)")
+
+    start = time.perf_counter()
+    import_rdf([source], store_path)
+    elapsed = time.perf_counter() - start
+    disk = sum(os.path.getsize(store_path + suffix) for suffix in ("", "-wal") if os.path.exists(store_path + suffix))
+    print(f"  Importación a SQLite: {elapsed:.1f}s ({triples / elapsed:,.0f} tripletas/s), {disk / 1e6:.0f} MB en disco")
+
+    graphs = {}
+    rss = current_rss()
+    graphs["sqlite"] = open_graph(store_path, read_only=True)
+    print(f"  SQLite abierto: +{((current_rss() or 0) - (rss or 0)) / 1e6:.1f} MB de RSS")
+
+    # El grafo en memoria se carga sólo si la extrapolación desde una muestra cabe en RAM.
+    sample_size = min(size, 20000)
+    sample_path = os.path.join(directory.name, "sample.nt")
+    sample_triples = write_ntriples(sample_path, sample_size)
+    rss = current_rss() or 0
+    sample = Graph()
+    sample.parse(sample_path, format="nt")
+    per_triple = max(((current_rss() or 0) - rss) / sample_triples, 1)
+    del sample
+    needed = per_triple * triples
+    available = available_memory()
+    print(f"  Grafo en memoria estimado: {needed / 1e6:,.0f} MB ({per_triple:.0f} B/tripleta); "
+          f"disponible: {available / 1e6:,.0f} MB" if available else "")
+    if available is None or needed < available * 0.7:
+        start = time.perf_counter()
+        graphs["memory"] = Graph()
+        graphs["memory"].parse(source, format="nt")
+        print(f"  Carga en memoria: {time.perf_counter() - start:.1f}s")
+    else:
+        print("  El grafo no cabe en memoria: sólo se mide SQLite")
+
+    rng = random.Random(3)
+    uris = [URIRef(f"http://example.org/noticia/{rng.randrange(size)}") for _ in range(200)]
+    detail = """
+        SELECT ?propiedad ?valor WHERE {{ <{uri}> ?propiedad ?valor . }}
+    """
+    by_topic = f"""
+        SELECT ?noticia ?titulo WHERE {{
+            ?noticia <{ONTOLOGY}Temática> "Educación" ; <{ONTOLOGY}Título> ?titulo .
+        }} LIMIT 20
+    """
+    queries = {
+        "SPO (s ? ?)": lambda g, uri: list(g.triples((uri, None, None))),
+        "POS (? p o) 100": lambda g, uri: list(itertools.islice(g.subjects(ns.Temática, Literal("Política")), 100)),
+        "OSP (? ? o)": lambda g, uri: list(g.triples((None, None, uri))),
+        "SPARQL detalle": lambda g, uri: list(g.query(detail.format(uri=uri))),
+        "SPARQL temática": lambda g, uri: list(g.query(by_topic)),
+    }
+    for name, query in queries.items():
+        line = f"  {name:18}"
+        for backend, graph in graphs.items():
+            picks = iter(uris * 2)
+            line += f"  {backend} {timed(lambda: query(graph, next(picks)), repeat=100):8.3f} ms"
+        print(line)
+    graphs["sqlite"].close()
+    directory.cleanup()
+
+
+def bench_sparql(size: int) -> None:
+    """Endpoint /sparql: consulta directa al grafo, primera ejecución en un trabajador y caché."""
+    from rdflib import Graph
+    from sparql_endpoint import QueryError, SparqlEndpoint
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.nt")
+        triples = write_ntriples(path, size)
+        graph = Graph()
+        graph.parse(path, format="nt")
+    print(f"{size} noticias ({triples} tripletas)")
+
+    queries = {
+        "por temática": f"SELECT ?n ?t WHERE {{ ?n <{ONTOLOGY}Temática> \"Salud pública\" ; "
+                        f"<{ONTOLOGY}Título> ?t }}",
+        "conteo por autor": f"SELECT ?a (COUNT(?n) AS ?c) WHERE {{ ?n <{ONTOLOGY}Autor> ?a }} "
+                            f"GROUP BY ?a ORDER BY DESC(?c) LIMIT 10",
+    }
+    endpoint = SparqlEndpoint(workers=2, timeout=30, max_rows=10000)
+    try:
+        endpoint.query(graph, "v1", "ASK { ?s ?p ?o }")  # arranque de los trabajadores
+        for name, text in queries.items():
+            start = time.perf_counter()
+            list(graph.query(text))
+            direct = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            endpoint.query(graph, "v1", text)
+            cold = (time.perf_counter() - start) * 1000
+            cached = timed(lambda: endpoint.query(graph, "v1", "  " + text + "  # misma consulta"), repeat=200)
+            print(f"  {name:<18} directa {direct:8.1f} ms   trabajador {cold:8.1f} ms   caché {cached:.3f} ms")
+
+        endpoint.timeout = 2.0
+        cartesian = "SELECT (COUNT(*) AS ?c) WHERE { ?a ?b ?c1 . ?d ?e ?f . ?g ?h ?i }"
+        start = time.perf_counter()
+        try:
+            endpoint.query(graph, "v1", cartesian)
+        except QueryError as e:
+            print(f"  Producto cartesiano cortado en {time.perf_counter() - start:.2f}s: {e}")
+        start = time.perf_counter()
+        endpoint.query(graph, "v1", queries["por temática"] + " LIMIT 1")
+        print(f"  Siguiente consulta tras el corte: {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(f"  {endpoint.get_statistics()}")
+    finally:
+        endpoint.close()
+
+
+def bench_ingest(size: int, documents: int = 2000, clients: int = 8) -> None:
+    """
+    Ingesta en línea sobre SQLite: una transacción por noticia frente al
+    escritor único por lotes, con lectores buscando sobre la generación vigente.
+    """
+    from rdflib import Namespace
+    from hot_reload import SnapshotHolder
+    from ingestion import IngestionWriter, UriGenerator, prepare_news
+    from sqlite_store import import_rdf, open_graph
+
+    ns = Namespace(ONTOLOGY)
+    new_uri = UriGenerator("http://example.org/ingesta")
+    rng = random.Random(5)
+    vocabulary = [word for words in topic_vocabulary().values() for word in words]
+
+    def document(i: int) -> dict:
+        return {"titulo": f"Noticia ingerida {i}", "autor": f"Autor {i % 50}",
+                "tematica": rng.choice(TOPICS), "fecha": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                "texto": " ".join(rng.choices(vocabulary, k=40))}
+
+    def record(write) -> NewsRecord:
+        return NewsRecord(uri=str(write.noticia), titulo=write.titulo, texto=write.texto)
+
+    with tempfile.TemporaryDirectory(prefix="ingest-") as tmp:
+        source = os.path.join(tmp, "corpus.nt")
+        write_ntriples(source, size)
+        import_rdf([source], os.path.join(tmp, "store.sqlite"))
+        graph = open_graph(os.path.join(tmp, "store.sqlite"))
+        graph.store.set_durable()
+        records = synthetic_records(size)
+        print(f"{size} noticias, {documents} escrituras desde {clients} clientes")
+
+        index = NewsIndex(records)
+        index.search_text(0)  # textos normalizados de la generación de partida
+
+        def apply(writes: list) -> list:
+            graph.addN((s, p, o, graph) for write in writes for s, p, o in write.triples)
+            graph.commit()
+            holder.swap(holder.current.with_records([record(write) for write in writes]))
+            return [write.to_dict() for write in writes]
+
+        for label, max_batch, total in (("Sin lotes (una transacción y generación por noticia)", 1, documents // 10),
+                                        ("Escritor único por lotes", 200, documents)):
+            holder = SnapshotHolder(index)
+            writer = IngestionWriter(apply, max_batch=max_batch, max_queue=total)
+            stop = threading.Event()
+            latencies: List[float] = []
+
+            def reader() -> None:
+                query = parse_query("ingerida")
+                while not stop.is_set():
+                    begin = time.perf_counter()
+                    current = holder.current
+                    current.results(QueryPlanner(current).execute(query), 20)
+                    latencies.append(time.perf_counter() - begin)
+
+            writes = [prepare_news(document(i), ns, new_uri) for i in range(total)]
+            readers = [threading.Thread(target=reader) for _ in range(2)]
+            for thread in readers:
+                thread.start()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(clients) as pool:
+                futures = list(pool.map(writer.submit, writes))
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - start
+            stop.set()
+            for thread in readers:
+                thread.join()
+            stats = writer.get_statistics()
+            latencies.sort()
+            print(f"  {label}:")
+            print(f"    {total / elapsed:8.0f} noticias/s, {stats['batches']} lotes de hasta "
+                  f"{stats['largest_batch']} ({stats['batch_ms']:.0f} ms por lote)")
+            print(f"    Lecturas durante la ingesta: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms ({len(latencies)} búsquedas); "
+                  f"visibles al final {len(holder.current) - size} de {total}")
+        graph.close()
+
+
+def bench_online(clients: int, delay: float, phase: float = 3.0, think_time: float = 0.01) -> None:
+    """
+    Latencia de la búsqueda online mientras DBpedia pasa de sano a colgado y
+    se recupera: sin protección, con cortocircuito y con réplica cubierta.
+    """
+    from app import OnlineSearchEngine
+
+    slow_rate, slow_delay, outage_delay = 0.03, 0.4, 10.0
+    print(f"{clients} clientes, DBpedia local a {delay * 1000:.0f} ms ({slow_rate:.0%} con "
+          f"{slow_delay * 1000:.0f} ms más); caída de {phase:g}s con respuestas de {outage_delay:g}s")
+    setups = (("Sin cortocircuito ni réplica", 10 ** 9, False),
+              ("Cortocircuito", 5, False),
+              ("Cortocircuito + réplica cubierta", 5, True))
+    for label, failure_threshold, hedged in setups:
+        with FakeEndpoint(delay, slow_rate, slow_delay) as primary, FakeEndpoint(delay, slow_rate, slow_delay) as mirror:
+            engine = OnlineSearchEngine(primary.url, mirror.url if hedged else None,
+                                        connect_timeout=0.2, read_timeout=0.5,
+                                        failure_threshold=failure_threshold, reset_timeout=phase / 3)
+            phases = ("sano", "caído", "recuperado")
+            latencies = {name: [] for name in phases}
+            current = [phases[0]]
+            stop = threading.Event()
+
+            def client(i: int) -> None:
+                while not stop.is_set():
+                    name = current[0]
+                    begin = time.perf_counter()
+                    engine.query_dbpedia(f"termino {i}", 'es')
+                    latencies[name].append(time.perf_counter() - begin)
+                    stop.wait(think_time)
+
+            threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+            for thread in threads:
+                thread.start()
+            for name in phases:
+                current[0] = name
+                primary.delay = outage_delay if name == "caído" else delay
+                time.sleep(phase)
+            stop.set()
+            for thread in threads:
+                thread.join()
+            stats = engine.get_statistics()
+            engine.client.close()
+            print(f"  {label}:")
+            for name in phases:
+                samples = sorted(latencies[name])
+                print(f"    {name:>10}: p50 {samples[len(samples) // 2] * 1000:7.1f} ms, "
+                      f"p99 {samples[int(len(samples) * 0.99)] * 1000:7.1f} ms ({len(samples)} consultas)")
+            print(f"    Cortocircuitadas {stats['short_circuited']}, cubiertas {stats['hedged']} "
+                  f"(ganó la réplica {stats['hedge_wins']}), fuera de plazo {stats['deadline_exceeded']}")
+
+
+def bench_render(size: int, repeat: int = 20) -> None:
+    """Página de resultados con ``size`` tarjetas: cada tarjeta renderizada frente a fragmentos en caché."""
+    from flask import render_template
+    from app import NewsSearchConfig, create_app, news_cards
+    from fragment_cache import FragmentCache
+
+    app = create_app(background_warm_up=False)
+    snapshot = app.extensions["news_search"].runtime.current
+    index = NewsIndex(synthetic_records(size))
+    results = index.results(index.all_bits)
+    for result in results[::10]:
+        result["duplicados"] = 2
+    print(f"{len(results)} tarjetas por página")
+
+    def page(fragments: FragmentCache, lang: str) -> str:
+        return render_template(
+            "search.html", local_cards=news_cards(fragments, snapshot, results, lang, "consulta"),
+            dbpedia_results=[], keyword="consulta", mode="lexical",
+            search_modes=NewsSearchConfig.SEARCH_MODES, correction=None, fuzzy_mode="off", facets={},
+            active_filters={}, facet_labels=NewsSearchConfig.FACET_LABELS,
+            languages=NewsSearchConfig.LANGUAGES, current_lang=lang,
+            translations=NewsSearchConfig.TRANSLATIONS, dark_mode=True
+        )
+
+    with app.test_request_context("/"):
+        for label, max_entries in (("Sin caché (cada tarjeta se renderiza)", 0),
+                                   ("Caché de fragmentos", 3 * size)):
+            fragments = FragmentCache(NewsSearchConfig.TRANSLATIONS, max_entries)
+            first = timed(lambda: page(fragments, 'es'), repeat=1)
+            elapsed = {lang: timed(lambda: page(fragments, lang), repeat) for lang in NewsSearchConfig.LANGUAGES}
+            print(f"  {label}: primera página {first:.1f} ms; después "
+                  + ", ".join(f"{lang} {ms:.1f} ms" for lang, ms in elapsed.items())
+                  + f" ({fragments.get_statistics()['fragments']} fragmentos)")
+
+
+EXPORT_SCRIPT = """
+import json, sys, time
+from sqlite_store import open_graph
+from export import chunks, grouped_triples, serialize
+store, method, fmt, out = sys.argv[1:5]
+graph = open_graph(store, read_only=True)
+start = time.perf_counter()
+with open(out, "wb") as f:
+    if method == "serialize":
+        f.write(graph.serialize(format=fmt, encoding="utf-8"))
+    elif method == "stream":
+        for chunk in chunks(serialize(grouped_triples(graph), fmt, "http://example.org/noticias")):
+            f.write(chunk)
+# VmHWM es el pico de este proceso; ru_maxrss conservaría el del padre tras fork y exec.
+with open("/proc/self/status") as status:
+    peak = next(int(line.split()[1]) * 1024 for line in status if line.startswith("VmHWM:"))
+print(json.dumps({"seconds": time.perf_counter() - start, "peak": peak}))
+"""
+
+
+def bench_export(size: int) -> None:
+    """Exportación del almacén SQLite: ``Graph.serialize`` completo frente a streaming, en tiempo y pico de RSS."""
+    from sqlite_store import import_rdf
+
+    with tempfile.TemporaryDirectory(prefix="export-") as tmp:
+        source = os.path.join(tmp, "corpus.nt")
+        store = os.path.join(tmp, "store.sqlite")
+        triples = write_ntriples(source, size)
+        import_rdf([source], store)
+        print(f"{size} noticias, {triples} tripletas en SQLite")
+
+        def run(method: str, fmt: str) -> dict:
+            out = os.path.join(tmp, f"out.{fmt}")
+            completed = subprocess.run([sys.executable, "-c", EXPORT_SCRIPT, store, method, fmt, out],
+                                       capture_output=True, text=True, check=True)
+            result = json.loads(completed.stdout.splitlines()[-1])
+            result["bytes"] = os.path.getsize(out)
+            return result
+
+        baseline = run("open", "nt")["peak"]
+        cases = (("serialize RDF/XML (guardar_ontologia)", "serialize", "xml"),
+                 ("serialize N-Triples", "serialize", "nt"),
+                 ("serialize JSON-LD", "serialize", "json-ld"),
+                 ("Streaming N-Triples", "stream", "nt"),
+                 ("Streaming N-Quads", "stream", "nq"),
+                 ("Streaming JSON-LD", "stream", "jsonld"))
+        for label, method, fmt in cases:
+            result = run(method, fmt)
+            print(f"  {label:38} {result['seconds']:7.1f}s  {triples / result['seconds']:9,.0f} tripletas/s  "
+                  f"pico +{(result['peak'] - baseline) / 1e6:7.1f} MB  ({result['bytes'] / 1e6:.0f} MB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks del buscador de noticias")
+    parser.add_argument("benchmark", choices=["facets", "dates", "fuzzy", "semantic", "linking",
+                                                        "suggest", "async", "http", "admission", "shards", "query", "batch", "locations", "dedupe",
+                                                        "startup", "store", "sparql", "ingest", "online", "render", "export"])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--labels", type=int, default=1000000)
+    parser.add_argument("--delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.benchmark == "facets":
+        bench_facets(args.size)
+    elif args.benchmark == "dates":
+        bench_dates(args.size)
+    elif args.benchmark == "fuzzy":
+        bench_fuzzy(args.size)
+    elif args.benchmark == "semantic":
+        bench_semantic(args.size)
+    elif args.benchmark == "linking":
+        bench_linking(args.size, args.labels)
+    elif args.benchmark == "suggest":
+        bench_suggest(args.size)
+    elif args.benchmark == "async":
+        bench_async(args.size, args.delay)
+    elif args.benchmark == "http":
+        bench_http()
+    elif args.benchmark == "admission":
+        bench_admission(args.size)
+    elif args.benchmark == "shards":
+        bench_shards(args.size)
+    elif args.benchmark == "query":
+        bench_query(args.size)
+    elif args.benchmark == "batch":
+        bench_batch(args.size)
+    elif args.benchmark == "locations":
+        bench_locations(args.size)
+    elif args.benchmark == "dedupe":
+        bench_dedupe(args.size)
+    elif args.benchmark == "startup":
+        bench_startup(args.size)
+    elif args.benchmark == "store":
+        bench_store(args.size)
+    elif args.benchmark == "sparql":
+        bench_sparql(args.size)
+    elif args.benchmark == "ingest":
+        bench_ingest(args.size)
+    elif args.benchmark == "online":
+        bench_online(args.size, args.delay)
+    elif args.benchmark == "render":
+        bench_render(args.size)
+    elif args.benchmark == "export":
+        bench_export(args.size)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,8 @@ class DBpediaLocalIndex:
         self.resources: Dict[str, DBpediaResource] = {}
         self.label_index: Dict[str, List[str]] = {}
         self.category_index: Dict[str, List[str]] = {}
+        # Se incrementa con cada recurso indexado; permite invalidar datos derivados.
+        self.version = 0
         self.load_or_initialize()
     
     def load_or_initialize(self) -> None:
@@ -110,6 +112,7 @@ class DBpediaLocalIndex:
     
     def _index_resource(self, resource: DBpediaResource) -> None:
         """Indexa un recurso para búsqueda rápida."""
+        self.version += 1
         label_lower = resource.label.lower()
         if label_lower not in self.label_index:
             self.label_index[label_lower] = []
@@ -219,6 +222,7 @@ class DBpediaLocalIndex:
             "total_resources": len(self.resources),
             "total_categories": len(self.category_index),
             "total_indexed_labels": len(self.label_index),
+            "version": self.version,
             "last_updated": datetime.now().isoformat()
         }
 
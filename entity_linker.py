@@ -0,0 +1,183 @@
+"""
+Enlace de entidades entre noticias y recursos de DBpedia.
+Construye un autómata Aho-Corasick sobre las etiquetas del índice local de
+DBpedia y lo recorre una sola vez por noticia para precalcular listas de
+adyacencia noticia→recursos y recurso→noticias.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from news_index import TOKEN_PATTERN, NewsIndex, NewsRecord, fold_text
+
+
+def label_tokens(text: str) -> List[str]:
+    """Tokens normalizados (sin acentos, en minúsculas) de una etiqueta o texto."""
+    return TOKEN_PATTERN.findall(fold_text(text))
+
+
+class AhoCorasick:
+    """
+    Autómata Aho-Corasick sobre secuencias de tokens.
+
+    Trabajar con palabras en lugar de caracteres reduce el número de estados
+    y garantiza que sólo se reconocen etiquetas completas, nunca fragmentos
+    de una palabra más larga.
+    """
+
+    def __init__(self):
+        self.transitions: Dict[Tuple[int, str], int] = {}
+        self.fail: List[int] = [0]
+        self.outputs: List[List[int]] = [[]]
+        # Siguiente estado en la cadena de fallos que tiene salidas propias.
+        self.output_link: List[int] = [0]
+        self.patterns: List[Tuple[str, ...]] = []
+        self._built = False
+
+    def add(self, tokens: Iterable[str]) -> int:
+        """Añade un patrón y devuelve su identificador."""
+        tokens = tuple(tokens)
+        state = 0
+        for token in tokens:
+            next_state = self.transitions.get((state, token))
+            if next_state is None:
+                next_state = len(self.fail)
+                self.transitions[(state, token)] = next_state
+                self.fail.append(0)
+                self.outputs.append([])
+                self.output_link.append(0)
+            state = next_state
+        self.patterns.append(tokens)
+        self.outputs[state].append(len(self.patterns) - 1)
+        self._built = False
+        return len(self.patterns) - 1
+
+    def build(self) -> None:
+        """Calcula los enlaces de fallo en anchura."""
+        children: Dict[int, List[Tuple[str, int]]] = {}
+        for (state, token), child in self.transitions.items():
+            children.setdefault(state, []).append((token, child))
+
+        queue = deque()
+        for _, child in children.get(0, []):
+            self.fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            for token, child in children.get(state, []):
+                fallback = self.fail[state]
+                while fallback and (fallback, token) not in self.transitions:
+                    fallback = self.fail[fallback]
+                target = self.transitions.get((fallback, token), 0)
+                self.fail[child] = target if target != child else 0
+                link = self.fail[child]
+                self.output_link[child] = link if self.outputs[link] else self.output_link[link]
+                queue.append(child)
+        self._built = True
+
+    def iter_matches(self, tokens: List[str]) -> Iterator[Tuple[int, int]]:
+        """Recorre los tokens y produce (posición final, patrón) por cada coincidencia."""
+        if not self._built:
+            self.build()
+        state = 0
+        transitions = self.transitions
+        for position, token in enumerate(tokens):
+            while state and (state, token) not in transitions:
+                state = self.fail[state]
+            state = transitions.get((state, token), 0)
+            match_state = state if self.outputs[state] else self.output_link[state]
+            while match_state:
+                for pattern in self.outputs[match_state]:
+                    yield position, pattern
+                match_state = self.output_link[match_state]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+
+class EntityLinker:
+    """Listas de adyacencia precalculadas entre noticias y recursos de DBpedia."""
+
+    def __init__(self):
+        self.automaton = AhoCorasick()
+        self.pattern_resources: List[List[str]] = []
+        self.news_to_resources: Dict[str, List[str]] = {}
+        self.resource_to_news: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_labels(cls, labels: Iterable[Tuple[str, str]]) -> "EntityLinker":
+        """
+        Construye el autómata a partir de pares (etiqueta, uri).
+
+        Las etiquetas de una sola palabra muy corta o numérica se descartan
+        porque producen demasiados falsos positivos.
+        """
+        linker = cls()
+        pattern_ids: Dict[Tuple[str, ...], int] = {}
+        for label, uri in labels:
+            tokens = tuple(label_tokens(label))
+            if not tokens or (len(tokens) == 1 and (len(tokens[0]) < 3 or tokens[0].isdigit())):
+                continue
+            pattern = pattern_ids.get(tokens)
+            if pattern is None:
+                pattern = pattern_ids[tokens] = linker.automaton.add(tokens)
+                linker.pattern_resources.append([])
+            if uri not in linker.pattern_resources[pattern]:
+                linker.pattern_resources[pattern].append(uri)
+        linker.automaton.build()
+        return linker
+
+    def link_text(self, text: str) -> List[str]:
+        """URIs de los recursos cuyas etiquetas aparecen en el texto."""
+        found = {}
+        for _, pattern in self.automaton.iter_matches(label_tokens(text)):
+            for uri in self.pattern_resources[pattern]:
+                found[uri] = None
+        return list(found)
+
+    def link_record(self, record: NewsRecord) -> List[str]:
+        fields = [record.titulo, *record.tematicas, *record.ubicaciones, record.texto]
+        return self.link_text("\n".join(fields))
+
+    def link_corpus(self, records: Iterable[NewsRecord]) -> None:
+        """Enlaza todas las noticias y reconstruye ambas listas de adyacencia."""
+        self.news_to_resources = {}
+        self.resource_to_news = {}
+        for record in records:
+            self.add_record(record)
+
+    def add_record(self, record: NewsRecord) -> None:
+        """Enlaza una noticia nueva (o reenlaza una existente)."""
+        for uri in self.news_to_resources.pop(record.uri, []):
+            self.resource_to_news[uri].remove(record.uri)
+        resources = self.link_record(record)
+        if resources:
+            self.news_to_resources[record.uri] = resources
+        for uri in resources:
+            self.resource_to_news.setdefault(uri, []).append(record.uri)
+
+    def resources_for(self, news_uri: str) -> List[str]:
+        return self.news_to_resources.get(news_uri, [])
+
+    def news_for(self, resource_uri: str) -> List[str]:
+        return self.resource_to_news.get(resource_uri, [])
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del enlazador."""
+        return {
+            "labels": len(self.automaton),
+            "automaton_states": len(self.automaton.fail),
+            "linked_news": len(self.news_to_resources),
+            "linked_resources": len(self.resource_to_news),
+            "links": sum(len(v) for v in self.news_to_resources.values())
+        }
+
+
+def build_entity_linker(news_index: NewsIndex, dbpedia_index) -> EntityLinker:
+    """Construye el autómata con las etiquetas de DBpedia local y enlaza el corpus."""
+    linker = EntityLinker.from_labels(
+        (resource.label, resource.uri) for resource in dbpedia_index.resources.values()
+    )
+    linker.link_corpus(news_index.records)
+    return linker
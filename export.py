@@ -0,0 +1,252 @@
+"""
+Exportación en streaming de la ontología y de conjuntos de noticias.
+N-Triples, N-Quads y JSON-LD se generan tripleta a tripleta desde el almacén
+(en memoria o SQLite) sin construir el documento completo: la memoria no
+crece con el tamaño del corpus. Con filtros (consulta, temática, rango de
+fechas, estado de verificación) se exportan sólo las noticias que los cumplen,
+cada una con sus verificaciones.
+
+Uso:
+    python export.py --format nt > noticias.nt
+    python export.py --format jsonld --tematica Salud --desde 2024-01 --out salud.jsonld
+    python export.py --format nq --backend sqlite --store data/ontologia.sqlite --estado Finalizada
+
+Los valores de ``--estado`` son los estados agregados del índice: Finalizada,
+En proceso, Rechazada o No verificada.
+"""
+
+import argparse
+import itertools
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD
+
+from news_index import NOT_VERIFIED, NewsIndex, parse_date_query
+from query_parser import Clause, Query, QueryPlanner, parse_query
+from verification_index import KNOWN_STATES, VerificationIndex
+
+
+FORMATS = {
+    "nt": "application/n-triples",
+    "nq": "application/n-quads",
+    "jsonld": "application/ld+json",
+}
+FORMAT_ALIASES = {"ntriples": "nt", "n-triples": "nt", "nquads": "nq", "n-quads": "nq", "json-ld": "jsonld"}
+# Facetas de NewsIndex que se pueden usar como filtro exacto.
+FILTER_FACETS = ("tematica", "estado", "autor", "ubicacion")
+# Valores de la faceta estado: un valor fuera de esta lista no exportaría nada.
+STATES = tuple(KNOWN_STATES.values()) + (NOT_VERIFIED,)
+DEFAULT_CONTEXT = {"rdf": str(RDF), "rdfs": str(RDFS), "xsd": str(XSD), "owl": str(OWL)}
+# Tamaño aproximado de cada trozo de la respuesta: un write por línea sería demasiado lento.
+CHUNK_SIZE = 64 * 1024
+
+Triple = Tuple
+
+
+class ExportError(ValueError):
+    """Parámetros de exportación no válidos."""
+
+    status = 400
+
+
+def resolve_format(name: str) -> str:
+    key = FORMAT_ALIASES.get((name or "nt").strip().lower(), (name or "nt").strip().lower())
+    if key not in FORMATS:
+        raise ExportError(f"formato desconocido '{name}': use {', '.join(FORMATS)}")
+    return key
+
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def nt_term(term) -> str:
+    """Un término en sintaxis N-Triples."""
+    if isinstance(term, Literal):
+        text = f'"{_escape(str(term))}"'
+        if term.language:
+            return f"{text}@{term.language}"
+        if term.datatype:
+            return f"{text}^^<{term.datatype}>"
+        return text
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return f"<{term}>"
+
+
+def ntriples(triples: Iterable[Triple]) -> Iterator[str]:
+    for s, p, o in triples:
+        yield f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n"
+
+
+def nquads(triples: Iterable[Triple], graph_name: str) -> Iterator[str]:
+    graph = nt_term(URIRef(graph_name))
+    for s, p, o in triples:
+        yield f"{nt_term(s)} {nt_term(p)} {nt_term(o)} {graph} .\n"
+
+
+class _Compactor:
+    """IRIs compactas (``prefijo:local``) según el @context del documento."""
+
+    def __init__(self, context: Dict[str, str]):
+        # El espacio de nombres más largo primero: gana el prefijo más específico.
+        self.prefixes = sorted(((ns, prefix) for prefix, ns in context.items()), key=lambda item: -len(item[0]))
+
+    def __call__(self, iri: str) -> str:
+        for ns, prefix in self.prefixes:
+            if iri.startswith(ns) and len(iri) > len(ns):
+                return f"{prefix}:{iri[len(ns):]}"
+        return iri
+
+
+def _jsonld_value(term):
+    if isinstance(term, Literal):
+        if term.language:
+            return {"@value": str(term), "@language": term.language}
+        if term.datatype:
+            return {"@value": str(term), "@type": str(term.datatype)}
+        return str(term)
+    if isinstance(term, BNode):
+        return {"@id": f"_:{term}"}
+    return {"@id": str(term)}
+
+
+def jsonld(triples: Iterable[Triple], context: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    """
+    Documento JSON-LD con un nodo por cada tramo de tripletas del mismo sujeto.
+    Los almacenes devuelven las tripletas agrupadas por sujeto; si un sujeto
+    aparece en varios tramos, JSON-LD une los nodos con el mismo @id.
+    """
+    context = {**DEFAULT_CONTEXT, **(context or {})}
+    compact = _Compactor(context)
+    yield '{"@context": ' + json.dumps(context, ensure_ascii=False) + ', "@graph": ['
+    separator = "\n"
+    for subject, group in itertools.groupby(triples, key=lambda triple: triple[0]):
+        node: Dict[str, object] = {"@id": f"_:{subject}" if isinstance(subject, BNode) else str(subject)}
+        for _, p, o in group:
+            if p == RDF.type and not isinstance(o, Literal):
+                node.setdefault("@type", []).append(compact(str(o)))
+            else:
+                node.setdefault(compact(str(p)), []).append(_jsonld_value(o))
+        yield separator + json.dumps(node, ensure_ascii=False)
+        separator = ",\n"
+    yield "\n]}\n"
+
+
+def serialize(triples: Iterable[Triple], fmt: str, graph_name: str = "",
+              context: Optional[Dict[str, str]] = None) -> Iterator[str]:
+    if fmt == "nq":
+        return nquads(triples, graph_name)
+    if fmt == "jsonld":
+        return jsonld(triples, context)
+    return ntriples(triples)
+
+
+def chunks(pieces: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Agrupa los fragmentos en trozos de unos ``size`` bytes codificados en UTF-8."""
+    buffer: List[str] = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def select_news(index: NewsIndex, query: str = "", filters: Optional[Dict[str, List[str]]] = None,
+                since: str = "", until: str = "") -> int:
+    """
+    Bitmap de las noticias que cumplen la consulta, los filtros exactos por
+    faceta y el rango de fechas de publicación [since, until].
+
+    Raises:
+        ExportError: Faceta desconocida o fecha no válida
+    """
+    unknown = set(filters or {}) - set(FILTER_FACETS)
+    if unknown:
+        raise ExportError(f"filtro desconocido: {', '.join(sorted(unknown))}")
+    clauses = list(parse_query(query).clauses)
+    if since or until:
+        expression = f"{since}..{until}"
+        if parse_date_query(expression) is None:
+            raise ExportError(f"rango de fechas no válido: '{since}' a '{until}'")
+        clauses.append(Clause("fecha", expression))
+    return QueryPlanner(index).execute(Query(clauses), index.filter_bits(filters))
+
+
+def news_subjects(index: NewsIndex, verifications: VerificationIndex, bits: int) -> Iterator[URIRef]:
+    """Las noticias del bitmap, de la más reciente a la más antigua, seguidas de sus verificaciones."""
+    for doc_id in index.iter_ids(bits):
+        uri = index.records[doc_id].uri
+        yield URIRef(uri)
+        for verification in verifications.verifications(uri):
+            yield URIRef(verification.uri)
+
+
+def subject_triples(graph: Graph, subjects: Iterable) -> Iterator[Triple]:
+    for subject in subjects:
+        yield from graph.triples((subject, None, None))
+
+
+def grouped_triples(graph: Graph) -> Iterator[Triple]:
+    """Todas las tripletas del grafo con las de cada sujeto seguidas."""
+    if getattr(graph.store, "ordered_by_subject", False):
+        return graph.triples((None, None, None))
+    # En memoria el grafo ya está entero: la lista de sujetos no añade un orden de magnitud.
+    return subject_triples(graph, dict.fromkeys(graph.subjects()))
+
+
+def main() -> None:
+    from sqlite_store import BACKENDS, open_ontology
+
+    parser = argparse.ArgumentParser(description="Exportación en streaming de la ontología de noticias")
+    parser.add_argument("--format", default="nt", help="nt, nq o jsonld")
+    parser.add_argument("--out", help="Fichero de salida (por defecto, la salida estándar)")
+    parser.add_argument("--backend", choices=BACKENDS, default="memory")
+    parser.add_argument("--store", default="data/ontologia.sqlite")
+    parser.add_argument("--ontology", default="noticias_ontologia.rdf")
+    parser.add_argument("--graph-name", default="http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3")
+    parser.add_argument("--q", default="", help="Consulta con la sintaxis del buscador")
+    for facet in FILTER_FACETS:
+        parser.add_argument(f"--{facet}", action="append", default=[],
+                            choices=STATES if facet == "estado" else None)
+    parser.add_argument("--desde", default="")
+    parser.add_argument("--hasta", default="")
+    args = parser.parse_args()
+
+    try:
+        fmt = resolve_format(args.format)
+    except ExportError as e:
+        parser.error(str(e))
+    graph = open_ontology(args.backend, args.store, [args.ontology])
+    filters = {facet: getattr(args, facet) for facet in FILTER_FACETS if getattr(args, facet)}
+    if args.q or filters or args.desde or args.hasta:
+        ns = Namespace(args.graph_name + "#")
+        verifications = VerificationIndex.from_graph(graph, ns)
+        index = NewsIndex.from_graph(graph, ns, verifications)
+        try:
+            bits = select_news(index, args.q, filters, args.desde, args.hasta)
+        except ExportError as e:
+            parser.error(str(e))
+        triples = subject_triples(graph, news_subjects(index, verifications, bits))
+    else:
+        triples = grouped_triples(graph)
+
+    out = open(args.out, "wb") if args.out else sys.stdout.buffer
+    try:
+        for chunk in chunks(serialize(triples, fmt, args.graph_name, {"onto": args.graph_name + "#"})):
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Caché de fragmentos HTML de las páginas de resultados y de detalle.
+Una tarjeta de noticia se renderiza igual en todas las búsquedas que la
+devuelven: se guarda ya renderizada por (tipo, uri, idioma) para la versión
+vigente de los datos y la página sólo ensambla fragmentos. Lo que cambia con
+cada petición (la palabra clave de los enlaces, los casi duplicados
+agrupados) queda en el fragmento como un hueco que se rellena al ensamblar.
+Las cadenas fijas de la interfaz se resuelven una sola vez por idioma.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+from markupsafe import Markup
+
+
+def slot(name: str) -> Markup:
+    """Marca de un hueco; el NUL no puede aparecer en textos que vienen de RDF/XML."""
+    return Markup(f"\x00{name}\x00")
+
+
+def fill(fragment: str, values: Mapping[str, str]) -> Markup:
+    """Rellena los huecos de un fragmento con HTML ya escapado."""
+    for name, value in values.items():
+        fragment = fragment.replace(f"\x00{name}\x00", value)
+    return Markup(fragment)
+
+
+class FragmentCache:
+    """Fragmentos renderizados de una versión de los datos, con expulsión LRU."""
+
+    def __init__(self, translations: Dict[str, Dict[str, str]], max_entries: int = 20000):
+        """
+        Args:
+            translations: Tabla clave -> idioma -> texto de la interfaz
+            max_entries: Fragmentos que se conservan (0 = sin caché)
+        """
+        self.translations = translations
+        self.languages = {lang for texts in translations.values() for lang in texts}
+        self.max_entries = max_entries
+        self.version: Optional[tuple] = None
+        self.entries: "OrderedDict[Hashable, Tuple[Any, str]]" = OrderedDict()
+        self._chrome: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def chrome(self, lang: str) -> Dict[str, str]:
+        """
+        Textos de la interfaz en ``lang`` (en español si falta la traducción).
+        Un idioma que no aparece en la tabla se sirve en español, para que el
+        parámetro de la petición no haga crecer la caché.
+        """
+        if lang not in self.languages:
+            lang = 'es'
+        chrome = self._chrome.get(lang)
+        if chrome is None:
+            chrome = {key: texts.get(lang, texts.get('es', key)) for key, texts in self.translations.items()}
+            self._chrome[lang] = chrome
+        return chrome
+
+    def get(self, version: tuple, key: Hashable, fields: Any, render: Callable[[], str]) -> str:
+        """
+        Fragmento de ``key`` para la versión de datos ``version`` (creciente,
+        como ``RuntimeSnapshot.versions()``). ``fields`` son los datos de la
+        petición que se pintan en el fragmento: si no coinciden con los del
+        guardado (p. ej. una traducción omitida por carga) se vuelve a renderizar.
+        Las peticiones que aún trabajan con una generación anterior renderizan
+        sin tocar la caché.
+        """
+        with self._lock:
+            if self.version is None or version > self.version:
+                if self.entries:
+                    self.invalidations += 1
+                self.entries.clear()
+                self.version = version
+            cached = self.entries.get(key) if version == self.version else None
+            if cached is not None and cached[0] == fields:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        fragment = str(render())
+        with self._lock:
+            if version == self.version and self.max_entries > 0:
+                self.entries[key] = (fields, fragment)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return fragment
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.version = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas de la caché de fragmentos."""
+        lookups = self.hits + self.misses
+        return {
+            "fragments": len(self.entries),
+            "max_fragments": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "languages": sorted(self._chrome)
+        }
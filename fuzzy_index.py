@@ -0,0 +1,183 @@
+"""
+Corrección ortográfica tolerante a errores para consultas de búsqueda.
+Implementa un diccionario de borrados al estilo SymSpell sobre el vocabulario
+normalizado de títulos, autores, temáticas y etiquetas de DBpedia.
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from news_index import NewsIndex, fold_text, tokenize
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Distancia de Damerau-Levenshtein restringida (OSA) con corte temprano.
+
+    Sólo se calcula la banda diagonal de ancho ``max_distance``: fuera de
+    ella la distancia ya supera el máximo.
+
+    Returns:
+        La distancia, o ``max_distance + 1`` si la supera
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+    over = max_distance + 1
+    previous2 = None
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [over] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        lo = max(1, i - max_distance)
+        hi = min(len_b, i + max_distance)
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous2, previous = previous, current
+    return min(previous[len_b], over)
+
+
+class FuzzyIndex:
+    """
+    Diccionario de borrados para búsqueda aproximada por distancia de edición.
+
+    Cada término se indexa junto con todas las variantes que resultan de
+    borrarle hasta ``max_distance`` caracteres de su prefijo; una consulta
+    genera sus propios borrados y sólo verifica los términos que comparten
+    alguno, sin recorrer el vocabulario.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.frequencies: Dict[str, int] = {}
+        self.deletes: Dict[str, List[str]] = {}
+        self._surface_counts: Dict[str, Counter] = {}
+
+    def add_term(self, term: str, count: int = 1) -> None:
+        """Añade una aparición de un término (en su forma original en minúsculas)."""
+        folded = fold_text(term)
+        self._surface_counts.setdefault(folded, Counter())[term] += count
+        if folded in self.frequencies:
+            self.frequencies[folded] += count
+            return
+        self.frequencies[folded] = count
+        for variant in self._deletes(folded[:self.prefix_length]):
+            self.deletes.setdefault(variant, []).append(folded)
+
+    def add_text(self, text: str) -> None:
+        for token in tokenize(text):
+            self.add_term(token)
+
+    def _deletes(self, word: str) -> Set[str]:
+        variants = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    def __contains__(self, term: str) -> bool:
+        return fold_text(term) in self.frequencies
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def lookup(self, term: str, max_distance: Optional[int] = None,
+               limit: int = 3) -> List[Tuple[str, int, int]]:
+        """
+        Busca términos del vocabulario a distancia acotada.
+
+        Args:
+            term: Término a corregir
+            max_distance: Distancia máxima (por defecto la del índice)
+            limit: Número máximo de sugerencias
+
+        Returns:
+            Lista de (término original, distancia, frecuencia) ordenada por
+            distancia y luego por frecuencia descendente
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        folded = fold_text(term)
+        if folded in self.frequencies:
+            return [(self._surface(folded), 0, self.frequencies[folded])]
+        # Como el modo AUTO de Elasticsearch: las palabras cortas toleran un solo error.
+        if len(folded) <= 5:
+            max_distance = min(max_distance, 1)
+
+        candidates = set()
+        for variant in self._deletes(folded[:self.prefix_length]):
+            candidates.update(self.deletes.get(variant, ()))
+
+        # Se verifica por distancias crecientes: la banda estrecha es más barata y
+        # basta con ``limit`` coincidencias cercanas para descartar las lejanas.
+        matches = []
+        for distance_bound in range(1, max_distance + 1):
+            for candidate in candidates:
+                distance = edit_distance(folded, candidate, distance_bound)
+                if distance == distance_bound:
+                    matches.append((candidate, distance, self.frequencies[candidate]))
+            if len(matches) >= limit:
+                break
+        matches.sort(key=lambda m: (m[1], -m[2], m[0]))
+        return [(self._surface(c), d, f) for c, d, f in matches[:limit]]
+
+    def _surface(self, folded: str) -> str:
+        return self._surface_counts[folded].most_common(1)[0][0]
+
+    def correct(self, query: str) -> Optional[str]:
+        """
+        Corrige palabra por palabra una consulta completa.
+
+        Los prefijos de campo (``autor:``, ``tema:``...) se conservan y sólo se
+        corrige el valor. Devuelve None si no hay nada que corregir.
+        """
+        changed = False
+        corrected = []
+        for part in query.split():
+            prefix, _, value = part.rpartition(":")
+            prefix = prefix + ":" if prefix else ""
+            if len(value) < 3 or value.isdigit() or value in self:
+                corrected.append(part)
+                continue
+            matches = self.lookup(value, limit=1)
+            if matches:
+                corrected.append(prefix + matches[0][0])
+                changed = True
+            else:
+                corrected.append(part)
+        return " ".join(corrected) if changed else None
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del índice."""
+        return {
+            "terms": len(self.frequencies),
+            "delete_variants": len(self.deletes)
+        }
+
+
+def build_fuzzy_index(news_index: NewsIndex, dbpedia_index=None,
+                      max_distance: int = 2) -> FuzzyIndex:
+    """Construye el índice aproximado a partir de las noticias y de DBpedia local."""
+    index = FuzzyIndex(max_distance=max_distance)
+    for record in news_index.records:
+        index.add_text(record.titulo)
+        for value in record.autores + record.tematicas:
+            index.add_text(value)
+    if dbpedia_index is not None:
+        for resource in dbpedia_index.resources.values():
+            index.add_text(resource.label)
+    return index
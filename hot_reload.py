@@ -0,0 +1,255 @@
+"""
+Recarga en caliente de la ontología y de la caché de DBpedia.
+Un hilo vigila los ficheros de datos; cuando cambian construye una nueva
+generación completa (grafo e índices) en segundo plano y la publica con un
+intercambio atómico. Las peticiones en curso terminan con la generación que
+tomaron al empezar. El mismo intercambio sirve para el calentamiento: al
+arrancar se publica una generación con lo imprescindible y se completa
+después en segundo plano. La ingesta en línea publica también por aquí
+(``publish``), serializada con las recargas.
+"""
+
+import gc
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class SnapshotHolder:
+    """
+    Doble búfer de generaciones: la vigente y, como mucho, la retirada que
+    aún usan peticiones en curso.
+    """
+
+    def __init__(self, snapshot: Any):
+        self._current = snapshot
+        self._retired: Optional[weakref.ref] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Any:
+        return self._current
+
+    def swap(self, snapshot: Any) -> Any:
+        """Publica una generación nueva y devuelve la anterior."""
+        with self._lock:
+            previous = self._current
+            self._current = snapshot
+            self._retired = weakref.ref(previous)
+        return previous
+
+    def replace(self, expected: Any, snapshot: Any) -> bool:
+        """Publica ``snapshot`` sólo si la vigente sigue siendo ``expected``."""
+        with self._lock:
+            if self._current is not expected:
+                return False
+            self._current = snapshot
+            self._retired = weakref.ref(expected)
+        return True
+
+    def retired_alive(self) -> bool:
+        return self._retired is not None and self._retired() is not None
+
+
+class WarmUp:
+    """
+    Completa en segundo plano la generación publicada con lo imprescindible y
+    la sustituye por la completa al terminar. Si mientras tanto una recarga
+    publicó otra generación, el resultado se descarta.
+    """
+
+    def __init__(self, holder: SnapshotHolder, complete_fn: Callable[[Any], Any],
+                 on_ready: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            holder: Contenedor de la generación vigente
+            complete_fn: Construye la generación completa a partir de la esencial
+            on_ready: Se llama tras publicar la generación completa
+        """
+        self.holder = holder
+        self.complete_fn = complete_fn
+        self.on_ready = on_ready
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.discarded = False
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, background: bool = True) -> None:
+        if self.started_at is not None:
+            return
+        self.started_at = time.time()
+        if background:
+            self._thread = threading.Thread(target=self._run, name="warm-up", daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        essentials = self.holder.current
+        try:
+            complete = self.complete_fn(essentials)
+        except Exception as e:
+            self.error = str(e)
+            print(f"✗ Error en el calentamiento, se sirve sólo lo imprescindible: {e}")
+        else:
+            self.discarded = not self.holder.replace(essentials, complete)
+            if self.on_ready is not None:
+                self.on_ready()
+        self.duration = time.perf_counter() - start
+        self._done.set()
+        if self.error is None:
+            print(f"✓ Calentamiento completado en {self.duration:.2f}s")
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine el calentamiento; devuelve si terminó a tiempo."""
+        return self._done.wait(timeout)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del calentamiento."""
+        return {
+            "done": self.done,
+            "started_at": self.started_at,
+            "seconds": round(self.duration, 3) if self.duration is not None else None,
+            "error": self.error,
+            "discarded": self.discarded
+        }
+
+
+class HotReloader:
+    """Vigila ficheros por fecha de modificación y reconstruye al detectar cambios."""
+
+    def __init__(self, holder: SnapshotHolder, build_fn: Callable[[int], Any],
+                 paths: Iterable[str], interval: float = 2.0, retire_timeout: float = 60.0):
+        """
+        Args:
+            holder: Contenedor de la generación vigente
+            build_fn: Construye la generación con el número indicado
+            paths: Ficheros a vigilar
+            interval: Segundos entre comprobaciones
+            retire_timeout: Espera máxima a que se libere la generación retirada
+        """
+        self.holder = holder
+        self.build_fn = build_fn
+        self.paths = list(paths)
+        self.interval = interval
+        self.retire_timeout = retire_timeout
+        self.generation = 1
+        self.reloads = 0
+        self.publications = 0
+        self.failures = 0
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_reload_at: Optional[float] = None
+        self._signature = self.signature()
+        self._pending: Optional[Tuple] = None
+        self._build_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def signature(self) -> Tuple:
+        entries = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                entries.append((path, None, None))
+        return tuple(entries)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="hot-reload", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            signature = self.signature()
+            if signature == self._signature:
+                self._pending = None
+            elif signature == self._pending:
+                # Dos lecturas iguales seguidas: el fichero terminó de escribirse.
+                self.reload(signature)
+            else:
+                self._pending = signature
+
+    def reload(self, signature: Optional[Tuple] = None) -> bool:
+        """Construye y publica una generación nueva; devuelve si tuvo éxito."""
+        with self._build_lock:
+            if signature is not None and signature == self._signature:
+                # Los ficheros los escribió ``publish`` mientras se esperaba el cerrojo.
+                return False
+            self._wait_for_retired()
+            start = time.perf_counter()
+            try:
+                snapshot = self.build_fn(self.generation + 1)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"✗ Error recargando datos, se mantiene la generación {self.generation}: {e}")
+                self._signature = signature or self.signature()
+                return False
+            self.holder.swap(snapshot)
+            self.generation += 1
+            self.reloads += 1
+            self.last_duration = time.perf_counter() - start
+            self.last_reload_at = time.time()
+            self.last_error = None
+            self._signature = signature or self.signature()
+            print(f"✓ Generación {self.generation} publicada en {self.last_duration:.2f}s")
+            return True
+
+    def publish(self, update_fn: Callable[[Any, int], Any]) -> Any:
+        """
+        Publica una generación derivada de la vigente sin releer los ficheros.
+
+        ``update_fn(vigente, número)`` construye la generación nueva (o devuelve
+        la vigente si no hay nada que publicar) y puede escribir los ficheros
+        vigilados: al terminar se toman como vistos para no recargarlos. Como en
+        ``reload``, no se construye una tercera generación mientras la retirada
+        siga viva.
+        """
+        with self._build_lock:
+            self._wait_for_retired()
+            current = self.holder.current
+            snapshot = update_fn(current, self.generation + 1)
+            self._signature = self.signature()
+            self._pending = None
+            if snapshot is current:
+                return current
+            self.holder.swap(snapshot)
+            self.generation += 1
+            self.publications += 1
+            return snapshot
+
+    def _wait_for_retired(self) -> None:
+        """No construye una tercera generación mientras la retirada siga viva."""
+        deadline = time.monotonic() + self.retire_timeout
+        while self.holder.retired_alive() and time.monotonic() < deadline:
+            gc.collect()
+            if self.holder.retired_alive():
+                time.sleep(0.1)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas de recarga."""
+        return {
+            "generation": self.generation,
+            "reloads": self.reloads,
+            "publications": self.publications,
+            "failures": self.failures,
+            "last_reload_seconds": round(self.last_duration, 3) if self.last_duration else None,
+            "last_reload_at": self.last_reload_at,
+            "last_error": self.last_error,
+            "watching": self.paths
+        }
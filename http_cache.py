@@ -0,0 +1,195 @@
+"""
+Caché HTTP del buscador: peticiones condicionales y compresión.
+Las respuestas llevan un ETag derivado de la versión del grafo y del índice
+DBpedia junto con los parámetros de la petición; si el cliente ya tiene esa
+versión se responde 304 antes de ejecutar ninguna búsqueda.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Callable, Iterable, Optional
+
+from flask import Flask, Response, g, request, send_file
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él se sirve sólo gzip
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("text/html", "text/css", "text/plain", "application/json",
+                      "application/javascript", "text/javascript", "image/svg+xml")
+
+
+def make_etag(*parts) -> str:
+    """ETag débil: la misma versión puede servirse con distintas codificaciones."""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Codificación preferida entre las soportadas: br, luego gzip."""
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in accept_encoding.split(",")
+        if not part.strip().endswith("q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def precompress_static(directory: str, min_size: int = 1024) -> int:
+    """
+    Genera ``.gz`` (y ``.br`` si brotli está instalado) junto a cada recurso
+    estático comprimible. Sólo rehace los que cambiaron desde la última vez.
+
+    Returns:
+        Número de ficheros escritos
+    """
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, name)
+            mimetype = mimetypes.guess_type(name)[0] or ""
+            if mimetype not in COMPRESSIBLE_TYPES or os.path.getsize(path) < min_size:
+                continue
+            with open(path, "rb") as f:
+                data = None
+                for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+                    target = f"{path}.{'gz' if encoding == 'gzip' else 'br'}"
+                    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                        continue
+                    data = data if data is not None else f.read()
+                    with open(target, "wb") as out:
+                        out.write(compress(data, encoding))
+                    written += 1
+    return written
+
+
+class HTTPCache:
+    """
+    Registra en la aplicación Flask la validación condicional, las cabeceras
+    Cache-Control y la compresión de respuestas y de estáticos.
+    """
+
+    def __init__(self, app: Flask, version_fn: Callable[[], tuple], endpoints: Iterable[str],
+                 max_age: int = 60, min_size: int = 1024):
+        """
+        Args:
+            app: Aplicación Flask
+            version_fn: Devuelve las versiones de los datos (grafo, DBpedia...)
+            endpoints: Vistas GET cuyas respuestas se pueden validar por ETag
+            max_age: Segundos que un proxy o CDN puede servir la respuesta
+            min_size: Tamaño mínimo en bytes para comprimir
+        """
+        self.app = app
+        self.version_fn = version_fn
+        self.endpoints = set(endpoints)
+        self.max_age = max_age
+        self.min_size = min_size
+        self.not_modified = 0
+        self.compressed_bytes_saved = 0
+        app.before_request(self.check_not_modified)
+        app.after_request(self.finalize)
+
+    def request_etag(self) -> str:
+        """ETag de la petición actual: versiones + ruta + parámetros + preferencias."""
+        args = sorted(request.args.items(multi=True))
+        return make_etag(*self.version_fn(), request.endpoint, request.path, args,
+                         request.cookies.get("dark_mode", ""))
+
+    def check_not_modified(self) -> Optional[Response]:
+        if request.method != "GET":
+            return None
+        if request.endpoint == "static":
+            return self.precompressed_static()
+        if request.endpoint not in self.endpoints:
+            return None
+        g.etag = self.request_etag()
+        if etag_matches(request.headers.get("If-None-Match"), g.etag):
+            self.not_modified += 1
+            response = Response(status=304)
+            response.headers["ETag"] = g.etag
+            return response
+        return None
+
+    def precompressed_static(self) -> Optional[Response]:
+        """Sirve la variante ``.br``/``.gz`` de un estático si existe y el cliente la acepta."""
+        encoding = accepted_encoding(request.headers.get("Accept-Encoding", ""))
+        filename = (request.view_args or {}).get("filename")
+        if encoding is None or not filename or self.app.static_folder is None:
+            return None
+        path = os.path.join(self.app.static_folder, filename)
+        variant = f"{path}.{'gz' if encoding == 'gzip' else 'br'}"
+        if not os.path.isfile(variant) or os.path.getmtime(variant) < os.path.getmtime(path):
+            return None
+        response = send_file(variant, mimetype=mimetypes.guess_type(path)[0], conditional=True,
+                             max_age=self.app.get_send_file_max_age(filename))
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def finalize(self, response: Response) -> Response:
+        # Una vista puede marcar su respuesta con no-store (p. ej. resultados parciales).
+        if (request.endpoint in self.endpoints and request.method == "GET"
+                and not response.cache_control.no_store):
+            response.headers["Cache-Control"] = (
+                f"public, max-age={self.max_age}, stale-while-revalidate={self.max_age * 5}"
+            )
+            response.vary.update(("Accept-Encoding", "Cookie"))
+            if response.status_code == 200 and "etag" in g:
+                response.headers["ETag"] = g.etag
+        return self.compress_response(response)
+
+    def compress_response(self, response: Response) -> Response:
+        # Las respuestas en streaming no se comprimen: habría que reunirlas enteras en memoria.
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        encoding = accepted_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        compressed = compress(data, encoding)
+        self.compressed_bytes_saved += len(data) - len(compressed)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def get_statistics(self) -> dict:
+        """Retorna estadísticas de la caché."""
+        return {
+            "not_modified_responses": self.not_modified,
+            "compressed_bytes_saved": self.compressed_bytes_saved,
+            "brotli": brotli is not None
+        }
@@ -0,0 +1,666 @@
+"""
+Ingesta en línea de noticias y verificaciones.
+Construye las mismas tripletas que Poblacion (``insertar_noticia`` e
+``insertar_verificacion``) a partir de documentos JSON y las aplica con un
+único hilo escritor: las peticiones se encolan, el escritor agrupa las que
+están esperando en un lote, lo persiste de una vez y publica una generación
+nueva. Las búsquedas leen siempre una generación inmutable y nunca esperan
+al escritor.
+"""
+
+import datetime
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+from rdflib.store import Store, TripleAddedEvent
+
+try:
+    import fcntl
+except ImportError:  # no disponible en Windows
+    fcntl = None
+
+from export import ntriples
+from news_index import fold_text
+from verification_index import normalize_state
+
+
+Triple = Tuple[URIRef, URIRef, Any]
+
+# Subclases de formato de Noticia (la primera es la opción por defecto de Poblacion).
+FORMATS = ("Artículo", "Reportaje", "Entrevista", "Crónica", "Columna")
+
+# Propiedades de cada elemento: (clave del documento, propiedad de la ontología, tipo).
+MULTIMEDIA_PROPERTIES = {
+    "Imagen": (("resolucion", "ResoluciónImágen", str), ("modo_color", "ModoColor", str)),
+    "Video": (("duracion", "Duración", int), ("tasa_fotogramas", "TasaFotogramas", float),
+              ("resolucion", "ResoluciónVideo", str)),
+    "Audio": (("duracion", "DuraciónAudio", int), ("canales", "Canales", float)),
+}
+VERIFICATION_METHODS = {
+    "Fact-checking": (("fuentes", "FuentesUtilizadasFC", list), ("cantidad_fuentes", "CantidadFuentes", int)),
+    "Verificación_de_Fuente": (("autoridad", "AutoridadFuente", str), ("registro_oficial", "RegistroOficial", bool)),
+    "Verificación_de_Imágen": (("coincidencia_visual", "CoincidenciaVisual", str),
+                               ("ediciones", "DetecciónEdiciones", bool)),
+    "Verificación_de_Video": (("coherencia_audiovisual", "CoherenciaAudiovisual", bool),
+                              ("coincidencia_contextual", "CoincidenciaContextual", str)),
+    "Patrones_lingüísticos": (("complejidad", "Complejidad", str), ("sesgo", "DetecciónSesgo", bool)),
+}
+# Tipo de entidad responsable -> (propiedad específica, clave del documento).
+RESPONSIBLE_TYPES = {
+    "Organización": ("TipoOrganización", "tipo_organizacion"),
+    "Medio_de_comunicación": ("AlineaciónEditorial", "alineacion_editorial"),
+    "Usuarios": ("Rol", "rol"),
+    "Algoritmo_de_IA": ("TipoAprendizaje", "tipo_aprendizaje"),
+}
+TRUE_WORDS = {"s", "si", "true", "1", "yes"}
+
+
+class IngestionError(ValueError):
+    """Documento rechazado; ``status`` es el código HTTP con que se informa."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _choice_key(value: str) -> str:
+    return " ".join(fold_text(value).replace("_", " ").replace("-", " ").split())
+
+
+def _choose(value: Optional[str], options, default: str, name: str) -> str:
+    """Opción de la ontología que corresponde a ``value`` sin atender a tildes, guiones ni mayúsculas."""
+    if not value:
+        return default
+    by_key = {_choice_key(option): option for option in options}
+    # Poblacion muestra "Usuario" para la clase Usuarios.
+    by_key.setdefault("usuario", "Usuarios")
+    option = by_key.get(_choice_key(str(value)))
+    if option is None or option not in options:
+        raise IngestionError(400, f"{name}: valor no admitido '{value}' (opciones: {', '.join(options)})")
+    return option
+
+
+def _iso_date(value: Optional[str], name: str) -> Literal:
+    if not value:
+        value = datetime.date.today().strftime("%Y-%m-%d")
+    try:
+        datetime.date.fromisoformat(str(value))
+    except ValueError:
+        raise IngestionError(400, f"{name}: se esperaba una fecha YYYY-MM-DD y no '{value}'") from None
+    return Literal(str(value), datatype=XSD.date)
+
+
+def _literals(value: Any, kind: type, name: str) -> List[Literal]:
+    """Literales de un valor del documento con el tipo de datos que usa Poblacion."""
+    if value is None or (kind is not str and value == ""):
+        return []
+    if kind is list:
+        parts = value if isinstance(value, list) else str(value).split(",")
+        return [Literal(str(part).strip()) for part in parts]
+    if kind is bool:
+        flag = value if isinstance(value, bool) else str(value).strip().lower() in TRUE_WORDS
+        return [Literal(flag, datatype=XSD.boolean)]
+    if kind is str:
+        return [Literal(str(value))]
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise IngestionError(400, f"{name}: se esperaba un número y no '{value}'") from None
+    return [Literal(number, datatype=XSD.integer if kind is int else XSD.float)]
+
+
+def _properties(subject: URIRef, data: Dict[str, Any], spec, ns: Namespace) -> List[Triple]:
+    return [(subject, ns[prop], literal)
+            for key, prop, kind in spec
+            for literal in _literals(data.get(key), kind, key)]
+
+
+def news_triples(data: Dict[str, Any], ns: Namespace,
+                 new_uri: Callable[[str], URIRef]) -> Tuple[URIRef, List[Triple]]:
+    """
+    Tripletas de una Noticia como las inserta ``insertar_noticia``.
+
+    Args:
+        data: titulo, autor, tematica (texto separado por comas o lista),
+            ubicacion, idioma, fecha, formato, texto y multimedia (booleano
+            o {"tipo": "Imagen"|"Video"|"Audio", ...propiedades})
+        ns: Namespace de la ontología
+        new_uri: Genera la URI de un recurso nuevo a partir de su tipo
+
+    Returns:
+        Tupla (URI de la noticia, tripletas)
+    """
+    titulo = str(data.get("titulo") or "").strip()
+    if not titulo:
+        raise IngestionError(400, "titulo: campo obligatorio")
+    tematicas = data.get("tematica") or ""
+    if not isinstance(tematicas, list):
+        tematicas = str(tematicas).split(",")
+    multimedia = data.get("multimedia") or False
+    tipo_formato = _choose(data.get("formato"), FORMATS, FORMATS[0], "formato")
+
+    noticia = new_uri("Noticia")
+    triples: List[Triple] = [
+        (noticia, RDF.type, ns.Noticia),
+        (noticia, ns.Título, Literal(titulo)),
+        (noticia, ns.Autor, Literal(str(data.get("autor") or ""))),
+    ]
+    triples.extend((noticia, ns.Temática, Literal(str(tema).strip())) for tema in tematicas)
+    triples += [
+        (noticia, ns.Ubicación, Literal(str(data.get("ubicacion") or ""))),
+        (noticia, ns.Idioma, Literal(str(data.get("idioma") or ""))),
+        (noticia, ns.Fecha_publicación, _iso_date(data.get("fecha"), "fecha")),
+        (noticia, ns.Multimedia_asociado, Literal(bool(multimedia), datatype=XSD.boolean)),
+    ]
+
+    formato = new_uri(tipo_formato)
+    triples += [(formato, RDF.type, ns[tipo_formato]), (noticia, ns.tiene, formato)]
+
+    texto = str(data.get("texto") or "")
+    if texto:
+        texto_uri = new_uri("Texto")
+        triples += [
+            (texto_uri, RDF.type, ns.Texto),
+            (texto_uri, ns.ContenidoTexto, Literal(texto)),
+            (texto_uri, ns.pertenece_a, noticia),
+            (noticia, ns.tiene, texto_uri),
+        ]
+
+    if isinstance(multimedia, dict):
+        tipo = _choose(multimedia.get("tipo"), tuple(MULTIMEDIA_PROPERTIES), "", "multimedia.tipo")
+        if not tipo:
+            raise IngestionError(400, "multimedia.tipo: campo obligatorio (Imagen, Video o Audio)")
+        multimedia_uri = new_uri(tipo)
+        triples += [(multimedia_uri, RDF.type, ns[tipo]), (noticia, ns.tiene, multimedia_uri)]
+        triples += _properties(multimedia_uri, multimedia, MULTIMEDIA_PROPERTIES[tipo], ns)
+    return noticia, triples
+
+
+def verification_triples(noticia: URIRef, data: Dict[str, Any], ns: Namespace,
+                         new_uri: Callable[[str], URIRef]) -> Tuple[URIRef, List[Triple]]:
+    """
+    Tripletas de una Verificación de ``noticia`` como las inserta ``insertar_verificacion``.
+
+    Args:
+        data: fecha, metodo (con las propiedades del método), resultado,
+            estado y responsable ({"tipo", "nombre", propiedad específica,
+            "experiencia"})
+
+    Returns:
+        Tupla (URI de la verificación, tripletas)
+    """
+    metodo = _choose(data.get("metodo"), tuple(VERIFICATION_METHODS), "Fact-checking", "metodo")
+    verificacion = new_uri("Verificacion")
+    triples: List[Triple] = [
+        (verificacion, RDF.type, ns.Verificación),
+        (verificacion, ns.evalua, noticia),
+        (verificacion, ns.FechaVerificación, _iso_date(data.get("fecha"), "fecha")),
+    ]
+
+    metodo_uri = new_uri(metodo)
+    triples += [(metodo_uri, RDF.type, ns[metodo]), (verificacion, ns.se_apoya_en, metodo_uri)]
+    triples += _properties(metodo_uri, data, VERIFICATION_METHODS[metodo], ns)
+
+    # Se guarda con la grafía canónica para que los filtros por estado coincidan.
+    estado = str(data.get("estado") or "")
+    triples += [
+        (verificacion, ns.Resultado, Literal(str(data.get("resultado") or ""))),
+        (verificacion, ns.Estado, Literal(normalize_state(estado) or estado)),
+    ]
+
+    responsable = data.get("responsable")
+    if responsable:
+        if not isinstance(responsable, dict):
+            raise IngestionError(400, "responsable: se esperaba un objeto con 'tipo' y 'nombre'")
+        tipo = _choose(responsable.get("tipo"), tuple(RESPONSIBLE_TYPES), "", "responsable.tipo")
+        if not tipo:
+            raise IngestionError(400, "responsable.tipo: campo obligatorio")
+        propiedad, clave = RESPONSIBLE_TYPES[tipo]
+        responsable_uri = new_uri("EntidadResponsable")
+        triples += [
+            (responsable_uri, RDF.type, ns[tipo]),
+            (responsable_uri, ns[propiedad], Literal(str(responsable.get(clave) or ""))),
+            (responsable_uri, ns.Especialización, Literal(str(responsable.get("nombre") or ""))),
+        ]
+        triples += [(responsable_uri, ns.Experiencia, literal)
+                    for literal in _literals(responsable.get("experiencia"), int, "responsable.experiencia")]
+        triples.append((verificacion, ns.se_realiza_por, responsable_uri))
+    return verificacion, triples
+
+
+@dataclass
+class PendingWrite:
+    """
+    Escritura preparada fuera del hilo escritor: las tripletas de una noticia
+    (con sus verificaciones) o de una verificación suelta de una noticia ya
+    publicada (``existing``). Se aplica entera o no se aplica.
+    """
+    noticia: URIRef
+    triples: List[Triple]
+    verifications: List[URIRef] = field(default_factory=list)
+    existing: bool = False
+    titulo: str = ""
+    texto: str = ""
+    force: bool = False
+
+    def to_dict(self) -> dict:
+        return {"noticia": str(self.noticia), "verificaciones": [str(v) for v in self.verifications]}
+
+
+def prepare_news(data: Dict[str, Any], ns: Namespace, new_uri: Callable[[str], URIRef]) -> PendingWrite:
+    """Noticia del documento, con su ``verificacion`` (objeto o lista) si la trae."""
+    if not isinstance(data, dict):
+        raise IngestionError(400, "cada noticia debe ser un objeto JSON")
+    noticia, triples = news_triples(data, ns, new_uri)
+    write = PendingWrite(noticia, triples, titulo=str(data.get("titulo") or ""),
+                         texto=str(data.get("texto") or ""), force=bool(data.get("force")))
+    nested = data.get("verificacion") or []
+    for verification in nested if isinstance(nested, list) else [nested]:
+        if not isinstance(verification, dict):
+            raise IngestionError(400, "verificacion: se esperaba un objeto")
+        uri, triples = verification_triples(noticia, verification, ns, new_uri)
+        write.triples.extend(triples)
+        write.verifications.append(uri)
+    return write
+
+
+def prepare_verification(data: Dict[str, Any], ns: Namespace,
+                         new_uri: Callable[[str], URIRef]) -> PendingWrite:
+    """Verificación suelta; ``noticia`` es la URI de la noticia que evalúa."""
+    if not isinstance(data, dict) or not data.get("noticia"):
+        raise IngestionError(400, "noticia: campo obligatorio con la URI de la noticia")
+    noticia = URIRef(str(data["noticia"]))
+    uri, triples = verification_triples(noticia, data, ns, new_uri)
+    return PendingWrite(noticia, triples, [uri], existing=True)
+
+
+class UriGenerator:
+    """
+    URIs con el formato de ``generar_uri`` de Poblacion (tipo y marca de tiempo
+    con microsegundos), sin repetirse aunque un lote pida varias en el mismo
+    microsegundo.
+    """
+
+    def __init__(self, base_uri: str):
+        self.base_uri = base_uri
+        self._last = datetime.datetime.min
+        self._lock = threading.Lock()
+
+    def __call__(self, tipo: str) -> URIRef:
+        with self._lock:
+            now = max(datetime.datetime.now(), self._last + datetime.timedelta(microseconds=1))
+            self._last = now
+        return URIRef(f"{self.base_uri}/{tipo}_{now.strftime('%Y%m%d%H%M%S%f')}")
+
+
+def _fsync_directory(directory: str) -> None:
+    if hasattr(os, "O_DIRECTORY"):
+        # El cambio de nombre (o el fichero nuevo) también debe llegar al disco.
+        directory_fd = os.open(directory, os.O_DIRECTORY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+
+def persist_graph(graph: Graph, path: str, rdf_format: str = "xml") -> None:
+    """
+    Escribe el grafo de forma atómica: fichero temporal en el mismo directorio,
+    ``fsync`` y ``os.replace``. Quien lea el fichero ve la versión anterior o
+    la nueva completa, nunca una a medias.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(prefix=".ingesta-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            graph.serialize(destination=handle, format=rdf_format)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+    _fsync_directory(directory)
+
+
+class TripleJournal:
+    """
+    Registro N-Triples de sólo añadir con las tripletas ingeridas desde la
+    última compactación. Con el almacén en memoria cada lote se añade aquí
+    (coste proporcional al lote) en lugar de reescribir el RDF/XML entero;
+    al cargar la ontología se vuelve a aplicar y la compactación lo vacía
+    tras escribir el RDF/XML completo.
+
+    Lo comparten la aplicación y Poblacion: ``lock`` serializa entre procesos
+    las escrituras y la compactación, y ``foreign_writes`` indica si otro
+    proceso añadió tripletas que este aún no ha aplicado.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.appended = 0
+        self.compactions = 0
+        # Bytes del registro que este proceso ya tiene en su grafo.
+        self.synced_size = 0
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Cerrojo exclusivo entre procesos (fichero ``.lock`` junto al registro)."""
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".lock", "a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def append(self, triples: List[Triple]) -> None:
+        """Añade un lote y lo sincroniza con el disco antes de volver."""
+        data = "".join(ntriples(triples)).encode("utf-8")
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with self.lock():
+            created = not os.path.exists(self.path)
+            if created:
+                os.makedirs(directory, exist_ok=True)
+            foreign = self.foreign_writes()
+            with open(self.path, "ab") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            if created:
+                _fsync_directory(directory)
+            if not foreign:
+                self.synced_size = self.size()
+        self.appended += len(triples)
+
+    def replay(self, graph: Graph) -> int:
+        """Aplica el registro sobre ``graph``; devuelve las tripletas leídas."""
+        with self.lock():
+            try:
+                with open(self.path, "rb") as handle:
+                    data = handle.read()
+            except FileNotFoundError:
+                data = b""
+        # Con el cerrojo tomado, una línea sin terminar es un lote que no llegó
+        # a confirmarse: se ignora y no cuenta como escritura de otro proceso.
+        self.synced_size = len(data)
+        data = data[:data.rfind(b"\n") + 1]
+        if not data:
+            return 0
+        graph.parse(data=data.decode("utf-8"), format="nt")
+        return data.count(b"\n")
+
+    def foreign_writes(self) -> bool:
+        """Si el registro tiene tripletas de otro proceso que este no ha aplicado."""
+        return self.size() > self.synced_size
+
+    def truncate(self) -> None:
+        """Vacía el registro (su contenido ya está en el RDF/XML); llamar con ``lock`` tomado."""
+        with open(self.path, "wb") as handle:
+            os.fsync(handle.fileno())
+        self.synced_size = 0
+        self.compactions += 1
+
+    def track(self, graph: Graph) -> List[Triple]:
+        """
+        Lista que recoge las tripletas que se añadan a ``graph`` a partir de
+        ahora, para pasarlas a ``append`` (así escribe Poblacion).
+        """
+        pending: List[Triple] = []
+        graph.store.dispatcher.subscribe(TripleAddedEvent, lambda event: pending.append(event.triple))
+        return pending
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del registro de ingesta."""
+        return {
+            "path": self.path,
+            "bytes": self.size(),
+            "appended_triples": self.appended,
+            "compactions": self.compactions,
+            "foreign_writes": self.foreign_writes()
+        }
+
+
+class LayeredStore(Store):
+    """
+    Grafo en memoria de sólo lectura formado por una base compartida y capas
+    con lo ingerido después. Cada lote crea un almacén nuevo con una capa más
+    (coste proporcional al lote): la base no se copia y las generaciones
+    anteriores siguen viendo sus capas. Las capas no repiten tripletas, así
+    que los recorridos no necesitan eliminar duplicados.
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+    # Capas a partir de las cuales se funden en una: acota el coste de cada patrón.
+    MAX_LAYERS = 8
+
+    def __init__(self, base: Graph, layers: Tuple[Graph, ...] = ()):
+        super().__init__()
+        self.base = base
+        self.layers = layers
+        self._namespace = dict(base.namespaces())
+        self._prefix = {namespace: prefix for prefix, namespace in self._namespace.items()}
+
+    @property
+    def graphs(self) -> Tuple[Graph, ...]:
+        return (self.base, *self.layers)
+
+    def with_batch(self, triples: List[Triple]) -> Graph:
+        """Grafo de la generación siguiente: éste más las tripletas nuevas de ``triples``."""
+        current = Graph(store=self)
+        layer = Graph()
+        for triple in triples:
+            if triple not in current:
+                layer.add(triple)
+        layers = (*self.layers, layer) if len(layer) else self.layers
+        if len(layers) > self.MAX_LAYERS:
+            merged = Graph()
+            for graph in layers:
+                merged += graph
+            layers = (merged,)
+        return Graph(store=LayeredStore(self.base, layers))
+
+    def delta(self) -> int:
+        """Tripletas añadidas sobre la base."""
+        return sum(len(layer) for layer in self.layers)
+
+    def compact(self) -> Graph:
+        """Copia la base con todas las capas en un grafo en memoria normal."""
+        merged = Graph()
+        for prefix, namespace in self._namespace.items():
+            merged.bind(prefix, namespace, override=True, replace=True)
+        for graph in self.graphs:
+            merged += graph
+        return merged
+
+    def add(self, triple, context=None, quoted: bool = False) -> None:
+        raise TypeError("las generaciones publicadas no se modifican: use with_batch()")
+
+    def addN(self, quads) -> None:
+        raise TypeError("las generaciones publicadas no se modifican: use with_batch()")
+
+    def remove(self, triple_pattern, context=None) -> None:
+        raise TypeError("las generaciones publicadas no se modifican")
+
+    def triples(self, triple_pattern, context=None):
+        for graph in self.graphs:
+            for triple in graph.triples(triple_pattern):
+                yield triple, iter(())
+
+    def __len__(self, context=None) -> int:
+        return sum(len(graph) for graph in self.graphs)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        if not override and (prefix in self._namespace or namespace in self._prefix):
+            return
+        self._prefix.pop(self._namespace.pop(prefix, None), None)
+        self._namespace.pop(self._prefix.pop(namespace, None), None)
+        self._namespace[prefix] = namespace
+        self._prefix[namespace] = prefix
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        return self._prefix.get(namespace)
+
+    def namespaces(self):
+        return iter(list(self._namespace.items()))
+
+
+def add_to_graph(graph: Graph, triples: List[Triple]) -> Graph:
+    """Grafo en memoria con ``triples`` añadidas sin copiar ni modificar ``graph``."""
+    store = graph.store if isinstance(graph.store, LayeredStore) else LayeredStore(graph)
+    return store.with_batch(triples)
+
+
+class IngestionWriter:
+    """
+    Cola de escrituras con un único hilo escritor.
+
+    El hilo toma todo lo que esté esperando (hasta ``max_batch``) y lo aplica
+    con una sola llamada a ``apply_fn``, que devuelve un resultado por
+    elemento (una excepción marca el elemento como rechazado). Cuando la cola
+    lleva ``idle_delay`` segundos vacía tras un lote se llama a ``idle_fn``
+    (p. ej. para reconstruir índices caros con todo lo ingerido).
+    """
+
+    # Peso de la última muestra en la media móvil del tiempo por lote.
+    EWMA_WEIGHT = 0.2
+
+    def __init__(self, apply_fn: Callable[[List[Any]], List[Any]], max_batch: int = 100,
+                 max_queue: int = 1000, idle_fn: Optional[Callable[[], None]] = None,
+                 idle_delay: float = 5.0, setup_fn: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            apply_fn: Aplica un lote y devuelve un resultado (o excepción) por elemento
+            max_batch: Elementos por lote como máximo
+            max_queue: Elementos en espera a partir de los cuales se rechaza
+            idle_fn: Tarea tras un periodo sin escrituras
+            idle_delay: Segundos sin escrituras antes de ``idle_fn``
+            setup_fn: Se ejecuta una vez en el hilo escritor antes del primer lote
+        """
+        self.apply_fn = apply_fn
+        self.max_batch = max_batch
+        self.idle_fn = idle_fn
+        self.idle_delay = idle_delay
+        self.setup_fn = setup_fn
+        self.submitted = 0
+        self.applied = 0
+        self.rejected = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.idle_runs = 0
+        self.batch_time = 0.0
+        self.last_error: Optional[str] = None
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Encola un elemento; el futuro se resuelve cuando su lote está publicado."""
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            raise IngestionError(503, "cola de ingesta llena, reintente más tarde") from None
+        self.submitted += 1
+        return future
+
+    def _ensure_started(self) -> None:
+        # El hilo arranca con la primera escritura, no con la aplicación.
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ingestion-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        if self.setup_fn is not None:
+            self.setup_fn()
+        pending_idle = False
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_delay if pending_idle else None)
+            except queue.Empty:
+                pending_idle = False
+                self._run_idle()
+                continue
+            batch = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._apply(batch)
+            pending_idle = self.idle_fn is not None
+
+    def _apply(self, batch: List[Tuple[Any, Future]]) -> None:
+        start = time.perf_counter()
+        items = [item for item, _ in batch]
+        try:
+            outcomes = self.apply_fn(items)
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"✗ Error aplicando un lote de {len(items)} escrituras: {e}")
+            outcomes = [e] * len(items)
+        for (_, future), outcome in zip(batch, outcomes):
+            if isinstance(outcome, BaseException):
+                self.rejected += 1
+                future.set_exception(outcome)
+            else:
+                self.applied += 1
+                future.set_result(outcome)
+        elapsed = time.perf_counter() - start
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.batch_time += self.EWMA_WEIGHT * (elapsed - self.batch_time) if self.batches > 1 else elapsed
+
+    def _run_idle(self) -> None:
+        try:
+            self.idle_fn()
+            self.idle_runs += 1
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"✗ Error en la tarea posterior a la ingesta: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas de la ingesta."""
+        return {
+            "running": self._thread is not None,
+            "queue_depth": self._queue.qsize(),
+            "submitted": self.submitted,
+            "applied": self.applied,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "batch_ms": round(self.batch_time * 1000, 2),
+            "idle_runs": self.idle_runs,
+            "last_error": self.last_error
+        }
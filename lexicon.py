@@ -0,0 +1,356 @@
+"""
+Léxico trilingüe (es/en/pt) para búsquedas entre idiomas.
+Cada concepto agrupa sus términos en los tres idiomas; una consulta en
+cualquiera de ellos se amplía con los demás antes de consultar el índice de
+noticias, sin llamar a ningún servicio de traducción. El léxico se construye
+fuera de línea a partir de un glosario base del dominio, del vocabulario de
+la ontología (clases, propiedades y temáticas) y de las etiquetas de DBpedia
+local, donde ``<recurso>_es`` es la versión en español de ``<recurso>``.
+
+Uso como proceso por lotes:
+    python lexicon.py [--ontology noticias_ontologia.rdf] [--output data/lexicon.json]
+    python lexicon.py --expand "fake news"
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from rdflib import Graph, Namespace
+from rdflib.namespace import OWL, RDF
+
+from news_index import fold_text
+from query_parser import Clause, Query
+
+
+LANGUAGES = ("es", "en", "pt")
+MIN_TERM_LENGTH = 3
+
+# Vocabulario del dominio que no aparece traducido en los datos.
+SEED_LEXICON = (
+    {"es": ["noticia", "noticias"], "en": ["news"], "pt": ["notícia", "notícias"]},
+    {"es": ["noticias falsas", "noticia falsa", "bulo", "desinformación"],
+     "en": ["fake news", "disinformation", "misinformation", "hoax"],
+     "pt": ["notícias falsas", "notícia falsa", "boato", "desinformação"]},
+    {"es": ["verificación", "verificación de datos"], "en": ["fact-checking", "fact checking", "verification"],
+     "pt": ["verificação", "checagem"]},
+    {"es": ["periodismo"], "en": ["journalism"], "pt": ["jornalismo"]},
+    {"es": ["periodista"], "en": ["journalist"], "pt": ["jornalista"]},
+    {"es": ["fuente"], "en": ["source"], "pt": ["fonte"]},
+    {"es": ["salud"], "en": ["health"], "pt": ["saúde"]},
+    {"es": ["salud pública"], "en": ["public health"], "pt": ["saúde pública"]},
+    {"es": ["medicina"], "en": ["medicine"], "pt": ["medicina"]},
+    {"es": ["enfermedad"], "en": ["disease"], "pt": ["doença"]},
+    {"es": ["vacuna"], "en": ["vaccine"], "pt": ["vacina"]},
+    {"es": ["pandemia"], "en": ["pandemic"], "pt": ["pandemia"]},
+    {"es": ["cambio climático"], "en": ["climate change"], "pt": ["mudança climática", "mudanças climáticas"]},
+    {"es": ["medio ambiente"], "en": ["environment"], "pt": ["meio ambiente"]},
+    {"es": ["educación"], "en": ["education"], "pt": ["educação"]},
+    {"es": ["educación superior"], "en": ["higher education"], "pt": ["ensino superior"]},
+    {"es": ["tecnología"], "en": ["technology"], "pt": ["tecnologia"]},
+    {"es": ["inteligencia artificial"], "en": ["artificial intelligence"], "pt": ["inteligência artificial"]},
+    {"es": ["redes sociales"], "en": ["social media", "social network"], "pt": ["redes sociais"]},
+    {"es": ["ciencia"], "en": ["science"], "pt": ["ciência"]},
+    {"es": ["física"], "en": ["physics"], "pt": ["física"]},
+    {"es": ["matemáticas"], "en": ["mathematics"], "pt": ["matemática"]},
+    {"es": ["política"], "en": ["politics"], "pt": ["política"]},
+    {"es": ["política boliviana"], "en": ["bolivian politics"], "pt": ["política boliviana"]},
+    {"es": ["gobierno"], "en": ["government"], "pt": ["governo"]},
+    {"es": ["elecciones"], "en": ["elections"], "pt": ["eleições"]},
+    {"es": ["economía"], "en": ["economy"], "pt": ["economia"]},
+    {"es": ["cultura"], "en": ["culture"], "pt": ["cultura"]},
+    {"es": ["música"], "en": ["music"], "pt": ["música"]},
+    {"es": ["literatura"], "en": ["literature"], "pt": ["literatura"]},
+    {"es": ["revista"], "en": ["magazine"], "pt": ["revista"]},
+    {"es": ["anarquismo"], "en": ["anarchism"], "pt": ["anarquismo"]},
+    {"es": ["deporte"], "en": ["sport", "sports"], "pt": ["esporte"]},
+    {"es": ["seguridad"], "en": ["security"], "pt": ["segurança"]},
+    {"es": ["ciudad"], "en": ["city"], "pt": ["cidade"]},
+    {"es": ["mundo"], "en": ["world"], "pt": ["mundo"]},
+)
+
+CAMEL_BOUNDARY = re.compile(r"(?<=[a-záéíóúñ])(?=[A-ZÁÉÍÓÚÑ])")
+LANGUAGE_SUFFIX = re.compile(r"_(%s)$" % "|".join(LANGUAGES))
+
+
+def vocabulary_forms(name: str) -> Set[str]:
+    """Formas normalizadas de un nombre de la ontología o de DBpedia: tal cual y con espacios."""
+    spaced = CAMEL_BOUNDARY.sub(" ", name).replace("_", " ")
+    return {fold_text(name).strip(), " ".join(fold_text(spaced).split())}
+
+
+def dbpedia_name(uri: str) -> str:
+    """Nombre local de un recurso DBpedia, sin el prefijo ``Category:``."""
+    return uri.rsplit("/", 1)[-1].split(":", 1)[-1]
+
+
+class Lexicon:
+    """Conceptos trilingües e índice término → concepto para ampliar consultas."""
+
+    def __init__(self, concepts: List[Dict[str, List[str]]], fingerprint: str = ""):
+        """
+        Args:
+            concepts: Términos normalizados de cada concepto, por idioma
+            fingerprint: Huella de las fuentes con que se construyó
+        """
+        self.concepts = concepts
+        self.fingerprint = fingerprint
+        self.terms: Dict[str, int] = {}
+        self.expansions: List[Tuple[str, ...]] = []
+        for concept_id, concept in enumerate(concepts):
+            ordered = dict.fromkeys(term for lang in LANGUAGES for term in concept.get(lang, []))
+            self.expansions.append(tuple(ordered))
+            for term in ordered:
+                self.terms.setdefault(term, concept_id)
+        self.max_words = max((term.count(" ") + 1 for term in self.terms), default=1)
+        self.lookups = 0
+        self.expanded = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, groups: Iterable[Dict[str, Iterable[str]]], fingerprint: str = "") -> "Lexicon":
+        """
+        Reúne en conceptos los grupos de términos equivalentes; dos grupos que
+        comparten un término forman un solo concepto.
+        """
+        concepts: List[Optional[Dict[str, Set[str]]]] = []
+        owner: Dict[str, int] = {}
+        for group in groups:
+            terms = {lang: {fold_text(t).strip() for t in group.get(lang, ())} for lang in LANGUAGES}
+            terms = {lang: {t for t in values if len(t) >= MIN_TERM_LENGTH} for lang, values in terms.items()}
+            found = sorted({owner[t] for values in terms.values() for t in values if t in owner})
+            if found:
+                target = found[0]
+                for other in found[1:]:
+                    for lang in LANGUAGES:
+                        concepts[target][lang] |= concepts[other][lang]
+                    concepts[other] = None
+            else:
+                target = len(concepts)
+                concepts.append({lang: set() for lang in LANGUAGES})
+            for lang in LANGUAGES:
+                concepts[target][lang] |= terms[lang]
+            for lang in LANGUAGES:
+                for term in concepts[target][lang]:
+                    owner[term] = target
+
+        result = []
+        for concept in concepts:
+            if concept is None:
+                continue
+            # Un concepto con un único término no amplía nada.
+            if len(set().union(*concept.values())) > 1:
+                result.append({lang: sorted(concept[lang]) for lang in LANGUAGES})
+        return cls(result, fingerprint)
+
+    def lookup(self, text: str) -> Tuple[str, ...]:
+        """Términos equivalentes (en los tres idiomas) de un término o frase; vacío si no se conoce."""
+        concept_id = self.terms.get(" ".join(fold_text(text).split()))
+        with self._lock:
+            self.lookups += 1
+            if concept_id is not None:
+                self.expanded += 1
+        if concept_id is None:
+            return ()
+        return self.expansions[concept_id]
+
+    def expand_query(self, query: Query) -> Query:
+        """
+        Añade a las cláusulas de texto y de temática sus equivalentes en los
+        otros idiomas. Las palabras sueltas consecutivas que forman una frase
+        conocida ("fake news") se sustituyen por una sola cláusula.
+        """
+        clauses = list(query.clauses)
+        expanded = []
+        i = 0
+        while i < len(clauses):
+            clause = clauses[i]
+            if clause.field == "text" and not clause.negated:
+                run = i
+                while run < len(clauses) and run - i < self.max_words \
+                        and clauses[run].field == "text" and not clauses[run].negated:
+                    run += 1
+                for end in range(run, i + 1, -1):
+                    phrase = " ".join(c.value for c in clauses[i:end])
+                    alternatives = self.lookup(phrase)
+                    if alternatives:
+                        expanded.append(Clause("text", phrase, False, self._others(phrase, alternatives)))
+                        i = end
+                        break
+                else:
+                    expanded.append(self._expand_clause(clause))
+                    i += 1
+                continue
+            expanded.append(self._expand_clause(clause) if clause.field in ("text", "tema") else clause)
+            i += 1
+        return Query(expanded)
+
+    def _expand_clause(self, clause: Clause) -> Clause:
+        alternatives = self.lookup(clause.value)
+        if not alternatives:
+            return clause
+        return Clause(clause.field, clause.value, clause.negated, self._others(clause.value, alternatives))
+
+    @staticmethod
+    def _others(value: str, alternatives: Tuple[str, ...]) -> Tuple[str, ...]:
+        folded = " ".join(fold_text(value).split())
+        return tuple(term for term in alternatives if term != folded)
+
+    def save(self, path: str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": self.fingerprint, "concepts": self.concepts}, f,
+                      ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "Lexicon":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["concepts"], data["fingerprint"])
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del léxico."""
+        return {
+            "concepts": len(self.concepts),
+            "terms": len(self.terms),
+            "max_words": self.max_words,
+            "lookups": self.lookups,
+            "expanded": self.expanded
+        }
+
+
+def ontology_vocabulary(graph: Graph, ontology_ns: Namespace) -> Set[str]:
+    """Nombres de clases y propiedades de la ontología y temáticas de las noticias."""
+    names = set()
+    for kind in (OWL.Class, OWL.ObjectProperty, OWL.DatatypeProperty):
+        for subject in graph.subjects(RDF.type, kind):
+            if str(subject).startswith(str(ontology_ns)):
+                names.add(str(subject)[len(str(ontology_ns)):])
+    names.update(str(tematica) for tematica in graph.objects(None, ontology_ns.Temática))
+    return {name for name in names if name}
+
+
+def dbpedia_groups(dbpedia_index) -> List[Dict[str, Set[str]]]:
+    """
+    Un grupo por recurso DBpedia con la etiqueta de cada versión de idioma
+    (``<recurso>`` y ``<recurso>_es``...) y el nombre local en inglés.
+    """
+    groups: Dict[str, Dict[str, Set[str]]] = {}
+    for uri, resource in dbpedia_index.resources.items():
+        base = LANGUAGE_SUFFIX.sub("", uri)
+        if base != uri and base not in dbpedia_index.resources:
+            base = uri
+        group = groups.setdefault(base, {lang: set() for lang in LANGUAGES})
+        lang = resource.language if resource.language in LANGUAGES else "en"
+        group[lang].add(resource.label)
+        if base == uri and uri.startswith("http://dbpedia.org/resource/"):
+            group["en"].update(vocabulary_forms(dbpedia_name(uri)))
+    return list(groups.values())
+
+
+def lexicon_groups(graph: Graph, ontology_ns: Namespace, dbpedia_index=None,
+                   vocabulary: Optional[Set[str]] = None) -> List[Dict[str, Set[str]]]:
+    """
+    Grupos de términos equivalentes de todas las fuentes. Los nombres de la
+    ontología sólo se añaden al concepto con el que comparten alguna forma
+    (p. ej. "Salud_pública" o "SaludPública" junto a "salud pública").
+
+    Args:
+        vocabulary: ``ontology_vocabulary`` ya calculado, para no recorrer el grafo otra vez
+    """
+    if vocabulary is None:
+        vocabulary = ontology_vocabulary(graph, ontology_ns)
+    groups: List[Dict[str, Set[str]]] = [
+        {lang: set(terms.get(lang, [])) for lang in LANGUAGES} for terms in SEED_LEXICON
+    ]
+    if dbpedia_index is not None:
+        groups.extend(dbpedia_groups(dbpedia_index))
+
+    known = {}
+    for group in groups:
+        for lang, terms in group.items():
+            for term in terms:
+                known[" ".join(fold_text(term).split())] = (group, lang)
+    for name in sorted(vocabulary):
+        forms = vocabulary_forms(name)
+        match = next((known[form] for form in sorted(forms) if form in known), None)
+        if match is not None:
+            group, lang = match
+            group[lang].update(forms)
+    return groups
+
+
+def sources_fingerprint(vocabulary: Set[str], dbpedia_index=None) -> str:
+    """
+    Huella de las fuentes en bruto (glosario base, vocabulario de la ontología
+    y etiquetas de DBpedia): se calcula sin agrupar ni normalizar términos.
+    """
+    digest = hashlib.sha1(b"lexicon:2")
+    digest.update(json.dumps(SEED_LEXICON, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    digest.update("\x1f".join(sorted(vocabulary)).encode("utf-8") + b"\x1e")
+    if dbpedia_index is not None:
+        for uri in sorted(dbpedia_index.resources):
+            resource = dbpedia_index.resources[uri]
+            digest.update(f"{uri}\x1f{resource.label}\x1f{resource.language}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_or_build_lexicon(graph: Graph, ontology_ns: Namespace, dbpedia_index=None,
+                          path: str = "data/lexicon.json") -> Lexicon:
+    """
+    Reutiliza el léxico guardado si corresponde a las mismas fuentes; si no, lo
+    reconstruye. Comprobarlo sólo requiere la huella de las fuentes, no los grupos.
+    """
+    vocabulary = ontology_vocabulary(graph, ontology_ns)
+    fingerprint = sources_fingerprint(vocabulary, dbpedia_index)
+    try:
+        lexicon = Lexicon.load(path)
+        if lexicon.fingerprint == fingerprint:
+            print(f"✓ Léxico trilingüe cargado: {len(lexicon.concepts)} conceptos")
+            return lexicon
+    except (OSError, ValueError, KeyError):
+        pass
+
+    lexicon = Lexicon.build(lexicon_groups(graph, ontology_ns, dbpedia_index, vocabulary), fingerprint)
+    try:
+        lexicon.save(path)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar el léxico: {e}")
+    print(f"✓ Léxico trilingüe construido: {len(lexicon.concepts)} conceptos, {len(lexicon.terms)} términos")
+    return lexicon
+
+
+def main() -> None:
+    from dbpedia_manager import DBpediaLocalIndex
+    from query_parser import parse_query
+
+    parser = argparse.ArgumentParser(description="Construcción del léxico trilingüe")
+    parser.add_argument("--ontology", default="noticias_ontologia.rdf")
+    parser.add_argument("--dbpedia", default="data/dbpedia_local.json")
+    parser.add_argument("--output", default="data/lexicon.json")
+    parser.add_argument("--expand", help="Muestra cómo se amplía una consulta")
+    args = parser.parse_args()
+
+    graph = Graph()
+    graph.parse(args.ontology, format="xml")
+    ontology_ns = Namespace("http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#")
+    lexicon = load_or_build_lexicon(graph, ontology_ns, DBpediaLocalIndex(args.dbpedia), args.output)
+
+    if args.expand:
+        query = parse_query(args.expand)
+        start = time.perf_counter()
+        expanded = lexicon.expand_query(query)
+        elapsed = (time.perf_counter() - start) * 1e6
+        for clause in expanded.clauses:
+            print(f"  {clause.field}:{clause.value!r} → {', '.join(clause.alternatives) or '(sin ampliar)'}")
+        print(f"  Ampliación en {elapsed:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Jerarquía de lugares para la Ubicación de las noticias.
+Resuelve los textos libres de Ubicación ("Cochabamba, Bolivia") a lugares de
+DBpedia local y construye la relación de contención a partir de sus
+propiedades (``country``...) y del orden de las partes separadas por comas.
+Cada noticia guarda su lugar y todos sus antecesores, así que buscar una
+región es leer una sola lista de postings de la faceta "ubicacion".
+"""
+
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from entity_linker import label_tokens
+from news_index import NewsRecord
+
+
+# Propiedades de DBpedia que apuntan al lugar contenedor, de la más cercana a la más lejana.
+CONTAINMENT_PROPERTIES = ("isPartOf", "municipality", "province", "department", "region",
+                          "state", "country")
+# Categorías que identifican un recurso como lugar aunque no tenga contenedor.
+PLACE_CATEGORY_WORDS = {"countries", "cities", "capitals", "towns", "regions", "departments",
+                        "provinces", "municipalities", "places"}
+
+
+def place_key(label: str) -> str:
+    """Clave normalizada de un lugar: tokens sin tildes ni mayúsculas."""
+    return " ".join(label_tokens(label))
+
+
+def is_place(resource) -> bool:
+    if any(resource.properties.get(name) for name in CONTAINMENT_PROPERTIES):
+        return True
+    return any(set(label_tokens(category)) & PLACE_CATEGORY_WORDS for category in resource.categories)
+
+
+class LocationHierarchy:
+    """Grafo de contención entre lugares con los antecesores de cada uno precalculados."""
+
+    def __init__(self):
+        self.labels: Dict[str, str] = {}
+        self.uris: Dict[str, str] = {}
+        self.parents: Dict[str, List[str]] = {}
+        self._ancestors: Dict[str, Tuple[str, ...]] = {}
+        self.resolved = 0
+        self.unresolved = 0
+
+    @classmethod
+    def from_dbpedia(cls, dbpedia_index) -> "LocationHierarchy":
+        """Lugares de DBpedia local enlazados por sus propiedades de contención."""
+        hierarchy = cls()
+        for resource in dbpedia_index.resources.values():
+            if not is_place(resource):
+                continue
+            key = hierarchy.add_place(resource.label, resource.uri)
+            for name in CONTAINMENT_PROPERTIES:
+                container = resource.properties.get(name)
+                if isinstance(container, str) and container.strip():
+                    hierarchy.add_edge(key, hierarchy.add_place(container))
+        return hierarchy
+
+    def copy(self) -> "LocationHierarchy":
+        """Copia independiente: ``learn`` sobre ella no altera la jerarquía de la generación vigente."""
+        hierarchy = LocationHierarchy()
+        hierarchy.labels = dict(self.labels)
+        hierarchy.uris = dict(self.uris)
+        hierarchy.parents = {key: list(parents) for key, parents in self.parents.items()}
+        hierarchy._ancestors = dict(self._ancestors)
+        hierarchy.resolved = self.resolved
+        hierarchy.unresolved = self.unresolved
+        return hierarchy
+
+    def add_place(self, label: str, uri: Optional[str] = None) -> str:
+        key = place_key(label)
+        if key not in self.labels or (uri and key not in self.uris):
+            # La etiqueta de DBpedia prevalece sobre la escrita en una Ubicación.
+            self.labels[key] = label.strip()
+        if uri:
+            self.uris.setdefault(key, uri)
+        self.parents.setdefault(key, [])
+        return key
+
+    def add_edge(self, child: str, parent: str) -> None:
+        """Añade ``parent`` como contenedor de ``child`` salvo que cree un ciclo."""
+        if child == parent or parent in self.parents[child] or child in self._walk(parent):
+            return
+        self.parents[child].append(parent)
+        self._ancestors.clear()
+
+    def _walk(self, key: str) -> Tuple[str, ...]:
+        seen: Dict[str, None] = {}
+        stack = list(reversed(self.parents.get(key, [])))
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen[current] = None
+            stack.extend(reversed(self.parents.get(current, [])))
+        return tuple(seen)
+
+    def ancestors(self, key: str) -> Tuple[str, ...]:
+        """Claves de todos los lugares que contienen a ``key``, de más cercano a más lejano."""
+        cached = self._ancestors.get(key)
+        if cached is None:
+            cached = self._ancestors[key] = self._walk(key)
+        return cached
+
+    def learn(self, ubicacion: str) -> Optional[str]:
+        """
+        Incorpora una Ubicación: cada parte separada por comas está contenida en
+        la siguiente ("Sucre, Bolivia"). Los lugares de DBpedia conservan sus
+        contenedores y sólo se les añaden los que indique el texto.
+
+        Returns:
+            Clave del lugar más específico, o None si el texto está vacío
+        """
+        parts = [part.strip() for part in ubicacion.split(",") if place_key(part)]
+        if not parts:
+            return None
+        keys = [self.add_place(part) for part in parts]
+        for child, parent in zip(keys, keys[1:]):
+            self.add_edge(child, parent)
+        if keys[0] in self.uris:
+            self.resolved += 1
+        else:
+            self.unresolved += 1
+        return keys[0]
+
+    def expand(self, ubicaciones: Iterable[str]) -> List[str]:
+        """Etiquetas de los lugares de las ubicaciones y de todos sus antecesores."""
+        keys: Dict[str, None] = {}
+        for ubicacion in ubicaciones:
+            key = place_key(ubicacion.split(",")[0])
+            if not key:
+                continue
+            keys.setdefault(key, None)
+            for ancestor in self.ancestors(key):
+                keys.setdefault(ancestor, None)
+        return [self.labels.get(key, key) for key in keys]
+
+    def annotate(self, records: List[NewsRecord]) -> None:
+        """Aprende las ubicaciones del corpus y guarda en cada noticia sus lugares."""
+        for record in records:
+            for ubicacion in record.ubicaciones:
+                self.learn(ubicacion)
+        for record in records:
+            record.lugares = self.expand(record.ubicaciones)
+
+    def refresh(self, records: Iterable[NewsRecord], changed: List[NewsRecord]) -> List[NewsRecord]:
+        """
+        ``annotate`` incremental para la ingesta: aprende las ubicaciones de
+        ``changed`` y anota esos registros. Si aparecieron contenciones nuevas
+        devuelve copias de los demás registros cuyos lugares cambian (los
+        originales pertenecen a la generación vigente y no se modifican).
+        """
+        edges = sum(len(parents) for parents in self.parents.values())
+        self.annotate(changed)
+        if sum(len(parents) for parents in self.parents.values()) == edges:
+            return []
+        skip = {record.uri for record in changed}
+        updated = []
+        for record in records:
+            if record.uri in skip:
+                continue
+            lugares = self.expand(record.ubicaciones)
+            if lugares != record.lugares:
+                updated.append(replace(record, lugares=lugares))
+        return updated
+
+    def uri(self, label: str) -> Optional[str]:
+        """URI de DBpedia del lugar, si está resuelto."""
+        return self.uris.get(place_key(label))
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas de la jerarquía de lugares."""
+        depths = [len(self.ancestors(key)) for key in self.parents]
+        return {
+            "places": len(self.parents),
+            "dbpedia_places": len(self.uris),
+            "edges": sum(len(parents) for parents in self.parents.values()),
+            "roots": sum(not parents for parents in self.parents.values()),
+            "max_depth": max(depths, default=0),
+            "resolved_locations": self.resolved,
+            "unresolved_locations": self.unresolved
+        }
+
+
+def build_location_hierarchy(dbpedia_index, records: List[NewsRecord]) -> LocationHierarchy:
+    """Construye la jerarquía con DBpedia local y anota los lugares de cada noticia."""
+    hierarchy = LocationHierarchy.from_dbpedia(dbpedia_index)
+    hierarchy.annotate(records)
+    return hierarchy
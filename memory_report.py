@@ -0,0 +1,224 @@
+"""
+Informe de memoria por subsistema.
+Suma el tamaño profundo de los objetos que pertenece a cada subsistema (grafo
+rdflib, índices DBpedia, caché de plantillas...) y, si tracemalloc está
+activo, las líneas que más memoria reservan y cuánto han crecido desde la
+instantánea de referencia. Puede ejecutarse periódicamente y registrar el
+resultado para detectar fugas bajo carga.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # no disponible en Windows
+    resource = None
+
+
+# Objetos compartidos por todo el proceso: no se atribuyen a ningún subsistema.
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.CodeType, types.FrameType, weakref.ref)
+LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), range)
+
+# Marcos de pila que no interesan en el informe de tracemalloc.
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def deep_sizeof(root: Any, seen: Optional[set] = None) -> Tuple[int, int]:
+    """
+    Tamaño en bytes de un objeto y de todo lo que alcanza a través de
+    contenedores, ``__dict__`` y ``__slots__``.
+
+    Args:
+        root: Objeto a medir
+        seen: Identificadores ya contados; compartirlo entre llamadas evita
+              contar dos veces lo que comparten varios subsistemas
+
+    Returns:
+        Tupla (bytes, número de objetos)
+    """
+    seen = set() if seen is None else seen
+    stack = [root]
+    total = objects = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        objects += 1
+        if isinstance(obj, LEAF_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(vars(obj))
+            for cls in type(obj).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(obj, slot) and slot not in ("__dict__", "__weakref__"):
+                        stack.append(getattr(obj, slot))
+    return total, objects
+
+
+def current_rss() -> Optional[int]:
+    """Memoria residente del proceso en bytes (el pico si no hay /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+class MemoryAccountant:
+    """Informe de memoria por subsistema con instantáneas de tracemalloc opcionales."""
+
+    def __init__(self, subsystems: Callable[[], Dict[str, Any]], top: int = 10,
+                 trace: bool = False, frames: int = 1):
+        """
+        Args:
+            subsystems: Devuelve {nombre: objeto raíz} en el orden de atribución
+            top: Número de líneas de código a listar en cada informe
+            trace: Si se activa tracemalloc (tiene coste en cada reserva de memoria)
+            frames: Marcos de pila que guarda tracemalloc por reserva
+        """
+        self.subsystems = subsystems
+        self.extra: Dict[str, Callable[[], Any]] = {}
+        self.top = top
+        self.reports = 0
+        self.last_sizes: Dict[str, int] = {}
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        if tracemalloc.is_tracing():
+            self.reset_baseline()
+
+    def register(self, name: str, fn: Callable[[], Any]) -> None:
+        """Añade un subsistema que vive fuera de la generación de datos (p. ej. una caché)."""
+        self.extra[name] = fn
+
+    def subsystem_sizes(self) -> Dict[str, Dict[str, int]]:
+        """
+        Tamaño profundo por subsistema. Un objeto compartido se atribuye al primer
+        subsistema que lo alcanza, así que la suma no cuenta nada dos veces.
+        """
+        roots = dict(self.subsystems())
+        roots.update((name, fn()) for name, fn in self.extra.items())
+        seen: set = set()
+        sizes = {}
+        for name, root in roots.items():
+            size, objects = deep_sizeof(root, seen)
+            sizes[name] = {"bytes": size, "objects": objects}
+        return sizes
+
+    def reset_baseline(self) -> None:
+        if tracemalloc.is_tracing():
+            self.baseline = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+            self.baseline_at = time.time()
+
+    def _top_allocators(self) -> Tuple[List[dict], List[dict]]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        top = [
+            {"location": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+            for stat in snapshot.statistics("lineno")[:self.top]
+        ]
+        growth = []
+        if self.baseline is not None:
+            growth = [
+                {"location": str(stat.traceback), "bytes": stat.size, "growth": stat.size_diff,
+                 "blocks_growth": stat.count_diff}
+                for stat in snapshot.compare_to(self.baseline, "lineno")[:self.top]
+                if stat.size_diff
+            ]
+        return top, growth
+
+    def report(self, reset_baseline: bool = False) -> Dict[str, Any]:
+        """
+        Informe completo: RSS, tamaño y crecimiento por subsistema desde el
+        informe anterior y, con tracemalloc, las líneas con más memoria.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            sizes = self.subsystem_sizes()
+            for name, entry in sizes.items():
+                entry["growth"] = entry["bytes"] - self.last_sizes.get(name, entry["bytes"])
+            self.last_sizes = {name: entry["bytes"] for name, entry in sizes.items()}
+
+            result: Dict[str, Any] = {
+                "rss_bytes": current_rss(),
+                "accounted_bytes": sum(entry["bytes"] for entry in sizes.values()),
+                "subsystems": sizes,
+                "tracing": tracemalloc.is_tracing()
+            }
+            if tracemalloc.is_tracing():
+                traced, peak = tracemalloc.get_traced_memory()
+                top, growth = self._top_allocators()
+                result.update({
+                    "traced_bytes": traced,
+                    "traced_peak_bytes": peak,
+                    "top_allocators": top,
+                    "growth_since_baseline": growth,
+                    "baseline_at": self.baseline_at
+                })
+                if reset_baseline:
+                    self.reset_baseline()
+            self.reports += 1
+            result["report_seconds"] = round(time.perf_counter() - start, 3)
+            return result
+
+    def start_schedule(self, interval: float) -> None:
+        """Registra un resumen cada ``interval`` segundos en un hilo aparte."""
+        if self._thread is None and interval > 0:
+            self._thread = threading.Thread(target=self._log_periodically, args=(interval,),
+                                            name="memory-report", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _log_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                report = self.report()
+            except Exception as e:
+                print(f"✗ Error generando el informe de memoria: {e}")
+                continue
+            rss = f"RSS {report['rss_bytes'] / 1e6:.1f} MB, " if report["rss_bytes"] else ""
+            print(f"📊 Memoria: {rss}contabilizada {report['accounted_bytes'] / 1e6:.1f} MB")
+            for name, entry in sorted(report["subsystems"].items(), key=lambda s: -s[1]["bytes"]):
+                growth = f" ({entry['growth']:+,} B)" if entry["growth"] else ""
+                print(f"   {name}: {entry['bytes'] / 1e6:.2f} MB{growth}")
+            for stat in report.get("growth_since_baseline", [])[:self.top]:
+                print(f"   {stat['growth']:+,} B  {stat['location']}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del informe de memoria."""
+        return {
+            "reports": self.reports,
+            "tracing": tracemalloc.is_tracing(),
+            "scheduled": self._thread is not None,
+            "rss_bytes": current_rss()
+        }
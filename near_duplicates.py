@@ -0,0 +1,345 @@
+"""
+Detección de noticias casi duplicadas con MinHash y LSH.
+Cada noticia se resume en una firma MinHash de los trigramas de palabras de
+su título y su texto; la firma se parte en bandas y cada banda se guarda en
+un índice SQLite. Dos noticias son candidatas si coinciden en alguna banda, y
+casi duplicadas si sus firmas estiman una similitud de Jaccard por encima del
+umbral. Las casi duplicadas comparten un identificador de grupo (la URI de
+la primera noticia del grupo).
+
+Uso como proceso por lotes sobre la ontología:
+    python near_duplicates.py [--ontology noticias_ontologia.rdf] [--index data/near_duplicates.sqlite]
+"""
+
+import argparse
+import sqlite3
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from news_index import TOKEN_PATTERN, fold_text
+
+
+SHINGLE_SIZE = 3
+GRAM_MULTIPLIER = np.uint64(1000003)
+
+Item = Tuple[str, str, str]  # (uri, título, texto)
+
+
+def shingles(title: str, text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Hashes de los n-gramas de palabras normalizadas (las palabras sueltas si hay
+    pocas). Puede contener repetidos: no alteran el mínimo de MinHash.
+    """
+    tokens = [token if token.isascii() else fold_text(token)
+              for token in TOKEN_PATTERN.findall(f"{title}\n{text}".lower())] or [""]
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens),
+                         dtype=np.uint64, count=len(tokens))
+    if len(hashes) < size:
+        return hashes
+    grams = hashes[:len(hashes) - size + 1].copy()
+    for offset in range(1, size):
+        grams = grams * GRAM_MULTIPLIER + hashes[offset:len(hashes) - size + 1 + offset]
+    return grams
+
+
+class NearDuplicateIndex:
+    """Índice LSH persistente en SQLite con firmas MinHash y grupos de casi duplicados."""
+
+    def __init__(self, path: str, threshold: float = 0.7, num_perm: int = 64,
+                 bands: int = 16, seed: int = 1):
+        """
+        Args:
+            path: Fichero SQLite (``:memory:`` para un índice temporal)
+            threshold: Similitud de Jaccard estimada a partir de la cual se agrupan
+            num_perm: Número de permutaciones de la firma MinHash
+            bands: Número de bandas LSH (``num_perm`` debe ser múltiplo)
+            seed: Semilla de las permutaciones; debe coincidir con la del índice guardado
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm debe ser múltiplo de bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        # Permutaciones por multiplicación-desplazamiento: (a * x + b) mod 2**64, 32 bits altos.
+        rng = np.random.RandomState(seed)
+        self._a = (rng.randint(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = rng.randint(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+        self._band_weights = rng.randint(1, 2 ** 31, size=self.rows, dtype=np.uint64)
+
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                uri TEXT UNIQUE NOT NULL,
+                cluster INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                key INTEGER NOT NULL,
+                item INTEGER NOT NULL,
+                PRIMARY KEY (band, key, item)
+            ) WITHOUT ROWID;
+        """)
+        self._check_parameters(seed)
+        self.checked = 0
+        self.duplicates_found = 0
+
+    def _check_parameters(self, seed: int) -> None:
+        expected = {"num_perm": str(self.num_perm), "bands": str(self.bands), "seed": str(seed)}
+        stored = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if not stored:
+            with self.connection:
+                self.connection.executemany("INSERT INTO meta VALUES (?, ?)", expected.items())
+        elif stored != expected:
+            raise ValueError(f"el índice {self.path} se creó con otros parámetros: {stored}")
+
+    def signatures(self, items: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Firmas MinHash (una fila uint32 por par título/texto), calculadas por lotes."""
+        hashes = [shingles(title, text) for title, text in items]
+        if not hashes:
+            return np.zeros((0, self.num_perm), dtype=np.uint32)
+        offsets = np.cumsum([0] + [len(h) for h in hashes[:-1]])
+        # Una fila por permutación para que reduceat recorra memoria contigua.
+        permuted = (self._a * np.concatenate(hashes) + self._b) >> np.uint64(32)
+        return np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Clave entera (con signo, para SQLite) de cada banda de cada firma."""
+        shaped = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        keys = (shaped * self._band_weights).sum(axis=2)  # suma modular en uint64
+        return (keys >> np.uint64(1)).astype(np.int64)
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Jaccard estimada: fracción de posiciones iguales entre dos firmas."""
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+    def _candidates(self, keys: np.ndarray) -> List[Tuple[int, str, int, np.ndarray]]:
+        """Elementos guardados que comparten alguna banda con las claves dadas."""
+        conditions = " OR ".join("(band = ? AND key = ?)" for _ in range(self.bands))
+        params = [value for band, key in enumerate(keys.tolist()) for value in (band, key)]
+        rows = self.connection.execute(f"""
+            SELECT id, uri, cluster, signature FROM items
+            WHERE id IN (SELECT item FROM bands WHERE {conditions})
+        """, params)
+        return [(item_id, uri, cluster, np.frombuffer(signature, dtype=np.uint32))
+                for item_id, uri, cluster, signature in rows]
+
+    def find(self, title: str, text: str) -> List[Tuple[str, float]]:
+        """Noticias ya indexadas casi duplicadas del par título/texto, de mayor a menor similitud."""
+        signature = self.signatures([(title, text)])[0]
+        matches = [
+            (uri, self.similarity(signature, candidate))
+            for _, uri, _, candidate in self._candidates(self.band_keys(signature[None, :])[0])
+        ]
+        return sorted((m for m in matches if m[1] >= self.threshold), key=lambda m: -m[1])
+
+    def add(self, uri: str, title: str, text: str) -> str:
+        """Indexa una noticia y devuelve la URI que identifica a su grupo."""
+        self.add_many([(uri, title, text)])
+        return self.cluster_of(uri)
+
+    def add_many(self, items: Iterable[Item], chunk_size: int = 1000) -> int:
+        """
+        Indexa noticias por lotes, comparando cada una con el índice y con las
+        anteriores del mismo lote. Las URIs ya indexadas se omiten.
+
+        Returns:
+            Número de noticias asignadas a un grupo existente
+        """
+        duplicates = 0
+        chunk: List[Item] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                duplicates += self._add_chunk(chunk)
+                chunk = []
+        if chunk:
+            duplicates += self._add_chunk(chunk)
+        return duplicates
+
+    def _add_chunk(self, chunk: List[Item]) -> int:
+        known = self._known_uris([uri for uri, _, _ in chunk])
+        pending, seen = [], set()
+        for item in chunk:
+            if item[0] not in known and item[0] not in seen:
+                pending.append(item)
+                seen.add(item[0])
+        if not pending:
+            return 0
+
+        signatures = self.signatures([(title, text) for _, title, text in pending])
+        keys = self.band_keys(signatures)
+        stored = self._stored_candidates(keys)
+        next_id = (self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0]) + 1
+
+        # Buckets del propio lote: band -> clave -> posiciones ya procesadas.
+        local: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+        clusters: List[int] = []
+        duplicates = 0
+        for position in range(len(pending)):
+            signature = signatures[position]
+            best, best_cluster = self.threshold, None
+            for item_id, cluster, candidate in stored.get(position, ()):
+                score = self.similarity(signature, candidate)
+                if score >= best:
+                    best, best_cluster = score, cluster
+            for band, key in enumerate(keys[position].tolist()):
+                bucket = local[band].setdefault(key, [])
+                for other in bucket:
+                    score = self.similarity(signature, signatures[other])
+                    if score >= best:
+                        best, best_cluster = score, clusters[other]
+                bucket.append(position)
+            if best_cluster is None:
+                best_cluster = next_id + position
+            else:
+                duplicates += 1
+            clusters.append(best_cluster)
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO items (id, uri, cluster, signature) VALUES (?, ?, ?, ?)",
+                [(next_id + position, uri, clusters[position], signatures[position].tobytes())
+                 for position, (uri, _, _) in enumerate(pending)]
+            )
+            # En orden de clave primaria para que las inserciones en el árbol sean locales.
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO bands (band, key, item) VALUES (?, ?, ?)",
+                sorted((band, key, next_id + position)
+                       for position, row in enumerate(keys.tolist())
+                       for band, key in enumerate(row))
+            )
+        self.checked += len(pending)
+        self.duplicates_found += duplicates
+        return duplicates
+
+    def _known_uris(self, uris: List[str]) -> set:
+        known = set()
+        for start in range(0, len(uris), 500):
+            part = uris[start:start + 500]
+            known.update(uri for (uri,) in self.connection.execute(
+                f"SELECT uri FROM items WHERE uri IN ({','.join('?' * len(part))})", part))
+        return known
+
+    def _stored_candidates(self, keys: np.ndarray) -> Dict[int, List[Tuple[int, int, np.ndarray]]]:
+        """Candidatos guardados de todo un lote con una sola consulta sobre una tabla temporal."""
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS probe (position INTEGER, band INTEGER, key INTEGER)")
+        self.connection.execute("DELETE FROM probe")
+        self.connection.executemany(
+            "INSERT INTO probe VALUES (?, ?, ?)",
+            [(position, band, key) for position, row in enumerate(keys.tolist())
+             for band, key in enumerate(row)]
+        )
+        rows = self.connection.execute("""
+            SELECT DISTINCT probe.position, items.id, items.cluster, items.signature
+            FROM probe
+            JOIN bands ON bands.band = probe.band AND bands.key = probe.key
+            JOIN items ON items.id = bands.item
+        """)
+        candidates: Dict[int, List[Tuple[int, int, np.ndarray]]] = {}
+        for position, item_id, cluster, signature in rows:
+            candidates.setdefault(position, []).append(
+                (item_id, cluster, np.frombuffer(signature, dtype=np.uint32)))
+        return candidates
+
+    def cluster_of(self, uri: str) -> Optional[str]:
+        row = self.connection.execute("""
+            SELECT first.uri FROM items JOIN items AS first ON first.id = items.cluster
+            WHERE items.uri = ?
+        """, (uri,)).fetchone()
+        return row[0] if row else None
+
+    def clusters(self) -> Dict[str, str]:
+        """URI -> URI del grupo, sólo para noticias con algún casi duplicado."""
+        rows = self.connection.execute("""
+            SELECT items.uri, first.uri FROM items
+            JOIN items AS first ON first.id = items.cluster
+            WHERE items.cluster IN (SELECT cluster FROM items GROUP BY cluster HAVING COUNT(*) > 1)
+        """)
+        return dict(rows)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Retorna estadísticas del índice de casi duplicados. Como en ``clusters``,
+        un grupo sólo cuenta si tiene más de una noticia.
+        """
+        items, groups = self.connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT cluster) FROM items").fetchone()
+        clusters, grouped = self.connection.execute("""
+            SELECT COUNT(*), COALESCE(SUM(size), 0) FROM
+                (SELECT COUNT(*) AS size FROM items GROUP BY cluster HAVING COUNT(*) > 1)
+        """).fetchone()
+        return {
+            "items": items,
+            "clusters": clusters,
+            "grouped": grouped,
+            "duplicates": items - groups,
+            "checked": self.checked,
+            "duplicates_found": self.duplicates_found,
+            "num_perm": self.num_perm,
+            "bands": self.bands
+        }
+
+
+def collapse_duplicates(results: List[dict], clusters: Dict[str, str]) -> List[dict]:
+    """
+    Deja un resultado por grupo de casi duplicados: el primero que aparece
+    (el más reciente o el de mayor puntaje), con el número de variantes omitidas.
+    """
+    if not clusters:
+        return results
+    collapsed, kept = [], {}
+    for result in results:
+        cluster = clusters.get(result["uri"])
+        if cluster is None:
+            collapsed.append(result)
+        elif cluster in kept:
+            kept[cluster]["duplicados"] = kept[cluster].get("duplicados", 0) + 1
+        else:
+            kept[cluster] = result
+            collapsed.append(result)
+    return collapsed
+
+
+def main() -> None:
+    from rdflib import Graph, Namespace
+    from news_index import extract_records
+
+    parser = argparse.ArgumentParser(description="Detección por lotes de noticias casi duplicadas")
+    parser.add_argument("--ontology", default="noticias_ontologia.rdf")
+    parser.add_argument("--index", default="data/near_duplicates.sqlite")
+    parser.add_argument("--threshold", type=float, default=0.7)
+    args = parser.parse_args()
+
+    graph = Graph()
+    graph.parse(args.ontology, format="xml")
+    records = extract_records(
+        graph, Namespace("http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#"))
+
+    index = NearDuplicateIndex(args.index, threshold=args.threshold)
+    start = time.perf_counter()
+    duplicates = index.add_many((r.uri, r.titulo, r.texto) for r in records)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {len(records)} noticias revisadas en {elapsed:.2f}s; {duplicates} casi duplicadas nuevas")
+    for uri, cluster in sorted(index.clusters().items(), key=lambda c: c[1]):
+        if uri != cluster:
+            print(f"  {uri}  ≈  {cluster}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,554 @@
+"""
+Índice precomputado de noticias sobre la ontología RDF.
+Asigna un identificador entero a cada Noticia y mantiene bitmaps de postings
+por valor de faceta, de modo que filtrar y contar no requiere recorrer el grafo.
+"""
+
+import re
+import sys
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, timedelta
+from functools import lru_cache
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS
+
+if TYPE_CHECKING:
+    from verification_index import VerificationIndex
+
+
+NOT_VERIFIED = "No verificada"
+UNDATED = "?"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+RELATIVE_DATE = re.compile(r"^last(\d+)([dwmy])$")
+RELATIVE_DAYS = {"d": 1, "w": 7, "m": 30, "y": 365}
+# Cantidades relativas mayores se tratan como "desde siempre" (evita int() de miles de dígitos).
+MAX_RELATIVE_AMOUNT = 10 ** 6
+PARTIAL_DATE = re.compile(r"^(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?$")
+
+
+@lru_cache(maxsize=1)
+def _combining_marks() -> Dict[int, None]:
+    """Tabla de ``str.translate`` que elimina las marcas combinantes (se construye una vez)."""
+    return {cp: None for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))}
+
+
+def fold_text(text: str) -> str:
+    """Normaliza un texto a minúsculas y sin acentos para comparaciones."""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKD", text.lower()).translate(_combining_marks())
+
+
+def tokenize(text: str, min_length: int = 3) -> List[str]:
+    """Tokens en minúsculas de un texto, descartando los muy cortos y los numéricos."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) >= min_length and not t.isdigit()]
+
+
+def format_date(value) -> str:
+    """Formatea un literal de fecha RDF como YYYY-MM-DD."""
+    try:
+        return value.toPython().strftime("%Y-%m-%d") if hasattr(value, 'toPython') else str(value)
+    except Exception:
+        return str(value)
+
+
+def parse_date_query(expression: str, today: Optional[date] = None) -> Optional[Tuple[str, str]]:
+    """
+    Convierte una expresión de fecha en un intervalo cerrado de cadenas ISO.
+
+    Acepta ``2024``, ``2024-03``, ``2024-03-15``, rangos ``desde..hasta``
+    (con cualquiera de los extremos vacío) y fechas relativas como
+    ``last30d``, ``last2w``, ``last6m`` o ``last1y``.
+
+    Returns:
+        Tupla (inicio, fin) comparable con fechas YYYY-MM-DD, o None si la
+        expresión no es válida (mes o día inexistente, rango invertido...)
+    """
+    expression = expression.strip().lower()
+    today = today or date.today()
+
+    relative = RELATIVE_DATE.match(expression)
+    if relative:
+        digits = relative.group(1)
+        amount = int(digits) if len(digits) <= 6 else MAX_RELATIVE_AMOUNT
+        days = amount * RELATIVE_DAYS[relative.group(2)]
+        if days >= today.toordinal():
+            return "0000", today.isoformat()
+        return (today - timedelta(days=days)).isoformat(), today.isoformat()
+
+    if ".." in expression:
+        start, end = expression.split("..", 1)
+        if start and not _is_partial_date(start) or end and not _is_partial_date(end):
+            return None
+        start, end = start or "0000", (end or "9999") + "\uffff"
+        return (start, end) if start <= end else None
+
+    if _is_partial_date(expression):
+        return expression, expression + "\uffff"
+    return None
+
+
+def _is_partial_date(value: str) -> bool:
+    """``YYYY``, ``YYYY-MM`` o ``YYYY-MM-DD`` con mes y día existentes."""
+    match = PARTIAL_DATE.match(value)
+    if match is None:
+        return False
+    year, month, day = match.groups()
+    try:
+        date(int(year), int(month or 1), int(day or 1))
+    except ValueError:
+        return False
+    return True
+
+
+class DateIndex:
+    """
+    Índice ordenado de fechas ISO con búsqueda binaria por rango.
+
+    Si los identificadores ya están en orden de fecha (``contiguous``) un
+    rango se resuelve como una máscara de bits sin recorrer los documentos.
+    """
+
+    def __init__(self, dates: List[str], contiguous: bool = False):
+        pairs = sorted((d, doc_id) for doc_id, d in enumerate(dates) if d != UNDATED)
+        self.dates: List[str] = [d for d, _ in pairs]
+        self.ids: List[int] = [doc_id for _, doc_id in pairs]
+        self.contiguous = contiguous
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def range_ids(self, start: str, end: str) -> List[int]:
+        """Identificadores con fecha en el intervalo cerrado [start, end]."""
+        return self.ids[bisect_left(self.dates, start):bisect_right(self.dates, end)]
+
+    def range_count(self, start: str, end: str) -> int:
+        return max(bisect_right(self.dates, end) - bisect_left(self.dates, start), 0)
+
+    def range_bits(self, start: str, end: str, ids_to_bits) -> int:
+        lo = bisect_left(self.dates, start)
+        hi = bisect_right(self.dates, end)
+        if lo >= hi:
+            return 0
+        if self.contiguous:
+            return ((1 << (self.ids[hi - 1] + 1)) - 1) ^ ((1 << self.ids[lo]) - 1)
+        return ids_to_bits(self.ids[lo:hi])
+
+
+@dataclass
+class NewsRecord:
+    """Vista plana de una Noticia con los campos usados para buscar y facetar."""
+    uri: str
+    titulo: str = "Sin título"
+    fecha: str = UNDATED
+    tematicas: List[str] = field(default_factory=list)
+    autores: List[str] = field(default_factory=list)
+    estados: List[str] = field(default_factory=list)
+    fecha_verificacion: str = UNDATED
+    texto: str = ""
+    ubicaciones: List[str] = field(default_factory=list)
+    # Lugares de las ubicaciones con todos sus antecesores (ver location_index).
+    lugares: List[str] = field(default_factory=list)
+
+    @property
+    def mes(self) -> str:
+        return self.fecha[:7] if len(self.fecha) >= 7 else UNDATED
+
+    def facet_values(self, facet: str) -> List[str]:
+        """Valores del registro para una faceta dada."""
+        if facet == "tematica":
+            return self.tematicas or ["?"]
+        if facet == "autor":
+            return self.autores or ["?"]
+        if facet == "estado":
+            return self.estados or [NOT_VERIFIED]
+        if facet == "mes":
+            return [self.mes]
+        if facet == "ubicacion":
+            return self.lugares or self.ubicaciones or ["?"]
+        return []
+
+
+def extract_records(graph: Graph, ontology_ns: Namespace,
+                    verifications: Optional["VerificationIndex"] = None) -> List[NewsRecord]:
+    """
+    Recorre el grafo una sola vez y devuelve un registro por Noticia.
+    El estado y la fecha de verificación salen del índice inverso de
+    verificaciones (se construye aquí si no se proporciona).
+    """
+    if verifications is None:
+        from verification_index import VerificationIndex  # importa este módulo
+        verifications = VerificationIndex.from_graph(graph, ontology_ns)
+
+    news_classes = set(graph.transitive_subjects(RDFS.subClassOf, ontology_ns.Noticia))
+    news_classes.add(ontology_ns.Noticia)
+
+    subjects = set()
+    for news_class in news_classes:
+        subjects.update(graph.subjects(RDF.type, news_class))
+
+    textos: Dict[str, List[str]] = {}
+    for contenido, noticia in graph.subject_objects(ontology_ns.pertenece_a):
+        for texto in graph.objects(contenido, ontology_ns.ContenidoTexto):
+            textos.setdefault(str(noticia), []).append(str(texto))
+
+    return [news_record(graph, ontology_ns, subject, verifications, textos.get(str(subject), []))
+            for subject in subjects]
+
+
+def news_record(graph: Graph, ontology_ns: Namespace, subject, verifications: "VerificationIndex",
+                textos: Optional[List[str]] = None) -> NewsRecord:
+    """
+    Registro de una sola Noticia. Sin ``textos`` se leen los Texto que
+    ``pertenece_a`` la noticia, así que no hace falta recorrer el grafo.
+    """
+    if textos is None:
+        textos = [str(texto)
+                  for contenido in graph.subjects(ontology_ns.pertenece_a, subject)
+                  for texto in graph.objects(contenido, ontology_ns.ContenidoTexto)]
+    titulo = graph.value(subject, ontology_ns.Título)
+    fecha = graph.value(subject, ontology_ns.Fecha_publicación)
+    return NewsRecord(
+        uri=str(subject),
+        titulo=str(titulo) if titulo else "Sin título",
+        fecha=format_date(fecha) if fecha else UNDATED,
+        tematicas=sorted({str(t) for t in graph.objects(subject, ontology_ns.Temática)}),
+        autores=sorted({str(a) for a in graph.objects(subject, ontology_ns.Autor)}),
+        estados=[verifications.state(subject)] if verifications.verifications(subject) else [],
+        fecha_verificacion=verifications.verification_date(subject),
+        texto="\n".join(sorted(textos)),
+        ubicaciones=sorted({str(u) for u in graph.objects(subject, ontology_ns.Ubicación)})
+    )
+
+
+def news_details(graph: Graph, uri: str) -> dict:
+    """Propiedades de la ontología (y tipo, etiqueta y comentario) de un recurso."""
+    detalles = {}
+    try:
+        query = f"""
+            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+            
+            SELECT ?propiedad ?valor
+            WHERE {{
+                <{uri}> ?propiedad ?valor .
+                FILTER (
+                    STRSTARTS(STR(?propiedad), 
+                        "http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#") ||
+                    ?propiedad IN (rdf:type, rdfs:label, rdfs:comment)
+                )
+            }}
+        """
+        
+        for row in graph.query(query):
+            prop_name = str(row.propiedad).split("#")[-1]
+            valor = str(row.valor)
+            
+            if hasattr(row.valor, 'toPython'):
+                valor = str(row.valor.toPython())
+            
+            detalles[prop_name] = valor
+    
+    except Exception as e:
+        print(f"Error obteniendo detalles: {e}")
+    
+    return detalles
+
+
+def infer_properties(graph: Graph, subject: URIRef) -> dict:
+    classes = set()
+    
+    for s, p, o in graph.triples((subject, RDF.type, None)):
+        classes.add(o)
+        for s2, p2, o2 in graph.triples((o, RDFS.subClassOf, None)):
+            classes.add(o2)
+    
+    properties = set()
+    for class_uri in classes:
+        for s, p, o in graph.triples((class_uri, RDFS.domain, None)):
+            properties.add(p)
+    
+    return {
+        'classes': [str(c) for c in classes],
+        'possible_properties': [str(p) for p in properties]
+    }
+
+
+class NewsIndex:
+    """
+    Índice columnar de noticias con bitmaps de postings por valor de faceta.
+
+    Los identificadores se asignan en orden ascendente de fecha, por lo que
+    recorrer un bitmap de mayor a menor bit devuelve las noticias de la más
+    reciente a la más antigua. Los bitmaps son enteros de Python: la
+    intersección es un ``&`` y el conteo un ``bit_count()``. Las noticias sin
+    fecha quedan al principio, como las más antiguas.
+    """
+
+    FACETS = ("tematica", "autor", "estado", "mes", "ubicacion")
+    # Facetas derivadas de la fecha: sus postings son rangos contiguos de ids.
+    RANGE_FACETS = ("mes",)
+
+    # Valores por faceta con bitmap precalculado; el resto se cuenta por columnas.
+    DENSE_VALUES_PER_FACET = 16
+    # Por debajo de este tamaño de resultado es más barato contar por columnas.
+    COLUMNAR_RESULT_LIMIT = 512
+
+    def __init__(self, records: Iterable[NewsRecord]):
+        self.records: List[NewsRecord] = sorted(
+            records, key=lambda r: (r.fecha if r.fecha != UNDATED else "", r.uri)
+        )
+        self.doc_ids: Dict[str, int] = {r.uri: i for i, r in enumerate(self.records)}
+        self.all_bits: int = (1 << len(self.records)) - 1
+
+        self.postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in self.FACETS}
+        self.columns: Dict[str, List[Tuple[str, ...]]] = {f: [] for f in self.FACETS}
+        for doc_id, record in enumerate(self.records):
+            for facet in self.FACETS:
+                values = tuple(dict.fromkeys(record.facet_values(facet)))
+                self.columns[facet].append(values)
+                for value in values:
+                    self.postings[facet].setdefault(value, []).append(doc_id)
+
+        self.ranges: Dict[str, List[Tuple[str, int, int]]] = {
+            facet: [(value, ids[0], ids[-1] + 1) for value, ids in self.postings[facet].items()]
+            for facet in self.RANGE_FACETS
+        }
+
+        self.date_index = DateIndex([r.fecha for r in self.records], contiguous=True)
+        self.verification_date_index = DateIndex([r.fecha_verificacion for r in self.records])
+
+        self._folded_values: Dict[str, List[Tuple[str, str]]] = {}
+        self._search_texts: Optional[List[str]] = None
+
+        self.bitmaps: Dict[str, Dict[str, int]] = {}
+        self._totals: Dict[str, List[Tuple[str, int]]] = {}
+        for facet, values in self.postings.items():
+            ranked = sorted(((v, len(ids)) for v, ids in values.items()), key=lambda c: (-c[1], c[0]))
+            self._totals[facet] = ranked
+            if facet in self.RANGE_FACETS:
+                continue
+            dense = ranked[:self.DENSE_VALUES_PER_FACET]
+            self.bitmaps[facet] = {value: self._ids_to_bits(values[value]) for value, _ in dense}
+
+    @classmethod
+    def from_graph(cls, graph: Graph, ontology_ns: Namespace,
+                   verifications: Optional["VerificationIndex"] = None) -> "NewsIndex":
+        return cls(extract_records(graph, ontology_ns, verifications))
+
+    def with_records(self, changed: Iterable[NewsRecord]) -> "NewsIndex":
+        """
+        Índice nuevo con ``changed`` añadidos o sustituidos (por URI), sin
+        modificar este. Los textos de búsqueda ya normalizados de las demás
+        noticias se reutilizan en lugar de recalcularse en la primera consulta.
+        """
+        updated = {record.uri: record for record in changed}
+        records = [updated.get(record.uri, record) for record in self.records]
+        records.extend(record for uri, record in updated.items() if uri not in self.doc_ids)
+        index = NewsIndex(records)
+        if self._search_texts is not None:
+            texts = {record.uri: text for record, text in zip(self.records, self._search_texts)
+                     if record.uri not in updated}
+            index._search_texts = [texts.get(r.uri) or self._search_text(r) for r in index.records]
+        return index
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _ids_to_bits(self, ids: Iterable[int]) -> int:
+        buffer = bytearray((len(self.records) >> 3) + 1)
+        for doc_id in ids:
+            buffer[doc_id >> 3] |= 1 << (doc_id & 7)
+        return int.from_bytes(buffer, "little")
+
+    def bits_for_uris(self, uris: Iterable[str]) -> int:
+        """Bitmap de las URIs indicadas (las desconocidas se ignoran)."""
+        return self._ids_to_bits(self.doc_ids[u] for u in uris if u in self.doc_ids)
+
+    def value_bits(self, facet: str, value: str) -> int:
+        """Bitmap de postings de un valor de faceta."""
+        bits = self.bitmaps.get(facet, {}).get(value)
+        if bits is None:
+            bits = self._ids_to_bits(self.postings.get(facet, {}).get(value, []))
+        return bits
+
+    def filter_bits(self, filters: Optional[Dict[str, List[str]]]) -> int:
+        """OR entre valores de una misma faceta y AND entre facetas."""
+        bits = self.all_bits
+        for facet, values in (filters or {}).items():
+            if facet not in self.postings or not values:
+                continue
+            facet_bits = 0
+            for value in values:
+                facet_bits |= self.value_bits(facet, value)
+            bits &= facet_bits
+        return bits
+
+    def date_bits(self, expression: str, verification: bool = False) -> Optional[int]:
+        """
+        Bitmap de las noticias cuya fecha cae en la expresión indicada.
+
+        Args:
+            expression: Expresión aceptada por ``parse_date_query``
+            verification: Si se filtra por FechaVerificación en lugar de publicación
+
+        Returns:
+            Bitmap de resultados, o None si la expresión no es una fecha válida
+        """
+        interval = parse_date_query(expression)
+        if interval is None:
+            return None
+        index = self.verification_date_index if verification else self.date_index
+        return index.range_bits(*interval, self._ids_to_bits)
+
+    def date_count(self, expression: str, verification: bool = False) -> Optional[int]:
+        """Número de noticias en el rango de fechas, sin construir el bitmap."""
+        interval = parse_date_query(expression)
+        if interval is None:
+            return None
+        index = self.verification_date_index if verification else self.date_index
+        return index.range_count(*interval)
+
+    def matching_values(self, facet: str, needle: str) -> List[str]:
+        """Valores de la faceta que contienen el texto (sin distinguir mayúsculas ni acentos)."""
+        folded_values = self._folded_values.get(facet)
+        if folded_values is None:
+            folded_values = self._folded_values[facet] = [
+                (fold_text(value), value) for value in self.postings.get(facet, {})
+            ]
+        needle = fold_text(needle)
+        return [value for folded, value in folded_values if needle in folded]
+
+    def search_text(self, doc_id: int) -> str:
+        """
+        Título, temáticas, autores y lugares normalizados de una noticia, para
+        búsqueda por subcadena; los lugares incluyen las regiones que los contienen.
+        """
+        if self._search_texts is None:
+            self._search_texts = [self._search_text(r) for r in self.records]
+        return self._search_texts[doc_id]
+
+    @staticmethod
+    def _search_text(r: NewsRecord) -> str:
+        return fold_text("\n".join([r.titulo, *r.tematicas, *r.autores, *(r.lugares or r.ubicaciones)]))
+
+    def to_result(self, doc_id: int) -> dict:
+        """Convierte un registro al formato de resultado de búsqueda."""
+        record = self.records[doc_id]
+        return {
+            "uri": record.uri,
+            "titulo": record.titulo,
+            "fecha": record.fecha,
+            "tematica": ", ".join(record.tematicas) or "?",
+            "autor": ", ".join(record.autores) or "?",
+            "verificacion": record.estados[0] if record.estados else NOT_VERIFIED,
+            "original_lang": "es"
+        }
+
+    def results(self, bits: int, limit: Optional[int] = None) -> List[dict]:
+        """Resultados de un bitmap ya ordenados de la noticia más reciente a la más antigua."""
+        return [self.to_result(doc_id) for doc_id in self.iter_ids(bits, limit)]
+
+    @staticmethod
+    def iter_ids(bits: int, limit: Optional[int] = None) -> Iterator[int]:
+        """Recorre los identificadores de un bitmap del mayor al menor."""
+        digits = bin(bits)
+        top = len(digits) - 3
+        pos = digits.find("1", 2)
+        emitted = 0
+        while pos != -1 and (limit is None or emitted < limit):
+            yield top - (pos - 2)
+            emitted += 1
+            pos = digits.find("1", pos + 1)
+
+    def facet_counts(self, bits: int, top_k: int = 10) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Cuenta por faceta los valores presentes en un conjunto de resultados.
+
+        Args:
+            bits: Bitmap del conjunto de resultados
+            top_k: Número de valores a devolver por faceta
+
+        Returns:
+            Dict faceta -> lista de (valor, conteo) ordenada por conteo
+        """
+        total = bits.bit_count()
+        if total == 0:
+            return {facet: [] for facet in self.FACETS}
+        if bits == self.all_bits:
+            return {facet: self._totals[facet][:top_k] for facet in self.FACETS}
+
+        if total <= self.COLUMNAR_RESULT_LIMIT:
+            ids = list(self.iter_ids(bits))
+            return {facet: self._columnar_counts(facet, ids, top_k) for facet in self.FACETS}
+
+        counts = {}
+        ids = None
+        raw = bits.to_bytes((len(self.records) >> 3) + 1, "little")
+        for facet in self.FACETS:
+            if facet in self.RANGE_FACETS:
+                ranged = [(value, self._range_count(raw, lo, hi)) for value, lo, hi in self.ranges[facet]]
+                counts[facet] = sorted((c for c in ranged if c[1]), key=lambda c: (-c[1], c[0]))[:top_k]
+                continue
+
+            dense = [(value, (bits & value_bits).bit_count())
+                     for value, value_bits in self.bitmaps[facet].items()]
+            counts[facet] = self._merge_sparse(facet, dense, raw, total, top_k)
+            if counts[facet] is None:
+                if ids is None:
+                    ids = list(self.iter_ids(bits))
+                counts[facet] = self._columnar_counts(facet, ids, top_k)
+        return counts
+
+    def _merge_sparse(self, facet: str, dense: List[Tuple[str, int]], raw: bytes,
+                      total: int, top_k: int) -> Optional[List[Tuple[str, int]]]:
+        """
+        Completa el top-k denso con los valores dispersos que aún pueden entrar.
+
+        Los valores dispersos se recorren por frecuencia global descendente y se
+        detiene en cuanto ninguno restante puede superar al k-ésimo actual. Si
+        hubiera que revisar más postings que resultados devuelve None para que
+        el llamador cuente por columnas.
+        """
+        top = sorted((c for c in dense if c[1]), key=lambda c: (-c[1], c[0]))
+        scanned = 0
+        for value, global_count in self._totals[facet][self.DENSE_VALUES_PER_FACET:]:
+            if len(top) >= top_k and global_count < top[top_k - 1][1]:
+                break
+            scanned += global_count
+            if scanned > total:
+                return None
+            count = sum(raw[i >> 3] >> (i & 7) & 1 for i in self.postings[facet][value])
+            if count:
+                top.append((value, count))
+                top.sort(key=lambda c: (-c[1], c[0]))
+        return top[:top_k]
+
+    @staticmethod
+    def _range_count(raw: bytes, lo: int, hi: int) -> int:
+        """Cuenta los bits activos del rango [lo, hi) sobre el bitmap serializado."""
+        chunk = int.from_bytes(raw[lo >> 3:(hi >> 3) + 1], "little") >> (lo & 7)
+        return (chunk & ((1 << (hi - lo)) - 1)).bit_count()
+
+    def _columnar_counts(self, facet: str, ids: List[int], top_k: int) -> List[Tuple[str, int]]:
+        column = self.columns[facet]
+        counter = Counter(value for doc_id in ids for value in column[doc_id])
+        return sorted(counter.items(), key=lambda c: (-c[1], c[0]))[:top_k]
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del índice."""
+        stats = {
+            "total_news": len(self.records),
+            "dated_news": len(self.date_index),
+            "verification_dated_news": len(self.verification_date_index)
+        }
+        for facet in self.FACETS:
+            stats[f"{facet}_values"] = len(self.postings[facet])
+        return stats
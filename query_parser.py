@@ -0,0 +1,244 @@
+"""
+Lenguaje de consulta compuesto y planificador por selectividad.
+Acepta consultas como ``autor:"Juan Pérez" tema:salud fecha:2024 verificadas -covid``:
+cada término es una cláusula que se evalúa sobre los bitmaps de NewsIndex,
+empezando por la más selectiva; las cláusulas de texto libre, que exigen
+comparar subcadenas, sólo se comprueban sobre los candidatos que quedan.
+Un lote de consultas comparte una única pasada de texto (``execute_many``).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from entity_linker import AhoCorasick
+from news_index import NewsIndex, fold_text, parse_date_query
+from verification_index import VERIFIED_STATES
+
+
+FIELD_ALIASES = {
+    "autor": "autor", "author": "autor",
+    "tema": "tema", "topic": "tema", "tematica": "tema",
+    "estado": "estado", "status": "estado",
+    "fecha": "fecha", "date": "fecha",
+    "ubicacion": "ubicacion", "lugar": "ubicacion", "location": "ubicacion", "place": "ubicacion",
+    "verificacion": "fecha_verificacion", "verification": "fecha_verificacion",
+}
+DATE_FIELDS = {"fecha", "fecha_verificacion"}
+VERIFIED_KEYWORDS = {"verificadas", "verificada", "verified"}
+
+TERM_PATTERN = re.compile(r'(-?)(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+
+
+@dataclass(frozen=True)
+class Clause:
+    """
+    Una condición de la consulta; ``field`` es "text" para el texto libre.
+    ``alternatives`` son equivalentes del valor (p. ej. en otros idiomas):
+    la cláusula se cumple si coincide cualquiera de ellos.
+    """
+    field: str
+    value: str = ""
+    negated: bool = False
+    alternatives: Tuple[str, ...] = ()
+
+    @property
+    def values(self) -> Tuple[str, ...]:
+        return (self.value,) + self.alternatives
+
+
+@dataclass
+class Query:
+    clauses: List[Clause]
+
+    @property
+    def kind(self) -> str:
+        """Tipo de búsqueda: el campo de la única cláusula, "general" o "compuesta"."""
+        fields = {clause.field for clause in self.clauses}
+        if not fields or fields == {"text"}:
+            return "general"
+        if len(self.clauses) == 1:
+            return self.clauses[0].field
+        return "compuesta"
+
+
+def parse_query(text: str) -> Query:
+    """
+    Convierte el texto de búsqueda en cláusulas.
+
+    Los prefijos desconocidos (``http:``...) se tratan como texto libre y las
+    comillas agrupan frases, tanto sueltas como tras un prefijo. Una fecha que
+    ``parse_date_query`` no entiende (``fecha:ayer``) se busca como texto en
+    lugar de descartar todas las noticias.
+    """
+    clauses = []
+    for match in TERM_PATTERN.finditer(text or ""):
+        negated = match.group(1) == "-"
+        prefix = match.group(2)
+        value = match.group(3) if match.group(3) is not None else match.group(4)
+        field = FIELD_ALIASES.get(fold_text(prefix)) if prefix else None
+        if prefix and field is None:
+            value = f"{prefix}:{value}"
+        value = value.strip()
+        if not value:
+            continue
+        if field in DATE_FIELDS and parse_date_query(value) is None:
+            field = "text"
+        if field is None and match.group(3) is None and fold_text(value) in VERIFIED_KEYWORDS:
+            clauses.append(Clause("verificadas", negated=negated))
+        else:
+            clauses.append(Clause(field or "text", value, negated))
+    return Query(clauses)
+
+
+class QueryPlanner:
+    """Ordena y evalúa cláusulas sobre un NewsIndex."""
+
+    FACET_FIELDS = {"autor": "autor", "tema": "tematica", "estado": "estado", "ubicacion": "ubicacion"}
+
+    def __init__(self, index: NewsIndex):
+        self.index = index
+
+    def estimate(self, clause: Clause) -> Optional[int]:
+        """
+        Número de noticias que cumplen la cláusula, a partir de las
+        estadísticas del índice; None si sólo se puede saber comparando texto.
+        """
+        index = self.index
+        if clause.field in DATE_FIELDS:
+            count = index.date_count(clause.value, verification=clause.field == "fecha_verificacion")
+            return count or 0
+        if clause.field == "verificadas":
+            return sum(len(index.postings["estado"][value]) for value in self._verified_values())
+        if clause.field in self.FACET_FIELDS:
+            facet = self.FACET_FIELDS[clause.field]
+            return sum(len(index.postings[facet][value]) for value in self._matching_values(facet, clause))
+        return None
+
+    def _matching_values(self, facet: str, clause: Clause) -> List[str]:
+        if not clause.alternatives:
+            return self.index.matching_values(facet, clause.value)
+        return list(dict.fromkeys(value for needle in clause.values
+                                  for value in self.index.matching_values(facet, needle)))
+
+    def _verified_values(self) -> List[str]:
+        # Los estados del índice ya vienen normalizados por VerificationIndex.
+        return [value for value in VERIFIED_STATES if value in self.index.postings["estado"]]
+
+    def clause_bits(self, clause: Clause) -> int:
+        index = self.index
+        if clause.field in DATE_FIELDS:
+            return index.date_bits(clause.value, verification=clause.field == "fecha_verificacion") or 0
+        if clause.field == "verificadas":
+            values = self._verified_values()
+            facet = "estado"
+        else:
+            facet = self.FACET_FIELDS[clause.field]
+            values = self._matching_values(facet, clause)
+        bits = 0
+        for value in values:
+            bits |= index.value_bits(facet, value)
+        return bits
+
+    def plan(self, query: Query) -> List[Tuple[Clause, Optional[int]]]:
+        """
+        Orden de evaluación: cláusulas positivas indexables de menor a mayor
+        tamaño estimado, luego las negadas y al final las de texto libre.
+        """
+        estimated = [(clause, self.estimate(clause)) for clause in query.clauses]
+        n = len(self.index)
+
+        def cost(item):
+            clause, estimate = item
+            if estimate is None:
+                return (2, clause.negated)
+            return (1, n - estimate) if clause.negated else (0, estimate)
+
+        return sorted(estimated, key=cost)
+
+    def execute(self, query: Query, allowed: Optional[int] = None) -> int:
+        """Bitmap de noticias que cumplen todas las cláusulas (y el filtro ``allowed``)."""
+        index = self.index
+        bits, text_clauses = self._indexed_bits(query, allowed)
+        if text_clauses and bits:
+            needles = [(tuple(fold_text(value) for value in clause.values), clause.negated)
+                       for clause in text_clauses]
+            bits = index._ids_to_bits(
+                doc_id for doc_id in index.iter_ids(bits)
+                if all(any(needle in index.search_text(doc_id) for needle in alternatives) != negated
+                       for alternatives, negated in needles)
+            )
+        return bits
+
+    def execute_many(self, queries: Sequence[Query], allowed: Optional[int] = None) -> List[int]:
+        """
+        Evalúa varias consultas a la vez. Las cláusulas indexables se resuelven
+        por consulta con bitmaps, pero el texto libre de todo el lote se busca
+        en una sola pasada sobre los candidatos con un autómata Aho-Corasick
+        por caracteres, en lugar de recorrer el corpus una vez por consulta.
+        """
+        evaluated = [self._indexed_bits(query, allowed) for query in queries]
+        scope = 0
+        needles = set()
+        for bits, text_clauses in evaluated:
+            if text_clauses and bits:
+                scope |= bits
+                needles.update(fold_text(value) for clause in text_clauses for value in clause.values)
+        matches = self.text_bits(needles, scope) if needles else {}
+
+        results = []
+        for bits, text_clauses in evaluated:
+            for clause in text_clauses:
+                if not bits:
+                    break
+                clause_bits = 0
+                for value in clause.values:
+                    clause_bits |= matches[fold_text(value)]
+                bits = bits & ~clause_bits if clause.negated else bits & clause_bits
+            results.append(bits)
+        return results
+
+    def text_bits(self, needles: Iterable[str], scope: int) -> Dict[str, int]:
+        """Bitmap por subcadena normalizada de las noticias de ``scope`` que la contienen."""
+        index = self.index
+        needles = list(needles)
+        matcher = AhoCorasick()
+        for needle in needles:
+            matcher.add(needle)
+        matcher.build()
+
+        hits: List[List[int]] = [[] for _ in needles]
+        for doc_id in index.iter_ids(scope):
+            found = set()
+            for _, pattern in matcher.iter_matches(index.search_text(doc_id)):
+                if pattern not in found:
+                    found.add(pattern)
+                    hits[pattern].append(doc_id)
+        # El patrón vacío no produce coincidencias en el autómata pero está en cualquier texto.
+        return {needle: scope if not needle else index._ids_to_bits(ids)
+                for needle, ids in zip(needles, hits)}
+
+    def _indexed_bits(self, query: Query, allowed: Optional[int]) -> Tuple[int, List[Clause]]:
+        """Aplica las cláusulas indexables y devuelve el bitmap y las de texto pendientes."""
+        bits = self.index.all_bits if allowed is None else allowed
+        text_clauses = []
+        for clause, estimate in self.plan(query):
+            if not bits:
+                return 0, []
+            if estimate is None:
+                text_clauses.append(clause)
+            elif clause.negated:
+                bits &= ~self.clause_bits(clause)
+            elif estimate == 0:
+                return 0, []
+            else:
+                bits &= self.clause_bits(clause)
+        return bits, text_clauses
+
+    def explain(self, query: Query) -> List[dict]:
+        """Plan legible: cláusulas en orden de evaluación con su estimación."""
+        return [
+            {"field": clause.field, "value": clause.value, "negated": clause.negated,
+             "alternatives": list(clause.alternatives), "estimate": estimate}
+            for clause, estimate in self.plan(query)
+        ]
@@ -0,0 +1,406 @@
+"""
+Resiliencia de las consultas a servicios remotos (DBpedia online).
+Cada endpoint tiene un cortocircuito: tras varios fallos seguidos deja de
+llamarse durante un tiempo y la búsqueda sigue sólo con resultados locales en
+el acto, sin esperar al plazo de lectura. Pasado ese tiempo una única
+petición de prueba decide si vuelve a cerrarse. Con una réplica configurada,
+la petición que tarda más que el percentil reciente del endpoint principal se
+repite contra ella y se usa la primera respuesta correcta. ``HedgedClient``
+usa hilos (WSGI) y ``AsyncHedgedClient`` tareas del bucle (ASGI).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+
+class CircuitOpen(Exception):
+    """Ningún endpoint admite peticiones: todos tienen el circuito abierto."""
+
+
+class ClientError(Exception):
+    """Error atribuible a la petición (HTTP 4xx): no cuenta como fallo del endpoint."""
+
+
+class CircuitBreaker:
+    """Cortocircuito con estados cerrado, abierto y semiabierto (una sola prueba)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            failure_threshold: Fallos seguidos que abren el circuito
+            reset_timeout: Segundos abierto antes de dejar pasar una prueba
+            clock: Reloj monotónico (sustituible al medir)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True si la petición puede salir; en semiabierto sólo la primera."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Anota un fallo; True si con él se acaba de abrir el circuito."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED
+                                                and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+                self.times_opened += 1
+                self._probing = False
+                return True
+            return False
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+
+
+class LatencyWindow:
+    """Últimas ``size`` latencias correctas de un endpoint para estimar percentiles."""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class Endpoint:
+    """Estado de un endpoint: cortocircuito, latencias y contadores."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker, window_size: int):
+        self.url = url
+        self.breaker = breaker
+        self.latencies = LatencyWindow(window_size)
+        self.requests = 0
+        self.failures = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        p50 = self.latencies.percentile(0.5)
+        p95 = self.latencies.percentile(0.95)
+        return {
+            "url": self.url,
+            **self.breaker.get_statistics(),
+            "requests": self.requests,
+            "failures": self.failures,
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class HedgedClient:
+    """
+    Llama a ``call(url, payload)`` contra el primer endpoint con el circuito
+    cerrado. Si no responde antes del percentil ``hedge_percentile`` de sus
+    latencias, lanza la misma petición contra el siguiente (petición cubierta);
+    si falla, pasa al siguiente sin esperar. Nunca espera más que ``deadline``:
+    las peticiones abandonadas terminan en segundo plano por el plazo de su
+    socket y su resultado sigue alimentando el cortocircuito.
+    """
+
+    # Latencias necesarias antes de fiarse del percentil; hasta entonces se cubre a mitad de plazo.
+    MIN_SAMPLES = 20
+
+    def __init__(self, urls: Sequence[str], call: Callable[[str, Any], Any], deadline: float,
+                 failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 hedge_percentile: float = 0.95, hedge_min_delay: float = 0.05,
+                 max_workers: int = 8, window_size: int = 200):
+        """
+        Args:
+            urls: Endpoint principal seguido de sus réplicas
+            call: Función que hace la petición; lanza ClientError si el fallo es de la petición
+            deadline: Segundos máximos que espera quien llama
+            failure_threshold: Fallos seguidos que abren el circuito de un endpoint
+            reset_timeout: Segundos hasta la petición de prueba
+            hedge_percentile: Percentil de latencia tras el que se cubre la petición
+            hedge_min_delay: Espera mínima antes de cubrir
+            max_workers: Peticiones remotas simultáneas
+            window_size: Latencias recientes que se conservan por endpoint
+        """
+        self.endpoints = [Endpoint(url, CircuitBreaker(failure_threshold, reset_timeout), window_size)
+                          for url in urls]
+        self.call = call
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.requests = 0
+        self.short_circuited = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.deadline_exceeded = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Los hilos de las peticiones sólo se crean con la primera consulta online.
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="online")
+        return self._executor
+
+    def hedge_delay(self, endpoint: Endpoint) -> float:
+        """Espera antes de cubrir una petición al endpoint, según sus latencias recientes."""
+        if len(endpoint.latencies) < self.MIN_SAMPLES:
+            return max(self.hedge_min_delay, self.deadline / 2)
+        return max(self.hedge_min_delay, endpoint.latencies.percentile(self.hedge_percentile))
+
+    def _attempt(self, endpoint: Endpoint, payload: Any) -> Any:
+        endpoint.requests += 1
+        start = time.perf_counter()
+        try:
+            result = self.call(endpoint.url, payload)
+        except ClientError:
+            endpoint.breaker.record_success()
+            raise
+        except Exception:
+            self._record_failure(endpoint)
+            raise
+        endpoint.latencies.add(time.perf_counter() - start)
+        endpoint.breaker.record_success()
+        return result
+
+    @staticmethod
+    def _record_failure(endpoint: Endpoint) -> None:
+        endpoint.failures += 1
+        if endpoint.breaker.record_failure():
+            print(f"⚠️  {endpoint.url} no responde: circuito abierto "
+                  f"{endpoint.breaker.reset_timeout:g}s")
+
+    def request(self, payload: Any) -> Any:
+        """
+        Resultado del primer endpoint que responde bien.
+
+        Raises:
+            CircuitOpen: Todos los circuitos están abiertos (no se ha hecho ninguna petición)
+            TimeoutError: Ningún endpoint respondió dentro del plazo
+            ClientError: El endpoint rechazó la petición
+        """
+        self.requests += 1
+        started_at = time.monotonic()
+        deadline_at = started_at + self.deadline
+        remaining = iter(self.endpoints)
+        pending: Dict[Future, Endpoint] = {}
+        launched: List[Endpoint] = []
+        hedge: Optional[Endpoint] = None
+        error: Optional[Exception] = None
+
+        def launch() -> bool:
+            for endpoint in remaining:
+                if endpoint.breaker.allow():
+                    pending[self.executor.submit(self._attempt, endpoint, payload)] = endpoint
+                    launched.append(endpoint)
+                    return True
+            return False
+
+        if not launch():
+            self.short_circuited += 1
+            raise CircuitOpen("todos los endpoints tienen el circuito abierto")
+        hedge_at = started_at + self.hedge_delay(launched[0]) if len(self.endpoints) > 1 else None
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline_at:
+                self.deadline_exceeded += 1
+                raise TimeoutError(f"sin respuesta en {self.deadline:g}s")
+            wake_at = deadline_at if hedge_at is None else min(hedge_at, deadline_at)
+            done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                endpoint = pending.pop(future)
+                try:
+                    result = future.result()
+                except ClientError:
+                    raise
+                except Exception as e:
+                    error = e
+                    if launch():
+                        self.failovers += 1
+                    continue
+                if endpoint is hedge:
+                    self.hedge_wins += 1
+                return result
+            if not done and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                if launch():
+                    hedge = launched[-1]
+                    self.hedged += 1
+        raise error if error is not None else CircuitOpen("sin endpoints disponibles")
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "short_circuited": self.short_circuited,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "deadline_exceeded": self.deadline_exceeded,
+            "endpoints": [endpoint.get_statistics() for endpoint in self.endpoints]
+        }
+
+
+class AsyncHedgedClient(HedgedClient):
+    """
+    ``HedgedClient`` para el bucle de asyncio: ``call(url, payload)`` es una
+    corrutina y cada intento es una tarea. Misma política de cortocircuito,
+    réplicas, cobertura y plazo; las tareas abandonadas siguen en segundo
+    plano hasta el plazo de su socket y su resultado alimenta el cortocircuito.
+    """
+
+    def __init__(self, urls: Sequence[str], call: Callable[[str, Any], Awaitable[Any]], deadline: float,
+                 **kwargs):
+        super().__init__(urls, call, deadline, **kwargs)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _attempt(self, endpoint: Endpoint, payload: Any) -> Any:
+        endpoint.requests += 1
+        start = time.perf_counter()
+        healthy = False
+        try:
+            result = await self.call(endpoint.url, payload)
+            healthy = True
+        except ClientError:
+            healthy = True
+            raise
+        finally:
+            # Una cancelación también cuenta como fallo: si no, la petición de
+            # prueba del estado semiabierto no se liberaría nunca.
+            if healthy:
+                endpoint.breaker.record_success()
+            else:
+                self._record_failure(endpoint)
+        endpoint.latencies.add(time.perf_counter() - start)
+        return result
+
+    def _settled(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled():
+            # Ya contabilizada en ``_attempt``; se recoge para que asyncio no avise.
+            task.exception()
+
+    async def request(self, payload: Any) -> Any:
+        """
+        Resultado del primer endpoint que responde bien.
+
+        Raises:
+            CircuitOpen: Todos los circuitos están abiertos (no se ha hecho ninguna petición)
+            TimeoutError: Ningún endpoint respondió dentro del plazo
+            ClientError: El endpoint rechazó la petición
+        """
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        deadline_at = started_at + self.deadline
+        remaining = iter(self.endpoints)
+        pending: Dict[asyncio.Task, Endpoint] = {}
+        launched: List[Endpoint] = []
+        hedge: Optional[Endpoint] = None
+        error: Optional[Exception] = None
+
+        def launch() -> bool:
+            for endpoint in remaining:
+                if endpoint.breaker.allow():
+                    task = loop.create_task(self._attempt(endpoint, payload))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._settled)
+                    pending[task] = endpoint
+                    launched.append(endpoint)
+                    return True
+            return False
+
+        if not launch():
+            self.short_circuited += 1
+            raise CircuitOpen("todos los endpoints tienen el circuito abierto")
+        hedge_at = started_at + self.hedge_delay(launched[0]) if len(self.endpoints) > 1 else None
+
+        while pending:
+            now = loop.time()
+            if now >= deadline_at:
+                self.deadline_exceeded += 1
+                raise TimeoutError(f"sin respuesta en {self.deadline:g}s")
+            wake_at = deadline_at if hedge_at is None else min(hedge_at, deadline_at)
+            done, _ = await asyncio.wait(list(pending), timeout=max(0.0, wake_at - now),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                endpoint = pending.pop(task)
+                try:
+                    result = task.result()
+                except ClientError:
+                    raise
+                except Exception as e:
+                    error = e
+                    if launch():
+                        self.failovers += 1
+                    continue
+                if endpoint is hedge:
+                    self.hedge_wins += 1
+                return result
+            if not done and hedge_at is not None and loop.time() >= hedge_at:
+                hedge_at = None
+                if launch():
+                    hedge = launched[-1]
+                    self.hedged += 1
+        raise error if error is not None else CircuitOpen("sin endpoints disponibles")
+
+    def close(self) -> None:
+        """Cancela las peticiones que siguen en curso (al cerrar el cliente HTTP)."""
+        for task in list(self._tasks):
+            task.cancel()
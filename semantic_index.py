@@ -0,0 +1,377 @@
+"""
+Búsqueda semántica local con vectores densos.
+Calcula embeddings LSA (TF-IDF + SVD truncada) de noticias y resúmenes de
+DBpedia sin conexión, los guarda en una matriz float32 mapeable en memoria y
+responde consultas top-k por coseno con un índice IVF aproximado.
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from news_index import NewsIndex, fold_text, tokenize
+
+
+STOPWORDS = {
+    "los", "las", "del", "por", "para", "con", "una", "uno", "unos", "unas", "que", "como",
+    "más", "mas", "pero", "sus", "sobre", "entre", "este", "esta", "estos", "estas", "ese",
+    "esa", "fue", "son", "han", "hay", "ser", "sin", "desde", "the", "and", "for", "with",
+    "from", "that", "this", "are", "was", "were", "has", "have", "its", "dos", "das", "nos",
+    "nas", "uma", "não", "nao", "com", "pelo", "pela"
+}
+
+
+def analyze(text: str) -> List[str]:
+    """Tokens normalizados sin acentos ni palabras vacías."""
+    return [t for t in tokenize(fold_text(text)) if t not in STOPWORDS]
+
+
+class SparseMatrix:
+    """Matriz dispersa CSR mínima con los productos que necesita la SVD aleatorizada."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, shape: Tuple[int, int]):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = shape
+        self._rows = np.repeat(np.arange(shape[0]), np.diff(indptr))
+
+    @staticmethod
+    def _scatter(targets: np.ndarray, sources: np.ndarray, data: np.ndarray,
+                 dense: np.ndarray, n_rows: int) -> np.ndarray:
+        # Un bincount por columna es bastante más rápido que np.add.at o reduceat.
+        columns = np.ascontiguousarray(dense.T)
+        out = np.empty((n_rows, dense.shape[1]), dtype=np.float64)
+        for c in range(dense.shape[1]):
+            out[:, c] = np.bincount(targets, weights=data * columns[c][sources], minlength=n_rows)
+        return out
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """A @ dense"""
+        return self._scatter(self._rows, self.indices, self.data, dense, self.shape[0])
+
+    def tdot(self, dense: np.ndarray) -> np.ndarray:
+        """A.T @ dense"""
+        return self._scatter(self.indices, self._rows, self.data, dense, self.shape[1])
+
+
+def randomized_svd(matrix: SparseMatrix, rank: int, n_iter: int = 4,
+                   oversamples: int = 10, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """SVD truncada aleatorizada (Halko et al.) sobre una matriz dispersa."""
+    rng = np.random.default_rng(seed)
+    size = min(rank + oversamples, min(matrix.shape))
+    basis, _ = np.linalg.qr(matrix.dot(rng.standard_normal((matrix.shape[1], size))))
+    for _ in range(n_iter):
+        basis, _ = np.linalg.qr(matrix.tdot(basis))
+        basis, _ = np.linalg.qr(matrix.dot(basis))
+    small = matrix.tdot(basis).T
+    u_small, singular, vt = np.linalg.svd(small, full_matrices=False)
+    return (basis @ u_small)[:, :rank], singular[:rank], vt[:rank]
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Índice de ficheros invertidos (IVF) para búsqueda aproximada por coseno.
+
+    Los vectores se agrupan con k-means esférico; una consulta sólo compara
+    contra los miembros de las ``n_probe`` listas con centroide más cercano.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, n_probe: int = 16):
+        self.centroids = centroids
+        self.assignments = assignments
+        self.n_probe = n_probe
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 16,
+              iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        n_lists = n_lists or max(1, int(4 * math.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), 64 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = cls._nearest(sample, centroids)
+            sums = np.zeros_like(centroids, dtype=np.float64)
+            for d in range(sample.shape[1]):
+                sums[:, d] = np.bincount(labels, weights=sample[:, d], minlength=n_lists)
+            empty = np.bincount(labels, minlength=n_lists) == 0
+            sums[empty] = centroids[empty]
+            centroids = normalize_rows(sums)
+
+        return cls(centroids, cls._nearest(vectors, centroids), n_probe)
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk):
+            labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return labels
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, k: int,
+               n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        candidates = np.concatenate([self.lists[p] for p in probes])
+        return top_k(vectors[candidates] @ query, k, candidates)
+
+
+def top_k(scores: np.ndarray, k: int, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Los ``k`` mayores puntajes ordenados de mayor a menor."""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best])]
+    return (ids[best] if ids is not None else best), scores[best]
+
+
+class SemanticIndex:
+    """Embeddings LSA de noticias y recursos DBpedia con búsqueda top-k por coseno."""
+
+    # Por debajo de este tamaño el recorrido exacto es más rápido que el IVF.
+    EXACT_SEARCH_LIMIT = 2048
+    # Cosenos por debajo de este valor se consideran sin relación.
+    MIN_SCORE = 1e-3
+
+    def __init__(self, keys: List[str], kinds: List[str], vocabulary: Dict[str, int],
+                 idf: np.ndarray, term_vectors: np.ndarray, embeddings: np.ndarray,
+                 ivf: Optional[IVFIndex] = None, fingerprint: str = ""):
+        self.keys = keys
+        self.kinds = kinds
+        self.rows = {key: i for i, key in enumerate(keys)}
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.term_vectors = term_vectors
+        self.embeddings = embeddings
+        self.ivf = ivf
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, items: List[Tuple[str, str, str]], dims: int = 100,
+              min_df: int = 1, max_features: int = 50000) -> "SemanticIndex":
+        """
+        Construye el índice a partir de tuplas (clave, tipo, texto).
+
+        Args:
+            items: Documentos a indexar
+            dims: Dimensiones de la proyección LSA
+            min_df: Frecuencia documental mínima de un término
+            max_features: Tamaño máximo del vocabulario
+        """
+        tokenized = [analyze(text) for _, _, text in items]
+        df: Dict[str, int] = {}
+        for tokens in tokenized:
+            for token in set(tokens):
+                df[token] = df.get(token, 0) + 1
+        terms = sorted((t for t, c in df.items() if c >= min_df), key=lambda t: (-df[t], t))[:max_features]
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        idf = np.array([math.log((1 + len(items)) / (1 + df[t])) + 1 for t in sorted(terms)], dtype=np.float32)
+
+        matrix = cls._tfidf_matrix(tokenized, vocabulary, idf)
+        # En corpus pequeños una proyección casi de rango completo no generaliza.
+        rank = max(1, min(dims, min(matrix.shape) // 2))
+        _, _, vt = randomized_svd(matrix, rank)
+        term_vectors = vt.T.astype(np.float32)
+        embeddings = normalize_rows(matrix.dot(term_vectors))
+
+        ivf = IVFIndex.train(embeddings) if len(items) > cls.EXACT_SEARCH_LIMIT else None
+        return cls([k for k, _, _ in items], [kind for _, kind, _ in items], vocabulary, idf,
+                   term_vectors, embeddings, ivf, items_fingerprint(items, dims))
+
+    @staticmethod
+    def _tfidf_matrix(tokenized: List[List[str]], vocabulary: Dict[str, int], idf: np.ndarray) -> SparseMatrix:
+        indptr, indices, data = [0], [], []
+        for tokens in tokenized:
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                column = vocabulary.get(token)
+                if column is not None:
+                    counts[column] = counts.get(column, 0) + 1
+            weights = {c: (1 + math.log(n)) * idf[c] for c, n in counts.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for column in sorted(weights):
+                indices.append(column)
+                data.append(weights[column] / norm)
+            indptr.append(len(indices))
+        return SparseMatrix(np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64),
+                            np.array(data, dtype=np.float64), (len(tokenized), len(vocabulary)))
+
+    def embed_query(self, text: str) -> Optional[np.ndarray]:
+        """Proyecta una consulta al espacio LSA; None si no comparte vocabulario."""
+        counts: Dict[int, int] = {}
+        for token in analyze(text):
+            column = self.vocabulary.get(token)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        if not counts:
+            return None
+        columns = np.fromiter(counts, dtype=np.int64)
+        weights = np.array([(1 + math.log(counts[c])) * self.idf[c] for c in counts], dtype=np.float32)
+        vector = weights @ self.term_vectors[columns]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def search(self, text: str, k: int = 10, kind: Optional[str] = None,
+               exact: bool = False) -> List[Tuple[str, float]]:
+        """
+        Devuelve los ``k`` documentos más similares a la consulta.
+
+        Args:
+            text: Texto de la consulta
+            k: Número de resultados
+            kind: Restringe a "noticia" o "dbpedia"
+            exact: Fuerza el recorrido exacto en lugar del IVF
+        """
+        query = self.embed_query(text)
+        if query is None:
+            return []
+        fetch = k if kind is None else k * 4
+        if self.ivf is None or exact:
+            ids, scores = top_k(self.embeddings @ query, fetch)
+        else:
+            ids, scores = self.ivf.search(self.embeddings, query, fetch)
+        hits = [(self.keys[i], float(s)) for i, s in zip(ids, scores)
+                if s > self.MIN_SCORE and (kind is None or self.kinds[i] == kind)]
+        return hits[:k]
+
+    def similarity(self, text: str, keys: Iterable[str]) -> Dict[str, float]:
+        """Coseno entre la consulta y un conjunto concreto de documentos."""
+        query = self.embed_query(text)
+        keys = [key for key in keys if key in self.rows]
+        if query is None or not keys:
+            return {}
+        rows = np.array([self.rows[key] for key in keys])
+        return dict(zip(keys, (self.embeddings[rows] @ query).tolist()))
+
+    def save(self, directory: str) -> None:
+        """
+        Guarda el índice; los embeddings quedan como float32 crudo mapeable.
+        Cada fichero se escribe aparte y se mueve a su sitio con ``os.replace``
+        (``meta.json`` el último): un índice cargado antes sigue leyendo su
+        fichero de embeddings, que nunca se trunca. El nombre de ese fichero
+        lleva la huella del corpus para que ``meta.json`` y los embeddings que
+        describe no puedan mezclarse con los de otra versión.
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        embeddings_name = f"embeddings-{self.fingerprint[:16]}.f32"
+        arrays = {"term_vectors.npy": self.term_vectors, "idf.npy": self.idf}
+        if self.ivf is not None:
+            arrays.update({"centroids.npy": self.ivf.centroids, "assignments.npy": self.ivf.assignments})
+        meta = {
+            "fingerprint": self.fingerprint,
+            "dims": int(self.embeddings.shape[1]),
+            "embeddings": embeddings_name,
+            "keys": self.keys,
+            "kinds": self.kinds,
+            "vocabulary": self.vocabulary
+        }
+
+        staging = Path(tempfile.mkdtemp(prefix=".semantic-", dir=path))
+        try:
+            np.ascontiguousarray(self.embeddings, dtype=np.float32).tofile(staging / embeddings_name)
+            for name, array in arrays.items():
+                np.save(staging / name, array)
+            with open(staging / "meta.json", 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            for name in [embeddings_name, *arrays]:
+                os.replace(staging / name, path / name)
+            if self.ivf is None:
+                for name in ("centroids.npy", "assignments.npy"):
+                    (path / name).unlink(missing_ok=True)
+            os.replace(staging / "meta.json", path / "meta.json")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        # Los embeddings de versiones anteriores: en POSIX un mapeo vivo sigue
+        # siendo válido tras borrar el nombre; donde no se puede, se deja.
+        for stale in path.glob("embeddings*.f32"):
+            if stale.name != embeddings_name:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, directory: str) -> "SemanticIndex":
+        """Carga un índice guardado mapeando los embeddings en memoria."""
+        path = Path(directory)
+        with open(path / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        embeddings = np.memmap(path / meta.get("embeddings", "embeddings.f32"), dtype=np.float32, mode="r",
+                               shape=(len(meta["keys"]), meta["dims"]))
+        ivf = None
+        if (path / "centroids.npy").exists():
+            ivf = IVFIndex(np.load(path / "centroids.npy"), np.load(path / "assignments.npy"))
+        return cls(meta["keys"], meta["kinds"], meta["vocabulary"], np.load(path / "idf.npy"),
+                   np.load(path / "term_vectors.npy"), embeddings, ivf, meta["fingerprint"])
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del índice."""
+        return {
+            "documents": len(self.keys),
+            "dimensions": int(self.embeddings.shape[1]),
+            "vocabulary": len(self.vocabulary),
+            "ivf_lists": len(self.ivf.centroids) if self.ivf is not None else 0
+        }
+
+
+def items_fingerprint(items: List[Tuple[str, str, str]], dims: int) -> str:
+    digest = hashlib.sha1(f"lsa:{dims}".encode("utf-8"))
+    for key, kind, text in items:
+        digest.update(f"{key}\x1f{kind}\x1f{text}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def semantic_items(news_index: NewsIndex, dbpedia_index=None) -> List[Tuple[str, str, str]]:
+    """Documentos a embeber: título, temáticas y texto de cada noticia y resúmenes de DBpedia."""
+    items = [
+        (record.uri, "noticia", " ".join([record.titulo, *record.tematicas, record.texto]))
+        for record in news_index.records
+    ]
+    if dbpedia_index is not None:
+        items.extend(
+            (resource.uri, "dbpedia", f"{resource.label} {resource.abstract}")
+            for resource in dbpedia_index.resources.values()
+        )
+    return items
+
+
+def load_or_build_semantic_index(news_index: NewsIndex, dbpedia_index=None,
+                                 directory: str = "data/semantic", dims: int = 100) -> SemanticIndex:
+    """Reutiliza el índice guardado si corresponde al mismo corpus; si no, lo reconstruye."""
+    items = semantic_items(news_index, dbpedia_index)
+    fingerprint = items_fingerprint(items, dims)
+    try:
+        index = SemanticIndex.load(directory)
+        if index.fingerprint == fingerprint:
+            print(f"✓ Índice semántico cargado: {len(index.keys)} documentos")
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = SemanticIndex.build(items, dims=dims)
+    try:
+        index.save(directory)
+    except OSError as e:
+        print(f"⚠️  No se pudo guardar el índice semántico: {e}")
+    print(f"✓ Índice semántico construido: {len(index.keys)} documentos")
+    return index
@@ -0,0 +1,334 @@
+"""
+Modo particionado del buscador de noticias.
+Las noticias se reparten en N particiones (por hash de la URI o por rangos de
+fecha de publicación), cada una servida por un proceso con su propio
+NewsIndex. Las búsquedas se difunden a todas las particiones y se combinan
+con una mezcla k-aria por fecha; si una partición no responde a tiempo se
+devuelven los resultados parciales del resto.
+Cada proceso recibe sólo sus noticias y las tripletas que las describen, y
+calcula el detalle de ``/noticia`` bajo demanda; el coordinador conserva lo
+necesario para encaminar (propietario de cada URI y cortes de fecha). Una
+partición cuyo proceso termina se marca como caída y deja de esperarse.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import threading
+import zlib
+from bisect import bisect_right
+from concurrent.futures import Future, wait
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDFS
+
+from news_index import UNDATED, NewsIndex, NewsRecord, infer_properties, news_details
+from query_parser import Clause, Query, QueryPlanner
+from sparql_endpoint import START_METHOD
+
+
+PARTITIONS = ("hash", "date")
+
+
+def hash_shard(uri: str, n_shards: int) -> int:
+    """Partición estable entre procesos (``hash()`` de Python cambia con cada arranque)."""
+    return zlib.crc32(uri.encode("utf-8")) % n_shards
+
+
+def order_key(fecha: str, uri: str) -> Tuple[str, str]:
+    """Misma clave con la que NewsIndex asigna ids: fecha y, a igualdad, URI."""
+    return (fecha if fecha != UNDATED else "", uri)
+
+
+def sort_key(result: dict) -> Tuple[str, str]:
+    return order_key(result["fecha"], result["uri"])
+
+
+def date_boundaries(records: List[NewsRecord], n_shards: int) -> List[Tuple[str, str]]:
+    """
+    Puntos de corte en el orden (fecha, URI) para que cada partición reciba un
+    número similar de noticias aunque muchas compartan fecha o no la tengan.
+    """
+    keys = sorted(order_key(record.fecha, record.uri) for record in records)
+    if not keys:
+        return []
+    return [keys[len(keys) * i // n_shards] for i in range(1, n_shards)]
+
+
+def partition_triples(graph: Graph, uris: Iterable[str]) -> list:
+    """
+    Tripletas que necesita una partición para el detalle de sus noticias: las
+    de cada noticia y las de subclase y dominio con las que se infieren propiedades.
+    """
+    triples = [triple for uri in uris for triple in graph.triples((URIRef(uri), None, None))]
+    triples.extend(graph.triples((None, RDFS.subClassOf, None)))
+    triples.extend(graph.triples((None, RDFS.domain, None)))
+    return triples
+
+
+def merge_results(shard_results: Iterable[List[dict]], limit: Optional[int] = None,
+                  key=sort_key) -> List[dict]:
+    """Mezcla k-aria de listas ya ordenadas de forma descendente según ``key``."""
+    merged = heapq.merge(*shard_results, key=key, reverse=True)
+    return list(itertools.islice(merged, limit))
+
+
+class ShardSearcher:
+    """Índice y búsqueda de una sola partición; vive dentro del proceso trabajador."""
+
+    def __init__(self, records: List[NewsRecord], triples: Optional[list]):
+        self.index = NewsIndex(records)
+        self.planner = QueryPlanner(self.index)
+        self.graph: Optional[Graph] = None
+        if triples is not None:
+            self.graph = Graph()
+            for triple in triples:
+                self.graph.add(triple)
+
+    def search(self, clauses: List[Clause], filters: Optional[dict],
+               limit: Optional[int]) -> List[dict]:
+        bits = self.planner.execute(Query(list(clauses)), self.index.filter_bits(filters))
+        return self.index.results(bits, limit)
+
+    def search_many(self, batch: List[List[Clause]], filters: Optional[dict],
+                    limit: Optional[int]) -> List[List[dict]]:
+        queries = [Query(list(clauses)) for clauses in batch]
+        return [self.index.results(bits, limit)
+                for bits in self.planner.execute_many(queries, self.index.filter_bits(filters))]
+
+    def detail(self, uri: str) -> Optional[tuple]:
+        if self.graph is None or uri not in self.index.doc_ids:
+            return None
+        return news_details(self.graph, uri), infer_properties(self.graph, URIRef(uri))
+
+
+def serve_shard(connection, records: List[NewsRecord], triples: Optional[list]) -> None:
+    """Bucle del proceso trabajador: atiende peticiones ``(id, operación, args)`` en orden."""
+    searcher = ShardSearcher(records, triples)
+    connection.send((None, "ready", len(records)))
+    while True:
+        try:
+            request_id, operation, args = connection.recv()
+        except EOFError:
+            return
+        if operation == "stop":
+            return
+        try:
+            if operation == "search":
+                reply = searcher.search(*args)
+            elif operation == "search_many":
+                reply = searcher.search_many(*args)
+            elif operation == "detail":
+                reply = searcher.detail(*args)
+            else:
+                reply = searcher.index.get_statistics()
+            connection.send((request_id, "ok", reply))
+        except Exception as e:
+            connection.send((request_id, "error", str(e)))
+
+
+class ShardedNewsSearch:
+    """Coordinador: reparte las noticias, difunde consultas y reúne las respuestas."""
+
+    def __init__(self, records: List[NewsRecord], graph: Optional[Graph], n_shards: int,
+                 partition: str = "hash", timeout: float = 2.0):
+        """
+        Args:
+            records: Noticias del corpus completo
+            graph: Grafo del que cada partición copia las tripletas de sus noticias
+                   para el detalle de ``/noticia`` (None: el detalle se calcula fuera)
+            n_shards: Número de particiones/procesos
+            partition: "hash" o "date"
+            timeout: Segundos de espera por partición antes de devolver resultados parciales
+        """
+        if partition not in PARTITIONS:
+            raise ValueError(f"partición desconocida: {partition}")
+        self.n_shards = n_shards
+        self.partition = partition
+        self.timeout = timeout
+        self.boundaries = date_boundaries(records, n_shards) if partition == "date" else []
+
+        buckets: List[List[NewsRecord]] = [[] for _ in range(n_shards)]
+        self.owners: Dict[str, int] = {}
+        for record in records:
+            shard = self.shard_for(record)
+            buckets[shard].append(record)
+            self.owners[record.uri] = shard
+
+        self._ids = itertools.count()
+        # Petición -> (partición, futuro), para fallar las de una partición que cae.
+        self._pending: Dict[int, Tuple[int, Future]] = {}
+        self._pending_lock = threading.Lock()
+        self.dead: Set[int] = set()
+        self._closed = False
+        self.partial_responses = 0
+        self.queries = 0
+
+        # Sin fork: el proceso web tiene hilos y el hijo heredaría el grafo entero.
+        context = multiprocessing.get_context(START_METHOD)
+        self.processes = []
+        self.connections = []
+        self._send_locks = []
+        for shard, bucket in enumerate(buckets):
+            parent, child = context.Pipe()
+            triples = partition_triples(graph, (r.uri for r in bucket)) if graph is not None else None
+            process = context.Process(target=serve_shard, args=(child, bucket, triples),
+                                      name=f"news-shard-{shard}", daemon=True)
+            process.start()
+            child.close()
+            self.processes.append(process)
+            self.connections.append(parent)
+            self._send_locks.append(threading.Lock())
+        self.shard_sizes = [len(bucket) for bucket in buckets]
+        for shard, connection in enumerate(self.connections):
+            try:
+                connection.recv()  # "ready"
+            except (EOFError, OSError):
+                self._mark_dead(shard)
+                continue
+            threading.Thread(target=self._read_replies, args=(shard, connection),
+                             name=f"news-shard-reader-{shard}", daemon=True).start()
+
+    def shard_for(self, record: NewsRecord) -> int:
+        if self.partition == "date":
+            return bisect_right(self.boundaries, order_key(record.fecha, record.uri))
+        return hash_shard(record.uri, self.n_shards)
+
+    def _read_replies(self, shard: int, connection) -> None:
+        while True:
+            try:
+                request_id, status, reply = connection.recv()
+            except (EOFError, OSError):
+                self._mark_dead(shard)
+                return
+            with self._pending_lock:
+                _, future = self._pending.pop(request_id, (shard, None))
+            # Las respuestas que llegan después del plazo se descartan.
+            if future is not None:
+                if status == "ok":
+                    future.set_result(reply)
+                else:
+                    future.set_exception(RuntimeError(reply))
+
+    def _mark_dead(self, shard: int) -> None:
+        """
+        La partición deja de recibir peticiones y las que esperaban su respuesta
+        fallan ya, sin agotar el plazo. Sus noticias faltan hasta la siguiente
+        generación, que vuelve a crear los procesos.
+        """
+        with self._pending_lock:
+            if shard not in self.dead and not self._closed:
+                self.dead.add(shard)
+                print(f"⚠️  La partición {shard} terminó: se omite hasta la próxima recarga")
+            stale = [key for key, (owner, _) in self._pending.items() if owner == shard]
+            futures = [self._pending.pop(key)[1] for key in stale]
+        for future in futures:
+            future.set_exception(ConnectionError(f"la partición {shard} terminó"))
+
+    def _request(self, shard: int, operation: str, *args) -> Future:
+        future = Future()
+        request_id = next(self._ids)
+        with self._pending_lock:
+            if shard in self.dead:
+                future.set_exception(ConnectionError(f"la partición {shard} terminó"))
+                return future
+            self._pending[request_id] = (shard, future)
+        try:
+            with self._send_locks[shard]:
+                self.connections[shard].send((request_id, operation, args))
+        except (OSError, ValueError) as e:
+            # Proceso caído: la partición cuenta como sin respuesta.
+            self._forget([future])
+            future.set_exception(e)
+        return future
+
+    def _forget(self, futures: Iterable[Future]) -> None:
+        with self._pending_lock:
+            stale = [key for key, (_, value) in self._pending.items() if value in futures]
+            for key in stale:
+                del self._pending[key]
+
+    def search(self, clauses: List[Clause], filters: Optional[dict] = None,
+               limit: Optional[int] = None) -> Tuple[List[dict], List[int]]:
+        """
+        Difunde la consulta a todas las particiones y mezcla las respuestas.
+
+        Returns:
+            Tupla (resultados de la más reciente a la más antigua, particiones sin respuesta)
+        """
+        self.queries += 1
+        shard_results, missing = self._broadcast("search", clauses, filters, limit)
+        return merge_results(shard_results, limit), missing
+
+    def search_many(self, batch: List[List[Clause]], filters: Optional[dict] = None,
+                    limit: Optional[int] = None) -> Tuple[List[List[dict]], List[int]]:
+        """
+        Difunde un lote de consultas en un solo mensaje por partición y mezcla
+        las respuestas de cada consulta por separado.
+
+        Returns:
+            Tupla (resultados por consulta, particiones sin respuesta)
+        """
+        self.queries += len(batch)
+        shard_results, missing = self._broadcast("search_many", batch, filters, limit)
+        if not shard_results:
+            return [[] for _ in batch], missing
+        return [merge_results(per_query, limit) for per_query in zip(*shard_results)], missing
+
+    def _broadcast(self, operation: str, *args) -> Tuple[List[Any], List[int]]:
+        futures = [self._request(shard, operation, *args) for shard in range(self.n_shards)]
+        done, not_done = wait(futures, timeout=self.timeout)
+        if not_done:
+            self._forget(not_done)
+
+        shard_results = []
+        missing = []
+        for shard, future in enumerate(futures):
+            if future in done and future.exception() is None:
+                shard_results.append(future.result())
+            else:
+                missing.append(shard)
+        if missing:
+            self.partial_responses += 1
+            print(f"⚠️  Resultados parciales: sin respuesta de las particiones {missing}")
+        return shard_results, missing
+
+    def detail(self, uri: str) -> Optional[tuple]:
+        """Consulta el detalle sólo en la partición propietaria de la noticia."""
+        shard = self.owners.get(uri)
+        if shard is None:
+            return None
+        future = self._request(shard, "detail", uri)
+        done, _ = wait([future], timeout=self.timeout)
+        if not done:
+            self._forget([future])
+            return None
+        return future.result() if future.exception() is None else None
+
+    def close(self) -> None:
+        self._closed = True
+        for lock, connection in zip(self._send_locks, self.connections):
+            try:
+                with lock:
+                    connection.send((None, "stop", ()))
+            except (OSError, ValueError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del modo particionado."""
+        return {
+            "shards": self.n_shards,
+            "partition": self.partition,
+            "shard_sizes": self.shard_sizes,
+            "queries": self.queries,
+            "partial_responses": self.partial_responses,
+            "dead": sorted(self.dead),
+            "alive": sum(process.is_alive() for process in self.processes)
+        }
@@ -0,0 +1,495 @@
+"""
+Endpoint SPARQL local de sólo lectura sobre la ontología cargada.
+Las consultas se ejecutan en procesos aparte: un proceso que supera el tiempo
+de CPU o el plazo de la petición se descarta y se sustituye, sin bloquear a
+los trabajadores web. Los resultados se limitan a un número máximo de filas
+y se guardan en caché por texto normalizado de la consulta y versión del
+grafo, de modo que una recarga de la ontología invalida la caché sola.
+Los procesos sólo se renuevan cuando cambia la base del grafo (otro fichero
+SQLite o un grafo en memoria recargado o compactado): las capas de la ingesta
+se envían a cada trabajador con la consulta que las necesita por primera vez.
+Los procesos no se crean con fork: el proceso web tiene hilos y el hijo podría
+heredar un cerrojo tomado por otro; se usa forkserver (o spawn donde no existe).
+"""
+
+import csv
+import io
+import multiprocessing
+import pickle
+import queue
+import re
+import signal
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+
+try:
+    import resource
+except ImportError:  # no disponible en Windows: sólo queda el plazo de la petición
+    resource = None
+
+
+RESULT_FORMATS = {
+    "json": "application/sparql-results+json",
+    "csv": "text/csv",
+}
+GRAPH_FORMAT = "application/n-triples"
+FORMAT_ALIASES = {
+    "json": "json", "application/sparql-results+json": "json", "application/json": "json",
+    "csv": "csv", "text/csv": "csv",
+}
+
+# Cadenas (también las de triple comilla, que pueden contener saltos de línea y
+# almohadillas), IRIs y comentarios se tratan como unidades al normalizar la consulta.
+QUERY_TOKENS = re.compile(r'("""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\''
+                          r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>"{}|^`\\\s]*>|#[^\n]*|\s+)')
+# SERVICE haría que el servidor consultara otros endpoints por cuenta del cliente.
+FORBIDDEN_KEYWORDS = re.compile(r"\bSERVICE\b", re.IGNORECASE)
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class QueryError(Exception):
+    """Consulta rechazada o fallida; ``status`` es el código HTTP a devolver."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _CPULimitExceeded(BaseException):
+    # No hereda de Exception para que ningún ``except Exception`` de rdflib la absorba.
+    pass
+
+
+def normalize_query(text: str) -> str:
+    """Texto canónico para la caché: sin comentarios y con los espacios colapsados."""
+    parts = []
+    for piece in QUERY_TOKENS.split(text):
+        if not piece:
+            continue
+        if piece.isspace() or piece.startswith("#"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        else:
+            parts.append(piece)
+    return "".join(parts).strip()
+
+
+def term_json(term) -> Dict[str, str]:
+    """Término RDF en el formato de resultados SPARQL 1.1 JSON."""
+    if isinstance(term, URIRef):
+        return {"type": "uri", "value": str(term)}
+    if isinstance(term, BNode):
+        return {"type": "bnode", "value": str(term)}
+    value = {"type": "literal", "value": str(term)}
+    if isinstance(term, Literal):
+        if term.language:
+            value["xml:lang"] = term.language
+        elif term.datatype:
+            value["datatype"] = str(term.datatype)
+    return value
+
+
+def run_query(graph: Graph, text: str, max_rows: int) -> Dict[str, Any]:
+    """Ejecuta la consulta y la convierte a un documento serializable con, como mucho, ``max_rows`` filas."""
+    result = graph.query(text)
+    if result.type == "ASK":
+        return {"head": {}, "boolean": bool(result.askAnswer)}
+    if result.type in ("CONSTRUCT", "DESCRIBE"):
+        triples = list(result.graph)
+        lines = [f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in triples[:max_rows]]
+        return {"graph": "\n".join(lines) + ("\n" if lines else ""), "truncated": len(triples) > max_rows}
+
+    variables = [str(var) for var in result.vars]
+    bindings = []
+    truncated = False
+    for row in result:
+        if len(bindings) >= max_rows:
+            truncated = True
+            break
+        bindings.append({var: term_json(value) for var, value in zip(variables, row) if value is not None})
+    return {"head": {"vars": variables}, "results": {"bindings": bindings}, "truncated": truncated}
+
+
+def to_csv(document: Dict[str, Any]) -> str:
+    """Resultados SPARQL 1.1 CSV: cabecera con las variables y valores sin tipo."""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\r\n")
+    if "boolean" in document:
+        writer.writerow(["_askResult"])
+        writer.writerow(["true" if document["boolean"] else "false"])
+        return out.getvalue()
+    variables = document["head"]["vars"]
+    writer.writerow(variables)
+    for binding in document["results"]["bindings"]:
+        writer.writerow([
+            ("_:" if binding[var]["type"] == "bnode" else "") + binding[var]["value"] if var in binding else ""
+            for var in variables
+        ])
+    return out.getvalue()
+
+
+def _raise_cpu_limit(signum, frame):
+    raise _CPULimitExceeded()
+
+
+def serve_queries(connection, source, cpu_seconds: float, max_rows: int) -> None:
+    """
+    Bucle del proceso trabajador. ``source`` es la ruta del almacén SQLite, que
+    cada trabajador abre en sólo lectura, o el grafo en memoria serializado con
+    pickle. Cada mensaje es ``(consulta, tripletas)``: las tripletas ingeridas
+    que aún no tenía se añaden a su copia del grafo antes de ejecutarla.
+    """
+    import rdflib.plugins.sparql
+
+    # FROM <url> no debe descargar grafos remotos.
+    rdflib.plugins.sparql.SPARQL_LOAD_GRAPHS = False
+    if isinstance(source, str):
+        from sqlite_store import open_graph
+        graph = open_graph(source, read_only=True)
+    else:
+        graph = pickle.loads(source)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    connection.send(("ready", None))
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        text, triples = message
+        for triple in triples:
+            graph.add(triple)
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            # El límite de CPU es acumulado: se renueva antes de cada consulta.
+            soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+            if hard != resource.RLIM_INFINITY:
+                soft = min(soft, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+        try:
+            reply = ("ok", run_query(graph, text, max_rows))
+        except _CPULimitExceeded:
+            reply = ("cpu", f"la consulta superó {cpu_seconds:g}s de CPU")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        connection.send(reply)
+
+
+class _Worker:
+    def __init__(self, context, source, cpu_seconds: float, max_rows: int, name: str):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=serve_queries, args=(child, source, cpu_seconds, max_rows),
+                                       name=name, daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.started = time.monotonic()
+        # Capas de la ingesta que ya se añadieron a su copia del grafo.
+        self.layers: Tuple[Graph, ...] = ()
+
+    def wait_ready(self, timeout: float) -> bool:
+        if not self.ready and self.connection.poll(timeout):
+            self.ready = self.connection.recv()[0] == "ready"
+        return self.ready
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.connection.close()
+
+    def close(self) -> None:
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+        self.connection.close()
+
+
+def graph_base(graph: Graph) -> Tuple[Any, Tuple[Graph, ...]]:
+    """
+    Base del grafo para los trabajadores (la ruta del almacén SQLite, que leen
+    directamente, o el grafo en memoria sin las capas de la ingesta) y capas.
+    """
+    store = graph.store
+    path = getattr(store, "path", None)
+    if path:
+        return path, ()
+    layers = getattr(store, "layers", None)
+    if layers is not None:
+        return store.base, tuple(layers)
+    return graph, ()
+
+
+class SparqlWorkerPool:
+    """
+    Procesos que ejecutan consultas sobre una base concreta del grafo. Al
+    cerrarlo se detienen los libres; los que están ejecutando una consulta
+    terminan de responderla y se detienen al devolverse.
+    """
+
+    def __init__(self, source, version: str, workers: int, cpu_seconds: float, max_rows: int,
+                 startup_timeout: float = 60.0):
+        """
+        Args:
+            source: Ruta del almacén SQLite o grafo en memoria (sin capas)
+            version: Versión del grafo con la que se creó
+            startup_timeout: Plazo para que un proceso cargue el grafo antes de darlo por fallido
+        """
+        self.base = source
+        # Un grafo en memoria se serializa una vez para todos los procesos (y sus sustitutos).
+        self.source = source if isinstance(source, str) else pickle.dumps(source, pickle.HIGHEST_PROTOCOL)
+        self.version = version
+        self.cpu_seconds = cpu_seconds
+        self.max_rows = max_rows
+        self.startup_timeout = startup_timeout
+        self.restarts = 0
+        self._context = multiprocessing.get_context(START_METHOD)
+        self._names = iter(range(1 << 30))
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self.source, self.cpu_seconds, self.max_rows,
+                         f"sparql-worker-{next(self._names)}")
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            # close() ya pudo sacarlo de la lista.
+            if worker in self._workers:
+                self._workers.remove(worker)
+            closed = self._closed
+        if not closed:
+            self.restarts += 1
+            self._release(self._spawn())
+
+    def _release(self, worker: _Worker) -> None:
+        """Deja el trabajador libre; si el grupo ya se cerró, lo detiene."""
+        with self._lock:
+            if not self._closed:
+                self._idle.put(worker)
+                return
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.close()
+
+    def execute(self, text: str, queue_timeout: float, timeout: float,
+                layers: Tuple[Graph, ...] = ()) -> Tuple[str, Any]:
+        """
+        Ejecuta la consulta en un trabajador libre. ``layers`` son las capas
+        de la ingesta sobre la base; el trabajador recibe las que le faltan.
+        Como las capas sólo añaden tripletas, un trabajador que ya tiene las de
+        una generación posterior responde con ellas.
+
+        Returns:
+            Tupla (estado, respuesta): "ok", "error" (consulta inválida), "cpu",
+            "timeout", "busy", "crashed" (el proceso no arrancó o terminó) o
+            "closed" (el grupo se cerró por un cambio de base)
+        """
+        if self._closed:
+            return "closed", "el grupo de trabajadores SPARQL se cerró"
+        try:
+            worker = self._idle.get(timeout=queue_timeout)
+        except queue.Empty:
+            return "busy", "no hay trabajadores SPARQL libres"
+        deadline = time.monotonic() + timeout
+        try:
+            if not worker.wait_ready(max(deadline - time.monotonic(), 0)):
+                if worker.process.is_alive() and time.monotonic() - worker.started < self.startup_timeout:
+                    # Sigue cargando el grafo: se devuelve sin descartarlo.
+                    self._release(worker)
+                    return "busy", "el trabajador SPARQL aún está arrancando"
+                self._replace(worker)
+                return "crashed", "el trabajador SPARQL no arrancó"
+            known = {id(layer) for layer in worker.layers}
+            triples = [triple for layer in layers if id(layer) not in known for triple in layer]
+            worker.connection.send((text, triples))
+            if triples:
+                worker.layers = layers
+            if not worker.connection.poll(max(deadline - time.monotonic(), 0)):
+                # No se puede interrumpir rdflib desde fuera: se descarta el proceso.
+                self._replace(worker)
+                return "timeout", f"la consulta superó {timeout:g}s"
+            status, reply = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            self._replace(worker)
+            return "crashed", f"el trabajador SPARQL terminó: {e}"
+        if status == "cpu":
+            # Tras SIGXCPU el proceso sigue vivo, pero se renueva por si quedó en mal estado.
+            self._replace(worker)
+        else:
+            self._release(worker)
+        return status, reply
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                if worker in self._workers:
+                    self._workers.remove(worker)
+            worker.close()
+
+    @property
+    def alive(self) -> int:
+        with self._lock:
+            return sum(worker.process.is_alive() for worker in self._workers)
+
+
+class SparqlEndpoint:
+    """Ejecución con límites, caché de resultados y renovación de procesos al cambiar el grafo."""
+
+    def __init__(self, workers: int = 2, timeout: float = 10.0, cpu_seconds: float = 10.0,
+                 max_rows: int = 10000, queue_timeout: float = 2.0, cache_size: int = 256,
+                 max_query_length: int = 20000):
+        """
+        Args:
+            workers: Procesos que ejecutan consultas
+            timeout: Plazo total de una consulta, tras el que se descarta el proceso
+            cpu_seconds: Tiempo de CPU por consulta dentro del trabajador
+            max_rows: Filas (o tripletas) máximas por resultado
+            queue_timeout: Espera máxima por un trabajador libre
+            cache_size: Resultados que se conservan en caché
+            max_query_length: Longitud máxima del texto de la consulta
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.max_rows = max_rows
+        self.queue_timeout = queue_timeout
+        self.cache_size = cache_size
+        self.max_query_length = max_query_length
+        self.pool: Optional[SparqlWorkerPool] = None
+        self.cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.hits = 0
+        self.counts: Dict[str, int] = {"timeout": 0, "cpu": 0, "busy": 0, "error": 0, "crashed": 0,
+                                       "truncated": 0}
+        self.restarts = 0
+        # Sólo un grupo nuevo en construcción a la vez; las consultas al vigente no esperan.
+        self._build_lock = threading.Lock()
+
+    @staticmethod
+    def _serves(pool: Optional[SparqlWorkerPool], base) -> bool:
+        return pool is not None and (pool.base is base or isinstance(base, str) and pool.base == base)
+
+    def _pool_for(self, graph: Graph, version: str) -> Tuple[SparqlWorkerPool, Tuple[Graph, ...]]:
+        """
+        Grupo para la base de ``graph`` y capas que hay que aplicarle. Serializar
+        el grafo cuesta: el grupo nuevo se crea fuera del cerrojo y sólo se
+        publica si nadie ha cambiado el vigente entretanto.
+        """
+        base, layers = graph_base(graph)
+        while True:
+            with self._lock:
+                current = self.pool
+                if self._serves(current, base):
+                    current.version = version
+                    return current, layers
+            with self._build_lock:
+                with self._lock:
+                    if self.pool is not current:
+                        continue
+                pool = SparqlWorkerPool(base, version, self.workers, self.cpu_seconds, self.max_rows)
+                with self._lock:
+                    swapped = self.pool is current
+                    if swapped:
+                        self.pool = pool
+                        self.cache.clear()
+            if not swapped:
+                pool.close()
+                continue
+            if current is not None:
+                self.restarts += current.restarts
+                current.close()
+            return pool, layers
+
+    def query(self, graph: Graph, version: str, text: str) -> Dict[str, Any]:
+        """
+        Resultado de la consulta en forma de documento SPARQL JSON (o
+        ``{"graph": ...}`` para CONSTRUCT/DESCRIBE).
+
+        Raises:
+            QueryError: consulta vacía, demasiado larga, no permitida o inválida
+                        (400), o sin trabajador libre, fuera de plazo o con el
+                        proceso caído (503)
+        """
+        text = (text or "").strip()
+        if not text:
+            raise QueryError(400, "falta el parámetro query")
+        if len(text) > self.max_query_length:
+            raise QueryError(400, f"la consulta supera {self.max_query_length} caracteres")
+        normalized = normalize_query(text)
+        if FORBIDDEN_KEYWORDS.search(QUERY_TOKENS.sub(" ", normalized)):
+            raise QueryError(400, "SERVICE no está permitido en este endpoint")
+
+        self.queries += 1
+        key = (normalized, version)
+        with self._lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        pool, layers = self._pool_for(graph, version)
+        status, reply = pool.execute(normalized, self.queue_timeout, self.timeout, layers)
+        if status == "closed":
+            # Otra petición cambió de base entre tomar el grupo y usarlo.
+            pool, layers = self._pool_for(graph, version)
+            status, reply = pool.execute(normalized, self.queue_timeout, self.timeout, layers)
+        if status != "ok":
+            self.counts[status] = self.counts.get(status, 0) + 1
+            # Sólo una consulta que rdflib no acepta es culpa del cliente.
+            raise QueryError(400 if status == "error" else 503, reply)
+        if reply.get("truncated"):
+            self.counts["truncated"] += 1
+        with self._lock:
+            self.cache[key] = reply
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return reply
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self.pool = self.pool, None
+        if pool is not None:
+            pool.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del endpoint SPARQL."""
+        pool = self.pool
+        return {
+            "queries": self.queries,
+            "cache_hits": self.hits,
+            "cached_results": len(self.cache),
+            "graph_version": pool.version if pool is not None else None,
+            "workers_alive": pool.alive if pool is not None else 0,
+            "worker_restarts": self.restarts + (pool.restarts if pool is not None else 0),
+            "max_rows": self.max_rows,
+            "timeout_seconds": self.timeout,
+            **self.counts
+        }
@@ -0,0 +1,450 @@
+"""
+Almacén de tripletas en disco para rdflib sobre SQLite.
+Los términos (URIs, nodos en blanco y literales) se guardan una vez en una
+tabla de diccionario y las tripletas como tres enteros con índices SPO, POS
+y OSP, así que cualquier patrón de ``triples()`` se resuelve con un índice.
+Con WAL varios procesos pueden leer mientras uno solo escribe; cada hilo
+usa su propia conexión y ve la última versión confirmada.
+
+Uso:
+    python sqlite_store.py import noticias_ontologia.rdf [--store data/ontologia.sqlite]
+    python sqlite_store.py stats [--store data/ontologia.sqlite]
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef, Variable
+from rdflib.store import VALID_STORE, Store
+
+
+BACKENDS = ("memory", "sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    datatype TEXT NOT NULL DEFAULT '',
+    lang TEXT NOT NULL DEFAULT '',
+    UNIQUE (value, kind, datatype, lang)
+);
+CREATE TABLE IF NOT EXISTS triples (
+    s INTEGER NOT NULL,
+    p INTEGER NOT NULL,
+    o INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS namespaces (prefix TEXT PRIMARY KEY, uri TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('version', 0);
+"""
+# Índices secundarios; la importación masiva los crea al final.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o, s);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s, p);
+"""
+
+TermKey = Tuple[str, str, str, str]  # (valor, tipo, datatype, idioma)
+
+
+def term_key(term) -> TermKey:
+    if isinstance(term, Literal):
+        return (str(term), "L", str(term.datatype or ""), term.language or "")
+    if isinstance(term, BNode):
+        return (str(term), "B", "", "")
+    return (str(term), "U", "", "")
+
+
+def make_term(value: str, kind: str, datatype: str, lang: str):
+    if kind == "L":
+        return Literal(value, lang=lang or None, datatype=URIRef(datatype) if datatype else None)
+    if kind == "B":
+        return BNode(value)
+    return URIRef(value)
+
+
+class _Connection:
+    """Conexión de un hilo; envoltorio para poder referenciarla débilmente."""
+    __slots__ = ("db", "__weakref__")
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+
+class SQLiteStore(Store):
+    """
+    Store de rdflib persistente y sin contextos (un único grafo por fichero).
+
+    Las escrituras abren una transacción implícita en la conexión del hilo
+    que escribe y son visibles para los demás tras ``commit()``. La caché de
+    términos es compartida y sólo guarda identificadores confirmados: los que
+    asigna una transacción quedan en una caché del hilo que escribe hasta el
+    ``commit()`` y se descartan con ``rollback()``.
+    """
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = False
+    # El recorrido completo sigue la clave primaria (s, p, o): las tripletas de
+    # cada sujeto salen seguidas y la exportación no necesita agruparlas.
+    ordered_by_subject = True
+
+    def __init__(self, configuration: Optional[str] = None, identifier=None,
+                 read_only: bool = False, cache_size: int = 200000, page_cache_mb: int = 64):
+        """
+        Args:
+            configuration: Ruta del fichero SQLite
+            read_only: Abre las conexiones en modo sólo lectura
+            cache_size: Términos que se guardan decodificados en memoria
+            page_cache_mb: Caché de páginas de SQLite por conexión
+        """
+        self.path: Optional[str] = None
+        self.read_only = read_only
+        self.cache_size = cache_size
+        self.page_cache_mb = page_cache_mb
+        self._local = threading.local()
+        self._connections: "weakref.WeakSet[_Connection]" = weakref.WeakSet()
+        self._ids: Dict[TermKey, int] = {}
+        self._terms: Dict[int, object] = {}
+        self._cache_lock = threading.Lock()
+        self._namespace: Dict[str, URIRef] = {}
+        self._prefix: Dict[URIRef, str] = {}
+        self._count: Optional[Tuple[tuple, int]] = None
+        super().__init__(configuration, identifier)
+
+    # Conexiones -------------------------------------------------------
+
+    def open(self, configuration: str, create: bool = True) -> int:
+        self.path = configuration
+        if not self.read_only:
+            directory = os.path.dirname(os.path.abspath(configuration))
+            os.makedirs(directory, exist_ok=True)
+            db = self._connect()
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA + INDEXES)
+            db.commit()
+        self._load_namespaces()
+        return VALID_STORE
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA busy_timeout=10000")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(f"PRAGMA cache_size=-{self.page_cache_mb * 1024}")
+        return db
+
+    def _db(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = _Connection(self._connect())
+            self._local.connection = connection
+            self._connections.add(connection)
+        return connection.db
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        for connection in list(self._connections):
+            try:
+                if commit_pending_transaction:
+                    connection.db.commit()
+                connection.db.close()
+            except sqlite3.Error:
+                pass
+        self._connections = weakref.WeakSet()
+        self._local = threading.local()
+
+    def commit(self) -> None:
+        db = self._db()
+        if db.in_transaction:
+            db.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            db.executemany("INSERT OR REPLACE INTO namespaces VALUES (?, ?)",
+                           [(prefix, str(uri)) for prefix, uri in self._namespace.items()])
+        db.commit()
+        # Ya confirmados: los demás hilos pueden resolver estos identificadores.
+        pending = self._pending()
+        for key, (term_id, term) in pending.items():
+            self._cache(key, term_id, term)
+        pending.clear()
+
+    def set_durable(self, durable: bool = True) -> None:
+        """
+        Con WAL y ``synchronous=NORMAL`` un corte de luz puede perder la última
+        transacción confirmada; FULL sincroniza el WAL en cada ``commit()``.
+        Sólo afecta a la conexión del hilo que lo llama.
+        """
+        self._db().execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+
+    def rollback(self) -> None:
+        self._db().rollback()
+        # Los identificadores asignados en la transacción ya no son válidos.
+        self._pending().clear()
+
+    def version(self) -> int:
+        """Contador de transacciones confirmadas con cambios."""
+        row = self._db().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    # Diccionario de términos ------------------------------------------
+
+    def _pending(self) -> Dict[TermKey, Tuple[int, object]]:
+        """Términos vistos por la transacción abierta del hilo, aún sin confirmar."""
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            pending = self._local.pending = {}
+        return pending
+
+    def _lookup(self, db: sqlite3.Connection, term) -> Optional[int]:
+        key = term_key(term)
+        pending = self._pending().get(key)
+        if pending is not None:
+            return pending[0]
+        with self._cache_lock:
+            term_id = self._ids.get(key)
+        if term_id is None:
+            row = db.execute("SELECT id FROM terms WHERE value = ? AND kind = ? AND datatype = ? AND lang = ?",
+                             key).fetchone()
+            if row is None:
+                return None
+            term_id = self._remember(db, key, row[0], term)
+        return term_id
+
+    def _intern(self, db: sqlite3.Connection, term) -> int:
+        term_id = self._lookup(db, term)
+        if term_id is None:
+            key = term_key(term)
+            term_id = db.execute("INSERT INTO terms (value, kind, datatype, lang) VALUES (?, ?, ?, ?)",
+                                 key).lastrowid
+            self._remember(db, key, term_id, term)
+        return term_id
+
+    def _remember(self, db: sqlite3.Connection, key: TermKey, term_id: int, term) -> int:
+        # Dentro de una transacción el identificador puede no existir para las demás conexiones.
+        if db.in_transaction:
+            pending = self._pending()
+            if len(pending) >= self.cache_size:
+                pending.clear()
+            pending[key] = (term_id, term)
+        else:
+            self._cache(key, term_id, term)
+        return term_id
+
+    def _cache(self, key: TermKey, term_id: int, term) -> None:
+        with self._cache_lock:
+            if len(self._ids) >= self.cache_size:
+                self._ids.clear()
+                self._terms.clear()
+            self._ids[key] = term_id
+            self._terms[term_id] = term
+
+    def _decode(self, db: sqlite3.Connection, term_id: int, value: str, kind: str, datatype: str, lang: str):
+        with self._cache_lock:
+            term = self._terms.get(term_id)
+        if term is None:
+            term = make_term(value, kind, datatype, lang)
+            self._remember(db, (value, kind, datatype, lang), term_id, term)
+        return term
+
+    # Interfaz de Store ------------------------------------------------
+
+    def add(self, triple, context=None, quoted: bool = False) -> None:
+        db = self._db()
+        db.execute("INSERT OR IGNORE INTO triples VALUES (?, ?, ?)",
+                   [self._intern(db, term) for term in triple])
+        Store.add(self, triple, context, quoted)
+
+    def addN(self, quads: Iterable[tuple]) -> None:
+        db = self._db()
+        db.executemany("INSERT OR IGNORE INTO triples VALUES (?, ?, ?)",
+                       ([self._intern(db, s), self._intern(db, p), self._intern(db, o)]
+                        for s, p, o, _ in quads))
+
+    def _where(self, db: sqlite3.Connection, pattern: Sequence) -> Optional[Tuple[str, list]]:
+        """Condición SQL de un patrón; None si algún término no existe en el almacén."""
+        clauses, params = [], []
+        for column, term in zip("spo", pattern):
+            if term is None or isinstance(term, Variable):
+                continue
+            term_id = self._lookup(db, term)
+            if term_id is None:
+                return None
+            clauses.append(f"t.{column} = ?")
+            params.append(term_id)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def remove(self, triple_pattern, context=None) -> None:
+        db = self._db()
+        where = self._where(db, triple_pattern)
+        if where is not None:
+            db.execute(f"DELETE FROM triples AS t{where[0]}", where[1])
+        super().remove(triple_pattern, context)
+
+    def triples(self, triple_pattern, context=None) -> Iterator[tuple]:
+        db = self._db()
+        where = self._where(db, triple_pattern)
+        if where is None:
+            return
+        # Sólo se unen con la tabla de términos las posiciones libres del patrón.
+        bound = [term if term is not None and not isinstance(term, Variable) else None
+                 for term in triple_pattern]
+        columns = ["t.s", "t.p", "t.o"]
+        joins = []
+        for position, column in enumerate("spo"):
+            if bound[position] is None:
+                alias = f"{column}t"
+                columns.append(f"{alias}.value, {alias}.kind, {alias}.datatype, {alias}.lang")
+                joins.append(f"JOIN terms AS {alias} ON {alias}.id = t.{column}")
+        sql = f"SELECT {', '.join(columns)} FROM triples AS t {' '.join(joins)}{where[0]}"
+        if not where[0]:
+            sql += " ORDER BY t.s"
+        for row in db.execute(sql, where[1]):
+            triple = []
+            offset = 3
+            for position in range(3):
+                if bound[position] is not None:
+                    triple.append(bound[position])
+                else:
+                    triple.append(self._decode(db, row[position], *row[offset:offset + 4]))
+                    offset += 4
+            yield tuple(triple), iter(())
+
+    def __len__(self, context=None) -> int:
+        db = self._db()
+        # COUNT(*) recorre un índice: se repite sólo si hubo cambios desde la última vez.
+        state = (id(db), db.execute("PRAGMA data_version").fetchone()[0], db.total_changes)
+        if self._count is None or self._count[0] != state:
+            self._count = (state, db.execute("SELECT COUNT(*) FROM triples").fetchone()[0])
+        return self._count[1]
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:
+        # Los prefijos viven en memoria y se guardan con commit(): abrir un grafo no escribe.
+        if not override and (prefix in self._namespace or namespace in self._prefix):
+            return
+        previous = self._namespace.pop(prefix, None)
+        if previous is not None:
+            self._prefix.pop(previous, None)
+        previous_prefix = self._prefix.pop(namespace, None)
+        if previous_prefix is not None:
+            self._namespace.pop(previous_prefix, None)
+        self._namespace[prefix] = namespace
+        self._prefix[namespace] = prefix
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        return self._namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:
+        return self._prefix.get(namespace)
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        return iter(list(self._namespace.items()))
+
+    def _load_namespaces(self) -> None:
+        try:
+            rows = self._db().execute("SELECT prefix, uri FROM namespaces").fetchall()
+        except sqlite3.Error:
+            rows = []
+        for prefix, uri in rows:
+            self.bind(prefix, URIRef(uri))
+
+    def get_statistics(self) -> Dict[str, object]:
+        """Retorna estadísticas del almacén."""
+        db = self._db()
+        return {
+            "path": self.path,
+            "triples": len(self),
+            "terms": db.execute("SELECT COUNT(*) FROM terms").fetchone()[0],
+            "version": self.version(),
+            "bytes": sum(os.path.getsize(self.path + suffix) for suffix in ("", "-wal")
+                         if os.path.exists(self.path + suffix)),
+            "cached_terms": len(self._terms),
+            "read_only": self.read_only
+        }
+
+
+def open_graph(path: str, read_only: bool = False, **options) -> Graph:
+    """Grafo de rdflib sobre un fichero SQLite (lo crea si no existe y no es de sólo lectura)."""
+    store = SQLiteStore(read_only=read_only, **options)
+    store.open(path)
+    graph = Graph(store=store)
+    # Las conexiones se cierran cuando deja de usarse el grafo.
+    weakref.finalize(graph, store.close)
+    return graph
+
+
+def import_rdf(sources: Iterable[str], path: str, rdf_format: Optional[str] = None) -> int:
+    """
+    Importación de una sola vez: el analizador de rdflib escribe directamente
+    en el almacén (sin cargar el fichero en memoria) dentro de una única
+    transacción, y los índices POS/OSP se crean al final.
+
+    Returns:
+        Número de tripletas del almacén al terminar
+    """
+    store = SQLiteStore()
+    store.open(path)
+    db = store._db()
+    db.executescript("DROP INDEX IF EXISTS triples_pos; DROP INDEX IF EXISTS triples_osp;")
+    graph = Graph(store=store)
+    for source in sources:
+        graph.parse(source, format=rdf_format or ("nt" if source.endswith(".nt") else "xml"))
+    store.commit()
+    db.executescript(INDEXES)
+    db.execute("ANALYZE")
+    total = len(store)
+    store.close()
+    return total
+
+
+def open_ontology(backend: str, store_file: str, sources: Sequence[str]) -> Graph:
+    """
+    Grafo de la ontología según el backend configurado. Con "sqlite", si el
+    almacén aún no existe se importa una vez desde el primer RDF disponible.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend de tripletas desconocido: {backend}")
+    existing = [path for path in sources if os.path.exists(path)]
+    if backend == "memory":
+        graph = Graph()
+        if existing:
+            graph.parse(existing[0], format="xml")
+        return graph
+    if not os.path.exists(store_file) and existing:
+        start = time.perf_counter()
+        total = import_rdf(existing[:1], store_file)
+        print(f"✓ Ontología importada a {store_file}: {total} tripletas en {time.perf_counter() - start:.2f}s")
+    return open_graph(store_file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Almacén de tripletas SQLite para la ontología")
+    parser.add_argument("command", choices=["import", "stats"])
+    parser.add_argument("sources", nargs="*", default=["noticias_ontologia.rdf"])
+    parser.add_argument("--store", default="data/ontologia.sqlite")
+    parser.add_argument("--format", default=None, help="Formato RDF de rdflib (por defecto según extensión)")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        if os.path.exists(args.store):
+            print(f"⚠️  {args.store} ya existe; las tripletas se añaden a las que contiene")
+        start = time.perf_counter()
+        total = import_rdf(args.sources, args.store, args.format)
+        print(f"✓ {total} tripletas en {args.store} ({time.perf_counter() - start:.2f}s)")
+    else:
+        graph = open_graph(args.store, read_only=True)
+        for key, value in graph.store.get_statistics().items():
+            print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
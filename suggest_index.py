@@ -0,0 +1,202 @@
+"""
+Autocompletado por prefijo para la caja de búsqueda.
+Mantiene las claves normalizadas en un arreglo ordenado (búsqueda binaria) y
+precalcula el top-k por popularidad de los prefijos con muchos candidatos.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from news_index import NewsIndex, fold_text
+
+
+# (clave normalizada, texto original, tipo, peso)
+Entry = Tuple[str, str, str, float]
+# (función de versión, función que produce las entradas)
+Source = Tuple[Callable[[], object], Callable[[], List[Entry]]]
+
+
+class SuggestIndex:
+    """
+    Arreglo ordenado de sugerencias con top-k precalculado por prefijo.
+
+    Sólo se guardan los prefijos cuyo rango supera ``SCAN_LIMIT`` entradas;
+    los demás se resuelven recorriendo su rango, que es corto por definición.
+    Así la memoria extra queda acotada y toda consulta cuesta O(log n + k).
+    """
+
+    SCAN_LIMIT = 64
+
+    def __init__(self, entries: Iterable[Entry], top_k: int = 10):
+        self.entries: List[Entry] = sorted(entries)
+        self.keys: List[str] = [entry[0] for entry in self.entries]
+        self.top_k = top_k
+        self.precomputed: Dict[str, List[int]] = {}
+        if self.entries:
+            self._precompute(0, len(self.entries), 0)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _best(self, positions: Iterable[int]) -> List[int]:
+        return heapq.nlargest(self.top_k, positions, key=lambda i: (self.entries[i][3], -i))
+
+    def _precompute(self, lo: int, hi: int, depth: int) -> List[int]:
+        """Top-k del rango [lo, hi), cuyas claves comparten los primeros ``depth`` caracteres."""
+        if hi - lo <= self.SCAN_LIMIT:
+            return self._best(range(lo, hi))
+
+        candidates = []
+        start = lo
+        # Claves que terminan exactamente en este prefijo.
+        while start < hi and len(self.keys[start]) == depth:
+            candidates.append(start)
+            start += 1
+        while start < hi:
+            char = self.keys[start][depth]
+            end = bisect_left(self.keys, self.keys[start][:depth] + chr(ord(char) + 1), start, hi)
+            candidates.extend(self._precompute(start, end, depth + 1))
+            start = end
+
+        best = self._best(candidates)
+        self.precomputed[self.keys[lo][:depth]] = best
+        return best
+
+    def suggest(self, prefix: str, k: int = 10) -> List[Dict[str, object]]:
+        """
+        Sugerencias que empiezan por el prefijo, de mayor a menor peso.
+
+        Args:
+            prefix: Texto escrito por el usuario
+            k: Número de sugerencias (como mucho el ``top_k`` del índice)
+        """
+        folded = fold_text(prefix).strip()
+        if not folded:
+            return []
+        # Todo prefijo con más de SCAN_LIMIT candidatos está precalculado.
+        positions = self.precomputed.get(folded)
+        if positions is None:
+            lo = bisect_left(self.keys, folded)
+            hi = bisect_right(self.keys, folded + "\uffff", lo)
+            positions = self._best(range(lo, hi))
+        return [
+            {"text": self.entries[i][1], "kind": self.entries[i][2], "weight": self.entries[i][3]}
+            for i in positions[:k]
+        ]
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Retorna estadísticas del índice."""
+        return {
+            "entries": len(self.entries),
+            "precomputed_prefixes": len(self.precomputed)
+        }
+
+
+def news_entries(news_index: NewsIndex) -> List[Entry]:
+    """Títulos, autores y temáticas; el peso es el número de noticias con ese valor."""
+    entries = {}
+    for facet, kind in (("autor", "autor"), ("tematica", "tematica")):
+        for value, ids in news_index.postings[facet].items():
+            if value != "?":
+                entries[(fold_text(value), kind)] = (value, len(ids))
+    for record in news_index.records:
+        key = (fold_text(record.titulo), "titulo")
+        text, weight = entries.get(key, (record.titulo, 0))
+        entries[key] = (text, weight + 1)
+    return [(folded, text, kind, float(weight)) for (folded, kind), (text, weight) in entries.items()]
+
+
+def dbpedia_entries(dbpedia_index, entity_linker=None) -> List[Entry]:
+    """Etiquetas de DBpedia; pesan más las que están enlazadas a más noticias."""
+    entries = {}
+    for resource in dbpedia_index.resources.values():
+        weight = 1 + (len(entity_linker.news_for(resource.uri)) if entity_linker is not None else 0)
+        key = fold_text(resource.label)
+        if weight > entries.get(key, ("", 0))[1]:
+            entries[key] = (resource.label, weight)
+    return [(folded, text, "dbpedia", float(weight)) for folded, (text, weight) in entries.items()]
+
+
+class SuggestService:
+    """
+    Mantiene el índice de sugerencias al día con sus fuentes de datos.
+
+    Cada fuente declara una función de versión y otra que produce sus
+    entradas; sólo se recalculan las entradas de las fuentes cuya versión
+    cambió y el resto se reutiliza al fusionar. Las consultas comparan
+    versiones sin cerrojo; la reconstrucción la hace un solo hilo y publica
+    el índice antes que las versiones, de modo que quien vea las versiones
+    nuevas ve también su índice.
+    """
+
+    def __init__(self, sources: Dict[str, Source], top_k: int = 10, build: bool = True):
+        """
+        Args:
+            sources: Nombre -> (función de versión, función que produce las entradas)
+            top_k: Sugerencias precalculadas por prefijo
+            build: Construye el índice ya; si no, con la primera consulta
+        """
+        self.sources = sources
+        self.top_k = top_k
+        self.versions: Dict[str, object] = {}
+        self.source_entries: Dict[str, List[Entry]] = {}
+        self.index = SuggestIndex([], top_k)
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+        if build:
+            self.refresh()
+
+    def with_sources(self, sources: Dict[str, Source]) -> "SuggestService":
+        """
+        Servicio para una generación nueva con algunas fuentes sustituidas. Las
+        entradas de las fuentes cuya versión no cambia se reutilizan y el
+        índice se reconstruye con la primera consulta, no al publicar.
+        """
+        service = SuggestService({**self.sources, **sources}, self.top_k, build=False)
+        service.versions = dict(self.versions)
+        service.source_entries = dict(self.source_entries)
+        service.index = self.index
+        service.rebuilds = self.rebuilds
+        return service
+
+    def stale(self) -> bool:
+        """Si alguna fuente cambió desde la última reconstrucción."""
+        versions = self.versions
+        return any(name not in versions or versions[name] != version_fn()
+                   for name, (version_fn, _) in self.sources.items())
+
+    def refresh(self) -> bool:
+        """Reconstruye el índice si alguna fuente cambió; devuelve si lo hizo."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        versions = {name: version_fn() for name, (version_fn, _) in self.sources.items()}
+        changed = [name for name, version in versions.items()
+                   if name not in self.versions or self.versions[name] != version]
+        if not changed:
+            return False
+        source_entries = dict(self.source_entries)
+        for name in changed:
+            source_entries[name] = sorted(self.sources[name][1]())
+        self.index = SuggestIndex(heapq.merge(*source_entries.values()), self.top_k)
+        self.source_entries = source_entries
+        self.versions = versions
+        self.rebuilds += 1
+        return True
+
+    def suggest(self, prefix: str, k: int = 10) -> List[Dict[str, object]]:
+        # Mientras otra petición reconstruye se responde con el índice anterior.
+        if self.stale() and self._lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+        return self.index.suggest(prefix, k)
+
+    def get_statistics(self) -> Dict[str, int]:
+        stats = self.index.get_statistics()
+        stats["rebuilds"] = self.rebuilds
+        return stats
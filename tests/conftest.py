@@ -0,0 +1,30 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Los módulos de la aplicación están en la raíz del repositorio.
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def web_app(tmp_path, monkeypatch):
+    """Aplicación completa sobre una copia de los datos, sin recarga en caliente ni límite de ritmo."""
+    import app
+    from admission import AdmissionController
+    from ingestion import TripleJournal
+
+    shutil.copy(ROOT / "noticias_ontologia.rdf", tmp_path / "noticias_ontologia.rdf")
+    shutil.copytree(ROOT / "data", tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.NewsSearchConfig, "TRIPLE_STORE", "memory")
+    monkeypatch.setattr(app.NewsSearchConfig, "HOT_RELOAD", False)
+    monkeypatch.setattr(app, "ingest_journal", TripleJournal(str(tmp_path / "data" / "ingesta.nt")))
+    monkeypatch.setattr(app, "admission", AdmissionController(app.NewsSearchConfig.ADMISSION_STAGES, rate=0))
+    flask_app = app.create_app(background_warm_up=False)
+    yield flask_app
+    flask_app.extensions["news_search"].sparql.close()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+import app
+from admission import AdmissionController, Overloaded, client_address
+
+
+def test_client_address_uses_hop_added_by_outermost_trusted_proxy():
+    assert client_address("10.0.0.1", "1.2.3.4") == "10.0.0.1"
+    assert client_address("10.0.0.1", "1.2.3.4", trusted_proxies=1) == "1.2.3.4"
+    # Lo que el cliente escribe a la izquierda no cuenta.
+    assert client_address("10.0.0.1", "6.6.6.6, 1.2.3.4", trusted_proxies=1) == "1.2.3.4"
+    assert client_address("10.0.0.1", "6.6.6.6, 1.2.3.4, 10.0.0.2", trusted_proxies=2) == "1.2.3.4"
+    assert client_address("10.0.0.1", "1.2.3.4", trusted_proxies=2) == "10.0.0.1"
+    assert client_address("10.0.0.1", "", trusted_proxies=1) == "10.0.0.1"
+
+
+def test_rate_limit_per_client_and_stage_shedding():
+    controller = AdmissionController({"search": (1, 0)}, rate=1, burst=2)
+    assert controller.allow("a") == 0 and controller.allow("a") == 0
+    assert controller.allow("a") > 0
+    assert controller.allow("b") == 0
+    with controller.stage("search"):
+        with pytest.raises(Overloaded):
+            with controller.stage("search"):
+                pass
+    assert controller.get_statistics()["stages"]["search"]["shed"] == {"queue_full": 1}
+
+
+def test_skip_optional_counts_degraded_mode():
+    controller = AdmissionController({"search": (1, 2)}, degrade_at=0.5)
+    assert not controller.skip_optional("skip_translation")
+    controller.stages["search"].queued = 1
+    assert controller.skip_optional("skip_translation")
+    assert controller.degraded["skip_translation"] == 1
+
+
+@pytest.fixture
+def limited(web_app, monkeypatch):
+    controller = AdmissionController(app.NewsSearchConfig.ADMISSION_STAGES, rate=0.001, burst=2)
+    monkeypatch.setattr(app, "admission", controller)
+    monkeypatch.setattr(app.NewsSearchConfig, "TRUSTED_PROXIES", 1)
+    return controller
+
+
+def test_flask_rate_limit_keys_on_forwarded_client(web_app, limited):
+    client = web_app.test_client()
+    proxy = {"REMOTE_ADDR": "10.0.0.1"}
+
+    def get(forwarded_for):
+        return client.get("/api/suggest?q=sa", environ_base=proxy, headers={"X-Forwarded-For": forwarded_for})
+
+    assert [get("1.2.3.4").status_code for _ in range(3)] == [200, 200, 429]
+    assert get("9.9.9.9, 1.2.3.4").status_code == 429
+    assert get("5.6.7.8").status_code == 200
+
+
+def call_asgi(asgi_app, path, headers=()):
+    scope = {"type": "http", "method": "GET", "path": path.split("?")[0],
+             "query_string": path.partition("?")[2].encode(), "client": ("10.0.0.1", 5000),
+             "headers": [(name.encode(), value.encode()) for name, value in headers]}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, body = sent[0], b"".join(message.get("body", b"") for message in sent[1:])
+    return start["status"], dict(start["headers"]), json.loads(body)
+
+
+def test_asgi_routes_go_through_admission(web_app, limited):
+    from async_app import AsyncNewsApp
+
+    state = web_app.extensions["news_search"]
+    asgi_app = AsyncNewsApp(state.runtime, web_app, admission=limited)
+    forwarded = [("x-forwarded-for", "1.2.3.4")]
+    statuses = [call_asgi(asgi_app, "/api/suggest?q=sa", forwarded)[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    status, headers, payload = call_asgi(asgi_app, "/api/search?keyword=salud", forwarded)
+    assert status == 429 and int(headers[b"retry-after"]) >= 1
+    assert call_asgi(asgi_app, "/api/search?keyword=salud", [("x-forwarded-for", "5.6.7.8")])[0] == 200
+
+
+def test_asgi_search_sheds_with_503_when_stage_is_full(web_app):
+    from async_app import AsyncNewsApp
+
+    controller = AdmissionController({"search": (1, 0), "translation": (1, 1), "online": (1, 1)}, rate=0)
+    state = web_app.extensions["news_search"]
+    asgi_app = AsyncNewsApp(state.runtime, web_app, admission=controller)
+    with controller.stage("search"):
+        status, headers, payload = call_asgi(asgi_app, "/api/search?keyword=salud")
+    assert status == 503 and headers[b"cache-control"] == b"no-store"
+    assert controller.get_statistics()["shed_total"] == 1
+
+
+def test_degraded_search_page_is_not_cached(web_app, monkeypatch):
+    client = web_app.test_client()
+    assert client.get("/?keyword=salud&lang=en").headers["Cache-Control"].startswith("public")
+
+    monkeypatch.setattr(app.admission, "overloaded", lambda: True)
+    response = client.get("/?keyword=salud&lang=en")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert app.admission.degraded["skip_translation"] >= 1
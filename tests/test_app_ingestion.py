@@ -0,0 +1,128 @@
+import shutil
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import app
+from ingestion import IngestionError, TripleJournal, prepare_news
+from suggest_index import SuggestService
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def essentials(tmp_path, monkeypatch):
+    """Generación esencial sobre una copia de la ontología en un directorio temporal."""
+    (tmp_path / "data").mkdir()
+    shutil.copy(ROOT / "noticias_ontologia.rdf", tmp_path / "noticias_ontologia.rdf")
+    shutil.copy(ROOT / "data" / "dbpedia_local.json", tmp_path / "data" / "dbpedia_local.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app.NewsSearchConfig, "TRIPLE_STORE", "memory")
+    monkeypatch.setattr(app, "ingest_journal", TripleJournal(str(tmp_path / "data" / "ingesta.nt")))
+    snapshot = app.build_essentials()
+    service = SuggestService(app.news_suggest_source(snapshot.news_index))
+    return replace(snapshot, suggest_service=service)
+
+
+def write(titulo):
+    return prepare_news({"titulo": titulo, "texto": f"{titulo} texto de la noticia", "tematica": "Salud"},
+                        app.NewsSearchConfig.ONTOLOGY_NS, app.new_uri)
+
+
+class FakeDuplicates:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.added = []
+
+    def find(self, title, text):
+        return []
+
+    def add_many(self, items):
+        items = list(items)
+        if self.fail:
+            raise sqlite3.OperationalError("disco lleno")
+        self.added.extend(uri for uri, _, _ in items)
+
+    def cluster_of(self, uri):
+        return uri
+
+
+def test_ingestion_builds_new_generation_without_touching_current(essentials):
+    triples, news = len(essentials.graph), len(essentials.news_index.records)
+    pending = write("Zorblax aprobado")
+
+    snapshot, outcomes = app.apply_ingestion(essentials, 2, [pending], None)
+
+    assert outcomes == [pending.to_dict()]
+    assert snapshot.generation == 2
+    assert len(essentials.graph) == triples
+    assert len(essentials.news_index.records) == news
+    assert str(pending.noticia) not in essentials.news_index.doc_ids
+    assert len(snapshot.graph) == triples + len(pending.triples)
+    assert str(pending.noticia) in snapshot.news_index.doc_ids
+    assert essentials.suggest_service.suggest("zorblax") == []
+    assert [s["text"] for s in snapshot.suggest_service.suggest("zorblax")] == ["Zorblax aprobado"]
+    # Durable antes de publicarse: el registro de ingesta tiene el lote.
+    assert app.ingest_journal.replay(app.Graph()) == len(pending.triples)
+
+
+def test_ingestion_rejects_verification_of_unknown_news(essentials):
+    from ingestion import prepare_verification
+
+    pending = prepare_verification({"noticia": "http://ej.org/no-existe"},
+                                   app.NewsSearchConfig.ONTOLOGY_NS, app.new_uri)
+    snapshot, outcomes = app.apply_ingestion(essentials, 2, [pending], None)
+
+    assert snapshot is essentials
+    assert isinstance(outcomes[0], IngestionError) and outcomes[0].status == 404
+
+
+def test_near_duplicates_are_committed_after_the_snapshot_is_built(essentials, monkeypatch):
+    duplicates = FakeDuplicates()
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("fallo al construir la generación")
+
+    monkeypatch.setattr(app, "RDFSearchEngine", broken)
+    with pytest.raises(RuntimeError):
+        app.apply_ingestion(essentials, 2, [write("Noticia que no llega")], duplicates)
+    assert duplicates.added == []
+
+
+def test_near_duplicate_failure_still_publishes_the_batch(essentials):
+    pending = write("Noticia publicada")
+    snapshot, outcomes = app.apply_ingestion(essentials, 2, [pending], FakeDuplicates(fail=True))
+
+    assert outcomes == [pending.to_dict()]
+    assert str(pending.noticia) in snapshot.news_index.doc_ids
+
+
+def test_compaction_rewrites_ontology_and_empties_journal(essentials):
+    pending = write("Noticia compactada")
+    snapshot, _ = app.apply_ingestion(essentials, 2, [pending], None)
+
+    compacted = app.compact_graph(snapshot)
+
+    assert not isinstance(compacted.graph.store, app.LayeredStore)
+    assert set(compacted.graph) == set(snapshot.graph)
+    assert app.ingest_journal.size() == 0
+    reloaded = app.load_ontology()
+    assert len(reloaded) == len(snapshot.graph)
+
+
+def test_compaction_keeps_journal_with_writes_from_another_process(essentials):
+    snapshot, _ = app.apply_ingestion(essentials, 2, [write("Noticia de la API")], None)
+    poblacion = write("Noticia de Poblacion")
+    TripleJournal(app.ingest_journal.path).append(poblacion.triples)
+
+    assert app.compact_graph(snapshot) is snapshot
+    with open(app.NewsSearchConfig.ONTOLOGY_FILES[0], "rb") as handle:
+        assert b"Noticia de Poblacion" not in handle.read()
+
+    # La recarga aplica el registro completo y entonces ya se puede compactar.
+    reloaded = app.build_essentials(3)
+    assert str(poblacion.noticia) in reloaded.news_index.doc_ids
+    assert not app.ingest_journal.foreign_writes()
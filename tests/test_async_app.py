@@ -0,0 +1,193 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+import app
+import translate_rpc
+
+
+def batchexecute_body(text: str) -> str:
+    inner = [None, [[[None, None, None, 1, None, [[word, None] for word in text.split()]]]]]
+    line = json.dumps([["wrb.fr", translate_rpc.RPC_ID, json.dumps(inner), None, None, None, "generic"]])
+    return f")]}}'\n\n{len(line)}\n{line}\n"
+
+
+def test_translate_rpc_round_trip():
+    params, data = translate_rpc.build_request("hola mundo", "es", "en")
+    assert params["rpcids"] == translate_rpc.RPC_ID
+    payload = json.loads(json.loads(data["f.req"])[0][0][1])
+    assert payload[0] == ["hola mundo", "es", "en", True]
+    assert translate_rpc.parse_response(batchexecute_body("hello world")) == "hello world"
+    with pytest.raises(ValueError):
+        translate_rpc.parse_response("<html>captcha</html>")
+    with pytest.raises(ValueError):
+        translate_rpc.parse_response(f'[["wrb.fr","{translate_rpc.RPC_ID}","[null, []]"]]')
+
+
+@pytest.fixture
+def translator_server():
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+            text = json.loads(json.loads(form["f.req"][0])[0][0][1])[0][0]
+            requests.append(text)
+            body = batchexecute_body(text.upper()).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/batchexecute", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_translation_cache_is_lru(translator_server):
+    from async_app import AsyncOnlineClient
+
+    url, requests = translator_server
+
+    async def run():
+        client = AsyncOnlineClient(translate_url=url, translation_cache_size=2)
+        try:
+            return [await client.translate(text, "en") for text in ("a", "b", "a", "c", "a", "b")], client
+        finally:
+            await client.close()
+
+    translated, client = asyncio.run(run())
+    assert translated == ["A", "B", "A", "C", "A", "B"]
+    # "a" se usó hace poco y sobrevive a la entrada de "c"; "b" no.
+    assert requests == ["a", "b", "c", "b"]
+    assert list(client.translations) == [("a", "en"), ("b", "en")]
+
+
+def test_factory_wraps_given_flask_app(web_app):
+    import async_app
+
+    asgi_app = async_app.create_app(web_app, workers=1)
+    state = web_app.extensions["news_search"]
+    assert asgi_app.runtime is state.runtime
+    assert asgi_app.memory is state.memory
+    assert asgi_app.admission is app.admission
+    assert asgi_app.executor._max_workers == 1
+    assert app._default_app is None
+
+
+SPARQL_EMPTY = json.dumps({"results": {"bindings": []}}).encode()
+
+
+@pytest.fixture
+def dbpedia_servers():
+    """Endpoints SPARQL locales; ``behaviour[i]`` es "ok", "error" o "hang"."""
+    release = threading.Event()
+    servers, behaviour, hits = [], [], []
+
+    def start(mode):
+        index = len(servers)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                hits.append(index)
+                if behaviour[index] == "hang":
+                    release.wait(5)
+                status = 503 if behaviour[index] == "error" else 200
+                body = SPARQL_EMPTY if status == 200 else b""
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        behaviour.append(mode)
+        return f"http://127.0.0.1:{server.server_address[1]}/sparql"
+
+    yield start, behaviour, hits
+    release.set()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cancelled_probe_does_not_wedge_the_breaker(dbpedia_servers):
+    from async_app import AsyncOnlineClient
+    from resilience import CircuitBreaker
+
+    start, behaviour, _ = dbpedia_servers
+    url = start("hang")
+
+    async def run():
+        client = AsyncOnlineClient(endpoint=url)
+        breaker = client.dbpedia.endpoints[0].breaker
+        breaker.state, breaker.opened_at = CircuitBreaker.OPEN, -breaker.reset_timeout
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.query_dbpedia("Bolivia"), 0.2)
+            # La prueba sigue en segundo plano; si se cancela cuenta como fallo.
+            assert breaker.state == CircuitBreaker.HALF_OPEN and not breaker.allow()
+            client.dbpedia.close()
+            await asyncio.sleep(0.05)
+            assert breaker.state == CircuitBreaker.OPEN
+            # Pasado el plazo de reinicio vuelve a dejar pasar una prueba.
+            breaker.opened_at = -breaker.reset_timeout
+            behaviour[0] = "ok"
+            assert await client.query_dbpedia("Bolivia") == []
+            assert breaker.state == CircuitBreaker.CLOSED
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+
+def test_async_dbpedia_fails_over_and_hedges_to_the_mirror(dbpedia_servers, monkeypatch):
+    from async_app import AsyncOnlineClient
+    from resilience import CircuitBreaker
+
+    start, behaviour, hits = dbpedia_servers
+    primary, mirror = start("error"), start("ok")
+    monkeypatch.setattr(app.NewsSearchConfig, "BREAKER_FAILURES", 2)
+
+    async def run():
+        client = AsyncOnlineClient(endpoint=primary, mirror=mirror)
+        try:
+            # Un 503 de la principal pasa a la réplica sin esperar.
+            assert await client.query_dbpedia("Bolivia") == []
+            assert hits == [0, 1] and client.dbpedia.failovers == 1
+
+            # Una principal colgada se cubre con la réplica a mitad de plazo.
+            behaviour[0] = "hang"
+            client.dbpedia.endpoints[0].breaker.record_success()
+            client.dbpedia.deadline = 0.4
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            assert await client.query_dbpedia("Bolivia") == []
+            assert loop.time() - started < 0.35
+            assert client.dbpedia.hedge_wins == 1
+
+            # Con la principal caída, ni siquiera se le envía la petición.
+            behaviour[0] = "error"
+            for _ in range(2):
+                await client.query_dbpedia("Bolivia")
+            assert client.dbpedia.endpoints[0].breaker.state == CircuitBreaker.OPEN
+            calls = hits.count(0)
+            await client.query_dbpedia("Bolivia")
+            assert hits.count(0) == calls and hits[-1] == 1
+        finally:
+            await client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import pytest
+
+
+QUERIES = ["salud", "fake news", "autor:nadie", "salud", "-salud"]
+
+
+@pytest.fixture
+def manager(web_app):
+    return web_app.extensions["news_search"].runtime.current.search_manager
+
+
+def test_batch_matches_individual_searches(manager):
+    batch = manager.search_many(QUERIES)
+    assert len(batch) == len(QUERIES)
+    for keyword, (results, kind, missing) in zip(QUERIES, batch):
+        single, single_kind, _ = manager.search_news(keyword)
+        assert [r["uri"] for r in results] == [r["uri"] for r in single]
+        assert kind == single_kind and missing == []
+    assert batch[0][0] and batch[2][0] == []
+
+
+def test_batch_api_applies_limit_and_filters(web_app, manager):
+    client = web_app.test_client()
+    payload = client.post("/api/search/batch", json={
+        "queries": ["salud", "-salud"], "limit": 2, "filters": {"estado": "Finalizada", "otra": ["x"]},
+    }).get_json()
+
+    entries = payload["results"]
+    assert [entry["query"] for entry in entries] == ["salud", "-salud"]
+    assert all(len(entry["results"]) <= 2 for entry in entries)
+    expected = manager.search_many(["salud", "-salud"], filters={"estado": ["Finalizada"]}, limit=2)
+    assert len(manager.search_many(["-salud"], limit=2)[0][0]) > len(expected[1][0])
+    assert [[r["uri"] for r in entry["results"]] for entry in entries] == \
+        [[r["uri"] for r in results] for results, _, _ in expected]
+
+
+@pytest.mark.parametrize("payload", [
+    {}, {"queries": "salud"}, {"queries": ["salud", 3]}, {"queries": ["x"] * 1001},
+])
+def test_batch_api_rejects_invalid_payloads(web_app, payload):
+    response = web_app.test_client().post("/api/search/batch", json=payload)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,54 @@
+import random
+
+from entity_linker import AhoCorasick, EntityLinker
+from news_index import NewsRecord
+
+
+def test_automaton_reports_every_overlapping_match():
+    rng = random.Random(3)
+    words = ["a", "b", "c"]
+    patterns = sorted({tuple(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(12)})
+    automaton = AhoCorasick()
+    for pattern in patterns:
+        automaton.add(pattern)
+    for _ in range(200):
+        tokens = [rng.choice(words) for _ in range(rng.randint(0, 10))]
+        expected = sorted((end, pid) for pid, pattern in enumerate(patterns)
+                          for end in range(len(pattern) - 1, len(tokens))
+                          if tuple(tokens[end - len(pattern) + 1:end + 1]) == pattern)
+        assert sorted(automaton.iter_matches(tokens)) == expected
+
+
+LABELS = [
+    ("Bogotá", "dbr:Bogotá"),
+    ("Nueva York", "dbr:New_York_City"),
+    ("York", "dbr:York"),
+    ("Organización Mundial de la Salud", "dbr:WHO"),
+    ("OMS", "dbr:WHO"),
+    ("UE", "dbr:EU"),
+    ("2020", "dbr:2020"),
+]
+
+
+def test_link_text_matches_whole_words_without_accents():
+    linker = EntityLinker.from_labels(LABELS)
+    assert linker.link_text("Reunión en bogota y NUEVA YORK") == [
+        "dbr:Bogotá", "dbr:New_York_City", "dbr:York"]
+    assert linker.link_text("La organizacion mundial de la salud (OMS)") == ["dbr:WHO"]
+    # Etiquetas cortas o numéricas y fragmentos de palabras no enlazan.
+    assert linker.link_text("La UE en 2020, yorkshire") == []
+
+
+def test_adjacency_lists_follow_relinked_records():
+    linker = EntityLinker.from_labels(LABELS)
+    linker.link_corpus([
+        NewsRecord(uri="n1", titulo="Lluvias en Bogotá"),
+        NewsRecord(uri="n2", titulo="Informe", tematicas=["OMS"]),
+    ])
+    assert linker.resources_for("n1") == ["dbr:Bogotá"]
+    assert linker.news_for("dbr:WHO") == ["n2"]
+
+    linker.add_record(NewsRecord(uri="n1", titulo="Vuelos a York"))
+    assert linker.resources_for("n1") == ["dbr:York"]
+    assert linker.news_for("dbr:Bogotá") == []
+    assert linker.get_statistics()["links"] == 2
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from rdflib import BNode, ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, XSD
+
+from export import ExportError, chunks, resolve_format, select_news, serialize
+from news_index import NewsIndex, NewsRecord
+
+
+EX = "http://ej.org/"
+
+
+def sample_graph():
+    graph = Graph()
+    news, place = URIRef(EX + "n1"), BNode()
+    graph.add((news, RDF.type, URIRef(EX + "Noticia")))
+    graph.add((news, URIRef(EX + "titulo"), Literal('Dijo "basta"\ny se fue \\ ñ', lang="es")))
+    graph.add((news, URIRef(EX + "fecha"), Literal("2024-02-29", datatype=XSD.date)))
+    graph.add((news, URIRef(EX + "lugar"), place))
+    graph.add((place, URIRef(EX + "nombre"), Literal("Quito")))
+    return graph
+
+
+@pytest.mark.parametrize("fmt, rdflib_format", [("nt", "nt"), ("jsonld", "json-ld")])
+def test_triple_formats_round_trip(fmt, rdflib_format):
+    graph = sample_graph()
+    document = b"".join(chunks(serialize(graph.triples((None, None, None)), fmt, EX + "g",
+                                         {"ej": EX}), size=16))
+    parsed = Graph().parse(data=document.decode("utf-8"), format=rdflib_format)
+    assert isomorphic(parsed, graph)
+
+
+def test_nquads_round_trip_into_named_graph():
+    graph = sample_graph()
+    document = "".join(serialize(graph.triples((None, None, None)), "nq", EX + "g"))
+    dataset = ConjunctiveGraph()
+    dataset.parse(data=document, format="nquads")
+    assert isomorphic(dataset.get_context(URIRef(EX + "g")), graph)
+
+
+def test_resolve_format_aliases_and_errors():
+    assert resolve_format("N-Quads") == "nq"
+    assert resolve_format("") == "nt"
+    with pytest.raises(ExportError):
+        resolve_format("turtle")
+
+
+def test_select_news_filters_and_rejects_bad_parameters():
+    index = NewsIndex([
+        NewsRecord(uri=EX + "n0", titulo="Vacuna", fecha="2024-01-05", tematicas=["Salud"], estados=["Finalizada"]),
+        NewsRecord(uri=EX + "n1", titulo="Elecciones", fecha="2023-06-01", tematicas=["Política"]),
+    ])
+    uris = lambda bits: [index.records[i].uri for i in index.iter_ids(bits)]
+    assert uris(select_news(index, filters={"estado": ["Finalizada"]})) == [EX + "n0"]
+    assert uris(select_news(index, since="2023", until="2023-12")) == [EX + "n1"]
+    assert uris(select_news(index, query="tema:salud", since="2024")) == [EX + "n0"]
+    with pytest.raises(ExportError):
+        select_news(index, filters={"color": ["rojo"]})
+    with pytest.raises(ExportError):
+        select_news(index, since="2024", until="2023")
+
+
+def test_http_export_rejects_invalid_dates(web_app):
+    client = web_app.test_client()
+    assert client.get("/api/export?format=nt&q=fecha:last9999999y").status_code == 200
+    assert client.get("/api/export?format=nt&desde=2024-13").status_code == 400
+
+
+def test_asgi_bridge_streams_export_in_chunks(web_app):
+    from async_app import AsyncNewsApp
+
+    expected = web_app.test_client().get("/api/export?format=nt").data
+    asgi_app = AsyncNewsApp(web_app.extensions["news_search"].runtime, web_app)
+    scope = {"type": "http", "method": "GET", "path": "/api/export", "query_string": b"format=nt",
+             "headers": [], "client": ("127.0.0.1", 5000)}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, bodies = sent[0], sent[1:]
+    assert start["status"] == 200
+    assert len(bodies) > 2
+    assert all(message["more_body"] for message in bodies[:-1]) and not bodies[-1]["more_body"]
+    assert b"".join(message["body"] for message in bodies) == expected
@@ -0,0 +1,48 @@
+from fragment_cache import FragmentCache, fill, slot
+
+
+TRANSLATIONS = {"title": {"es": "Buscador", "en": "Search"}, "back": {"es": "Volver"}}
+
+
+def test_chrome_falls_back_to_spanish_and_unknown_languages_share_it():
+    fragments = FragmentCache(TRANSLATIONS)
+    assert fragments.chrome("en") == {"title": "Search", "back": "Volver"}
+    for i in range(50):
+        assert fragments.chrome(f"x{i}") == {"title": "Buscador", "back": "Volver"}
+    assert fragments.get_statistics()["languages"] == ["en", "es"]
+
+
+def test_get_caches_per_version_and_refreshes_changed_fields():
+    fragments = FragmentCache(TRANSLATIONS, max_entries=2)
+    renders = []
+
+    def render(text):
+        renders.append(text)
+        return text
+
+    assert fragments.get((1,), "a", "f", lambda: render("a1")) == "a1"
+    assert fragments.get((1,), "a", "f", lambda: render("a2")) == "a1"
+    assert fragments.get((1,), "a", "g", lambda: render("a3")) == "a3"
+    assert fragments.get((2,), "a", "g", lambda: render("a4")) == "a4"
+    # Una petición de la generación anterior no toca la caché.
+    assert fragments.get((1,), "a", "g", lambda: render("a5")) == "a5"
+    assert fragments.get((2,), "a", "g", lambda: render("a6")) == "a4"
+    assert renders == ["a1", "a3", "a4", "a5"]
+    assert fragments.invalidations == 1
+
+
+def test_fill_replaces_slots():
+    assert fill(f"<a href='?x{slot('keyword')}'>", {"keyword": "&amp;k=1"}) == "<a href='?x&amp;k=1'>"
+
+
+def test_unsupported_lang_does_not_grow_page_caches(web_app):
+    client = web_app.test_client()
+    fragments = web_app.extensions["news_search"].fragments
+    for i in range(30):
+        assert client.get(f"/?keyword=salud&lang=x{i}").status_code == 200
+    assert fragments.get_statistics()["languages"] == ["es"]
+    cards = len(fragments.entries)
+    assert cards and {key[2] for key in fragments.entries} == {"es"}
+    assert client.get("/?keyword=salud&lang=en").status_code == 200
+    assert {key[2] for key in fragments.entries} == {"es", "en"}
+    assert len(fragments.entries) == 2 * cards
@@ -0,0 +1,57 @@
+import itertools
+import random
+
+import pytest
+
+from fuzzy_index import FuzzyIndex, edit_distance
+
+
+def _osa(a, b):
+    """Distancia OSA completa, sin banda ni corte, como referencia."""
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i, j in itertools.product(range(1, len(a) + 1), range(1, len(b) + 1)):
+        cost = 0 if a[i - 1] == b[j - 1] else 1
+        d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+        if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+            d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def test_edit_distance_matches_reference_within_bound():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 6)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 6)))
+        for bound in (1, 2):
+            assert edit_distance(a, b, bound) == min(_osa(a, b), bound + 1), (a, b, bound)
+
+
+@pytest.fixture
+def index():
+    fuzzy = FuzzyIndex()
+    for text in ["Elecciones presidenciales", "elecciones", "Vacuna COVID", "economía", "Colombia"]:
+        fuzzy.add_text(text)
+    return fuzzy
+
+
+def test_lookup_orders_by_distance_then_frequency(index):
+    assert index.lookup("elecciones") == [("elecciones", 0, 2)]
+    assert index.lookup("eleciones")[0] == ("elecciones", 1, 2)
+    assert index.lookup("presidensiale")[0][:2] == ("presidenciales", 2)
+    assert index.lookup("colombai")[0][:2] == ("colombia", 1)
+
+
+def test_short_words_tolerate_a_single_error(index):
+    assert index.lookup("vacna")[0][:2] == ("vacuna", 1)
+    assert index.lookup("vcna") == []
+
+
+def test_lookup_ignores_accents(index):
+    assert "economia" in index
+    assert index.lookup("economia")[0][:2] == ("economía", 0)
+
+
+def test_correct_keeps_field_prefixes_and_known_words(index):
+    assert index.correct("tema:eleciones colombai") == "tema:elecciones colombia"
+    assert index.correct("elecciones 2024 de") is None
+    assert index.correct("xyzzyq") is None
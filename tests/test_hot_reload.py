@@ -0,0 +1,146 @@
+import dataclasses
+import gc
+import threading
+import time
+
+from hot_reload import HotReloader, SnapshotHolder, WarmUp
+
+
+class Snapshot:
+    def __init__(self, generation):
+        self.generation = generation
+
+
+def reloader_for(tmp_path, retire_timeout=0.3):
+    holder = SnapshotHolder(Snapshot(1))
+    reloader = HotReloader(holder, Snapshot, [str(tmp_path / "ontologia.rdf")],
+                           retire_timeout=retire_timeout)
+    return holder, reloader
+
+
+def test_publish_swaps_and_counts_generations(tmp_path):
+    holder, reloader = reloader_for(tmp_path)
+    published = reloader.publish(lambda current, generation: Snapshot(generation))
+
+    assert holder.current is published
+    assert published.generation == 2 == reloader.generation
+    # Sin cambios no se publica nada.
+    assert reloader.publish(lambda current, generation: current) is published
+    assert reloader.publications == 1
+
+
+def test_publish_waits_while_retired_generation_is_in_use(tmp_path):
+    holder, reloader = reloader_for(tmp_path, retire_timeout=0.3)
+    in_use = holder.current  # una petición en curso con la generación 1
+    reloader.publish(lambda current, generation: Snapshot(generation))
+
+    start = time.monotonic()
+    reloader.publish(lambda current, generation: Snapshot(generation))
+    assert time.monotonic() - start >= 0.3
+    assert in_use.generation == 1
+
+
+def test_publish_does_not_wait_once_retired_generation_is_released(tmp_path):
+    holder, reloader = reloader_for(tmp_path, retire_timeout=5.0)
+    for _ in range(5):
+        start = time.monotonic()
+        reloader.publish(lambda current, generation: Snapshot(generation))
+        gc.collect()
+        assert time.monotonic() - start < 1.0
+        # Nunca hay más de dos generaciones vivas: la vigente y la retirada.
+        assert sum(isinstance(obj, Snapshot) for obj in gc.get_objects()) <= 2
+    assert reloader.generation == 6
+
+
+def test_warm_up_replaces_essentials_in_background():
+    holder = SnapshotHolder(Snapshot(1))
+    release = threading.Event()
+    ready = []
+
+    def complete(essentials):
+        release.wait(5)
+        return Snapshot(essentials.generation)
+
+    warm_up = WarmUp(holder, complete, on_ready=lambda: ready.append(True))
+    warm_up.start()
+    essentials = holder.current
+    assert not warm_up.done and holder.current is essentials
+
+    release.set()
+    assert warm_up.wait(5)
+    assert holder.current is not essentials and ready == [True]
+    assert warm_up.get_statistics()["discarded"] is False
+
+
+def test_warm_up_is_discarded_after_a_reload():
+    holder = SnapshotHolder(Snapshot(1))
+    reloaded = Snapshot(2)
+
+    def complete(essentials):
+        holder.swap(reloaded)  # una recarga publica mientras se calienta
+        return Snapshot(essentials.generation)
+
+    warm_up = WarmUp(holder, complete)
+    warm_up.start(background=False)
+    assert holder.current is reloaded
+    assert warm_up.discarded
+
+
+def test_warm_up_error_keeps_serving_essentials():
+    holder = SnapshotHolder(Snapshot(1))
+    essentials = holder.current
+
+    def fail(_):
+        raise RuntimeError("sin DBpedia")
+
+    warm_up = WarmUp(holder, fail)
+    warm_up.start(background=False)
+    assert warm_up.done and holder.current is essentials
+    assert warm_up.get_statistics()["error"] == "sin DBpedia"
+
+
+def test_readyz_reflects_extras(web_app):
+    client = web_app.test_client()
+    runtime = web_app.extensions["news_search"].runtime
+    response = client.get("/readyz")
+    assert response.status_code == 200 and response.get_json()["ready"]
+    assert client.get("/healthz").status_code == 200
+
+    runtime.swap(dataclasses.replace(runtime.current, extras_ready=False))
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_watcher_reloads_once_the_file_stops_changing(tmp_path):
+    path = tmp_path / "ontologia.rdf"
+    path.write_text("v1")
+    holder = SnapshotHolder(Snapshot(1))
+    reloader = HotReloader(holder, Snapshot, [str(path)], interval=0.05, retire_timeout=0.1)
+    reloader.start()
+    try:
+        path.write_text("version 2")
+        deadline = time.monotonic() + 5
+        while reloader.reloads == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        reloader.stop()
+    assert reloader.reloads == 1
+    assert holder.current.generation == 2
+
+
+def test_failed_reload_keeps_current_generation(tmp_path):
+    holder, reloader = reloader_for(tmp_path)
+    current = holder.current
+
+    def broken(generation):
+        raise ValueError("RDF mal formado")
+
+    reloader.build_fn = broken
+    assert not reloader.reload()
+    assert holder.current is current and reloader.generation == 1
+    assert reloader.get_statistics()["last_error"] == "RDF mal formado"
+
+    reloader.build_fn = Snapshot
+    assert reloader.reload()
+    assert holder.current.generation == 2 and reloader.get_statistics()["last_error"] is None
@@ -0,0 +1,61 @@
+import gzip
+from dataclasses import replace
+
+from http_cache import accepted_encoding, etag_matches, make_etag
+
+
+def test_etag_helpers():
+    etag = make_etag(1, "v", [("q", "salud")])
+    assert etag.startswith('W/"') and etag == make_etag(1, "v", [("q", "salud")])
+    assert etag != make_etag(2, "v", [("q", "salud")])
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"otro", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"otro"', etag) and not etag_matches(None, etag)
+    assert accepted_encoding("gzip, deflate") == "gzip"
+    assert accepted_encoding("gzip;q=0, identity") is None
+
+
+def test_conditional_get_answers_304_until_data_changes(web_app):
+    client = web_app.test_client()
+    first = client.get("/?keyword=salud")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+
+    again = client.get("/?keyword=salud", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b"" and again.headers["ETag"] == etag
+    assert web_app.extensions["news_search"].http_cache.not_modified == 1
+
+    # Otros parámetros u otra preferencia de tema son otra representación.
+    assert client.get("/?keyword=covid", headers={"If-None-Match": etag}).status_code == 200
+    client.set_cookie("dark_mode", "false")
+    assert client.get("/?keyword=salud", headers={"If-None-Match": etag}).status_code == 200
+    client.delete_cookie("dark_mode")
+
+    # Una generación nueva invalida el ETag.
+    state = web_app.extensions["news_search"]
+    state.reloader.publish(lambda current, generation: replace(current, generation=generation))
+    changed = client.get("/?keyword=salud", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_uncached_endpoints_have_no_etag(web_app):
+    response = web_app.test_client().get("/healthz")
+    assert "ETag" not in response.headers
+
+
+def test_large_responses_are_gzipped(web_app):
+    client = web_app.test_client()
+    plain = client.get("/?keyword=salud")
+    compressed = client.get("/?keyword=salud", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_stats_are_never_revalidated(web_app):
+    response = web_app.test_client().get("/stats")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
@@ -0,0 +1,106 @@
+from rdflib import Graph, Literal, Namespace, URIRef
+
+from ingestion import LayeredStore, TripleJournal, UriGenerator, add_to_graph, prepare_news
+
+
+NS = Namespace("http://www.semanticweb.org/cabez/ontologies/2025/2/untitled-ontology-3#")
+
+
+def base_graph():
+    graph = Graph()
+    graph.bind("onto", NS)
+    graph.add((NS.n1, NS.Título, Literal("Noticia base")))
+    return graph
+
+
+def news_write(titulo="Noticia ingerida"):
+    return prepare_news({"titulo": titulo, "texto": "texto de prueba", "tematica": "Salud"}, NS,
+                        UriGenerator("http://ej.org"))
+
+
+def test_layered_graph_isolates_generations():
+    base = base_graph()
+    first = news_write("Primera")
+    second = news_write("Segunda")
+
+    generation_2 = add_to_graph(base, first.triples)
+    generation_3 = add_to_graph(generation_2, second.triples)
+
+    assert len(base) == 1
+    assert len(generation_2) == 1 + len(first.triples)
+    assert len(generation_3) == 1 + len(first.triples) + len(second.triples)
+    assert (second.noticia, NS.Título, Literal("Segunda")) not in generation_2
+    assert generation_3.value(second.noticia, NS.Título) == Literal("Segunda")
+    # La base se comparte, no se copia.
+    assert generation_3.store.base is base
+
+
+def test_layered_graph_skips_existing_triples_and_answers_sparql():
+    base = base_graph()
+    graph = add_to_graph(base, [(NS.n1, NS.Título, Literal("Noticia base")),
+                                (NS.n2, NS.Título, Literal("Nueva"))])
+
+    assert len(graph) == 2
+    rows = graph.query(f"SELECT ?t WHERE {{ ?s <{NS.Título}> ?t }} ORDER BY ?t")
+    assert [str(row.t) for row in rows] == ["Noticia base", "Nueva"]
+
+
+def test_layered_graph_merges_layers_and_compacts():
+    graph = base_graph()
+    for i in range(LayeredStore.MAX_LAYERS + 3):
+        graph = add_to_graph(graph, [(URIRef(f"http://ej.org/n{i}"), NS.Título, Literal(str(i)))])
+
+    assert len(graph.store.layers) <= LayeredStore.MAX_LAYERS
+    compacted = graph.store.compact()
+    assert type(compacted.store) is not LayeredStore
+    assert set(compacted) == set(graph)
+    assert dict(compacted.namespaces())["onto"] == URIRef(str(NS))
+
+
+def test_layered_graph_is_read_only():
+    graph = add_to_graph(base_graph(), [])
+    try:
+        graph.add((NS.n3, NS.Título, Literal("x")))
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("una generación publicada no debe modificarse")
+
+
+def test_journal_replays_batches_and_ignores_torn_tail(tmp_path):
+    journal = TripleJournal(str(tmp_path / "data" / "ingesta.nt"))
+    first, second = news_write("Uno"), news_write("Dos")
+    journal.append(first.triples)
+    journal.append(second.triples)
+    with open(journal.path, "ab") as handle:
+        handle.write(b'<http://ej.org/roto> <http://ej.org/p> "sin term')
+
+    graph = base_graph()
+    assert journal.replay(graph) == len(first.triples) + len(second.triples)
+    assert graph.value(second.noticia, NS.Título) == Literal("Dos")
+
+    journal.truncate()
+    assert journal.size() == 0
+    assert journal.replay(base_graph()) == 0
+
+
+def test_journal_detects_appends_from_another_process(tmp_path):
+    path = str(tmp_path / "data" / "ingesta.nt")
+    server, poblacion = TripleJournal(path), TripleJournal(path)
+    server.append(news_write("Desde la API").triples)
+    assert not server.foreign_writes()
+
+    graph = base_graph()
+    poblacion.replay(graph)
+    pending = poblacion.track(graph)
+    inserted = news_write("Desde Poblacion")
+    for triple in inserted.triples:
+        graph.add(triple)
+    assert pending == inserted.triples
+    poblacion.append(pending)
+
+    assert server.foreign_writes() and not poblacion.foreign_writes()
+    reloaded = base_graph()
+    server.replay(reloaded)
+    assert reloaded.value(inserted.noticia, NS.Título) == Literal("Desde Poblacion")
+    assert not server.foreign_writes()
@@ -0,0 +1,93 @@
+import threading
+
+from rdflib import Graph, Namespace, RDF
+from rdflib.namespace import OWL
+
+import lexicon as lexicon_module
+from lexicon import Lexicon, lexicon_groups, load_or_build_lexicon, sources_fingerprint
+from query_parser import Clause, parse_query
+
+
+NS = Namespace("http://ej.org/onto#")
+
+
+def test_build_merges_groups_sharing_a_term():
+    lexicon = Lexicon.build([
+        {"es": ["Vacuna"], "en": ["vaccine"]},
+        {"en": ["Vaccine", "jab"], "pt": ["vacina"]},
+        {"es": ["ue"], "en": ["eu"]},
+        {"es": ["solo"]},
+    ])
+    assert lexicon.concepts == [{"es": ["vacuna"], "en": ["jab", "vaccine"], "pt": ["vacina"]}]
+    assert lexicon.lookup("  VACINA ") == ("vacuna", "jab", "vaccine", "vacina")
+    assert lexicon.lookup("solo") == ()
+
+
+def test_expand_query_joins_known_phrases_and_expands_topics():
+    lexicon = Lexicon.build(lexicon_groups(Graph(), NS))
+    clauses = lexicon.expand_query(parse_query('fake news tema:salud -vacuna bolivia')).clauses
+
+    assert clauses[0].field == "text" and clauses[0].value == "fake news"
+    assert {"noticias falsas", "bulo", "boato"} <= set(clauses[0].alternatives)
+    assert "fake news" not in clauses[0].alternatives
+    assert clauses[1] == Clause("tema", "salud", False, ("health", "saude"))
+    # Una negación excluye también los equivalentes; lo desconocido queda igual.
+    assert clauses[2:] == [Clause("text", "vacuna", True, ("vaccine", "vacina")), Clause("text", "bolivia")]
+
+
+def test_negated_words_do_not_join_phrases():
+    lexicon = Lexicon.build(lexicon_groups(Graph(), NS))
+    clauses = lexicon.expand_query(parse_query("fake -news")).clauses
+    assert [(c.value, c.negated) for c in clauses] == [("fake", False), ("news", True)]
+    assert "noticias" in clauses[1].alternatives
+
+
+def test_saved_lexicon_is_reused_while_sources_match(tmp_path):
+    path = str(tmp_path / "lexicon.json")
+    built = load_or_build_lexicon(Graph(), NS, path=path)
+    assert built.fingerprint == sources_fingerprint(set())
+
+    loaded = Lexicon.load(path)
+    assert loaded.concepts == built.concepts and loaded.terms == built.terms
+
+    # Con otra huella guardada se reconstruye y se sobrescribe.
+    Lexicon(built.concepts[:1], "obsoleta").save(path)
+    rebuilt = load_or_build_lexicon(Graph(), NS, path=path)
+    assert rebuilt.concepts == built.concepts
+    assert Lexicon.load(path).fingerprint == built.fingerprint
+
+
+def test_matching_fingerprint_skips_grouping(tmp_path, monkeypatch):
+    path = str(tmp_path / "lexicon.json")
+    built = load_or_build_lexicon(Graph(), NS, path=path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("no debe reagrupar un léxico vigente")
+
+    monkeypatch.setattr(lexicon_module, "lexicon_groups", fail)
+    assert load_or_build_lexicon(Graph(), NS, path=path).concepts == built.concepts
+
+    # Un cambio en el vocabulario de la ontología sí obliga a reconstruirlo.
+    monkeypatch.undo()
+    graph = Graph()
+    graph.add((NS.SaludPública, RDF.type, OWL.Class))
+    rebuilt = load_or_build_lexicon(graph, NS, path=path)
+    assert rebuilt.fingerprint != built.fingerprint
+    assert "saludpublica" in rebuilt.lookup("public health")
+
+
+def test_lookup_counters_are_exact_under_concurrency():
+    lexicon = Lexicon.build(lexicon_groups(Graph(), NS))
+
+    def work():
+        for _ in range(2000):
+            lexicon.lookup("vacuna")
+            lexicon.lookup("desconocido")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = lexicon.get_statistics()
+    assert (stats["lookups"], stats["expanded"]) == (32000, 16000)
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from dbpedia_manager import DBpediaResource
+from location_index import LocationHierarchy, build_location_hierarchy
+from news_index import NewsIndex, NewsRecord
+
+
+def _dbpedia():
+    resources = [
+        DBpediaResource("dbr:La_Paz", "La Paz", "", properties={"country": "Bolivia"}),
+        DBpediaResource("dbr:Bolivia", "Bolivia", "", categories=["Countries in South America"]),
+        DBpediaResource("dbr:Evo", "Evo Morales", "", properties={"birthPlace": "Orinoca"}),
+    ]
+    return SimpleNamespace(resources={r.uri: r for r in resources})
+
+
+def _records():
+    return [
+        NewsRecord(uri="n1", ubicaciones=["Sucre, Chuquisaca, Bolivia"]),
+        NewsRecord(uri="n2", ubicaciones=["la paz"]),
+        NewsRecord(uri="n3", ubicaciones=["Lima, Perú"]),
+        NewsRecord(uri="n4"),
+    ]
+
+
+def test_news_roll_up_to_every_container():
+    records = _records()
+    hierarchy = build_location_hierarchy(_dbpedia(), records)
+
+    assert records[0].lugares == ["Sucre", "Chuquisaca", "Bolivia"]
+    # La etiqueta de DBpedia prevalece sobre la escrita en la Ubicación.
+    assert records[1].lugares == ["La Paz", "Bolivia"]
+    assert hierarchy.uri("BOLIVIA") == "dbr:Bolivia"
+    assert hierarchy.uri("Evo Morales") is None
+
+    index = NewsIndex(records)
+    bolivia = index.filter_bits({"ubicacion": ["Bolivia"]})
+    assert sorted(index.records[i].uri for i in index.iter_ids(bolivia)) == ["n1", "n2"]
+    assert index.facet_counts(index.all_bits)["ubicacion"][0] == ("Bolivia", 2)
+
+
+def test_cycles_are_not_added():
+    hierarchy = LocationHierarchy()
+    hierarchy.learn("A, B, C")
+    hierarchy.learn("C, A")
+    assert hierarchy.ancestors("a") == ("b", "c")
+    assert hierarchy.ancestors("c") == ()
+
+
+def test_refresh_copies_records_whose_places_change():
+    records = _records()
+    hierarchy = build_location_hierarchy(_dbpedia(), records)
+    snapshot = hierarchy.copy()
+
+    assert hierarchy.refresh(records, [NewsRecord(uri="n5", ubicaciones=["Cusco, Perú"])]) == []
+    updated = hierarchy.refresh(records, [NewsRecord(uri="n6", ubicaciones=["Perú, Sudamérica"])])
+    assert [(r.uri, r.lugares) for r in updated] == [("n3", ["Lima", "Perú", "Sudamérica"])]
+    # Los registros y la jerarquía de la generación vigente no cambian.
+    assert records[2].lugares == ["Lima", "Perú"]
+    assert snapshot.ancestors("peru") == ()
@@ -0,0 +1,53 @@
+import sys
+
+import app
+from memory_report import MemoryAccountant, deep_sizeof
+
+
+class Slotted:
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+def test_deep_sizeof_follows_containers_and_slots():
+    payload = ["x" * 1000]
+    size, objects = deep_sizeof(Slotted(payload))
+    assert size >= sys.getsizeof(payload[0])
+    assert objects == 3
+
+    seen = set()
+    deep_sizeof(payload, seen)
+    # Lo ya contado por otro subsistema no vuelve a contarse.
+    assert deep_sizeof(Slotted(payload), seen)[1] == 1
+
+
+def test_shared_objects_are_attributed_once_and_growth_tracked():
+    shared = ["y" * 5000]
+    cache = {}
+    accountant = MemoryAccountant(lambda: {"primero": shared, "segundo": [shared]})
+    accountant.register("cache", lambda: cache)
+
+    first = accountant.report()
+    sizes = first["subsystems"]
+    assert sizes["primero"]["bytes"] > 5000 > sizes["segundo"]["bytes"]
+    assert first["accounted_bytes"] == sum(entry["bytes"] for entry in sizes.values())
+    assert all(entry["growth"] == 0 for entry in sizes.values())
+
+    cache["clave"] = "z" * 10000
+    assert accountant.report()["subsystems"]["cache"]["growth"] > 10000
+    assert accountant.get_statistics()["reports"] == 2
+
+
+def test_admin_memory_route_requires_token(web_app, monkeypatch):
+    client = web_app.test_client()
+    monkeypatch.setattr(app.NewsSearchConfig, "ADMIN_TOKEN", "")
+    assert client.get("/admin/memory").status_code == 404
+
+    monkeypatch.setattr(app.NewsSearchConfig, "ADMIN_TOKEN", "secreto")
+    assert client.get("/admin/memory", headers={"X-Admin-Token": "otro"}).status_code == 403
+    response = client.get("/admin/memory", headers={"Authorization": "Bearer secreto"})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-store"
+    assert {"graph", "news_index"} <= set(response.get_json()["subsystems"])
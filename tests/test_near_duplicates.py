@@ -0,0 +1,74 @@
+from near_duplicates import NearDuplicateIndex, collapse_duplicates
+
+
+TEXT = ("el ministerio de salud confirmó hoy la llegada de un nuevo lote de vacunas "
+        "contra la gripe que se distribuirá en los centros de salud de todo el país")
+
+
+def test_statistics_count_only_clusters_with_duplicates():
+    index = NearDuplicateIndex(":memory:")
+    index.add_many([
+        ("http://ej.org/a", "Llegan nuevas vacunas", TEXT),
+        ("http://ej.org/b", "Llegan nuevas vacunas", TEXT + " esta semana"),
+        ("http://ej.org/c", "Elecciones municipales", "la junta electoral publicó el calendario de votación"),
+        ("http://ej.org/d", "Sube el precio del pan", "los panaderos anuncian subidas por el coste de la harina"),
+    ])
+    stats = index.get_statistics()
+    clusters = index.clusters()
+    assert set(clusters) == {"http://ej.org/a", "http://ej.org/b"}
+    assert (stats["items"], stats["clusters"], stats["grouped"], stats["duplicates"]) == (4, 1, 2, 1)
+    assert stats["clusters"] == len(set(clusters.values()))
+
+    results = [{"uri": "http://ej.org/b"}, {"uri": "http://ej.org/c"}, {"uri": "http://ej.org/a"}]
+    assert [r["uri"] for r in collapse_duplicates(results, clusters)] == ["http://ej.org/b", "http://ej.org/c"]
+    index.close()
+
+
+LONG_TEXT = ("el gobierno regional presentó este martes el plan de movilidad urbana que prevé ampliar "
+             "la red de autobuses eléctricos, crear nuevos carriles para bicicletas en el centro histórico "
+             "y reducir el tráfico de vehículos privados en las horas de mayor congestión durante los "
+             "próximos cinco años con una inversión cercana a los doscientos millones de euros")
+
+
+def test_near_identical_texts_share_a_cluster():
+    index = NearDuplicateIndex(":memory:")
+    original = index.add("http://ej.org/a", "Plan de movilidad urbana", LONG_TEXT)
+    # Otra agencia publica la misma nota con retoques mínimos.
+    edited = LONG_TEXT.replace("este martes", "el martes").replace("cercana a", "de casi")
+    [(uri, similarity)] = index.find("Plan de movilidad urbana", edited)
+    assert uri == "http://ej.org/a" and similarity >= index.threshold
+
+    assert index.add("http://ej.org/b", "Plan de movilidad urbana", edited) == original
+    assert index.clusters() == {"http://ej.org/a": original, "http://ej.org/b": original}
+    index.close()
+
+
+def test_unrelated_texts_stay_apart():
+    index = NearDuplicateIndex(":memory:")
+    index.add("http://ej.org/a", "Plan de movilidad urbana", LONG_TEXT)
+    # Mismo tema con otras palabras, y otra noticia distinta.
+    same_topic = ("la consejería de transporte anunció un programa para renovar los autobuses, "
+                  "sumar vías ciclistas y limitar el acceso de coches al centro de la ciudad")
+    unrelated = "la selección nacional ganó la final del campeonato tras una prórroga muy disputada"
+
+    assert index.find("Movilidad en la ciudad", same_topic) == []
+    assert index.find("Victoria en la final", unrelated) == []
+    clusters = {index.add("http://ej.org/b", "Movilidad en la ciudad", same_topic),
+                index.add("http://ej.org/c", "Victoria en la final", unrelated),
+                index.cluster_of("http://ej.org/a")}
+    assert len(clusters) == 3
+    assert index.clusters() == {}
+    index.close()
+
+
+def test_search_collapses_duplicates_into_one_result(web_app, monkeypatch):
+    from app import NewsSearchConfig
+
+    manager = web_app.extensions["news_search"].runtime.current.search_manager
+    results, _, _ = manager.search_news("Amuleto")
+    assert [r["titulo"] for r in results] == ["Amuleto (novela)"]
+    assert results[0]["duplicados"] == 1
+    assert "+1" in web_app.test_client().get("/?keyword=Amuleto").get_data(as_text=True)
+
+    monkeypatch.setattr(NewsSearchConfig, "COLLAPSE_DUPLICATES", False)
+    assert [r["titulo"] for r in manager.search_news("Amuleto")[0]] == ["Amuleto (novela)"] * 2
@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+from news_index import DateIndex, NewsIndex, NewsRecord, parse_date_query
+
+
+TODAY = date(2025, 3, 15)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2024", ("2024", "2024￿")),
+    ("2024-02", ("2024-02", "2024-02￿")),
+    ("2024-02-29", ("2024-02-29", "2024-02-29￿")),
+    ("2024..2025-01", ("2024", "2025-01￿")),
+    ("..2024", ("0000", "2024￿")),
+    ("2024..", ("2024", "9999￿")),
+    ("2024-05..2024", ("2024-05", "2024￿")),
+    (" LAST30D ", ("2025-02-13", "2025-03-15")),
+    ("last2w", ("2025-03-01", "2025-03-15")),
+    ("last1y", ("2024-03-15", "2025-03-15")),
+])
+def test_parse_date_query_accepts_valid_expressions(expression, expected):
+    assert parse_date_query(expression, TODAY) == expected
+
+
+@pytest.mark.parametrize("expression", [
+    "2024-13", "2024-00", "2024-02-30", "2023-02-29", "2024-1", "24", "0000",
+    "2024..2023", "2024-03..2024-02-28", "ayer", "last5x", "2024..ayer", "",
+])
+def test_parse_date_query_rejects_invalid_expressions(expression):
+    assert parse_date_query(expression, TODAY) is None
+
+
+def test_parse_date_query_caps_huge_relative_amounts():
+    assert parse_date_query("last9999999y", TODAY) == ("0000", "2025-03-15")
+    assert parse_date_query("last" + "9" * 5000 + "d", TODAY) == ("0000", "2025-03-15")
+
+
+def test_date_index_ranges():
+    index = DateIndex(["2024-01-05", "?", "2023-12-31", "2024-02-10"])
+    start, end = parse_date_query("2024")
+    assert sorted(index.range_ids(start, end)) == [0, 3]
+    assert index.range_count(*parse_date_query("2023")) == 1
+    assert index.range_count(*parse_date_query("2022")) == 0
+
+
+def test_news_index_date_search():
+    records = [NewsRecord(uri=f"http://ej.org/n{i}", titulo=f"Noticia {i}", fecha=fecha)
+               for i, fecha in enumerate(["2024-01-05", "2024-06-01", "2023-12-31"])]
+    index = NewsIndex(records)
+    bits = index.date_bits("2024")
+    assert sorted(index.records[i].uri for i in index.iter_ids(bits)) == ["http://ej.org/n0", "http://ej.org/n1"]
+
+
+def _facet_records(count):
+    return [NewsRecord(uri=f"http://ej.org/n{i}", fecha=f"202{i % 3}-{i % 12 + 1:02d}-01",
+                       tematicas=[f"t{i % 40}"] + (["comun"] if i % 2 else []),
+                       autores=[f"a{i % 7}"], estados=["Verificada"] if i % 5 == 0 else [])
+            for i in range(count)]
+
+
+def _expected_counts(index, bits, top_k):
+    expected = {}
+    for facet in NewsIndex.FACETS:
+        counter = {}
+        for doc_id in index.iter_ids(bits):
+            for value in set(index.records[doc_id].facet_values(facet)):
+                counter[value] = counter.get(value, 0) + 1
+        expected[facet] = sorted(counter.items(), key=lambda c: (-c[1], c[0]))[:top_k]
+    return expected
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 97])
+def test_facet_counts_match_brute_force(step):
+    # 1500 noticias: con paso 2 o 3 se supera COLUMNAR_RESULT_LIMIT y se
+    # combinan bitmaps densos, postings dispersos y rangos de mes.
+    index = NewsIndex(_facet_records(1500))
+    bits = sum(1 << i for i in range(0, len(index), step))
+    assert index.facet_counts(bits, top_k=5) == _expected_counts(index, bits, 5)
+
+
+def test_facet_counts_empty_result():
+    index = NewsIndex(_facet_records(10))
+    assert index.facet_counts(0) == {facet: [] for facet in NewsIndex.FACETS}
+
+
+def test_filter_bits_or_within_facet_and_across_facets():
+    index = NewsIndex(_facet_records(200))
+    uris = lambda bits: {index.records[i].uri for i in index.iter_ids(bits)}
+
+    autores = index.filter_bits({"autor": ["a1", "a2"]})
+    assert uris(autores) == {r.uri for r in index.records if r.autores[0] in ("a1", "a2")}
+
+    both = index.filter_bits({"autor": ["a1", "a2"], "estado": ["Verificada"]})
+    assert uris(both) == {r.uri for r in index.records
+                          if r.autores[0] in ("a1", "a2") and r.estados == ["Verificada"]}
+    assert index.filter_bits({"autor": [], "desconocida": ["x"]}) == index.all_bits
+    assert index.filter_bits({"autor": ["nadie"]}) == 0
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+from rdflib import URIRef
+
+from news_index import infer_properties, news_details
+from sharding import ShardedNewsSearch
+from sparql_endpoint import START_METHOD
+
+
+@pytest.fixture
+def degraded(web_app):
+    """Modo particionado con una de las dos particiones caída."""
+    manager = web_app.extensions["news_search"].runtime.current.search_manager
+    shards = ShardedNewsSearch(manager.news_index.records, None, 2, timeout=0.5)
+    shards.processes[1].terminate()
+    shards.processes[1].join()
+    manager.shards = shards
+    yield manager
+    manager.shards = None
+    shards.close()
+
+
+def test_search_manager_reports_missing_shards(degraded):
+    results, kind, missing = degraded.search_news("salud")
+    assert missing == [1]
+    assert all(degraded.shards.owners[r["uri"]] == 0 for r in results)
+    assert degraded.search_with_correction("salud")[3] == [1]
+    assert [entry[2] for entry in degraded.search_many(["salud", "covid"])] == [[1], [1]]
+
+
+def test_partial_page_is_flagged_and_not_cached(web_app, degraded):
+    response = web_app.test_client().get("/?keyword=salud")
+    assert response.status_code == 200
+    assert "Resultados incompletos" in response.get_data(as_text=True)
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+
+
+def test_batch_api_flags_partial_results(web_app, degraded):
+    payload = web_app.test_client().post("/api/search/batch", json={"queries": ["salud"]}).get_json()
+    assert payload["results"][0]["partial"] is True
+
+
+def test_complete_results_keep_cache_headers(web_app):
+    client = web_app.test_client()
+    response = client.get("/?keyword=salud")
+    assert "Resultados incompletos" not in response.get_data(as_text=True)
+    assert response.headers["Cache-Control"].startswith("public")
+    assert client.post("/api/search/batch", json={"queries": ["salud"]}).get_json()["results"][0]["partial"] is False
+
+
+def test_dead_shard_is_skipped_without_waiting_for_the_timeout(web_app):
+    records = web_app.extensions["news_search"].runtime.current.news_index.records
+    shards = ShardedNewsSearch(records, None, 2, timeout=5.0)
+    try:
+        shards.processes[1].kill()
+        shards.processes[1].join()
+        deadline = time.monotonic() + 5
+        while 1 not in shards.dead and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        start = time.monotonic()
+        results, missing = shards.search([])
+        assert missing == [1] and time.monotonic() - start < 1.0
+        assert all(shards.owners[r["uri"]] == 0 for r in results)
+        assert shards.get_statistics()["dead"] == [1]
+    finally:
+        shards.close()
+
+
+def test_shards_describe_their_own_news(web_app):
+    snapshot = web_app.extensions["news_search"].runtime.current
+    shards = ShardedNewsSearch(snapshot.news_index.records, snapshot.graph, 2)
+    try:
+        assert all(type(process)._start_method == START_METHOD for process in shards.processes)
+        uri = snapshot.news_index.records[0].uri
+        detalles, inferred = shards.detail(uri)
+        assert detalles == news_details(snapshot.graph, uri)
+        expected = infer_properties(snapshot.graph, URIRef(uri))
+        assert {key: sorted(values) for key, values in inferred.items()} == \
+            {key: sorted(values) for key, values in expected.items()}
+        assert shards.detail("http://ej.org/desconocida") is None
+    finally:
+        shards.close()
@@ -0,0 +1,62 @@
+from news_index import NewsIndex, NewsRecord
+from query_parser import Clause, QueryPlanner, parse_query
+
+
+def make_index():
+    return NewsIndex([
+        NewsRecord(uri="http://ej.org/n0", titulo="Vacuna aprobada ayer", fecha="2024-01-05",
+                   tematicas=["Salud"], autores=["Juan Pérez"], estados=["Finalizada"]),
+        NewsRecord(uri="http://ej.org/n1", titulo="Elecciones municipales", fecha="2024-06-01",
+                   tematicas=["Política"], autores=["Ana Gómez"], estados=["En proceso"]),
+        NewsRecord(uri="http://ej.org/n2", titulo="Brote de covid en la ciudad", fecha="2023-12-31",
+                   tematicas=["Salud"], autores=["Ana Gómez"], estados=["Finalizada"]),
+    ])
+
+
+def uris(index, bits):
+    return sorted(index.records[i].uri for i in index.iter_ids(bits))
+
+
+def test_parse_query_fields_phrases_and_negation():
+    query = parse_query('autor:"Juan Pérez" tema:salud fecha:2024 verificadas -covid http://x')
+    assert query.clauses == [
+        Clause("autor", "Juan Pérez"), Clause("tema", "salud"), Clause("fecha", "2024"),
+        Clause("verificadas"), Clause("text", "covid", negated=True), Clause("text", "http://x"),
+    ]
+    assert query.kind == "compuesta"
+    assert parse_query("vacuna").kind == "general"
+
+
+def test_unparseable_date_falls_back_to_text():
+    assert parse_query("fecha:ayer").clauses == [Clause("text", "ayer")]
+    assert parse_query("verificacion:2024-13").clauses == [Clause("text", "2024-13")]
+    assert parse_query("fecha:verificadas").clauses == [Clause("text", "verificadas")]
+    index = make_index()
+    assert uris(index, QueryPlanner(index).execute(parse_query("fecha:ayer"))) == ["http://ej.org/n0"]
+
+
+def test_plan_orders_by_selectivity_and_text_last():
+    index = make_index()
+    plan = QueryPlanner(index).plan(parse_query("vacuna tema:salud autor:juan -fecha:2023"))
+    assert [(clause.field, estimate) for clause, estimate in plan] == [
+        ("autor", 1), ("tema", 2), ("fecha", 1), ("text", None),
+    ]
+
+
+def test_execute_and_execute_many_agree():
+    index = make_index()
+    planner = QueryPlanner(index)
+    texts = ["tema:salud -covid", "autor:ana fecha:2024", "verificadas", "salud ciudad", "fecha:2022"]
+    queries = [parse_query(text) for text in texts]
+    single = [planner.execute(query) for query in queries]
+    assert single == planner.execute_many(queries)
+    assert [uris(index, bits) for bits in single] == [
+        ["http://ej.org/n0"], ["http://ej.org/n1"], ["http://ej.org/n0", "http://ej.org/n2"],
+        ["http://ej.org/n2"], [],
+    ]
+
+
+def test_execute_respects_allowed_bitmap():
+    index = make_index()
+    allowed = index.filter_bits({"autor": ["Ana Gómez"]})
+    assert uris(index, QueryPlanner(index).execute(parse_query("tema:salud"), allowed)) == ["http://ej.org/n2"]
@@ -0,0 +1,37 @@
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS, XSD
+
+from app import NewsSearchConfig, RDFSearchEngine
+from verification_index import VerificationIndex
+
+
+NS = NewsSearchConfig.ONTOLOGY_NS
+
+
+def make_engine():
+    graph = Graph()
+    graph.add((NS.Noticia, RDFS.subClassOf, NS.Noticia))
+    for i, fecha in enumerate(["2024-01-05", "2024-02-29", "2023-12-31"]):
+        news = URIRef(f"http://ej.org/n{i}")
+        graph.add((news, RDF.type, NS.Noticia))
+        graph.add((news, NS["Título"], Literal(f"Noticia {i}")))
+        graph.add((news, NS["Fecha_publicación"], Literal(fecha, datatype=XSD.date)))
+    return RDFSearchEngine(graph, NS, VerificationIndex.from_graph(graph, NS))
+
+
+def search(engine, expression):
+    return sorted(row["uri"] for row in engine.execute_search(engine.build_query(expression, "fecha")))
+
+
+def test_fecha_search_uses_date_expressions():
+    engine = make_engine()
+    assert search(engine, "2024") == ["http://ej.org/n0", "http://ej.org/n1"]
+    assert search(engine, "2024-02") == ["http://ej.org/n1"]
+    assert search(engine, "2023-12-31") == ["http://ej.org/n2"]
+    assert search(engine, "..2024-01") == ["http://ej.org/n0", "http://ej.org/n2"]
+
+
+def test_fecha_search_rejects_invalid_expressions_without_injection():
+    engine = make_engine()
+    assert search(engine, "2024-13") == []
+    assert search(engine, '2024") || true || ("') == []
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from resilience import AsyncHedgedClient, CircuitBreaker, CircuitOpen, ClientError, HedgedClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_lets_a_single_probe_through():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow() and not breaker.allow()
+    # La prueba fallida reabre el circuito en el acto.
+    assert breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    assert breaker.get_statistics()["times_opened"] == 2
+
+
+@pytest.fixture
+def release():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_slow_primary_is_hedged_to_the_replica(release):
+    def call(url, payload):
+        if url == "principal":
+            release.wait(5)
+        return url, payload
+
+    client = HedgedClient(["principal", "replica"], call, deadline=0.4)
+    start = time.monotonic()
+    assert client.request("q") == ("replica", "q")
+    assert time.monotonic() - start < 0.35
+    assert client.hedged == client.hedge_wins == 1
+    client.close()
+
+
+def test_failures_fail_over_and_open_the_circuit():
+    calls = []
+
+    def call(url, payload):
+        calls.append(url)
+        if url == "principal":
+            raise ConnectionError("caído")
+        return url
+
+    client = HedgedClient(["principal", "replica"], call, deadline=1, failure_threshold=2)
+    assert client.request("q") == "replica"
+    assert client.request("q") == "replica"
+    # Con el circuito abierto la principal ya no se llama.
+    assert client.request("q") == "replica"
+    assert calls.count("principal") == 2
+    assert client.failovers == 2
+    assert client.get_statistics()["endpoints"][0]["state"] == CircuitBreaker.OPEN
+    client.close()
+
+
+def test_client_errors_do_not_count_as_endpoint_failures():
+    def call(url, payload):
+        raise ClientError("400")
+
+    client = HedgedClient(["principal"], call, deadline=1, failure_threshold=1)
+    for _ in range(3):
+        with pytest.raises(ClientError):
+            client.request("q")
+    assert client.endpoints[0].breaker.state == CircuitBreaker.CLOSED
+    client.close()
+
+
+def test_deadline_and_short_circuit(release):
+    client = HedgedClient(["principal"], lambda url, payload: release.wait(5), deadline=0.1,
+                          failure_threshold=1)
+    with pytest.raises(TimeoutError):
+        client.request("q")
+    assert client.deadline_exceeded == 1
+
+    client.endpoints[0].breaker.record_failure()
+    with pytest.raises(CircuitOpen):
+        client.request("q")
+    assert client.short_circuited == 1
+    client.close()
+
+
+def test_async_client_enforces_deadline_and_settles_abandoned_attempts():
+    async def hang(url, payload):
+        await asyncio.sleep(0.3)
+        raise ConnectionError("sin respuesta")
+
+    async def run():
+        client = AsyncHedgedClient(["principal"], hang, deadline=0.1, failure_threshold=1)
+        with pytest.raises(TimeoutError):
+            await client.request("q")
+        assert client.deadline_exceeded == 1
+        # El intento abandonado termina en segundo plano y abre el circuito.
+        await asyncio.sleep(0.3)
+        assert client.endpoints[0].breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpen):
+            await client.request("q")
+
+    asyncio.run(run())
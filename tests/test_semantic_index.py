@@ -0,0 +1,41 @@
+import numpy as np
+
+from semantic_index import SemanticIndex
+
+
+TOPICS = ["vacuna gripe hospital salud", "elecciones parlamento votos partido",
+          "incendio forestal bomberos monte", "futbol liga partido gol"]
+
+
+def items(count):
+    return [(f"http://ej.org/n{i}", "noticia", f"{TOPICS[i % len(TOPICS)]} noticia {i}")
+            for i in range(count)]
+
+
+def test_save_load_round_trip(tmp_path):
+    index = SemanticIndex.build(items(40), dims=8)
+    index.save(str(tmp_path))
+    loaded = SemanticIndex.load(str(tmp_path))
+
+    assert loaded.keys == index.keys
+    assert loaded.fingerprint == index.fingerprint
+    assert isinstance(loaded.embeddings, np.memmap)
+    np.testing.assert_allclose(np.asarray(loaded.embeddings), index.embeddings, rtol=1e-6)
+    assert loaded.search("vacuna hospital", k=3) == index.search("vacuna hospital", k=3)
+
+
+def test_save_does_not_truncate_live_memmap(tmp_path):
+    SemanticIndex.build(items(400), dims=16).save(str(tmp_path))
+    live = SemanticIndex.load(str(tmp_path))
+    expected = live.search("incendio bomberos", k=5)
+
+    # Un índice más pequeño sobre el mismo directorio, como en una recarga.
+    SemanticIndex.build(items(10), dims=4).save(str(tmp_path))
+
+    assert live.search("incendio bomberos", k=5) == expected
+    # Recorre todas las filas mapeadas: con el fichero truncado esto es un SIGBUS.
+    assert np.isfinite(np.asarray(live.embeddings).sum())
+    reloaded = SemanticIndex.load(str(tmp_path))
+    assert len(reloaded.keys) == 10
+    assert len(list(tmp_path.glob("embeddings*.f32"))) == 1
+    assert not list(tmp_path.glob(".semantic-*"))
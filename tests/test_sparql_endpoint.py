@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+import sparql_endpoint
+from ingestion import add_to_graph
+from sparql_endpoint import QueryError, SparqlEndpoint, SparqlWorkerPool, normalize_query
+
+
+EX = Namespace("http://ej.org/")
+
+
+def graph(count=3):
+    g = Graph()
+    for i in range(count):
+        g.add((EX[f"n{i}"], EX.titulo, Literal(f"Noticia {i}")))
+    return g
+
+
+def test_normalize_query_collapses_whitespace_and_comments():
+    text = "SELECT ?s   # todas\n WHERE {\n  ?s ?p ?o }"
+    assert normalize_query(text) == "SELECT ?s WHERE { ?s ?p ?o }"
+
+
+def test_normalize_query_keeps_string_literals_intact():
+    single = 'SELECT * WHERE { ?s ?p "a  #b" }'
+    triple = 'SELECT * WHERE { ?s ?p """uno\n  # no es comentario\ndos""" }'
+    other = 'SELECT * WHERE { ?s ?p """uno # no es comentario dos""" }'
+
+    assert normalize_query(single) == single
+    assert normalize_query(triple) == triple
+    assert normalize_query("  " + triple.replace("WHERE", "WHERE\n")) == triple
+    # Dos literales distintos no comparten entrada de caché.
+    assert normalize_query(triple) != normalize_query(other)
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = SparqlEndpoint(workers=1, timeout=20.0, queue_timeout=20.0)
+    yield endpoint
+    endpoint.close()
+
+
+def test_endpoint_runs_queries_in_workers_and_caches(endpoint):
+    g = graph()
+    query = "SELECT ?t WHERE { ?s <http://ej.org/titulo> ?t } ORDER BY ?t"
+
+    first = endpoint.query(g, "v1", query)
+    assert [b["t"]["value"] for b in first["results"]["bindings"]] == ["Noticia 0", "Noticia 1", "Noticia 2"]
+    assert endpoint.query(g, "v1", query + "  ") is first
+    assert endpoint.get_statistics()["cache_hits"] == 1
+
+    with pytest.raises(QueryError) as error:
+        endpoint.query(g, "v1", "SELECT * WHERE { SERVICE <http://ej.org/> { ?s ?p ?o } }")
+    assert error.value.status == 400
+
+
+def test_new_version_replaces_pool_and_cache(endpoint):
+    query = "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }"
+    assert endpoint.query(graph(3), "v1", query)["results"]["bindings"][0]["n"]["value"] == "3"
+    old_pool = endpoint.pool
+
+    assert endpoint.query(graph(5), "v2", query)["results"]["bindings"][0]["n"]["value"] == "5"
+    assert endpoint.pool is not old_pool
+    assert old_pool.alive == 0
+
+
+def test_closing_pool_lets_running_query_finish():
+    pool = SparqlWorkerPool(graph(350), "v1", 1, cpu_seconds=20.0, max_rows=10)
+    slow = "SELECT (COUNT(*) AS ?n) WHERE { ?a ?p ?b . ?c ?q ?d }"
+    assert pool.execute("ASK { ?s ?p ?o }", 30.0, 30.0)[0] == "ok"
+
+    results = []
+    runner = threading.Thread(target=lambda: results.append(pool.execute(slow, 30.0, 30.0)))
+    runner.start()
+    time.sleep(0.2)
+    pool.close()
+    runner.join(30)
+
+    assert results and results[0][0] == "ok"
+    assert pool.alive == 0
+    assert pool.execute("ASK { ?s ?p ?o }", 1.0, 1.0)[0] == "closed"
+
+
+def test_replacing_worker_of_closed_pool_does_not_raise():
+    pool = SparqlWorkerPool(graph(), "v1", 1, cpu_seconds=20.0, max_rows=10)
+    worker = pool._idle.get()
+    pool.close()
+    pool._replace(worker)
+    assert pool.alive == 0 and pool.restarts == 0
+
+
+def test_ingested_layers_reach_workers_without_rebuilding_pool(endpoint):
+    query = "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }"
+    base = graph(3)
+    assert endpoint.query(base, "v1", query)["results"]["bindings"][0]["n"]["value"] == "3"
+    pool = endpoint.pool
+
+    second = add_to_graph(base, [(EX.n3, EX.titulo, Literal("Noticia 3"))])
+    third = add_to_graph(second, [(EX.n4, EX.titulo, Literal("Noticia 4"))])
+    assert endpoint.query(second, "v2", query)["results"]["bindings"][0]["n"]["value"] == "4"
+    assert endpoint.query(third, "v3", query)["results"]["bindings"][0]["n"]["value"] == "5"
+    assert endpoint.pool is pool and pool.restarts == 0
+
+    # Compactar cambia la base: entonces sí se renuevan los procesos.
+    compacted = third.store.compact()
+    assert endpoint.query(compacted, "v4", query)["results"]["bindings"][0]["n"]["value"] == "5"
+    assert endpoint.pool is not pool
+
+
+def test_building_a_new_pool_does_not_block_cached_queries(endpoint, monkeypatch):
+    query = "ASK { ?s ?p ?o }"
+    old = graph(3)
+    cached = endpoint.query(old, "v1", query)
+
+    release = threading.Event()
+    original = sparql_endpoint.SparqlWorkerPool
+
+    class SlowPool(original):
+        def __init__(self, *args, **kwargs):
+            release.wait(10)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(sparql_endpoint, "SparqlWorkerPool", SlowPool)
+    results = []
+    builder = threading.Thread(target=lambda: results.append(endpoint.query(graph(5), "v2", query)))
+    builder.start()
+    time.sleep(0.1)
+
+    start = time.monotonic()
+    assert endpoint.query(old, "v1", query) is cached
+    assert time.monotonic() - start < 1.0
+    release.set()
+    builder.join(30)
+    assert results and results[0]["boolean"] is True
+
+
+def test_dead_worker_is_a_server_error_and_gets_replaced(endpoint):
+    g = graph()
+    endpoint.query(g, "v1", "ASK { ?s ?p ?o }")
+    worker = endpoint.pool._workers[0]
+    worker.process.kill()
+    worker.process.join(5)
+
+    with pytest.raises(QueryError) as error:
+        endpoint.query(g, "v1", "SELECT * WHERE { ?s ?p ?o }")
+    assert error.value.status == 503
+    assert endpoint.get_statistics()["crashed"] == 1
+    assert endpoint.query(g, "v1", "SELECT * WHERE { ?s ?p ?o }")["results"]["bindings"]
+
+
+def test_startup_wait_is_bounded_by_query_timeout():
+    pool = SparqlWorkerPool(graph(), "v1", 1, cpu_seconds=20.0, max_rows=10)
+    try:
+        start = time.monotonic()
+        status, _ = pool.execute("ASK { ?s ?p ?o }", 1.0, 0.001)
+        assert status == "busy" and time.monotonic() - start < 1.0
+        # El proceso que aún cargaba el grafo no se descarta.
+        assert pool.restarts == 0
+        assert pool.execute("ASK { ?s ?p ?o }", 30.0, 30.0)[0] == "ok"
+    finally:
+        pool.close()
@@ -0,0 +1,93 @@
+import threading
+
+from rdflib import Graph, Literal, Namespace
+
+from sqlite_store import open_graph
+
+
+EX = Namespace("http://ej.org/")
+
+
+def in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_round_trip_and_subject_order(tmp_path):
+    graph = open_graph(str(tmp_path / "store.sqlite"))
+    source = Graph()
+    for i in range(50):
+        source.add((EX[f"n{i % 7}"], EX[f"p{i % 3}"], Literal(i)))
+        source.add((EX[f"n{i % 7}"], EX.titulo, Literal(f"título {i}", lang="es")))
+    graph.addN((s, p, o, graph) for s, p, o in source)
+    graph.commit()
+
+    reopened = open_graph(str(tmp_path / "store.sqlite"), read_only=True)
+    assert set(reopened) == set(source)
+    subjects = [s for s, _, _ in reopened.triples((None, None, None))]
+    # Las tripletas de cada sujeto salen seguidas.
+    assert len({s for i, s in enumerate(subjects) if i == 0 or subjects[i - 1] != s}) == 7
+
+
+def test_uncommitted_term_ids_are_not_shared(tmp_path):
+    graph = open_graph(str(tmp_path / "store.sqlite"))
+    graph.add((EX.a, EX.titulo, Literal("confirmado")))
+    graph.commit()
+
+    graph.add((EX.b, EX.titulo, Literal("pendiente")))
+    # Otro hilo (otra conexión) no ve la transacción abierta ni sus identificadores.
+    assert in_thread(lambda: list(graph.triples((EX.b, None, None)))) == []
+    assert in_thread(lambda: graph.store._lookup(graph.store._db(), EX.b)) is None
+
+    graph.commit()
+    assert in_thread(lambda: list(graph.triples((EX.b, None, None)))) == [
+        (EX.b, EX.titulo, Literal("pendiente"))]
+
+
+def test_rollback_discards_only_the_transaction_ids(tmp_path):
+    graph = open_graph(str(tmp_path / "store.sqlite"))
+    graph.add((EX.a, EX.titulo, Literal("confirmado")))
+    graph.commit()
+    cached = dict(graph.store._ids)
+
+    graph.add((EX.c, EX.titulo, Literal("descartado")))
+    graph.rollback()
+
+    assert graph.store._ids == cached
+    assert list(graph.triples((EX.c, None, None))) == []
+    graph.add((EX.c, EX.titulo, Literal("de nuevo")))
+    graph.commit()
+    assert in_thread(lambda: [o for _, _, o in graph.triples((EX.c, None, None))]) == [Literal("de nuevo")]
+
+
+def test_concurrent_readers_with_a_small_cache(tmp_path):
+    path = str(tmp_path / "store.sqlite")
+    writer = open_graph(path, cache_size=16)
+    writer.addN((EX[f"n{i}"], EX.titulo, Literal(f"t{i}"), writer) for i in range(300))
+    writer.commit()
+    errors, counts = [], []
+
+    def reader():
+        try:
+            for _ in range(20):
+                counts.append(len(list(writer.triples((None, EX.titulo, None)))))
+        except Exception as e:  # pragma: no cover - sólo si hay carreras
+            errors.append(e)
+
+    def write_more():
+        for i in range(300, 340):
+            writer.add((EX[f"n{i}"], EX.titulo, Literal(f"t{i}")))
+            writer.commit()
+
+    threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=write_more)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert all(300 <= count <= 340 for count in counts)
+    assert len(writer) == 340
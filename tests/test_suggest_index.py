@@ -0,0 +1,87 @@
+import threading
+import time
+
+from app import NewsSearchConfig
+from news_index import fold_text
+from suggest_index import SuggestIndex, SuggestService
+
+
+def entry(text, weight, kind="titulo"):
+    return (fold_text(text), text, kind, float(weight))
+
+
+def test_suggest_orders_by_weight_with_and_without_precomputed_prefixes():
+    entries = [entry(f"salud {i:03d}", i) for i in range(200)] + [entry("Sal marina", 500)]
+    index = SuggestIndex(entries, top_k=5)
+    assert "sal" in index.precomputed
+    assert [s["text"] for s in index.suggest("SAL", 3)] == ["Sal marina", "salud 199", "salud 198"]
+    assert [s["text"] for s in index.suggest("salud 00", 2)] == ["salud 009", "salud 008"]
+    assert index.suggest("   ") == []
+
+
+class Source:
+    def __init__(self, texts, delay=0.0):
+        self.texts = list(texts)
+        self.delay = delay
+        self.builds = 0
+
+    def source(self):
+        return (lambda: len(self.texts), self.entries)
+
+    def entries(self):
+        self.builds += 1
+        time.sleep(self.delay)
+        return [entry(text, 1) for text in self.texts]
+
+
+def test_only_changed_sources_are_rebuilt():
+    news, dbpedia = Source(["Vacuna"]), Source(["Valencia"])
+    service = SuggestService({"news": news.source(), "dbpedia": dbpedia.source()})
+    assert [s["text"] for s in service.suggest("va")] == ["Vacuna", "Valencia"]
+    assert not service.refresh()
+    news.texts.append("Vacunación")
+    assert [s["text"] for s in service.suggest("vacuna")] == ["Vacuna", "Vacunación"]
+    assert (news.builds, dbpedia.builds, service.rebuilds) == (2, 1, 2)
+
+
+def test_with_sources_reuses_unchanged_entries_and_builds_lazily():
+    news, dbpedia = Source(["Vacuna"]), Source(["Valencia"])
+    service = SuggestService({"news": news.source(), "dbpedia": dbpedia.source()})
+    newer = Source(["Vacuna", "Vacunación"])
+    derived = service.with_sources({"news": newer.source()})
+    assert newer.builds == 0
+    assert [s["text"] for s in derived.suggest("vacuna")] == ["Vacuna", "Vacunación"]
+    assert [s["text"] for s in service.suggest("vacuna")] == ["Vacuna"]
+    assert (newer.builds, dbpedia.builds) == (1, 1)
+
+
+def test_concurrent_requests_rebuild_once_and_never_block():
+    news = Source(["Vacuna"], delay=0.3)
+    service = SuggestService({"news": news.source()})
+    news.texts.append("Vacunación")
+    results, elapsed = [], []
+
+    def request():
+        start = time.perf_counter()
+        results.append([s["text"] for s in service.suggest("vacuna")])
+        elapsed.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert news.builds == 2
+    # Una petición reconstruye; las demás responden con el índice anterior sin esperar.
+    assert sorted(elapsed)[-2] < 0.2
+    assert ["Vacuna", "Vacunación"] in results
+    assert all(result in (["Vacuna"], ["Vacuna", "Vacunación"]) for result in results)
+    assert [s["text"] for s in service.suggest("vacuna")] == ["Vacuna", "Vacunación"]
+
+
+def test_suggest_endpoint_clamps_k(web_app):
+    client = web_app.test_client()
+    for k in ("0", "-3"):
+        assert len(client.get(f"/api/suggest?q=sa&k={k}").get_json()["suggestions"]) == 1
+    many = client.get("/api/suggest?q=s&k=100000").get_json()["suggestions"]
+    assert 1 < len(many) <= NewsSearchConfig.SUGGEST_MAX_RESULTS
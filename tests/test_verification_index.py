@@ -0,0 +1,74 @@
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDFS, XSD
+
+from verification_index import VerificationIndex, normalize_state
+
+
+NS = Namespace("http://ej.org/onto#")
+N1, N2, N3 = (URIRef(f"http://ej.org/noticia{i}") for i in (1, 2, 3))
+
+
+def _verification(graph, name, noticias, estado=None, fecha=None, resultado=None):
+    uri = URIRef(f"http://ej.org/{name}")
+    for noticia in noticias:
+        graph.add((uri, NS.evalua, noticia))
+    if estado is not None:
+        graph.add((uri, NS.Estado, Literal(estado)))
+    if fecha is not None:
+        graph.add((uri, NS.FechaVerificación, Literal(fecha, datatype=XSD.date)))
+    if resultado is not None:
+        graph.add((uri, NS.Resultado, Literal(resultado)))
+    return uri
+
+
+def _graph():
+    graph = Graph()
+    _verification(graph, "v1", [N1], "En proceso", "2024-01-10")
+    _verification(graph, "v2", [N1], "FInalizada ", "2024-02-01")
+    _verification(graph, "v3", [N1], "pendiente de fuentes", "2024-03-01", "Sin datos")
+    _verification(graph, "v4", [N1, N2], "Rechazada")
+    metodo = URIRef("http://ej.org/metodo")
+    graph.add((URIRef("http://ej.org/v2"), NS.se_apoya_en, metodo))
+    graph.add((metodo, RDFS.label, Literal("Contraste de fuentes")))
+    return graph
+
+
+def test_normalize_state():
+    assert normalize_state(" en  PROCESO ") == "En proceso"
+    assert normalize_state("Finalizada") == "Finalizada"
+    assert normalize_state("otra cosa") is None
+
+
+def test_aggregated_state_is_latest_known_state():
+    index = VerificationIndex.from_graph(_graph(), NS)
+    # v3 es la más reciente pero su estado no es conocido: cuenta v2.
+    assert [v.uri.rsplit("/", 1)[-1] for v in index.verifications(N1)] == ["v3", "v2", "v1", "v4"]
+    assert index.state(N1) == "Finalizada"
+    assert index.is_verified(N1)
+    assert index.verification_date(N1) == "2024-03-01"
+    assert index.verifications(N1)[0].notas == ["pendiente de fuentes", "Sin datos"]
+    assert index.latest(N1).metodos == ["Contraste de fuentes"]
+
+    # Una verificación sin fecha cuenta como la más antigua.
+    assert index.state(N2) == "Rechazada"
+    assert index.verification_date(N2) == "?"
+    assert index.state(N3) == "No verificada"
+    assert index.unverified([N1, N2, N3]) == [N3]
+
+
+def test_reindexing_and_copy_isolation():
+    graph = _graph()
+    index = VerificationIndex.from_graph(graph, NS)
+    snapshot = index.copy()
+
+    v4 = URIRef("http://ej.org/v4")
+    graph.remove((v4, NS.evalua, N2))
+    graph.add((v4, NS.FechaVerificación, Literal("2024-05-01", datatype=XSD.date)))
+    index.add(graph, v4)
+    assert index.state(N1) == "Rechazada"
+    assert index.verifications(N2) == []
+    assert index.get_statistics()["states"]["Rechazada"] == 1
+
+    assert snapshot.state(N1) == "Finalizada"
+    assert snapshot.state(N2) == "Rechazada"
+    assert snapshot.version < index.version
@@ -0,0 +1,46 @@
+"""
+Protocolo ``batchexecute`` del traductor web de Google, el que usa googletrans
+4.0.0rc1 por debajo. No es una API pública: el identificador de la llamada y
+la forma de la respuesta pueden cambiar sin aviso. Todo lo que depende de ese
+formato está aquí, con sus propias constantes, para que el cliente asíncrono
+no importe nombres privados de googletrans y un cambio del protocolo se
+arregle en un solo sitio.
+"""
+
+import json
+from typing import Dict, Tuple
+
+
+# googletrans.client.RPC_ID y googletrans.urls.TRANSLATE_RPC en 4.0.0rc1.
+RPC_ID = "MkEWBc"
+TRANSLATE_RPC = "https://{host}/_/TranslateWebserverUi/data/batchexecute"
+
+
+def translate_url(host: str) -> str:
+    return TRANSLATE_RPC.format(host=host)
+
+
+def build_request(text: str, source: str, target: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Parámetros de la URL y cuerpo del formulario para traducir ``text``."""
+    payload = json.dumps([[text, source, target, True], [None]], separators=(',', ':'))
+    request = json.dumps([[[RPC_ID, payload, None, 'generic']]], separators=(',', ':'))
+    return {"rpcids": RPC_ID, "rt": "c"}, {"f.req": request}
+
+
+def parse_response(body: str) -> str:
+    """
+    Extrae el texto traducido de la respuesta.
+
+    Raises:
+        ValueError: La respuesta no tiene la forma esperada
+    """
+    for line in body.split("\n"):
+        if f'"{RPC_ID}"' in line[:30]:
+            try:
+                parsed = json.loads(json.loads(line)[0][2])
+                parts = parsed[1][0][0][5]
+                separator = " " if parsed[1][0][0][3] else ""
+                return separator.join(part[0] for part in parts)
+            except (IndexError, TypeError, KeyError) as e:
+                raise ValueError(f"respuesta de traducción inesperada: {e}") from e
+    raise ValueError("respuesta de traducción sin datos")
@@ -0,0 +1,176 @@
+"""
+Índice inverso noticia → verificaciones.
+Precalcula para cada Noticia sus registros de Verificación (estado, fecha,
+método en que se apoya y entidad responsable) y el estado agregado, de modo
+que las búsquedas y las facetas consultan un diccionario en lugar de unir
+``evalua`` y ``Estado`` en cada consulta SPARQL.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDFS
+
+from news_index import NOT_VERIFIED, UNDATED, fold_text, format_date
+
+
+# Estados admitidos por Poblacion, indexados por su forma normalizada
+# (así "FInalizada" o "finalizada " cuentan como "Finalizada").
+KNOWN_STATES = {
+    "finalizada": "Finalizada",
+    "en proceso": "En proceso",
+    "rechazada": "Rechazada",
+}
+VERIFIED_STATES = {"Finalizada"}
+
+
+def normalize_state(value: str) -> Optional[str]:
+    """Forma canónica de un estado de verificación, o None si no es un estado conocido."""
+    return KNOWN_STATES.get(" ".join(fold_text(value).split()))
+
+
+def local_name(graph: Graph, resource) -> str:
+    """Etiqueta del recurso o, si no tiene, el final de su URI."""
+    label = graph.value(resource, RDFS.label)
+    if label:
+        return str(label)
+    return str(resource).rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+
+@dataclass
+class Verification:
+    """Un registro de Verificación tal como se muestra junto a la noticia."""
+    uri: str
+    estado: Optional[str] = None
+    fecha: str = UNDATED
+    metodos: List[str] = field(default_factory=list)
+    responsables: List[str] = field(default_factory=list)
+    # Textos de Resultado y valores de Estado que no son un estado conocido.
+    notas: List[str] = field(default_factory=list)
+
+    @property
+    def order(self) -> tuple:
+        return (self.fecha if self.fecha != UNDATED else "", self.uri)
+
+    def to_dict(self) -> dict:
+        return {
+            "uri": self.uri,
+            "estado": self.estado or NOT_VERIFIED,
+            "fecha": self.fecha,
+            "metodos": self.metodos,
+            "responsables": self.responsables,
+            "notas": self.notas
+        }
+
+
+class VerificationIndex:
+    """
+    Verificaciones agrupadas por noticia, de la más reciente a la más antigua.
+
+    El estado agregado de una noticia es el de su verificación más reciente
+    con un estado conocido; las verificaciones sin fecha cuentan como las
+    más antiguas.
+    """
+
+    def __init__(self, ontology_ns: Namespace):
+        self.ontology_ns = ontology_ns
+        self.by_news: Dict[str, List[Verification]] = {}
+        self.news_by_verification: Dict[str, List[str]] = {}
+        self.version = 0
+
+    @classmethod
+    def from_graph(cls, graph: Graph, ontology_ns: Namespace) -> "VerificationIndex":
+        index = cls(ontology_ns)
+        for verificacion in set(graph.subjects(ontology_ns.evalua, None)):
+            index.add(graph, verificacion)
+        return index
+
+    def copy(self) -> "VerificationIndex":
+        """
+        Copia independiente para la ingesta en línea: ``add`` sobre la copia no
+        altera las listas que leen las búsquedas con la generación vigente.
+        """
+        index = VerificationIndex(self.ontology_ns)
+        index.by_news = {noticia: list(records) for noticia, records in self.by_news.items()}
+        index.news_by_verification = dict(self.news_by_verification)
+        index.version = self.version
+        return index
+
+    def add(self, graph: Graph, verificacion: URIRef) -> None:
+        """
+        Indexa (o vuelve a indexar) una verificación ya insertada en el grafo.
+        Sólo lee las tripletas de ese recurso: coste proporcional a sus propiedades.
+        """
+        ns = self.ontology_ns
+        key = str(verificacion)
+        self._remove(key)
+
+        record = Verification(uri=key)
+        for estado in graph.objects(verificacion, ns.Estado):
+            state = normalize_state(str(estado))
+            if state is not None and record.estado is None:
+                record.estado = state
+            elif state is None:
+                record.notas.append(str(estado))
+        record.notas.extend(str(r) for r in graph.objects(verificacion, ns.Resultado))
+        fechas = [format_date(f) for f in graph.objects(verificacion, ns.FechaVerificación)]
+        if fechas:
+            record.fecha = max(fechas)
+        record.metodos = sorted(local_name(graph, m) for m in graph.objects(verificacion, ns.se_apoya_en))
+        record.responsables = sorted(local_name(graph, r)
+                                     for r in graph.objects(verificacion, ns.se_realiza_por))
+
+        noticias = sorted({str(n) for n in graph.objects(verificacion, ns.evalua)})
+        for noticia in noticias:
+            records = self.by_news.setdefault(noticia, [])
+            records.append(record)
+            records.sort(key=lambda r: r.order, reverse=True)
+        if noticias:
+            self.news_by_verification[key] = noticias
+        self.version += 1
+
+    def _remove(self, key: str) -> None:
+        for noticia in self.news_by_verification.pop(key, []):
+            records = [r for r in self.by_news.get(noticia, []) if r.uri != key]
+            if records:
+                self.by_news[noticia] = records
+            else:
+                self.by_news.pop(noticia, None)
+
+    def verifications(self, noticia: str) -> List[Verification]:
+        return self.by_news.get(str(noticia), [])
+
+    def latest(self, noticia: str) -> Optional[Verification]:
+        """Verificación más reciente con un estado conocido."""
+        for record in self.verifications(noticia):
+            if record.estado is not None:
+                return record
+        return None
+
+    def state(self, noticia: str) -> str:
+        latest = self.latest(noticia)
+        return latest.estado if latest is not None else NOT_VERIFIED
+
+    def verification_date(self, noticia: str) -> str:
+        records = self.verifications(noticia)
+        return max((r.fecha for r in records if r.fecha != UNDATED), default=UNDATED)
+
+    def is_verified(self, noticia: str) -> bool:
+        return self.state(noticia) in VERIFIED_STATES
+
+    def unverified(self, noticias: Iterable[str]) -> List[str]:
+        """Noticias sin ningún registro de verificación."""
+        return [n for n in noticias if str(n) not in self.by_news]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Retorna estadísticas del índice de verificaciones."""
+        states = dict.fromkeys(KNOWN_STATES.values(), 0)
+        for noticia in self.by_news:
+            state = self.state(noticia)
+            states[state] = states.get(state, 0) + 1
+        return {
+            "verifications": len(self.news_by_verification),
+            "news_with_verifications": len(self.by_news),
+            "states": states
+        }